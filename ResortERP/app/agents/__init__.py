@@ -1,10 +1,3 @@
-import datetime
-from zoneinfo import ZoneInfo
-from google.adk.agents import Agent
-import os
-import asyncio
-from google.adk.agents import Agent
-from google.adk.sessions import InMemorySessionService
-from google.adk.runners import Runner
-from google.genai import types # For creating message Content/Parts
-from app.config.env import get_settings
+# Keep this package import-free: the Google ADK/GenAI stack is heavy, so
+# agent modules are only imported on the first chat request or on warmup
+# (see app.routers.endpoints.chatRouter.load_agent_factory).
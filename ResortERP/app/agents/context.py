@@ -0,0 +1,142 @@
+# app/agents/context.py
+#
+# Guest context prefetched into a chat session.
+#
+# Most chats open with "what have I booked?" and "what is free?". Each of
+# those questions costs a tool call, which is an extra model round trip.
+# initialize_agent therefore loads the guest's bookings, the available rooms
+# and the next calendar events concurrently, and stores them in the session
+# state under CONTEXT_KEY. The agents' instructions include that state, so
+# they can answer these questions without a tool call. The data uses the same
+# shape as the tools return.
+#
+# Before each turn, the context is checked against the "rooms" data version
+# of every resort. Booking, unbooking and room changes bump that version. When
+# it has changed, bookings and availability are reloaded. Calendar events are
+# reloaded once they are older than CHAT_CONTEXT_CALENDAR_TTL_SECONDS.
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from app.config.db import shard_router
+from app.config.env import get_settings
+from app.repo.data_version import data_versions, ROOMS
+from .tools.rag_tools.google_calendar import tool_get_next_10_calendar_events
+from .tools.repo_tools.repo_tools import tool_get_bookings_for_users, tool_search_rooms
+
+logger = logging.getLogger(__name__)
+
+# Session state keys
+CONTEXT_KEY = "guest_context"
+VERSIONS_KEY = "guest_context_versions"
+
+BOOKINGS = "bookings"
+AVAILABILITY = "available_rooms"
+CALENDAR = "calendar_events"
+
+# Parts that depend on resort data, reloaded when a resort's rooms data version changes
+DATA_PARTS = (BOOKINGS, AVAILABILITY)
+
+
+class GuestContext:
+    """
+    The prefetched context of one chat session. Each part is loaded in a worker
+    thread. A part that fails or does not finish within `timeout` seconds holds
+    an error instead, and the agent falls back to the tool.
+    """
+
+    def __init__(self, user_id: str, timeout: Optional[float] = None, calendar_ttl: Optional[float] = None):
+        settings = get_settings()
+        self.user_id = user_id
+        self.timeout = settings.CHAT_CONTEXT_TIMEOUT_SECONDS if timeout is None else timeout
+        self.calendar_ttl = settings.CHAT_CONTEXT_CALENDAR_TTL_SECONDS if calendar_ttl is None else calendar_ttl
+        self.max_bookings = settings.CHAT_CONTEXT_MAX_BOOKINGS
+        self.parts: Dict[str, Any] = {}
+        self.loaded_at: Dict[str, float] = {}
+        # Rooms data version of each resort when the data parts were last loaded
+        self.versions: Dict[str, int] = {}
+        self.loaders: Dict[str, Callable[[], Any]] = {
+            BOOKINGS: self._load_bookings,
+            AVAILABILITY: tool_search_rooms,
+            CALENDAR: tool_get_next_10_calendar_events,
+        }
+
+    async def load(self, parts: Optional[Iterable[str]] = None) -> None:
+        """Loads `parts` (all of them by default) concurrently."""
+        parts = list(parts if parts is not None else self.loaders)
+        started = time.perf_counter()
+        if any(part in DATA_PARTS for part in parts):
+            # Read before the data, so a change made during the load is seen by the next check
+            self.versions = await asyncio.to_thread(self._read_versions)
+        results = await asyncio.gather(*(self._load_part(part) for part in parts))
+        for part, result in zip(parts, results):
+            self.parts[part] = result
+            self.loaded_at[part] = time.monotonic()
+        logger.info("Chat context loaded", extra={
+            "user_id": self.user_id, "parts": parts, "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        })
+
+    async def _load_part(self, part: str) -> Any:
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(self.loaders[part]), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Chat context part timed out", extra={"user_id": self.user_id, "part": part})
+            return {"error": f"Not loaded within {self.timeout}s; use the tool instead."}
+        except Exception as e:
+            logger.exception("Error loading chat context", extra={"user_id": self.user_id, "part": part})
+            return {"error": f"Not loaded ({e}); use the tool instead."}
+
+    def _load_bookings(self) -> Dict[str, Any]:
+        # Only the latest bookings go into the prompt; the tool returns all of them
+        result = tool_get_bookings_for_users(self.user_id)
+        for user_id, bookings in result.get("bookings", {}).items():
+            if len(bookings) > self.max_bookings:
+                bookings.sort(key=lambda booking: booking["booking_date"], reverse=True)
+                result.setdefault("total_bookings", {})[user_id] = len(bookings)
+                del bookings[self.max_bookings:]
+        return result
+
+    def _read_versions(self) -> Dict[str, int]:
+        ttl = get_settings().DATA_VERSION_TTL_SECONDS
+        versions = {}
+        for resort_id in shard_router.resort_ids():
+            try:
+                versions[resort_id] = data_versions.current(resort_id, ROOMS, ttl)
+            except Exception:
+                # An unreachable resort counts as changed, so it is retried on the next turn
+                versions[resort_id] = -1
+        return versions
+
+    async def stale_parts(self) -> list:
+        """Parts whose data changed since they were loaded, or that are too old."""
+        stale = []
+        if any(part in self.parts for part in DATA_PARTS):
+            versions = await asyncio.to_thread(self._read_versions)
+            if versions != self.versions or -1 in versions.values():
+                stale += [part for part in DATA_PARTS if part in self.parts]
+        loaded_at = self.loaded_at.get(CALENDAR)
+        if loaded_at is not None and time.monotonic() - loaded_at > self.calendar_ttl:
+            stale.append(CALENDAR)
+        return stale
+
+    async def refresh(self) -> list:
+        """Reloads the stale parts; returns them (empty if nothing changed)."""
+        stale = await self.stale_parts()
+        if stale:
+            await self.load(stale)
+        return stale
+
+    def render(self) -> str:
+        return json.dumps(
+            {"guest_user_id": self.user_id, "as_of": datetime.now(timezone.utc).isoformat(timespec="seconds"), **self.parts},
+            separators=(",", ":"),
+            default=str,
+        )
+
+    def state(self) -> Dict[str, Any]:
+        """The session state entries holding this context."""
+        return {CONTEXT_KEY: self.render(), VERSIONS_KEY: dict(self.versions)}
@@ -7,11 +7,13 @@ from .tools.rag_tools.google_calendar import (
     tool_get_next_10_calendar_events,
     tool_get_calendar_events_in_range
 )
+from .tools.rag_tools.knowledge_base import tool_search_resort_knowledge
 
 def getRagAgent() -> Agent:
-    """Creates the RAG agent specialized in accessing Google Calendar."""
+    """Creates the RAG agent that answers from the resort documents and Google Calendar."""
 
-    calendar_tools = [
+    rag_tools = [
+        tool_search_resort_knowledge,
         tool_get_next_10_calendar_events,
         tool_get_calendar_events_in_range,
     ]
@@ -21,12 +23,16 @@ def getRagAgent() -> Agent:
         # Use a model strong enough for function calling and understanding dates
         model="gemini-1.5-flash", # Or gemini-pro
         description=(
-            "An agent that can access and retrieve information from the user's "
-            "primary Google Calendar. It can fetch upcoming events or events "
-            "within a specified date range."
+            "An agent that answers questions about the resort (spa, restaurants, menus, "
+            "policies, facilities, activities) from the resort's documents, and that can "
+            "retrieve events from the user's primary Google Calendar."
         ),
         instruction=(
-            "You are a helpful assistant with access to the user's Google Calendar. "
+            "You are a helpful assistant for the resort. For questions about the resort's services, "
+            "opening hours, menus, prices or policies, call tool_search_resort_knowledge first and "
+            "answer only from the passages it returns, naming the source. If it returns 'not_found', "
+            "say that the information is not available instead of guessing. "
+            "You also have access to the user's Google Calendar. "
             "Use the provided tools to answer questions about calendar events. "
             "When retrieving events in a range, ensure you understand the start and end dates/times "
             "from the user's query and provide them to the tool in ISO 8601 format "
@@ -35,7 +41,7 @@ def getRagAgent() -> Agent:
             "If no events are found, state that clearly. If an error occurs, report it."
             "You need valid, pre-existing authentication credentials (token.json) to function."
         ),
-        tools=calendar_tools,
+        tools=rag_tools,
         # enable_feedback=False # Optional
     )
     return rag_agent
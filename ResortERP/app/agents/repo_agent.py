@@ -79,43 +79,75 @@
 #     # return uri for booking
 #     return {"booking_uri": f"http://localhost:8000/booking?user_id={user_id}&room_id={room_id}"}
 
+from typing import Optional
+
 from google.adk.agents import Agent
 # Import the NEW tool functions
 from .tools.repo_tools.repo_tools import (
+    tool_list_resorts,
     tool_get_available_rooms,
-    tool_get_user_bookings,
+    tool_search_rooms,
+    tool_get_bookings_for_users,
+    tool_get_room_status,
     tool_book_room,
     tool_unbook_room
     # Add any other tools you create
 )
 
-def getRepoAgent() -> Agent:
-    """Creates the sub-agent responsible for resort repository interactions."""
+def getRepoAgent(context_key: Optional[str] = None) -> Agent:
+    """
+    Creates the sub-agent responsible for resort repository interactions.
+
+    Args:
+        context_key (str, optional): Session state key holding the prefetched guest context
+            (see app/agents/context.py), included in the instruction.
+    """
 
     # List the agent-specific tool functions
     repo_tools = [
+        tool_list_resorts,
         tool_get_available_rooms,
-        tool_get_user_bookings,
+        tool_search_rooms,
+        tool_get_bookings_for_users,
+        tool_get_room_status,
         tool_book_room,
         tool_unbook_room,
     ]
 
+    instruction = (
+        "You are a database interaction agent for a resort. "
+        "Use the provided tools accurately based on the user's request. "
+        "You can query room availability, user bookings, book a room, or unbook a room. "
+        "When the user mentions room type, view, amenities, number of guests or budget, use tool_search_rooms "
+        "with those filters rather than listing every available room. "
+        "tool_get_bookings_for_users and tool_get_room_status take comma-separated lists: when a request "
+        "involves several guests or rooms, make ONE call with all of them instead of one call per item. "
+        "The group has several resorts (tool_list_resorts). tool_search_rooms and tool_get_bookings_for_users "
+        "cover all resorts unless narrowed; room numbers are per resort, so pass resort_id to "
+        "tool_get_available_rooms and tool_get_room_status when the guest names a resort, and always say "
+        "which resort a room belongs to. "
+        "Provide results clearly. Ask for user ID or room ID if needed and not provided."
+        "For room booking, check if the room is available before booking, and you don't need user ID to book a room. "
+        "When the guest's user ID is known, pass it to tool_book_room: the room is then held for them while they "
+        "check out, and you should tell them until when. "
+        "When booking or unbooking, confirm the action and provide relevant details like booking ID or room number."
+    )
+    if context_key:
+        instruction += (
+            " The current guest's latest bookings and the cheapest available rooms are already loaded below, in the "
+            "format the tools return, and kept current; answer from them without a tool call when they cover "
+            "the question. Guest context: {" + context_key + "}"
+        )
+
     repo_agent = Agent(
         name="resort_database_manager",
         # Use a model capable of function calling
         model="gemini-1.5-flash", # Or gemini-pro, etc.
         description=(
-            "Manages interactions with the resort's database. "
+            "Manages interactions with the databases of the group's resorts. "
             "Can find available rooms, list user bookings, book rooms, and unbook rooms."
         ),
-        instruction=(
-            "You are a database interaction agent for a resort. "
-            "Use the provided tools accurately based on the user's request. "
-            "You can query room availability, user bookings, book a room, or unbook a room. "
-            "Provide results clearly. Ask for user ID or room ID if needed and not provided."
-            "For room booking, check if the room is available before booking, and you don't need user ID to book a room."
-            "When booking or unbooking, confirm the action and provide relevant details like booking ID or room number."
-        ),
+        instruction=instruction,
         tools=repo_tools, # Use the wrapper tools
         # enable_feedback=False # Optional: disable if not needed
     )
@@ -1,16 +1,26 @@
 import datetime
+import inspect
+import logging
+import time
+import uuid
 from zoneinfo import ZoneInfo
 from google.adk.agents import Agent
 import os
 import asyncio
 from google.adk.agents import Agent
+from google.adk.events import Event, EventActions
 from google.adk.sessions import InMemorySessionService
 from google.adk.runners import Runner
 from google.genai import types # For creating message Content/Parts
+from app.config.db import AGENT, db_workload
 from app.config.env import get_settings
 from .repo_agent import getRepoAgent
 from .rag_agent import getRagAgent
+from .context import CONTEXT_KEY, GuestContext
+from app.observability.log import request_id_var
+from app.observability.metrics import CHAT_TOOL_CALLS
 
+logger = logging.getLogger(__name__)
 
 
 def get_weather(city: str) -> dict:
@@ -65,18 +75,57 @@ def get_current_time(city: str) -> dict:
     return {"status": "success", "report": report}
 
 
+async def _resolve(value):
+    # Session service methods are synchronous in older google-adk releases and coroutines in newer ones
+    return await value if inspect.isawaitable(value) else value
+
 
 class WeatherTimeAgent:
-    def __init__(self, runner: Runner, session: InMemorySessionService, app_name, user_id, session_id):
+    def __init__(self, runner: Runner, session: InMemorySessionService, app_name, user_id, session_id, context: GuestContext = None):
         self.app_name = app_name
         self.user_id = user_id
         self.session_id = session_id
         self.runner = runner
         self.session = session
+        self.context = context
+
+    async def refresh_context(self) -> None:
+        """Reloads the parts of the guest context whose data changed and writes them to the session state."""
+        if self.context is None:
+            return
+        stale = await self.context.refresh()
+        if not stale:
+            return
+        session = await _resolve(self.runner.session_service.get_session(
+            app_name=self.app_name, user_id=self.user_id, session_id=self.session_id,
+        ))
+        # An event without content only updates the state; the model never sees it as a message
+        event = Event(
+            invocation_id=f"context-{uuid.uuid4().hex}",
+            author="user",
+            actions=EventActions(state_delta=self.context.state()),
+        )
+        await _resolve(self.runner.session_service.append_event(session, event))
+        logger.info("Chat context refreshed", extra={"user_id": self.user_id, "session_id": self.session_id, "parts": stale})
 
     async def call_agent_async(self, query: str):
-        """Sends a query to the agent and prints the final response."""
-        print(f"\n>>> User Query: {query}")
+        """Sends a query to the agent and logs the final response."""
+        # The turn's database access (context refresh, tools) uses the agent pools
+        with db_workload(AGENT):
+            return await self._call_agent(query)
+
+    async def _call_agent(self, query: str):
+        # Tag every log line of this turn (including tool calls) with one correlation id
+        if request_id_var.get() == "-":
+            request_id_var.set(uuid.uuid4().hex)
+        started = time.perf_counter()
+        logger.info("User query", extra={"user_id": self.user_id, "session_id": self.session_id, "query": query})
+        try:
+            await self.refresh_context()
+        except Exception:
+            # A stale context is better than a failed turn; the agent can still call the tools
+            logger.exception("Error refreshing chat context", extra={"user_id": self.user_id})
+        tool_calls = 0
 
         # Prepare the user's message in ADK format
         content = types.Content(role='user', parts=[types.Part(text=query)])
@@ -89,7 +138,12 @@ class WeatherTimeAgent:
             user_id=self.user_id, session_id=self.session_id, new_message=content
         ):
             # Uncomment the line below to see *all* events during execution
-            # print(f"  [Event] Author: {event.author}, Type: {type(event).__name__}, Final: {event.is_final_response()}, Content: {event.content}")
+            logger.debug(
+                "Agent event", extra={"author": event.author, "final": event.is_final_response(), "sample_rate": 0.1}
+            )
+            for call in event.get_function_calls():
+                tool_calls += 1
+                CHAT_TOOL_CALLS.inc((call.name,))
 
             # Key Concept: is_final_response() marks the concluding message for the turn.
             if event.is_final_response():
@@ -101,7 +155,16 @@ class WeatherTimeAgent:
                 # Add more checks here if needed (e.g., specific error codes)
                 break  # Stop processing events once the final response is found
 
-        print(f"<<< Agent Response: {final_response_text}")
+        logger.info(
+            "Agent response",
+            extra={
+                "user_id": self.user_id,
+                "session_id": self.session_id,
+                "response": final_response_text,
+                "tool_calls": tool_calls,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            },
+        )
         return final_response_text
 
 
@@ -112,7 +175,13 @@ async def initialize_agent(user_id):
     settings = get_settings()
     os.environ["GOOGLE_API_KEY"] = settings.GOOGLE_API_KEY  # <--- REPLACE
 
-    repoAgent = getRepoAgent()
+    # Prefetch the guest's bookings, availability and calendar while the agents are built
+    context = GuestContext(user_id)
+    with db_workload(AGENT):
+        # The task keeps the workload it was created with
+        prefetch = asyncio.create_task(context.load())
+
+    repoAgent = getRepoAgent(context_key=CONTEXT_KEY)
     ragAgent = getRagAgent()
     root_agent = Agent(
         name="weather_time_resort_agent",
@@ -126,8 +195,14 @@ async def initialize_agent(user_id):
             "You are a specialized agent designed to assist users with weather and time-related queries for cities. "
             "You also have a sub-agent capable of managing resort bookings, including checking available rooms, "
             "booking rooms, and retrieving user booking information. Always provide clear and concise responses."
-            "You also have a sub-agent called ragAgent that can access the resort Google Calendar events and services. "
-            ""
+            "You also have a sub-agent called ragAgent that answers questions about resort services, hours, menus and policies from the resort documents, and can access Google Calendar events. "
+            "The guest's context was loaded when this chat started and is kept current: their latest bookings at every "
+            "resort (total_bookings is set when they have more), the cheapest available rooms across resorts with the "
+            "total number available, and their next calendar events, in the same JSON format the tools return. Answer "
+            "questions about these directly from it, without transferring or calling a tool. Use the sub-agents for "
+            "anything it does not cover, such as filtered room searches, older bookings, other guests, booking changes, "
+            "or a part that holds an error. "
+            "Guest context: {" + CONTEXT_KEY + "}"
         ),
         tools=[get_weather, get_current_time],
         sub_agents=[repoAgent, ragAgent],  # Integrates the resort management sub-agent
@@ -140,13 +215,16 @@ async def initialize_agent(user_id):
     USER_ID = user_id
     SESSION_ID = "session_001" # Using a fixed ID for simplicity
 
-    # Create the specific session where the conversation will happen
-    session = session_service.create_session(
+    await prefetch
+
+    # Create the specific session where the conversation will happen, starting with the guest context
+    session = await _resolve(session_service.create_session(
         app_name=APP_NAME,
         user_id=USER_ID,
-        session_id=SESSION_ID
-    )
-    print(f"Session created: App='{APP_NAME}', User='{USER_ID}', Session='{SESSION_ID}'")
+        session_id=SESSION_ID,
+        state=context.state(),
+    ))
+    logger.info("Session created", extra={"app_name": APP_NAME, "user_id": USER_ID, "session_id": SESSION_ID})
 
     # --- Runner ---
     # Key Concept: Runner orchestrates the agent execution loop.
@@ -155,5 +233,5 @@ async def initialize_agent(user_id):
         app_name=APP_NAME,   # Associates runs with our app
         session_service=session_service # Uses our session manager
     )
-    agent = WeatherTimeAgent(runner=runner, session=session, app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID)
+    agent = WeatherTimeAgent(runner=runner, session=session, app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID, context=context)
     return agent
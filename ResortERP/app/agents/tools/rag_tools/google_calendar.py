@@ -2,7 +2,9 @@
 # Inside app/agents/tools/rag_tools/google_calendar.py (or calendar_tools.py)
 
 import datetime
+import logging
 import os.path # Make sure os is imported
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 
 from google.auth.transport.requests import Request
@@ -11,21 +13,27 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+logger = logging.getLogger(__name__)
+
 # --- Define scopes ---
 SCOPES = ["https://www.googleapis.com/auth/calendar.readonly"]
 
 # --- Calculate paths relative to THIS file ---
 TOKEN_PATH = "app/agents/tools/rag_tools/token.json"
 CREDS_PATH = "app/agents/tools/rag_tools/credentials.json"
-# Add a print statement for debugging (optional, remove later)
-print(f"[Calendar Tools] Using Token Path: {TOKEN_PATH}")
-print(f"[Calendar Tools] Using Creds Path: {CREDS_PATH}")
 
 
-if not os.path.exists(TOKEN_PATH):
-    print(f"ERROR: Token path does not exist: {TOKEN_PATH}")
-if not os.path.exists(CREDS_PATH):
-    print(f"ERROR: Credentials path does not exist: {CREDS_PATH}")
+@lru_cache(maxsize=1)
+def _check_credential_paths() -> None:
+    """
+    Reports the configured token/credentials paths once, on first calendar use,
+    rather than touching the filesystem at import time.
+    """
+    logger.info("Calendar tools using token path %s and creds path %s", TOKEN_PATH, CREDS_PATH)
+    if not os.path.exists(TOKEN_PATH):
+        logger.error("Token path does not exist: %s", TOKEN_PATH)
+    if not os.path.exists(CREDS_PATH):
+        logger.error("Credentials path does not exist: %s", CREDS_PATH)
 
 def _get_calendar_credentials() -> Optional[Credentials]:
     """
@@ -35,61 +43,65 @@ def _get_calendar_credentials() -> Optional[Credentials]:
     Returns:
         Credentials object if successful, None otherwise.
     """
+    _check_credential_paths()
     creds = None
     # Use the absolute TOKEN_PATH
-    print(f"DEBUG: Checking for token file at: {TOKEN_PATH}") # More debugging
+    logger.debug("Checking for token file at: %s", TOKEN_PATH)
     if os.path.exists(TOKEN_PATH):
-        print(f"DEBUG: Token file FOUND at: {TOKEN_PATH}")
+        logger.debug("Token file found at: %s", TOKEN_PATH)
         try:
             creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
         except ValueError as ve:
-             print(f"Error loading credentials from token file '{TOKEN_PATH}'. Is it valid JSON? Error: {ve}")
+             logger.error("Error loading credentials from token file '%s'. Is it valid JSON? Error: %s", TOKEN_PATH, ve)
              return None
         except Exception as e:
-            print(f"Error loading credentials from {TOKEN_PATH}: {e}")
+            logger.error("Error loading credentials from %s: %s", TOKEN_PATH, e)
             return None # Indicate failure to load
     else:
-        print(f"DEBUG: Token file NOT FOUND at: {TOKEN_PATH}")
+        logger.debug("Token file not found at: %s", TOKEN_PATH)
 
 
     # If there are no valid credentials available, try to refresh.
     if not creds or not creds.valid:
-        print("DEBUG: Credentials not found or not valid. Checking refresh token...")
+        logger.debug("Credentials not found or not valid. Checking refresh token...")
         # Use the absolute CREDS_PATH for refresh context
-        print(f"DEBUG: Expecting credentials file for refresh at: {CREDS_PATH}")
+        logger.debug("Expecting credentials file for refresh at: %s", CREDS_PATH)
         if creds and creds.expired and creds.refresh_token:
-            print(f"DEBUG: Credentials expired, attempting refresh using {CREDS_PATH}...")
+            logger.debug("Credentials expired, attempting refresh using %s", CREDS_PATH)
             if not os.path.exists(CREDS_PATH):
-                 print(f"ERROR: Cannot refresh token. Credentials file missing at {CREDS_PATH}")
+                 logger.error("Cannot refresh token. Credentials file missing at %s", CREDS_PATH)
                  return None
             try:
                 creds.refresh(Request())
                 # Save the refreshed credentials to the absolute TOKEN_PATH
                 with open(TOKEN_PATH, "w") as token:
                     token.write(creds.to_json())
-                print("DEBUG: Credentials refreshed successfully.")
+                logger.debug("Credentials refreshed successfully.")
             except Exception as e:
-                print(f"Failed to refresh credentials: {e}")
+                logger.error("Failed to refresh credentials: %s", e)
                 # Consider deleting token.json here if refresh fails permanently
                 # if os.path.exists(TOKEN_PATH): os.remove(TOKEN_PATH)
                 return None # Indicate failure
         else:
             # Cannot proceed without a valid token.json or refresh token
-            print(f"ERROR: Cannot authenticate Google Calendar.")
+            reasons = []
             if not os.path.exists(TOKEN_PATH):
-                 print(f"Reason: Token file missing at '{TOKEN_PATH}'.")
+                 reasons.append(f"Token file missing at '{TOKEN_PATH}'.")
             elif not creds:
-                 print(f"Reason: Failed to load credentials from '{TOKEN_PATH}'.")
+                 reasons.append(f"Failed to load credentials from '{TOKEN_PATH}'.")
             elif not creds.valid:
-                 print(f"Reason: Credentials loaded from '{TOKEN_PATH}' are invalid.")
+                 reasons.append(f"Credentials loaded from '{TOKEN_PATH}' are invalid.")
             if not (creds and creds.refresh_token):
-                print("Reason: No valid refresh token found to attempt refresh.")
+                reasons.append("No valid refresh token found to attempt refresh.")
 
-            print(f"Please ensure '{TOKEN_PATH}' exists and is valid (run interactive auth if needed).")
-            print(f"Ensure '{CREDS_PATH}' is also present for potential refresh.")
+            logger.error(
+                "Cannot authenticate Google Calendar. Ensure '%s' exists and is valid (run interactive auth "
+                "if needed) and '%s' is present for potential refresh.",
+                TOKEN_PATH, CREDS_PATH, extra={"reasons": reasons},
+            )
             return None # Indicate failure - requires pre-authentication
 
-    print("DEBUG: Credentials obtained successfully.")
+    logger.debug("Credentials obtained successfully.")
     return creds
 
 # ... (rest of your calendar tool functions: _build_calendar_service,
@@ -103,7 +115,7 @@ def _build_calendar_service(creds: Credentials) -> Optional[Any]:
         service = build("calendar", "v3", credentials=creds)
         return service
     except Exception as e:
-        print(f"Error building Google Calendar service: {e}")
+        logger.error("Error building Google Calendar service: %s", e)
         return None
 
 def _format_event(event: Dict[str, Any]) -> Dict[str, Any]:
@@ -129,7 +141,7 @@ def tool_get_next_10_calendar_events() -> Dict[str, Any]:
               event details (summary, start time/date, id) or an 'error' key
               with an error message.
     """
-    print("Attempting to get next 10 calendar events...")
+    logger.debug("Attempting to get next 10 calendar events...")
     creds = _get_calendar_credentials()
     if not creds:
         return {"error": "Authentication failed. Cannot access Google Calendar."}
@@ -159,14 +171,14 @@ def tool_get_next_10_calendar_events() -> Dict[str, Any]:
             return {"events": [], "message": "No upcoming events found."} # Return empty list
 
         formatted_events = [_format_event(event) for event in items]
-        print(f"Successfully retrieved {len(formatted_events)} upcoming events.")
+        logger.info("Retrieved %d upcoming calendar events", len(formatted_events))
         return {"events": formatted_events}
 
     except HttpError as error:
-        print(f"An HTTP error occurred getting events: {error}")
+        logger.error("An HTTP error occurred getting events: %s", error)
         return {"error": f"Google Calendar API error: {error.resp.status} - {error.reason}"}
     except Exception as e:
-        print(f"An unexpected error occurred getting events: {e}")
+        logger.exception("An unexpected error occurred getting events")
         return {"error": f"An unexpected error occurred: {str(e)}"}
 
 
@@ -186,7 +198,7 @@ def tool_get_calendar_events_in_range(start_time_str: str, end_time_str: str) ->
               event details (summary, start time/date, id) found in the range
               or an 'error' key with an error message.
     """
-    print(f"Attempting to get calendar events from {start_time_str} to {end_time_str}...")
+    logger.debug("Attempting to get calendar events from %s to %s", start_time_str, end_time_str)
     creds = _get_calendar_credentials()
     if not creds:
         return {"error": "Authentication failed. Cannot access Google Calendar."}
@@ -232,12 +244,12 @@ def tool_get_calendar_events_in_range(start_time_str: str, end_time_str: str) ->
             return {"events": [], "message": "No events found in the specified range."} # Return empty list
 
         formatted_events = [_format_event(event) for event in items]
-        print(f"Successfully retrieved {len(formatted_events)} events in range.")
+        logger.info("Retrieved %d calendar events in range", len(formatted_events))
         return {"events": formatted_events}
 
     except HttpError as error:
-        print(f"An HTTP error occurred getting events in range: {error}")
+        logger.error("An HTTP error occurred getting events in range: %s", error)
         return {"error": f"Google Calendar API error: {error.resp.status} - {error.reason}"}
     except Exception as e:
-        print(f"An unexpected error occurred getting events in range: {e}")
+        logger.exception("An unexpected error occurred getting events in range")
         return {"error": f"An unexpected error occurred: {str(e)}"}
\ No newline at end of file
@@ -0,0 +1,33 @@
+# app/agents/tools/rag_tools/knowledge_base.py
+
+import logging
+from typing import Any, Dict
+
+from app.knowledge import knowledge_base
+
+logger = logging.getLogger(__name__)
+
+
+def tool_search_resort_knowledge(query: str, max_results: int = 4) -> Dict[str, Any]:
+    """
+    Searches the resort's own documents (spa and restaurant hours, menus,
+    policies, facilities, activities) for passages relevant to a question.
+
+    Args:
+        query (str): The guest's question or the key words to look up, e.g. "spa opening hours sunday".
+        max_results (int): Maximum number of passages to return (1-10).
+
+    Returns:
+        Dict[str, Any]: A dictionary with:
+            - "status" (str): "success", "not_found" or "error".
+            - "results" (List[Dict]): Passages, best first, each with "text", "source" and "score".
+            - "error" (str, optional): An error message if the search fails.
+    """
+    try:
+        hits = knowledge_base.search(query, k=max(1, min(int(max_results or 4), 10)))
+        if not hits:
+            return {"status": "not_found", "results": []}
+        return {"status": "success", "results": [hit.to_dict() for hit in hits]}
+    except Exception as e:
+        logger.exception("Error in tool_search_resort_knowledge")
+        return {"status": "error", "results": [], "error": f"Failed to search resort documents: {str(e)}"}
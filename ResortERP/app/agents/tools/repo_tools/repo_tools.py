@@ -1,29 +1,50 @@
 # app/agents/repo_tools.py (New File)
 
+import logging
 import uuid
 from typing import List, Dict, Any  # Use Dict/Any for JSON-serializable returns
-from app.config.db import SessionLocal  # Import the session factory directly
-from app.repo.base import ResortManager
+from app.config.db import AGENT, shard_router  # Sessions per resort database
+from app.repo.base import ResortManager, fan_out_resorts, search_all_resorts
+from app.domain.model.base import as_utc
 from fastapi import HTTPException  # Keep for status codes if needed
 
+logger = logging.getLogger(__name__)
+
 # --- Helper to create manager within a context ---
 # Optional, but helps reduce repetition
-def _get_manager_with_session():
+def _get_manager_with_session(resort_id: str = ""):
     """
-    Helper function to create a ResortManager instance with a database session.
-    
+    Helper function to create a ResortManager instance with a database session from the agent pool.
+
+    Args:
+        resort_id (str): The resort whose database to use; empty for the default resort.
+
     Returns:
-        Tuple[ResortManager, SessionLocal]: A tuple containing the ResortManager instance and the database session.
+        Tuple[ResortManager, Session]: A tuple containing the ResortManager instance and the database session.
     """
-    db = SessionLocal()
+    db = shard_router.session(resort_id or None, workload=AGENT)
     manager = ResortManager(db)
     return manager, db
 
 # --- Wrapper Tools for the Agent ---
 
-def tool_get_available_rooms() -> List[Dict[str, Any]]:
+def tool_list_resorts() -> Dict[str, Any]:
     """
-    Retrieves a list of available rooms for the agent.
+    Lists the resorts (properties) of the group. Room numbers and guest records belong to one resort.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - "resorts" (list): The resort IDs.
+            - "default" (str): The resort used when a tool's resort_id is left empty.
+    """
+    return {"resorts": shard_router.resort_ids(), "default": shard_router.default}
+
+def tool_get_available_rooms(resort_id: str = "") -> List[Dict[str, Any]]:
+    """
+    Retrieves a list of available rooms at one resort for the agent.
+
+    Args:
+        resort_id (str): The resort (from tool_list_resorts). Empty for the default resort.
 
     Returns:
         List[Dict[str, Any]]: A list of dictionaries, where each dictionary represents a room with the following keys:
@@ -32,74 +53,205 @@ def tool_get_available_rooms() -> List[Dict[str, Any]]:
             - "is_booked" (bool): Indicates whether the room is booked.
             - "error" (str, optional): An error message if the operation fails.
     """
-    manager, db = _get_manager_with_session()
     try:
-        rooms = manager.get_available_rooms()
+        manager, db = _get_manager_with_session(resort_id)
+    except KeyError as e:
+        return [{"error": str(e)}]
+    try:
+        rows = manager.get_available_room_rows(("id", "number", "is_booked"))
         return [
-            {"id": str(room.id), "number": room.number, "is_booked": room.is_booked}
-            for room in rooms
+            {"id": str(room_id), "number": number, "is_booked": is_booked}
+            for room_id, number, is_booked in rows
         ]
     except Exception as e:
-        print(f"Error in tool_get_available_rooms: {e}")
+        logger.exception("Error in tool_get_available_rooms")
         return [{"error": f"Failed to retrieve available rooms: {str(e)}"}]
     finally:
         db.close()
 
-def tool_get_user_bookings(user_id_str: str) -> List[Dict[str, Any]]:
+def _split_csv(value: str) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+def tool_search_rooms(
+    room_types: str = "",
+    views: str = "",
+    amenities: str = "",
+    min_capacity: int = 0,
+    max_price: float = 0,
+    sort_by_price: str = "asc",
+    resort_ids: str = "",
+) -> Dict[str, Any]:
     """
-    Retrieves a list of bookings for a specific user.
+    Searches available rooms by type, view, amenities, guest capacity and nightly price,
+    at every resort at once unless resort_ids narrows it down.
+    Use this instead of listing all rooms whenever the guest states any preference
+    (e.g. "ocean view, sleeps 4, under $200").
 
     Args:
-        user_id_str (str): The user ID as a string (UUID format).
+        room_types (str): Comma-separated room types, any of which match (e.g. "suite,deluxe"). Empty for any type.
+        views (str): Comma-separated views, any of which match (e.g. "ocean,garden"). Empty for any view.
+        amenities (str): Comma-separated amenities the room must ALL have (e.g. "wifi,balcony"). Empty for none.
+        min_capacity (int): Minimum number of guests the room must sleep. 0 for no minimum.
+        max_price (float): Maximum nightly price. 0 for no limit.
+        sort_by_price (str): "asc" for cheapest first, "desc" for most expensive first.
+        resort_ids (str): Comma-separated resorts to search (from tool_list_resorts). Empty for all resorts.
 
     Returns:
-        List[Dict[str, Any]]: A list of dictionaries, where each dictionary represents a booking with the following keys:
-            - "id" (str): The unique identifier of the booking.
-            - "user_id" (str): The user ID associated with the booking.
-            - "room_id" (str): The room ID associated with the booking.
-            - "booking_date" (str): The booking date in ISO 8601 format.
-            - "room_number" (str): The room number, or "N/A" if unavailable.
+        Dict[str, Any]: A dictionary containing:
+            - "total" (int): Number of matching rooms.
+            - "rooms" (list): Up to 20 matching rooms with resort_id, id, number, room_type, capacity, view, price and amenities.
+            - "unavailable" (list): Resorts that could not be searched right now.
             - "error" (str, optional): An error message if the operation fails.
     """
-    manager, db = _get_manager_with_session()
+    resorts = _split_csv(resort_ids)
+    unknown = [resort_id for resort_id in resorts if resort_id not in shard_router]
+    if unknown:
+        return {"error": f"Unknown resorts: {', '.join(unknown)}. Use one of: {', '.join(shard_router.resort_ids())}."}
     try:
+        return search_all_resorts(
+            resort_ids=resorts or None,
+            room_types=_split_csv(room_types),
+            views=_split_csv(views),
+            amenities_all=_split_csv(amenities),
+            min_capacity=min_capacity or None,
+            max_price=max_price or None,
+            sort="-price" if sort_by_price.lower().startswith("desc") else "price",
+            limit=20,
+        )
+    except Exception as e:
+        logger.exception("Error in tool_search_rooms")
+        return {"error": f"Failed to search rooms: {str(e)}"}
+
+# Largest number of ids/room numbers accepted by one batch tool call
+MAX_BATCH = 50
+
+def _booking_to_dict(booking) -> Dict[str, Any]:
+    return {
+        "resort_id": booking.resort_id,
+        "id": str(booking.id),
+        "user_id": str(booking.user_id),
+        "room_id": str(booking.room_id),
+        "booking_date": booking.booking_date.isoformat(),
+        "room_number": booking.room.number if booking.room else "N/A"
+    }
+
+def tool_get_bookings_for_users(user_ids: str) -> Dict[str, Any]:
+    """
+    Retrieves the bookings of one or more users in a single call, looking at every resort.
+    When the question involves several guests, pass ALL of their IDs at once
+    instead of calling this tool once per guest.
+
+    Args:
+        user_ids (str): Comma-separated user IDs (UUID format), up to 50 (e.g. "3f2b...,9a1c...").
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - "bookings" (dict): For each found user ID, a list of bookings with resort_id, id, user_id, room_id,
+              booking_date (ISO 8601) and room_number. An empty list means the user has no bookings.
+            - "not_found" (list): User IDs that do not exist at any resort.
+            - "invalid" (list): Values that are not valid UUIDs.
+            - "unavailable" (list): Resorts that could not be searched right now.
+            - "error" (str, optional): An error message if the operation fails.
+    """
+    requested, invalid = [], []
+    for value in _split_csv(user_ids):
         try:
-            user_id = uuid.UUID(user_id_str)
+            requested.append(uuid.UUID(value))
         except ValueError:
-            return [{"error": f"Invalid user ID format: '{user_id_str}'"}]
-
-        bookings = manager.get_user_bookings(user_id=user_id)
-        return [
-            {
-                "id": str(booking.id),
-                "user_id": str(booking.user_id),
-                "room_id": str(booking.room_id),
-                "booking_date": booking.booking_date.isoformat(),
-                "room_number": booking.room.number if booking.room else "N/A"
+            invalid.append(value)
+    if len(requested) > MAX_BATCH:
+        return {"error": f"At most {MAX_BATCH} user IDs per call; got {len(requested)}."}
+    try:
+        # A user exists at one resort; ask all of them at once and combine
+        results, errors = fan_out_resorts(
+            lambda manager: {
+                user_id: [_booking_to_dict(b) for b in bookings]
+                for user_id, bookings in manager.get_bookings_for_users(requested).items()
             }
-            for booking in bookings
-        ]
-    except HTTPException as http_exc:
-        print(f"Error in tool_get_user_bookings: {http_exc.detail}")
-        return [{"error": http_exc.detail}]
+        )
+        found: Dict[uuid.UUID, List[Dict[str, Any]]] = {}
+        for resort_found in results.values():
+            for user_id, bookings in resort_found.items():
+                found.setdefault(user_id, []).extend(bookings)
+        return {
+            "bookings": {str(user_id): bookings for user_id, bookings in found.items()},
+            "not_found": [str(user_id) for user_id in dict.fromkeys(requested) if user_id not in found],
+            "invalid": invalid,
+            "unavailable": sorted(errors),
+        }
+    except Exception as e:
+        logger.exception("Error in tool_get_bookings_for_users")
+        return {"error": f"Failed to retrieve bookings: {str(e)}"}
+
+def tool_get_room_status(room_numbers: str, resort_id: str = "") -> Dict[str, Any]:
+    """
+    Looks up one or more rooms of one resort by room number in a single call and reports whether each is booked
+    or held for a guest who is checking out.
+    When the question involves several rooms, pass ALL of their numbers at once
+    instead of calling this tool once per room.
+
+    Args:
+        room_numbers (str): Comma-separated room numbers, up to 50 (e.g. "101,102,305").
+        resort_id (str): The resort the rooms belong to (from tool_list_resorts). Empty for the default resort.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing:
+            - "resort_id" (str): The resort that was searched.
+            - "rooms" (list): For each found room: id, number, is_booked, is_held, held_until (ISO 8601, or None),
+              room_type, capacity, view and price. A held room cannot be booked by anyone else until held_until.
+            - "not_found" (list): Room numbers that do not exist.
+            - "error" (str, optional): An error message if the operation fails.
+    """
+    numbers = list(dict.fromkeys(_split_csv(room_numbers)))
+    if len(numbers) > MAX_BATCH:
+        return {"error": f"At most {MAX_BATCH} room numbers per call; got {len(numbers)}."}
+    try:
+        manager, db = _get_manager_with_session(resort_id)
+    except KeyError as e:
+        return {"error": str(e)}
+    try:
+        rooms = manager.get_rooms_by_numbers(numbers)
+        return {
+            "resort_id": manager.resort_id,
+            "rooms": [
+                {
+                    "id": str(room.id),
+                    "number": room.number,
+                    "is_booked": room.is_booked,
+                    "is_held": room.is_held,
+                    "held_until": as_utc(room.held_until).isoformat() if room.is_held else None,
+                    "room_type": room.room_type,
+                    "capacity": room.capacity,
+                    "view": room.view,
+                    "price": room.price,
+                }
+                for room in (rooms[number] for number in numbers if number in rooms)
+            ],
+            "not_found": [number for number in numbers if number not in rooms],
+        }
     except Exception as e:
-        print(f"Error in tool_get_user_bookings: {e}")
-        return [{"error": f"Failed to retrieve user bookings: {str(e)}"}]
+        logger.exception("Error in tool_get_room_status")
+        return {"error": f"Failed to retrieve room status: {str(e)}"}
     finally:
         db.close()
 
-def tool_book_room(room_number: str) -> Dict[str, Any]:
+def tool_book_room(room_number: str, user_id_str: str = "", resort_id: str = "") -> Dict[str, Any]:
     """
     Generates a booking URL for a specific room based on its room number.
+    When the guest's user ID is known, the room is also held for them while they check out,
+    so no other guest can book it before the hold expires.
 
     Args:
         room_number (str): The room number as a string. Must be a valid numeric string.
+        user_id_str (str): The guest's user ID (UUID format). Empty to only generate the URL.
+        resort_id (str): The resort the room belongs to (from tool_list_resorts). Empty for the default resort.
 
     Returns:
         Dict[str, Any]: A dictionary containing:
             - "status" (str): "success" if the URL was generated successfully.
             - "booking_url" (str): The generated booking URL.
-            - "error" (str, optional): An error message if the operation fails.
+            - "held_until" (str, optional): When the guest's hold on the room expires, in ISO 8601 format.
+            - "error" (str, optional): An error message if the operation fails, e.g. the room is booked or held for another guest.
     
     Example:
         Input: "101"
@@ -110,11 +262,39 @@ def tool_book_room(room_number: str) -> Dict[str, Any]:
             return {"error": "Invalid room number format."}
 
         booking_url = f"https://example.com/book?room_number={room_number}"
-        return {"status": "success", "booking_url": booking_url}
+        if not user_id_str:
+            return {"status": "success", "booking_url": booking_url}
+        try:
+            user_id = uuid.UUID(user_id_str)
+        except ValueError:
+            return {"error": f"Invalid user ID format: '{user_id_str}'"}
     except Exception as e:
-        print(f"Error in tool_book_room: {e}")
+        logger.exception("Error in tool_book_room")
         return {"error": f"Failed to generate booking URL: {str(e)}"}
 
+    try:
+        manager, db = _get_manager_with_session(resort_id)
+    except KeyError as e:
+        return {"error": str(e)}
+    try:
+        room = manager.get_rooms_by_numbers([room_number]).get(room_number)
+        if room is None:
+            return {"error": f"Room {room_number} not found"}
+        room = manager.hold_room(user_id, room.id)
+        return {
+            "status": "success",
+            "booking_url": f"{booking_url}&resort_id={manager.resort_id}&user_id={user_id}",
+            "held_until": as_utc(room.held_until).isoformat(),
+        }
+    except HTTPException as http_exc:
+        logger.warning("Error in tool_book_room: %s", http_exc.detail)
+        return {"error": http_exc.detail}
+    except Exception as e:
+        logger.exception("Error in tool_book_room")
+        return {"error": f"Failed to hold room: {str(e)}"}
+    finally:
+        db.close()
+
 def tool_unbook_room(room_number: str) -> Dict[str, Any]:
     """
     Generates an unbooking URL for a specific room based on its room number.
@@ -139,5 +319,5 @@ def tool_unbook_room(room_number: str) -> Dict[str, Any]:
         unbooking_url = f"https://example.com/unbook?room_number={room_number}"
         return {"status": "success", "unbooking_url": unbooking_url}
     except Exception as e:
-        print(f"Error in tool_unbook_room: {e}")
+        logger.exception("Error in tool_unbook_room")
         return {"error": f"Failed to generate unbooking URL: {str(e)}"}
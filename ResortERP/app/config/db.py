@@ -1,17 +1,254 @@
+import contextvars
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
 from .env import get_settings
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import QueuePool
+
+from app.observability.metrics import DB_POOL_TIMEOUTS, DB_POOL_WAIT
 
 
 DB_CONNECTION_URI = get_settings().DB_CONNECTION_URI
 
-# Create the database engine
-engine = create_engine(DB_CONNECTION_URI)
+# Connection pool budgets. Each resort database has one engine (and pool) per
+# workload: "http" for requests, background jobs and scripts, and "agent" for
+# agent tools and chat context loads. A burst of chats then waits on the agent
+# pool instead of taking the connections REST requests need.
+HTTP = "http"
+AGENT = "agent"
+WORKLOADS = (HTTP, AGENT)
+
+# The workload of the code running in this context; sessions without an
+# explicit workload use its pool. Copied into fan-out threads and to_thread calls.
+db_workload_var: contextvars.ContextVar[str] = contextvars.ContextVar("db_workload", default=HTTP)
+
+
+@contextmanager
+def db_workload(workload: str) -> Iterator[None]:
+    """Runs the block's database access (and anything it starts) on `workload`'s pools."""
+    token = db_workload_var.set(workload)
+    try:
+        yield
+    finally:
+        db_workload_var.reset(token)
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool recording how long each checkout waited, and the checkouts that timed out."""
+
+    workload = HTTP
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc((self.workload,))
+            raise
+        DB_POOL_WAIT.observe(time.perf_counter() - started, (self.workload,))
+        return connection
+
+    def recreate(self) -> "MeteredQueuePool":
+        # dispose() replaces the pool; keep its label
+        pool = super().recreate()
+        pool.workload = self.workload
+        return pool
+
+
+def create_pooled_engine(uri: Union[str, URL], workload: str = HTTP) -> Engine:
+    """
+    An engine on `uri` with `workload`'s pool budget (DB_POOL_* or AGENT_DB_POOL_* settings).
+    Connections are pre-pinged and recycled on every workload.
+    """
+    settings = get_settings()
+    url = make_url(uri)
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING, "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite keeps one connection per thread; there is no pool to size
+        return create_engine(url, **options)
+    if workload == AGENT:
+        size, overflow, timeout = settings.AGENT_DB_POOL_SIZE, settings.AGENT_DB_MAX_OVERFLOW, settings.AGENT_DB_POOL_TIMEOUT_SECONDS
+    else:
+        size, overflow, timeout = settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW, settings.DB_POOL_TIMEOUT_SECONDS
+    pooled = create_engine(
+        url, poolclass=MeteredQueuePool, pool_size=size, max_overflow=overflow, pool_timeout=timeout, **options,
+    )
+    pooled.pool.workload = workload
+    return pooled
+
+
+# Create the database engine (the default resort's database)
+engine = create_pooled_engine(DB_CONNECTION_URI)
 
 # Create a configured "Session" class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+
+# Resort ids appear in URLs, ETags and log lines
+RESORT_ID = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+
+
+class UnknownResort(KeyError):
+    def __str__(self) -> str:
+        return f"Unknown resort '{self.args[0]}'." if self.args else "Unknown resort."
+
+
+class ShardRouter:
+    """
+    Maps each resort (property) to its own database. The default resort uses
+    DB_CONNECTION_URI; RESORT_SHARDS adds the others as a JSON object of
+    resort id -> connection URI. A database holds exactly one resort, so two
+    resorts may not share a URI.
+    """
+
+    def __init__(self, default_resort: str, default_engine: Engine, shards: Dict[str, str]):
+        for resort_id in (default_resort, *shards):
+            if not RESORT_ID.match(resort_id):
+                raise ValueError(f"Invalid resort id '{resort_id}': use lowercase letters, digits, '-' and '_'.")
+        self.default = default_resort
+        # Engines by workload, then resort
+        self._engines: Dict[str, Dict[str, Engine]] = {workload: {} for workload in WORKLOADS}
+        self._sessions: Dict[Tuple[str, str], sessionmaker] = {}
+        self._resort_by_engine: Dict[int, str] = {}
+        self._add(default_resort, HTTP, default_engine, SessionLocal)
+        seen = {default_engine.url.render_as_string(hide_password=False): default_resort}
+        for resort_id, uri in shards.items():
+            if resort_id == default_resort:
+                if uri != DB_CONNECTION_URI:
+                    raise ValueError(f"Resort '{resort_id}' is the default resort; its database is DB_CONNECTION_URI.")
+                continue
+            shard_engine = create_pooled_engine(uri)
+            key = shard_engine.url.render_as_string(hide_password=False)
+            if key in seen:
+                raise ValueError(f"Resorts '{seen[key]}' and '{resort_id}' are mapped to the same database.")
+            seen[key] = resort_id
+            self._add(resort_id, HTTP, shard_engine)
+        for resort_id, http_engine in list(self._engines[HTTP].items()):
+            self._add(resort_id, AGENT, create_pooled_engine(http_engine.url, AGENT))
+        # Threads start on first use, so forked workers do not inherit any.
+        # Each workload has its own, so agent fan-outs never queue behind HTTP ones or the reverse.
+        self._executors = {
+            workload: ThreadPoolExecutor(max_workers=max(4, 2 * len(self._engines[HTTP])), thread_name_prefix=f"shard-{workload}")
+            for workload in WORKLOADS
+        }
+
+    def _add(self, resort_id: str, workload: str, shard_engine: Engine, sessions: Optional[sessionmaker] = None) -> None:
+        self._engines[workload][resort_id] = shard_engine
+        self._sessions[(resort_id, workload)] = sessions or sessionmaker(autocommit=False, autoflush=False, bind=shard_engine)
+        self._resort_by_engine[id(shard_engine)] = resort_id
+
+    def __contains__(self, resort_id: str) -> bool:
+        return resort_id in self._engines[HTTP]
+
+    def resort_ids(self) -> List[str]:
+        return list(self._engines[HTTP])
+
+    def engines(self, workload: str = HTTP) -> List[Tuple[str, Engine]]:
+        """One engine per resort database: `workload`'s (HTTP's, which migrations and scripts use, by default)."""
+        return list(self._engines[workload].items())
+
+    def engine(self, resort_id: Optional[str] = None, workload: str = HTTP) -> Engine:
+        try:
+            return self._engines[workload][resort_id or self.default]
+        except KeyError:
+            raise UnknownResort(resort_id) from None
+
+    def session(self, resort_id: Optional[str] = None, workload: Optional[str] = None) -> Session:
+        """
+        A new session on `resort_id`'s database (default resort if None), from
+        `workload`'s pool (the context's db_workload_var if None); the caller closes it.
+        """
+        try:
+            return self._sessions[(resort_id or self.default, workload or db_workload_var.get())]()
+        except KeyError:
+            raise UnknownResort(resort_id) from None
+
+    def resort_for(self, bind: Engine) -> str:
+        """The resort whose database `bind` (an engine or connection) points at."""
+        resort_id = self._resort_by_engine.get(id(getattr(bind, "engine", bind)))
+        if resort_id is None:
+            raise UnknownResort(f"Engine {bind!r} is not a resort database.")
+        return resort_id
+
+    def fan_out(
+        self,
+        func: Callable[[str, Session], Any],
+        resort_ids: Optional[Iterable[str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, BaseException]]:
+        """
+        Calls `func(resort_id, session)` for every resort (or `resort_ids`)
+        concurrently, each in a pool thread with its own session.
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, BaseException]]: Results by resort,
+            and the error of each resort that failed or did not answer within
+            `timeout` seconds (TimeoutError).
+        """
+        resort_ids = list(dict.fromkeys(resort_ids if resort_ids is not None else self._engines[HTTP]))
+        for resort_id in resort_ids:
+            if resort_id not in self:
+                raise UnknownResort(resort_id)
+
+        def call(resort_id: str):
+            db = self.session(resort_id)
+            try:
+                return func(resort_id, db)
+            finally:
+                db.close()
+
+        # Each call runs in a copy of the caller's context (request id for logs, active profile)
+        executor = self._executors[db_workload_var.get()]
+        futures = {
+            executor.submit(contextvars.copy_context().run, call, resort_id): resort_id for resort_id in resort_ids
+        }
+        done, pending = wait(futures, timeout=timeout)
+        results: Dict[str, Any] = {}
+        errors: Dict[str, BaseException] = {}
+        for future, resort_id in futures.items():
+            if future in pending:
+                future.cancel()
+                errors[resort_id] = TimeoutError(f"Resort '{resort_id}' did not answer within {timeout}s.")
+            elif future.exception() is not None:
+                errors[resort_id] = future.exception()
+            else:
+                results[resort_id] = future.result()
+        return results, errors
+
+    def dispose(self, close: bool = True) -> None:
+        for engines in self._engines.values():
+            for shard_engine in engines.values():
+                shard_engine.dispose(close=close)
+
+
+shard_router = ShardRouter(
+    get_settings().DEFAULT_RESORT_ID,
+    engine,
+    json.loads(get_settings().RESORT_SHARDS or "{}"),
+)
+
+
+def current_resort_id(context) -> str:
+    """Column default for `resort_id`: the resort owning the database the row is inserted into."""
+    return shard_router.resort_for(context.connection)
+
+
+def dispose_engine_after_fork():
+    """
+    Drops pooled connections inherited from the parent process without closing
+    them (the parent still owns the sockets), so each forked worker opens its own.
+    """
+    shard_router.dispose(close=False)
+
 # Dependency to get a database session
 def get_db():
     db = SessionLocal()
@@ -19,4 +256,3 @@ def get_db():
         yield db
     finally:
         db.close()
-
@@ -12,6 +12,88 @@ import os
 class Settings():
     GOOGLE_API_KEY: str = os.environ.get("GOOGLE_API_KEY", "default_google_api_key")
     DB_CONNECTION_URI: str = os.environ.get("DB_CONNECTION_URI", "default_db_connection_uri")
+    # Resort (property) served from DB_CONNECTION_URI, and used when a request names none
+    DEFAULT_RESORT_ID: str = os.environ.get("DEFAULT_RESORT_ID", "main")
+    # Other resorts, each in its own database, as JSON: {"resort id": "connection URI", ...}
+    RESORT_SHARDS: str = os.environ.get("RESORT_SHARDS", "")
+    # Cross-resort listings leave out resorts that have not answered after this many seconds
+    SHARD_FANOUT_TIMEOUT_SECONDS: float = float(os.environ.get("SHARD_FANOUT_TIMEOUT_SECONDS", "10"))
+    # Connections kept open per resort database for HTTP requests, background jobs and scripts
+    DB_POOL_SIZE: int = int(os.environ.get("DB_POOL_SIZE", "10"))
+    # Extra connections opened under load beyond DB_POOL_SIZE; closed again when returned
+    DB_MAX_OVERFLOW: int = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+    # Seconds to wait for a free connection before the request fails
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.environ.get("DB_POOL_TIMEOUT_SECONDS", "10"))
+    # Connections older than this are replaced on checkout; keep it below server/proxy idle timeouts (-1 never)
+    DB_POOL_RECYCLE_SECONDS: int = int(os.environ.get("DB_POOL_RECYCLE_SECONDS", "1800"))
+    # Test each connection on checkout, so a restarted database or dropped connection costs no failed request
+    DB_POOL_PRE_PING: bool = os.environ.get("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    # Separate pool per resort database for agent tools and chat context loads, so chat bursts cannot take HTTP's connections
+    AGENT_DB_POOL_SIZE: int = int(os.environ.get("AGENT_DB_POOL_SIZE", "3"))
+    AGENT_DB_MAX_OVERFLOW: int = int(os.environ.get("AGENT_DB_MAX_OVERFLOW", "2"))
+    AGENT_DB_POOL_TIMEOUT_SECONDS: float = float(os.environ.get("AGENT_DB_POOL_TIMEOUT_SECONDS", "5"))
+    LOG_LEVEL: str = os.environ.get("LOG_LEVEL", "INFO")
+    # Fraction of DEBUG log records kept (1.0 keeps all of them)
+    LOG_DEBUG_SAMPLE_RATE: float = float(os.environ.get("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+    # Max age of the in-memory room search index before it is rebuilt from the database, for writes that skip the data version
+    ROOM_INDEX_TTL_SECONDS: float = float(os.environ.get("ROOM_INDEX_TTL_SECONDS", "30"))
+    # Months of bookings kept in the live `bookings` table; older closed months are archived
+    BOOKING_RETENTION_MONTHS: int = int(os.environ.get("BOOKING_RETENTION_MONTHS", "12"))
+    # Monthly booking partitions created ahead of time (PostgreSQL only)
+    BOOKING_PARTITIONS_AHEAD: int = int(os.environ.get("BOOKING_PARTITIONS_AHEAD", "3"))
+    # Optional PostgreSQL tablespace (e.g. on cheaper disks) that archived booking partitions move to
+    BOOKING_ARCHIVE_TABLESPACE: str = os.environ.get("BOOKING_ARCHIVE_TABLESPACE", "")
+    # Max age of a worker's cached data version (ETags) before it is re-read from the database
+    DATA_VERSION_TTL_SECONDS: float = float(os.environ.get("DATA_VERSION_TTL_SECONDS", "5"))
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MIN_BYTES: int = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "4"))
+    # Pub/sub for availability push: "auto" (PostgreSQL LISTEN/NOTIFY when available), "local" or "postgres"
+    REALTIME_BROKER: str = os.environ.get("REALTIME_BROKER", "auto")
+    # How long a checkout hold keeps a room for one guest, and the longest hold a client may ask for
+    ROOM_HOLD_TTL_SECONDS: float = float(os.environ.get("ROOM_HOLD_TTL_SECONDS", "600"))
+    ROOM_HOLD_MAX_TTL_SECONDS: float = float(os.environ.get("ROOM_HOLD_MAX_TTL_SECONDS", "1800"))
+    # Concurrent background jobs per process (0 disables the in-app worker, e.g. when running app.scripts.run_jobs)
+    JOB_WORKERS: int = int(os.environ.get("JOB_WORKERS", "4"))
+    # Seconds between queue polls when idle
+    JOB_POLL_INTERVAL: float = float(os.environ.get("JOB_POLL_INTERVAL", "1.0"))
+    # Seconds a claimed job may run before another worker may take it over
+    JOB_LEASE_SECONDS: float = float(os.environ.get("JOB_LEASE_SECONDS", "300"))
+    # Resort documents (.md/.txt) ingested into the knowledge index, and where the index is written
+    KNOWLEDGE_DOCS_DIR: str = os.environ.get("KNOWLEDGE_DOCS_DIR", "app/knowledge/docs")
+    KNOWLEDGE_INDEX_DIR: str = os.environ.get("KNOWLEDGE_INDEX_DIR", "app/knowledge/index")
+    # Embedder for new knowledge indexes: "hashing" (local, no model) or "gemini" (uses GOOGLE_API_KEY)
+    KNOWLEDGE_EMBEDDER: str = os.environ.get("KNOWLEDGE_EMBEDDER", "hashing")
+    KNOWLEDGE_CHUNK_CHARS: int = int(os.environ.get("KNOWLEDGE_CHUNK_CHARS", "800"))
+    # Corpora with at least this many chunks get an approximate (IVF) index; smaller ones are searched exactly
+    KNOWLEDGE_IVF_MIN_CHUNKS: int = int(os.environ.get("KNOWLEDGE_IVF_MIN_CHUNKS", "200000"))
+    # IVF clusters scanned per query (0: nlist / 16)
+    KNOWLEDGE_NPROBE: int = int(os.environ.get("KNOWLEDGE_NPROBE", "0"))
+    # Per-request profiling: requests sending `X-Profile: <token>` are profiled; empty disables the header
+    PROFILING_TOKEN: str = os.environ.get("PROFILING_TOKEN", "")
+    # Fraction of requests profiled at random (0 disables sampling)
+    PROFILING_SAMPLE_RATE: float = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+    # "wall" (stack samples, includes waiting) or "cpu" (cProfile); X-Profile-Mode overrides it per request
+    PROFILING_MODE: str = os.environ.get("PROFILING_MODE", "wall")
+    PROFILING_INTERVAL_MS: float = float(os.environ.get("PROFILING_INTERVAL_MS", "5"))
+    # Where profiles are stored, and how many are kept
+    PROFILING_DIR: str = os.environ.get("PROFILING_DIR", "/tmp/resort-profiles")
+    PROFILING_KEEP: int = int(os.environ.get("PROFILING_KEEP", "50"))
+    # How long the response to a request with an Idempotency-Key is replayed for retries
+    IDEMPOTENCY_TTL_SECONDS: float = float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    # How long a key stays claimed by a request that has not finished; a retry waits this long at most
+    IDEMPOTENCY_LEASE_SECONDS: float = float(os.environ.get("IDEMPOTENCY_LEASE_SECONDS", "60"))
+    # Responses per worker kept in memory for replay (the rest are read from the database)
+    IDEMPOTENCY_CACHE_ENTRIES: int = int(os.environ.get("IDEMPOTENCY_CACHE_ENTRIES", "10000"))
+    # Max seconds initialize-chat waits for each part of the prefetched guest context (bookings, rooms, calendar)
+    CHAT_CONTEXT_TIMEOUT_SECONDS: float = float(os.environ.get("CHAT_CONTEXT_TIMEOUT_SECONDS", "3"))
+    # Latest bookings of the guest included in the chat context (the tool returns all of them)
+    CHAT_CONTEXT_MAX_BOOKINGS: int = int(os.environ.get("CHAT_CONTEXT_MAX_BOOKINGS", "20"))
+    # Age after which the prefetched calendar events are reloaded before a chat turn
+    CHAT_CONTEXT_CALENDAR_TTL_SECONDS: float = float(os.environ.get("CHAT_CONTEXT_CALENDAR_TTL_SECONDS", "300"))
+    # Import the agent stack in the background at startup instead of on the first chat request
+    AGENT_WARMUP: bool = os.environ.get("AGENT_WARMUP", "false").lower() in ("1", "true", "yes")
 
     class Config:
         env_file = ".env"  # Specify the .env file to load variables from
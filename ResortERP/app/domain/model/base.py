@@ -1,32 +1,160 @@
-import uuid
 from datetime import datetime, timezone
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Boolean, DateTime, Date, ForeignKey, Integer, BigInteger, Numeric, JSON, Index, Text, LargeBinary, false
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import relationship
-from app.config.db import Base
+from app.config.db import Base, current_resort_id
+from app.domain.model.ids import uuid7
+
+
+# Keys are time-ordered UUIDs (see app/domain/model/ids.py), so inserts append to
+# the primary key indexes. The primary keys need no extra index on `id`.
+
+# Every resort (property) has its own database (see ShardRouter in app/config/db.py).
+# Rows of the tenant tables below are stamped with the resort they belong to, so
+# they stay attributable when exported, merged or moved to another database; the
+# default fills it in from the database the row is inserted into.
+
+def as_utc(value: datetime) -> datetime:
+    """`value` as an aware UTC datetime; SQLite returns naive UTC datetimes."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
 
 
 # Define the User table
 class User(Base):
     __tablename__ = 'users'
-    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid7)
     name = Column(String, nullable=False)
     email = Column(String, unique=True, nullable=False, index=True)
+    resort_id = Column(String, default=current_resort_id, nullable=False)
 
 # Define the Room table
 class Room(Base):
     __tablename__ = 'rooms'
-    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid7)
     number = Column(String, unique=True, nullable=False, index=True)
     is_booked = Column(Boolean, default=False, nullable=False)
+    room_type = Column(String, default="standard", nullable=False)
+    capacity = Column(Integer, default=2, nullable=False)
+    view = Column(String, nullable=True)
+    price = Column(Numeric(10, 2, asdecimal=False), default=0, nullable=False)
+    amenities = Column(JSON, default=list, nullable=False)
+    # booking_date of the active booking; lets unbook_room go straight to its partition
+    booked_at = Column(DateTime(timezone=True), nullable=True)
+    # Checkout hold: until held_until only held_by may book the room (see ResortManager.hold_room)
+    held_by = Column(PG_UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
+    held_until = Column(DateTime(timezone=True), nullable=True, index=True)
+    resort_id = Column(String, default=current_resort_id, nullable=False)
+
+    @property
+    def is_held(self) -> bool:
+        # A hold past held_until has lapsed, even before the sweeper clears it
+        return self.held_until is not None and as_utc(self.held_until) > datetime.now(timezone.utc)
 
 # Define the Booking table
+# On PostgreSQL `bookings` is range-partitioned by month on booking_date (see
+# app/repo/partitions.py), so booking_date is part of the primary key.
 class Booking(Base):
     __tablename__ = 'bookings'
-    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id = Column(PG_UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
     room_id = Column(PG_UUID(as_uuid=True), ForeignKey('rooms.id'), nullable=False)
-    booking_date = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    booking_date = Column(DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(timezone.utc), nullable=False)
+    # Set by unbook_room when the booking ends; ended bookings stay as history. A room is booked while it has a booking without one
+    cancelled_at = Column(DateTime(timezone=True), nullable=True)
+    # The booking ended with the guest checking out rather than cancelling
+    checked_out = Column(Boolean, default=False, server_default=false(), nullable=False)
+    resort_id = Column(String, default=current_resort_id, nullable=False)
 
     user = relationship("User")
     room = relationship("Room")
+
+    __table_args__ = (
+        Index("ix_bookings_user_id_booking_date", "user_id", "booking_date"),
+        Index("ix_bookings_room_id_booking_date", "room_id", "booking_date"),
+        {"postgresql_partition_by": "RANGE (booking_date)"},
+    )
+
+# Cold storage for bookings of closed months, moved here by app/repo/partitions.archive_bookings.
+# Same columns as `bookings`; on PostgreSQL archived partitions are re-attached here unchanged.
+class BookingArchive(Base):
+    __tablename__ = 'bookings_archive'
+    id = Column(PG_UUID(as_uuid=True), primary_key=True)
+    user_id = Column(PG_UUID(as_uuid=True), nullable=False)
+    room_id = Column(PG_UUID(as_uuid=True), nullable=False)
+    booking_date = Column(DateTime(timezone=True), primary_key=True, nullable=False)
+    cancelled_at = Column(DateTime(timezone=True), nullable=True)
+    checked_out = Column(Boolean, default=False, server_default=false(), nullable=False)
+    resort_id = Column(String, nullable=False)
+
+    __table_args__ = (
+        Index("ix_bookings_archive_user_id_booking_date", "user_id", "booking_date"),
+        {"postgresql_partition_by": "RANGE (booking_date)"},
+    )
+
+# --- Analytics rollups, maintained by ResortManager in the same transaction as the change ---
+
+# Current inventory and occupancy per room type
+class RoomTypeInventory(Base):
+    __tablename__ = 'room_type_inventory'
+    room_type = Column(String, primary_key=True)
+    total_rooms = Column(Integer, default=0, nullable=False)
+    occupied_rooms = Column(Integer, default=0, nullable=False)
+
+# Per-day, per-room-type booking activity; occupied/total are end-of-day values
+class DailyOccupancy(Base):
+    __tablename__ = 'daily_occupancy'
+    day = Column(Date, primary_key=True)
+    room_type = Column(String, primary_key=True)
+    bookings = Column(Integer, default=0, nullable=False)
+    cancellations = Column(Integer, default=0, nullable=False)
+    checkouts = Column(Integer, default=0, server_default="0", nullable=False)
+    revenue = Column(Numeric(12, 2, asdecimal=False), default=0, nullable=False)
+    occupied_rooms = Column(Integer, default=0, nullable=False)
+    total_rooms = Column(Integer, default=0, nullable=False)
+
+# Version counter per data set (e.g. "rooms"), bumped right after each change
+# commits; listing endpoints derive their ETags from it
+class DataVersion(Base):
+    __tablename__ = 'data_versions'
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, default=0, nullable=False)
+
+# Background jobs (see app/jobs). Rows are claimed with FOR UPDATE SKIP LOCKED;
+# a running job whose lease (locked_until) expired is picked up again.
+class Job(Base):
+    __tablename__ = 'jobs'
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid7)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, default=dict, nullable=False)
+    # queued -> running -> succeeded | queued (retry) | dead
+    status = Column(String, default="queued", nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    # Enqueuing the same key again returns the existing job instead of a duplicate
+    idempotency_key = Column(String, unique=True, nullable=True)
+    run_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    locked_by = Column(String, nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+# Responses to requests sent with an Idempotency-Key header (see
+# app/routers/idempotency.py). status_code is NULL while the first request runs;
+# a claim whose lease (locked_until) expired, or a key past expires_at, is reused.
+class IdempotencyKey(Base):
+    __tablename__ = 'idempotency_keys'
+    key = Column(String, primary_key=True)
+    # SHA-256 of method, path, query string and body, so a key reused for another request is rejected
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,8 +1,16 @@
 from pydantic import BaseModel
+from typing import Any, List, Optional, Dict
+from datetime import date, datetime
+from uuid import UUID
 
 class RoomSchema(BaseModel):
     number: str
     is_booked: bool = False # Add default if applicable
+    room_type: str = "standard"
+    capacity: int = 2
+    view: Optional[str] = None
+    price: float = 0.0
+    amenities: List[str] = []
 
     class Config:
         from_attributes = True # Use this instead of orm_mode in Pydantic v2
@@ -11,7 +19,12 @@ class RoomSchema(BaseModel):
         schema_extra = {
             "example": {
                 "number": "101",
-                "is_booked": False
+                "is_booked": False,
+                "room_type": "suite",
+                "capacity": 4,
+                "view": "ocean",
+                "price": 180.0,
+                "amenities": ["wifi", "balcony"]
             }
         }
 
@@ -30,6 +43,99 @@ class UserSchema(BaseModel):
             }
         }
 
+class RoomSearchResult(RoomSchema):
+    id: str
+
+class RoomSearchResponse(BaseModel):
+    total: int
+    rooms: List[RoomSearchResult]
+    facets: Optional[Dict[str, Dict[str, int]]] = None
+
+class ResortRoomSearchResult(RoomSearchResult):
+    resort_id: str
+
+# Cross-resort search; `unavailable` lists resorts that failed or timed out
+class ResortRoomSearchResponse(BaseModel):
+    total: int
+    rooms: List[ResortRoomSearchResult]
+    unavailable: List[str] = []
+
+class GuestBooking(BaseModel):
+    resort_id: str
+    id: UUID
+    user_id: UUID
+    room_id: UUID
+    room_number: Optional[str] = None
+    booking_date: datetime
+
+class GuestBookingsResponse(BaseModel):
+    email: str
+    bookings: List[GuestBooking]
+    unavailable: List[str] = []
+
+class GroupBookingRequest(BaseModel):
+    room_ids: List[UUID]
+
+class GroupBookingItem(BaseModel):
+    id: UUID
+    room_id: UUID
+    room_number: str
+    price: float
+
+# One booking per room, all created in the same transaction
+class GroupBookingResponse(BaseModel):
+    user_id: UUID
+    resort_id: str
+    booking_date: datetime
+    total_price: float
+    bookings: List[GroupBookingItem]
+
+# A checkout hold: the room is kept for the user until held_until
+class RoomHoldResponse(BaseModel):
+    room_id: UUID
+    room_number: str
+    user_id: UUID
+    resort_id: str
+    held_until: datetime
+
+class OccupancyDay(BaseModel):
+    day: date
+    bookings: int
+    cancellations: int
+    checkouts: int
+    revenue: float
+    occupied_rooms: int
+    total_rooms: int
+    occupancy_rate: float
+
+class RoomTypeOccupancy(BaseModel):
+    room_type: str
+    occupied_rooms: int
+    total_rooms: int
+    occupancy_rate: float
+
+class JobSchema(BaseModel):
+    id: UUID
+    kind: str
+    payload: Dict[str, Any]
+    status: str
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class JobRequest(BaseModel):
+    kind: str
+    payload: Dict[str, Any] = {}
+    idempotency_key: Optional[str] = None
+    delay_seconds: float = 0.0
+
 # Optional: Define a specific response model if you want the "message" field
 class MessageResponse(BaseModel):
     message: str
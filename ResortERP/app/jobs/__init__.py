@@ -0,0 +1,3 @@
+from .queue import enqueue, enqueue_many, job_handler, HANDLERS
+from .worker import job_worker
+from . import handlers  # noqa: F401  (registers the built-in handlers)
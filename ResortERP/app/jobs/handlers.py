@@ -0,0 +1,60 @@
+# app/jobs/handlers.py
+#
+# Built-in job handlers. Each one is safe to run more than once for the same
+# payload.
+
+import logging
+import uuid
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.domain.model.base import Booking, Room, User
+from app.jobs.queue import job_handler
+from app.repo import partitions
+
+logger = logging.getLogger(__name__)
+
+
+@job_handler("booking.confirmation")
+def send_booking_confirmation(db: Session, payload: dict) -> None:
+    """
+    Sends the guest a confirmation for a booking. Enqueued by book_room with
+    idempotency key `booking.confirmation:<booking id>`, so each booking gets one job.
+
+    Payload: booking_id, booking_date (ISO 8601, used to prune to the booking's partition).
+    """
+    booking = (
+        db.query(Booking)
+        .filter(
+            Booking.id == uuid.UUID(payload["booking_id"]),
+            Booking.booking_date == datetime.fromisoformat(payload["booking_date"]),
+        )
+        .first()
+    )
+    if booking is None or booking.cancelled_at is not None:
+        logger.info("Booking no longer active; confirmation skipped", extra={"booking_id": payload["booking_id"]})
+        return
+    user = db.get(User, booking.user_id)
+    room = db.get(Room, booking.room_id)
+    # There is no mail integration yet; the structured log line is the notice
+    logger.info("Booking confirmation sent", extra={
+        "booking_id": str(booking.id), "email": user.email, "room_number": room.number,
+        "booking_date": booking.booking_date.isoformat(),
+    })
+
+
+@job_handler("bookings.maintenance", max_attempts=3)
+def maintain_booking_partitions(db: Session, payload: dict) -> None:
+    """Creates upcoming booking partitions and archives closed months. Payload: dry_run (optional)."""
+    engine = db.get_bind()
+    partitions.ensure_booking_partitions(engine)
+    partitions.archive_bookings(engine, dry_run=bool(payload.get("dry_run", False)))
+
+
+@job_handler("knowledge.reindex", max_attempts=3)
+def reindex_knowledge(db: Session, payload: dict) -> None:
+    """Rebuilds the knowledge index from KNOWLEDGE_DOCS_DIR. Payload: embedder (optional)."""
+    from app.knowledge import build_index
+
+    build_index(embedder_name=payload.get("embedder"))
@@ -0,0 +1,260 @@
+# app/jobs/queue.py
+#
+# Durable job queue stored in the `jobs` table.
+#
+# enqueue() only adds a row to the caller's session, so a job commits or rolls
+# back together with the change that caused it (a booking and its confirmation
+# notice are either both saved or neither is). Workers claim due jobs with
+# FOR UPDATE SKIP LOCKED, so any number of processes can work the same table.
+#
+# A handler's database writes commit in the same transaction that marks the job
+# succeeded. Other side effects (emails, external APIs) are at-least-once: they
+# can repeat if a worker dies after doing them, so handlers must be idempotent.
+
+import logging
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, event, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.domain.model.base import Job
+from app.domain.model.ids import uuid7
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, DEAD = "queued", "running", "succeeded", "dead"
+
+# Retry delays grow as BACKOFF_BASE * 2 ** (attempt - 1), capped, with +-20% jitter
+BACKOFF_BASE_SECONDS = 5.0
+BACKOFF_MAX_SECONDS = 3600.0
+
+
+@dataclass(frozen=True)
+class JobHandler:
+    kind: str
+    func: Callable[[Session, dict], Any]
+    max_attempts: int
+
+
+HANDLERS: Dict[str, JobHandler] = {}
+
+# Called after a session that enqueued jobs commits (the in-process worker wakes up early)
+_enqueue_listeners: List[Callable[[], None]] = []
+
+
+def job_handler(kind: str, max_attempts: int = 5):
+    """
+    Registers `func(db, payload)` as the handler for jobs of `kind`. The handler
+    runs in a worker thread with its own session and must be idempotent.
+    """
+    def register(func):
+        HANDLERS[kind] = JobHandler(kind=kind, func=func, max_attempts=max_attempts)
+        return func
+    return register
+
+
+def on_enqueue(listener: Callable[[], None]) -> None:
+    _enqueue_listeners.append(listener)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_enqueued(session) -> None:
+    if session.info.pop("jobs_enqueued", False):
+        for listener in _enqueue_listeners:
+            listener()
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[dict] = None,
+    delay_seconds: float = 0.0,
+    idempotency_key: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+) -> Job:
+    """
+    Adds a job to `db` without committing; it becomes visible to workers when
+    the caller commits.
+
+    Args:
+        db (Session): Session of the transaction the job belongs to.
+        kind (str): Registered handler name.
+        payload (dict, optional): JSON-serialisable arguments for the handler.
+        delay_seconds (float): Earliest start, relative to now.
+        idempotency_key (str, optional): Returns the existing job with this key instead of adding another.
+        max_attempts (int, optional): Defaults to the handler's setting.
+
+    Returns:
+        Job: The new (or existing) job.
+    """
+    handler = HANDLERS.get(kind)
+    if handler is None:
+        raise ValueError(f"No job handler registered for '{kind}'.")
+    if idempotency_key is not None:
+        existing = db.query(Job).filter(Job.idempotency_key == idempotency_key).first()
+        if existing is not None:
+            return existing
+    now = datetime.now(timezone.utc)
+    job = Job(
+        id=uuid7(),
+        kind=kind,
+        payload=payload or {},
+        status=QUEUED,
+        attempts=0,
+        max_attempts=max_attempts or handler.max_attempts,
+        idempotency_key=idempotency_key,
+        run_at=now + timedelta(seconds=delay_seconds),
+        created_at=now,
+    )
+    db.add(job)
+    db.info["jobs_enqueued"] = True
+    return job
+
+
+def enqueue_many(
+    db: Session,
+    kind: str,
+    payloads: List[dict],
+    idempotency_keys: Optional[List[str]] = None,
+) -> List[Job]:
+    """
+    Like enqueue() for several jobs of one kind, with one query for the
+    existing idempotency keys instead of one per job.
+
+    Args:
+        db (Session): Session of the transaction the jobs belong to.
+        kind (str): Registered handler name.
+        payloads (List[dict]): One payload per job.
+        idempotency_keys (List[str], optional): One key per payload.
+
+    Returns:
+        List[Job]: The new (or existing) job of each payload, in order.
+    """
+    handler = HANDLERS.get(kind)
+    if handler is None:
+        raise ValueError(f"No job handler registered for '{kind}'.")
+    keys = idempotency_keys or [None] * len(payloads)
+    existing = {}
+    if any(keys):
+        existing = {
+            job.idempotency_key: job
+            for job in db.query(Job).filter(Job.idempotency_key.in_([key for key in keys if key]))
+        }
+    now = datetime.now(timezone.utc)
+    jobs = []
+    for payload, key in zip(payloads, keys):
+        job = existing.get(key) if key else None
+        if job is None:
+            job = Job(
+                id=uuid7(), kind=kind, payload=payload or {}, status=QUEUED, attempts=0,
+                max_attempts=handler.max_attempts, idempotency_key=key, run_at=now, created_at=now,
+            )
+            db.add(job)
+            if key:
+                existing[key] = job
+        jobs.append(job)
+    db.info["jobs_enqueued"] = True
+    return jobs
+
+
+def claim_jobs(db: Session, worker_id: str, limit: int, lease_seconds: float) -> List[Job]:
+    """
+    Atomically marks up to `limit` due jobs as running for `worker_id` and
+    commits. Also reclaims running jobs whose lease has expired.
+    """
+    now = datetime.now(timezone.utc)
+    due = (
+        select(Job.id)
+        .where(or_(
+            and_(Job.status == QUEUED, Job.run_at <= now),
+            and_(Job.status == RUNNING, Job.locked_until < now),
+        ))
+        .order_by(Job.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = db.execute(
+        update(Job)
+        .where(Job.id.in_(due.scalar_subquery()))
+        .values(
+            status=RUNNING,
+            attempts=Job.attempts + 1,
+            started_at=now,
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=lease_seconds),
+        )
+        .returning(Job)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    return claimed
+
+
+def complete_job(db: Session, job_id: uuid.UUID, worker_id: str) -> bool:
+    """
+    Marks the job succeeded in the caller's transaction, so a handler's own
+    database writes and its completion commit together.
+
+    Returns:
+        bool: False if `worker_id` no longer holds the job (its lease expired
+        and another worker claimed it); the caller should roll back.
+    """
+    result = db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == RUNNING, Job.locked_by == worker_id)
+        .values(status=SUCCEEDED, finished_at=datetime.now(timezone.utc), locked_by=None, locked_until=None, last_error=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def retry_delay(attempt: int) -> float:
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempt - 1), BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def fail_job(db: Session, job: Job, worker_id: str, error: str) -> str:
+    """
+    Records a failed attempt: requeues the job with exponential backoff, or
+    marks it dead once max_attempts is reached.
+
+    Returns:
+        str: The new status.
+    """
+    now = datetime.now(timezone.utc)
+    if job.attempts >= job.max_attempts:
+        values = {"status": DEAD, "finished_at": now}
+    else:
+        values = {"status": QUEUED, "run_at": now + timedelta(seconds=retry_delay(job.attempts))}
+    db.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == RUNNING, Job.locked_by == worker_id)
+        .values(locked_by=None, locked_until=None, last_error=error[-4000:], **values)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return values["status"]
+
+
+def queue_depth(db: Session) -> int:
+    """Number of queued jobs that are due now."""
+    return db.query(func.count(Job.id)).filter(
+        Job.status == QUEUED, Job.run_at <= datetime.now(timezone.utc),
+    ).scalar()
+
+
+def retry_dead_job(db: Session, job_id: uuid.UUID) -> Optional[Job]:
+    """Requeues a dead job with a fresh set of attempts; returns None if it is not dead."""
+    job = db.query(Job).filter(Job.id == job_id, Job.status == DEAD).first()
+    if job is None:
+        return None
+    job.status = QUEUED
+    job.attempts = 0
+    job.run_at = datetime.now(timezone.utc)
+    job.finished_at = None
+    db.info["jobs_enqueued"] = True
+    return job
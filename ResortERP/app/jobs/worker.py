@@ -0,0 +1,183 @@
+# app/jobs/worker.py
+#
+# asyncio worker pool for the job queue. One coordinator task claims due jobs
+# in batches, up to the number of free slots, from the jobs table of every
+# resort database (a job lives in the database of the change that enqueued
+# it). Each job's handler then runs in a thread with its own session on that
+# database. The coordinator polls every poll_interval
+# seconds. A commit that enqueued jobs in this process wakes it immediately.
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import datetime, timezone
+from typing import Optional, Set
+
+from app.config.db import shard_router
+from app.jobs import queue
+from app.observability.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+JOB_DURATION = REGISTRY.histogram(
+    "job_duration_seconds", "Job handler run time, by kind and outcome.", ("kind", "outcome"),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+JOB_WAIT = REGISTRY.histogram(
+    "job_wait_seconds", "Time from when a job was due until a worker started it, by kind.", ("kind",),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+
+class JobWorker:
+    """Claims and runs jobs with up to `concurrency` handlers in flight."""
+
+    def __init__(self, concurrency: int = 4, poll_interval: float = 1.0, lease_seconds: float = 300.0):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.depth: Optional[int] = None
+        self._running: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._coordinator: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._first_shard = 0
+
+    # --- Lifecycle ---
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._coordinator = asyncio.create_task(self._run())
+        logger.info("Job worker started", extra={"worker": self.worker_id, "concurrency": self.concurrency})
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Stops claiming and waits up to `timeout` for running jobs; the rest are retried after their lease."""
+        self._stopping = True
+        if self._coordinator is None:
+            return
+        self._wakeup.set()
+        await self._coordinator
+        if self._running:
+            done, pending = await asyncio.wait(self._running, timeout=timeout)
+            if pending:
+                logger.warning("Jobs still running at shutdown", extra={"jobs": len(pending)})
+        self._coordinator = None
+        self._loop = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._running)
+
+    def notify(self) -> None:
+        """Thread-safe: wake the coordinator to claim new jobs now."""
+        loop = self._loop
+        if loop is not None and not self._stopping:
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    # --- Coordinator ---
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            free = self.concurrency - len(self._running)
+            claimed = []
+            if free > 0:
+                try:
+                    claimed = await asyncio.to_thread(self._claim, free)
+                except Exception:
+                    logger.exception("Error claiming jobs")
+            for resort_id, job in claimed:
+                task = asyncio.create_task(self._execute(resort_id, job))
+                self._running.add(task)
+                task.add_done_callback(self._finished)
+            if len(claimed) < free or free <= 0:
+                # Sleep until a job finishes, a commit enqueues more, or the poll interval elapses
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._wakeup.set()
+
+    def _claim(self, limit: int):
+        # Resorts take turns at going first, so one busy resort cannot starve the others
+        resort_ids = shard_router.resort_ids()
+        self._first_shard = (self._first_shard + 1) % len(resort_ids)
+        claimed, depth = [], 0
+        for resort_id in resort_ids[self._first_shard:] + resort_ids[:self._first_shard]:
+            db = shard_router.session(resort_id)
+            db.expire_on_commit = False
+            try:
+                if len(claimed) < limit:
+                    claimed += [(resort_id, job) for job in queue.claim_jobs(db, self.worker_id, limit - len(claimed), self.lease_seconds)]
+                depth += queue.queue_depth(db)
+            except Exception:
+                # One unreachable resort database must not stop the others' jobs
+                logger.exception("Error claiming jobs", extra={"resort_id": resort_id})
+            finally:
+                db.close()
+        self.depth = depth
+        return claimed
+
+    # --- Execution ---
+
+    async def _execute(self, resort_id: str, job) -> None:
+        due = job.run_at if job.run_at.tzinfo else job.run_at.replace(tzinfo=timezone.utc)
+        JOB_WAIT.observe(max(0.0, (datetime.now(timezone.utc) - due).total_seconds()), (job.kind,))
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            outcome = await asyncio.to_thread(self._run_handler, resort_id, job)
+        except Exception:
+            logger.exception("Error recording job result", extra={"resort_id": resort_id, "job_id": str(job.id), "kind": job.kind})
+        finally:
+            JOB_DURATION.observe(time.perf_counter() - started, (job.kind, outcome))
+
+    def _run_handler(self, resort_id: str, job) -> str:
+        handler = queue.HANDLERS.get(job.kind)
+        db = shard_router.session(resort_id)
+        try:
+            if handler is None:
+                error = f"No job handler registered for '{job.kind}'."
+            elif job.attempts > job.max_attempts:
+                error = "Exceeded max attempts (worker lost while running)."
+            else:
+                try:
+                    handler.func(db, dict(job.payload or {}))
+                    if not queue.complete_job(db, job.id, self.worker_id):
+                        db.rollback()
+                        logger.warning("Job lease lost; result discarded", extra={"resort_id": resort_id, "job_id": str(job.id), "kind": job.kind})
+                        return "lost"
+                    db.commit()
+                    logger.info("Job succeeded", extra={"resort_id": resort_id, "job_id": str(job.id), "kind": job.kind, "attempt": job.attempts})
+                    return "success"
+                except Exception:
+                    db.rollback()
+                    error = traceback.format_exc()
+            status = queue.fail_job(db, job, self.worker_id, error)
+            level = logging.ERROR if status == queue.DEAD else logging.WARNING
+            logger.log(level, "Job failed", extra={
+                "resort_id": resort_id, "job_id": str(job.id), "kind": job.kind, "attempt": job.attempts, "status": status,
+                "error": error.strip().splitlines()[-1],
+            })
+            return "dead" if status == queue.DEAD else "retry"
+        finally:
+            db.close()
+
+
+# Process-wide worker, started by the app lifespan when JOB_WORKERS > 0
+job_worker = JobWorker()
+queue.on_enqueue(job_worker.notify)
+
+REGISTRY.gauge("jobs_queue_depth", "Queued jobs that are due in all resort databases, as of the worker's last poll.", lambda: job_worker.depth)
+REGISTRY.gauge("jobs_running", "Jobs running in this process.", lambda: job_worker.in_flight)
@@ -0,0 +1,3 @@
+from .embeddings import get_embedder
+from .index import VectorIndex, SearchHit, knowledge_base, write_index
+from .ingest import Chunk, build_index, build_index_from_chunks, chunk_document
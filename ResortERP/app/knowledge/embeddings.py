@@ -0,0 +1,136 @@
+# app/knowledge/embeddings.py
+#
+# Text embedders for the knowledge index. Every embedder returns float32 rows
+# of unit length, so a dot product is the cosine similarity.
+#
+# "hashing" (the default) needs no model or network: words and word pairs are
+# hashed into a fixed number of signed buckets. It matches on shared wording,
+# which suits short factual documents (hours, menus, policies).
+# "gemini" calls the Gemini embedding API with GOOGLE_API_KEY and also
+# matches paraphrases. The index remembers which embedder built it, and
+# queries always use the same one.
+
+import math
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import List, Sequence
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+HYPHEN_RE = re.compile(r"(?<=[a-z0-9])-(?=[a-z0-9])")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i in is it its me my of on or our "
+    "the their there this to was we what when where which who will with you your".split()
+)
+
+
+class Embedder:
+    name: str
+    dim: int
+
+    def embed_documents(self, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed_documents([text])[0]
+
+
+@lru_cache(maxsize=200_000)
+def _bucket(feature: str, dim: int):
+    h = zlib.crc32(feature.encode("utf-8"))
+    return h % dim, 1.0 if (h >> 31) & 1 else -1.0
+
+
+def _stem(word: str) -> str:
+    # Plural folding only: "dogs" -> "dog", "classes" -> "class"
+    if len(word) > 4 and word.endswith(("sses", "ches", "shes", "xes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+class HashingEmbedder(Embedder):
+    """Signed feature hashing of words and adjacent word pairs, with log term frequency."""
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> Counter:
+        # "check-out" and "checkout" are the same word
+        text = HYPHEN_RE.sub("", text.lower())
+        words = [_stem(w) for w in TOKEN_RE.findall(text) if w not in STOPWORDS]
+        features = Counter(words)
+        features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+        return features
+
+    def embed_documents(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            vector = out[row]
+            for feature, count in self._features(text).items():
+                index, sign = _bucket(feature, self.dim)
+                vector[index] += sign * (1.0 + math.log(count))
+        return normalize(out)
+
+
+class GeminiEmbedder(Embedder):
+    """Gemini embedding API (google-genai); documents and queries use their own task types."""
+
+    BATCH = 100
+
+    def __init__(self, model: str = "text-embedding-004", dim: int = 768):
+        self.model = model
+        self.dim = dim
+        self.name = f"gemini:{model}"
+        self._client = None
+
+    def _embed(self, texts: Sequence[str], task_type: str) -> np.ndarray:
+        from google import genai
+        from google.genai import types
+        from app.config.env import get_settings
+
+        if self._client is None:
+            self._client = genai.Client(api_key=get_settings().GOOGLE_API_KEY)
+        rows: List[List[float]] = []
+        for start in range(0, len(texts), self.BATCH):
+            response = self._client.models.embed_content(
+                model=self.model,
+                contents=list(texts[start:start + self.BATCH]),
+                config=types.EmbedContentConfig(task_type=task_type),
+            )
+            rows.extend(embedding.values for embedding in response.embeddings)
+        return normalize(np.asarray(rows, dtype=np.float32).reshape(len(texts), -1))
+
+    def embed_documents(self, texts: Sequence[str]) -> np.ndarray:
+        return self._embed(texts, "RETRIEVAL_DOCUMENT")
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self._embed([text], "RETRIEVAL_QUERY")[0]
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    np.maximum(norms, 1e-12, out=norms)
+    return vectors / norms
+
+
+def get_embedder(name: str) -> Embedder:
+    """
+    Returns the embedder for a KNOWLEDGE_EMBEDDER setting or an index's recorded
+    name: "hashing", "hashing-<dim>", "gemini" or "gemini:<model>".
+    """
+    if name == "hashing":
+        return HashingEmbedder()
+    if name.startswith("hashing-"):
+        return HashingEmbedder(int(name.split("-", 1)[1]))
+    if name == "gemini":
+        return GeminiEmbedder()
+    if name.startswith("gemini:"):
+        return GeminiEmbedder(name.split(":", 1)[1])
+    raise ValueError(f"Unknown embedder '{name}'. Use 'hashing' or 'gemini'.")
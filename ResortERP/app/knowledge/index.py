@@ -0,0 +1,256 @@
+# app/knowledge/index.py
+#
+# On-disk vector index for the resort knowledge base.
+#
+# An index is a directory of plain .npy files opened with mmap_mode="r". Every
+# worker process shares the same page cache, and opening an index costs
+# nothing until it is searched:
+#
+#   meta.json           embedder, dimension, chunk count, sources, nlist
+#   vectors.npy         float32 (count, dim), unit length
+#   texts.bin           UTF-8 chunk texts, back to back
+#   text_offsets.npy    int64 (count + 1) byte offsets into texts.bin
+#   source_ids.npy      int32 (count) index into meta["sources"]
+#   centroids.npy       float32 (nlist, dim)         IVF only
+#   list_offsets.npy    int64 (nlist + 1)            IVF only
+#
+# Small corpora are searched exactly: one matrix-vector product over all
+# vectors. Corpora of at least ivf_min_chunks chunks also get an inverted file
+# (IVF). Spherical k-means splits the vectors into nlist clusters, and rows are
+# stored grouped by cluster. A query scans only the nprobe clusters whose
+# centroids are closest, and each of those is a contiguous slice of vectors.npy.
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    text: str
+    source: str
+    score: float
+
+    def to_dict(self) -> dict:
+        return {"text": self.text, "source": self.source, "score": round(self.score, 4)}
+
+
+def default_nlist(count: int) -> int:
+    return max(1, int(4 * np.sqrt(count)))
+
+
+def _kmeans(vectors: np.ndarray, nlist: int, iterations: int = 10, sample_size: int = 64_000, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a random sample; returns unit-length centroids."""
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), max(sample_size, nlist)), replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # Re-seed empty clusters from random sample rows
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        norms[empty] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, batch: int = 8192) -> np.ndarray:
+    out = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), batch):
+        out[start:start + batch] = np.argmax(vectors[start:start + batch] @ centroids.T, axis=1)
+    return out
+
+
+def write_index(
+    path: str,
+    vectors: np.ndarray,
+    texts: Sequence[str],
+    sources: Sequence[str],
+    embedder_name: str,
+    ivf_min_chunks: int = 200_000,
+    nlist: Optional[int] = None,
+) -> dict:
+    """
+    Writes a new index to `path`, replacing any index already there. Readers
+    that have the old files open keep using them until they reload.
+
+    Args:
+        path (str): Index directory.
+        vectors (np.ndarray): Unit-length float32 rows, one per chunk.
+        texts (Sequence[str]): Chunk texts.
+        sources (Sequence[str]): Source label of each chunk (e.g. "spa.md > Opening hours").
+        embedder_name (str): Name of the embedder that produced `vectors`.
+        ivf_min_chunks (int): Build an IVF index from this many chunks on; below it search is exact.
+        nlist (int, optional): Number of IVF clusters; defaults to 4 * sqrt(count).
+
+    Returns:
+        dict: The index metadata.
+    """
+    count = len(texts)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(count, -1)
+    order = np.arange(count)
+    centroids = list_offsets = None
+    if count >= ivf_min_chunks:
+        nlist = min(nlist or default_nlist(count), count)
+        centroids = _kmeans(vectors, nlist)
+        assign = _assign(vectors, centroids)
+        order = np.argsort(assign, kind="stable")
+        list_offsets = np.concatenate(([0], np.cumsum(np.bincount(assign, minlength=nlist)))).astype(np.int64)
+    else:
+        nlist = 0
+
+    source_names = sorted(set(sources))
+    source_lookup = {name: i for i, name in enumerate(source_names)}
+    encoded = [texts[i].encode("utf-8") for i in order]
+
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".knowledge-", dir=parent)
+    np.save(os.path.join(staging, "vectors.npy"), vectors[order])
+    with open(os.path.join(staging, "texts.bin"), "wb") as out:
+        for chunk in encoded:
+            out.write(chunk)
+    np.save(os.path.join(staging, "text_offsets.npy"),
+            np.concatenate(([0], np.cumsum([len(chunk) for chunk in encoded], dtype=np.int64))).astype(np.int64))
+    np.save(os.path.join(staging, "source_ids.npy"), np.array([source_lookup[sources[i]] for i in order], dtype=np.int32))
+    if nlist:
+        np.save(os.path.join(staging, "centroids.npy"), centroids)
+        np.save(os.path.join(staging, "list_offsets.npy"), list_offsets)
+    meta = {
+        "version": INDEX_VERSION,
+        "embedder": embedder_name,
+        "dim": int(vectors.shape[1]) if count else 0,
+        "count": count,
+        "nlist": nlist,
+        "sources": source_names,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    with open(os.path.join(staging, "meta.json"), "w") as out:
+        json.dump(meta, out, indent=1)
+
+    # Swap directories; open memory maps of the old index stay valid
+    retired = None
+    if os.path.exists(path):
+        retired = f"{staging}.old"
+        os.rename(path, retired)
+    os.rename(staging, path)
+    if retired:
+        shutil.rmtree(retired, ignore_errors=True)
+    return meta
+
+
+class VectorIndex:
+    """A read-only, memory-mapped index directory written by write_index()."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as meta_file:
+            self.meta = json.load(meta_file)
+        if self.meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported knowledge index version {self.meta.get('version')} in {path}.")
+        self.count: int = self.meta["count"]
+        self.nlist: int = self.meta["nlist"]
+        self.sources: List[str] = self.meta["sources"]
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self.text_offsets = np.load(os.path.join(path, "text_offsets.npy"), mmap_mode="r")
+        self.source_ids = np.load(os.path.join(path, "source_ids.npy"), mmap_mode="r")
+        self.texts = np.memmap(os.path.join(path, "texts.bin"), dtype=np.uint8, mode="r") if self.text_offsets[-1] else b""
+        if self.nlist:
+            self.centroids = np.load(os.path.join(path, "centroids.npy"))
+            self.list_offsets = np.load(os.path.join(path, "list_offsets.npy"))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def text(self, row: int) -> str:
+        return bytes(self.texts[self.text_offsets[row]:self.text_offsets[row + 1]]).decode("utf-8")
+
+    def _top(self, rows: np.ndarray, scores: np.ndarray, k: int):
+        if len(scores) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
+
+    def search_rows(self, query: np.ndarray, k: int = 5, nprobe: Optional[int] = None, exact: bool = False):
+        """
+        Returns (rows, scores) of the `k` chunks most similar to `query`, best
+        first. IVF indexes scan `nprobe` clusters unless `exact` is set.
+        """
+        if not self.count:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = np.asarray(query, dtype=np.float32)
+        k = min(k, self.count)
+        if exact or not self.nlist:
+            return self._top(np.arange(self.count), self.vectors @ query, k)
+        nprobe = min(nprobe or max(1, self.nlist // 16), self.nlist)
+        lists = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        spans = [(self.list_offsets[i], self.list_offsets[i + 1]) for i in lists]
+        rows = np.concatenate([np.arange(start, end) for start, end in spans])
+        scores = np.concatenate([self.vectors[start:end] @ query for start, end in spans])
+        return self._top(rows, scores, min(k, len(rows)))
+
+    def search(self, query: np.ndarray, k: int = 5, nprobe: Optional[int] = None, min_score: float = 0.0) -> List[SearchHit]:
+        rows, scores = self.search_rows(query, k, nprobe)
+        return [
+            SearchHit(text=self.text(row), source=self.sources[self.source_ids[row]], score=float(score))
+            for row, score in zip(rows, scores) if score > min_score
+        ]
+
+
+class KnowledgeBase:
+    """
+    Process-wide handle on the index at KNOWLEDGE_INDEX_DIR. Reopens the index
+    when a rebuild replaces it, so workers pick up new documents without a restart.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index: Optional[VectorIndex] = None
+        self._embedder = None
+        self._stamp = None
+
+    def _current(self, path: str) -> Optional[VectorIndex]:
+        try:
+            stat = os.stat(os.path.join(path, "meta.json"))
+            stamp = (path, stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            return None
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    from app.knowledge.embeddings import get_embedder
+
+                    index = VectorIndex(path)
+                    self._embedder = get_embedder(index.meta["embedder"])
+                    self._index, self._stamp = index, stamp
+                    logger.info("Knowledge index loaded", extra={"path": path, "chunks": index.count, "nlist": index.nlist})
+        return self._index
+
+    def search(self, query: str, k: int = 4, path: Optional[str] = None) -> List[SearchHit]:
+        """Embeds `query` and returns the best matching chunks; empty if no index has been built."""
+        from app.config.env import get_settings
+
+        settings = get_settings()
+        index = self._current(path or settings.KNOWLEDGE_INDEX_DIR)
+        if index is None:
+            return []
+        return index.search(self._embedder.embed_query(query), k, nprobe=settings.KNOWLEDGE_NPROBE or None)
+
+
+knowledge_base = KnowledgeBase()
@@ -0,0 +1,168 @@
+# app/knowledge/ingest.py
+#
+# Turns the documents in KNOWLEDGE_DOCS_DIR (.md and .txt) into index chunks.
+#
+# Markdown is split at headings. Each section is packed into chunks of about
+# max_chars characters along paragraph boundaries. Every chunk starts with its
+# heading path (e.g. "Spa > Opening hours"), so a short chunk like "09:00-21:00
+# daily" still carries what it is about.
+
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from app.knowledge.embeddings import Embedder, get_embedder
+from app.knowledge.index import write_index
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_SUFFIXES = (".md", ".markdown", ".txt")
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+EMBED_BATCH = 1000
+
+
+@dataclass(frozen=True)
+class Chunk:
+    text: str
+    source: str
+
+
+def _sections(text: str) -> Iterator[Tuple[List[str], str]]:
+    """Yields (heading path, body) for each markdown section."""
+    path: List[str] = []
+    body: List[str] = []
+    for line in text.splitlines():
+        match = HEADING_RE.match(line)
+        if match:
+            if "".join(body).strip():
+                yield list(path), "\n".join(body)
+            level = len(match.group(1))
+            path = path[:level - 1] + [match.group(2)]
+            body = []
+        else:
+            body.append(line)
+    if "".join(body).strip():
+        yield list(path), "\n".join(body)
+
+
+def _split_long(paragraph: str, max_chars: int) -> List[str]:
+    if len(paragraph) <= max_chars:
+        return [paragraph]
+    pieces, current = [], ""
+    for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+        while len(sentence) > max_chars:
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_document(text: str, name: str, max_chars: int = 800) -> List[Chunk]:
+    """
+    Splits one document into chunks of at most about `max_chars` characters.
+
+    Args:
+        text (str): Document text (markdown or plain text).
+        name (str): Document name used in the chunk sources, e.g. "spa.md".
+        max_chars (int): Target chunk size.
+
+    Returns:
+        List[Chunk]: The document's chunks in order.
+    """
+    chunks = []
+    for path, body in _sections(text):
+        title = " > ".join(path)
+        source = f"{name} > {title}" if title else name
+        paragraphs = [p.strip() for p in re.split(r"\n\s*\n", body) if p.strip()]
+        current = ""
+        for paragraph in paragraphs:
+            for piece in _split_long(paragraph, max_chars):
+                if current and len(current) + len(piece) + 2 > max_chars:
+                    chunks.append(Chunk(f"{title}\n{current}" if title else current, source))
+                    current = piece
+                else:
+                    current = f"{current}\n\n{piece}" if current else piece
+        if current:
+            chunks.append(Chunk(f"{title}\n{current}" if title else current, source))
+    return chunks
+
+
+def iter_documents(docs_dir: str) -> Iterator[Tuple[str, str]]:
+    """Yields (relative path, text) for every document under `docs_dir`, in a stable order."""
+    for root, dirs, files in os.walk(docs_dir):
+        dirs.sort()
+        for file_name in sorted(files):
+            if file_name.lower().endswith(DOCUMENT_SUFFIXES):
+                full_path = os.path.join(root, file_name)
+                with open(full_path, encoding="utf-8") as document:
+                    yield os.path.relpath(full_path, docs_dir), document.read()
+
+
+def build_index_from_chunks(
+    chunks: Iterable[Chunk],
+    index_dir: str,
+    embedder: Embedder,
+    ivf_min_chunks: int = 200_000,
+    nlist: Optional[int] = None,
+) -> dict:
+    """Embeds `chunks` and writes them as the index at `index_dir`; returns the index metadata."""
+    import numpy as np
+
+    chunks = list(chunks)
+    started = time.perf_counter()
+    texts = [chunk.text for chunk in chunks]
+    if texts:
+        vectors = np.concatenate([
+            embedder.embed_documents(texts[start:start + EMBED_BATCH]) for start in range(0, len(texts), EMBED_BATCH)
+        ])
+    else:
+        vectors = np.zeros((0, embedder.dim), dtype=np.float32)
+    embedded = time.perf_counter()
+    meta = write_index(
+        index_dir, vectors, texts, [chunk.source for chunk in chunks], embedder.name,
+        ivf_min_chunks=ivf_min_chunks, nlist=nlist,
+    )
+    logger.info(
+        "Knowledge index built",
+        extra={
+            "path": index_dir,
+            "chunks": meta["count"],
+            "nlist": meta["nlist"],
+            "embedder": embedder.name,
+            "embed_seconds": round(embedded - started, 2),
+            "index_seconds": round(time.perf_counter() - embedded, 2),
+        },
+    )
+    return meta
+
+
+def build_index(docs_dir: Optional[str] = None, index_dir: Optional[str] = None, embedder_name: Optional[str] = None) -> dict:
+    """
+    Rebuilds the knowledge index from every document in `docs_dir`. Defaults
+    come from the KNOWLEDGE_* settings.
+
+    Returns:
+        dict: The new index metadata.
+    """
+    from app.config.env import get_settings
+
+    settings = get_settings()
+    docs_dir = docs_dir or settings.KNOWLEDGE_DOCS_DIR
+    chunks: List[Chunk] = []
+    for name, text in iter_documents(docs_dir):
+        chunks.extend(chunk_document(text, name, settings.KNOWLEDGE_CHUNK_CHARS))
+    return build_index_from_chunks(
+        chunks,
+        index_dir or settings.KNOWLEDGE_INDEX_DIR,
+        get_embedder(embedder_name or settings.KNOWLEDGE_EMBEDDER),
+        ivf_min_chunks=settings.KNOWLEDGE_IVF_MIN_CHUNKS,
+    )
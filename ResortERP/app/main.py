@@ -1,14 +1,81 @@
+import asyncio
+import logging
 import os
 import sys
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-import uvicorn
+from sqlalchemy.exc import OperationalError
 from app.routers.router import getRouters
-from app.config.db import engine, Base
+from app.routers.endpoints.chatRouter import warmup_agents
+from app.config.db import Base, shard_router, WORKLOADS
+from app.repo.partitions import ensure_booking_partitions, migrate_cancellation_columns
+from app.repo.holds import migrate_hold_columns
+from app.realtime import availability_hub, create_broker, hold_sweeper
+from app.jobs import job_worker
+from app.config.env import get_settings
+from app.observability.log import setup_logging, RequestContextMiddleware
+from app.observability.metrics import MetricsMiddleware, instrument_engine
+from app.observability.profiling import ProfilingMiddleware, instrument_profiling
+from app.routers.compression import CompressionMiddleware
+from app.routers.idempotency import IdempotencyMiddleware
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))  # Optional: Add project root to Python path
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The agent stack is imported lazily; with AGENT_WARMUP set we load it in a
+    # worker thread right after boot so the server starts accepting requests first.
+    settings = get_settings()
+    if settings.AGENT_WARMUP:
+        app.state.agent_warmup = asyncio.create_task(asyncio.to_thread(warmup_agents))
+    # The broker listens on every resort database, since changes are announced from their own transactions
+    broker = create_broker([shard_engine for _, shard_engine in shard_router.engines()], settings.REALTIME_BROKER)
+    await availability_hub.start(broker)
+    await hold_sweeper.start()
+    if settings.JOB_WORKERS > 0:
+        job_worker.concurrency = settings.JOB_WORKERS
+        job_worker.poll_interval = settings.JOB_POLL_INTERVAL
+        job_worker.lease_seconds = settings.JOB_LEASE_SECONDS
+        await job_worker.start()
+    yield
+    await job_worker.stop()
+    await hold_sweeper.stop()
+    await availability_hub.stop()
+
+
 class AppCreator():
     def __init__(self):
-        self.app = FastAPI()
+        settings = get_settings()
+        self.app = FastAPI(lifespan=lifespan)
+        # Innermost, so stored responses are uncompressed and replays are negotiated per request
+        self.app.add_middleware(
+            IdempotencyMiddleware,
+            ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+            lease_seconds=settings.IDEMPOTENCY_LEASE_SECONDS,
+            cache_entries=settings.IDEMPOTENCY_CACHE_ENTRIES,
+        )
+        self.app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MIN_BYTES,
+            gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        )
+        self.app.add_middleware(MetricsMiddleware)
+        # Installed only when configured, so profiling costs nothing otherwise
+        if settings.PROFILING_TOKEN or settings.PROFILING_SAMPLE_RATE > 0:
+            self.app.add_middleware(
+                ProfilingMiddleware,
+                token=settings.PROFILING_TOKEN,
+                sample_rate=settings.PROFILING_SAMPLE_RATE,
+                mode=settings.PROFILING_MODE,
+                interval_ms=settings.PROFILING_INTERVAL_MS,
+                directory=settings.PROFILING_DIR,
+                keep=settings.PROFILING_KEEP,
+            )
+            for workload in WORKLOADS:
+                for _, shard_engine in shard_router.engines(workload):
+                    instrument_profiling(shard_engine)
+        self.app.add_middleware(RequestContextMiddleware)
         self.app.include_router(getRouters())  # Updated to use getRouters()
 
 # Create the FastAPI app at the module level so that uvicorn can find it.
@@ -22,12 +89,33 @@ class AppCreator():
 #     connection.execute(text('GRANT ALL ON SCHEMA public TO public;'))
 #     connection.commit()
 
-# Recreate all tables
-Base.metadata.create_all(bind=engine)
+setup_logging()
+
+# Statement and pool metrics for every pool: one per resort database and workload
+for workload in WORKLOADS:
+    for _, shard_engine in shard_router.engines(workload):
+        instrument_engine(shard_engine)
+# Every resort has its own database (the default resort's is `engine`)
+for resort_id, shard_engine in shard_router.engines():
+    try:
+        # Recreate all tables
+        Base.metadata.create_all(bind=shard_engine)
+        # Room hold columns for databases created before holds existed
+        migrate_hold_columns(shard_engine)
+        # Booking cancellation column for databases created when cancelling deleted the booking
+        migrate_cancellation_columns(shard_engine)
+        # Monthly booking partitions for the current month and a few ahead (PostgreSQL only)
+        ensure_booking_partitions(shard_engine)
+    except OperationalError:
+        if resort_id == shard_router.default:
+            raise
+        # One unreachable property must not keep the others down; its requests fail until it is back
+        logging.getLogger(__name__).exception("Resort database unavailable at startup", extra={"resort_id": resort_id})
 
 app_creator = AppCreator()
 app = app_creator.app
 
 if __name__ == "__main__":
+    import uvicorn
     # You can now start the app using the module's "app" attribute.
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
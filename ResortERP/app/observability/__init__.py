@@ -0,0 +1 @@
+from .log import setup_logging, request_id_var, RequestContextMiddleware
@@ -0,0 +1,190 @@
+# app/observability/log.py
+#
+# Structured, non-blocking logging. Records are filtered and tagged with the
+# current request id on the calling thread, then pushed onto an in-memory
+# queue; a single background listener thread formats them as JSON and writes
+# them to stdout, so request handlers and the event loop never block on I/O.
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+from app.config.env import get_settings
+
+# Correlation id of the request (or chat turn) currently being handled
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RESERVED_ATTRS = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime", "request_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_fork_hook_registered = False
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps each record with the request id from the caller's context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of DEBUG records so chatty debug lines can stay enabled
+    in production. A record can override the rate with `extra={"sample_rate": 0.1}`.
+    """
+
+    def __init__(self, debug_rate: float = 1.0):
+        super().__init__()
+        self.debug_rate = debug_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", None)
+        if rate is None:
+            if record.levelno > logging.DEBUG:
+                return True
+            rate = self.debug_rate
+        return rate >= 1.0 or random.random() < rate
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records untouched. The stock `prepare` copies the
+    record and formats its message on the caller's thread so it can be pickled;
+    our queue never leaves the process, so formatting is left to the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    converter = time.gmtime
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and key != "sample_rate":
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def setup_logging(level: Optional[str] = None, debug_sample_rate: Optional[float] = None, stream=None) -> logging.handlers.QueueListener:
+    """
+    Installs the queue-backed JSON handler on the `app` logger. Idempotent.
+
+    Args:
+        level (str, optional): Log level name; defaults to settings.LOG_LEVEL.
+        debug_sample_rate (float, optional): Fraction of DEBUG records kept; defaults to settings.LOG_DEBUG_SAMPLE_RATE.
+        stream (IO, optional): Destination stream; defaults to stdout.
+
+    Returns:
+        QueueListener: The running listener (stopped automatically at exit).
+    """
+    global _listener, _fork_hook_registered
+    if _listener is not None:
+        return _listener
+
+    settings = get_settings()
+    level = level or settings.LOG_LEVEL
+    debug_sample_rate = settings.LOG_DEBUG_SAMPLE_RATE if debug_sample_rate is None else debug_sample_rate
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _InProcessQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(debug_sample_rate))
+    queue_handler.addFilter(RequestIdFilter())
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(level.upper())
+    app_logger.addHandler(queue_handler)
+    app_logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    if not _fork_hook_registered:
+        atexit.register(shutdown_logging)
+        os.register_at_fork(after_in_child=_restart_after_fork)
+        _fork_hook_registered = True
+    return _listener
+
+
+def _restart_after_fork() -> None:
+    """The listener thread does not survive fork(); give each child a fresh queue and listener."""
+    global _listener
+    if _listener is None:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    for handler in logging.getLogger("app").handlers:
+        if isinstance(handler, _InProcessQueueHandler):
+            handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flushes queued records and removes the handler installed by setup_logging."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    app_logger = logging.getLogger("app")
+    for handler in list(app_logger.handlers):
+        if isinstance(handler, _InProcessQueueHandler):
+            app_logger.removeHandler(handler)
+    listener.stop()
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware that assigns every HTTP request a correlation id, taken from
+    the `X-Request-ID` header when present, and echoes it on the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
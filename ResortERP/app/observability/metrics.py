@@ -0,0 +1,332 @@
+# app/observability/metrics.py
+#
+# Minimal Prometheus-compatible metrics with a lock-free hot path.
+#
+# Each metric keeps one shard (a plain dict) per thread. Recording only
+# touches the calling thread's shard, so no lock is taken after a thread's
+# first observation; the scrape copies every shard (dict/list copies are
+# atomic under the GIL) and sums them.
+
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshots(self) -> List[dict]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        return [dict(shard) for shard in shards]
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally split by labels."""
+
+    kind = "counter"
+
+    def inc(self, labels: LabelValues = (), amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> Dict[LabelValues, float]:
+        totals: Dict[LabelValues, float] = {}
+        for shard in self._snapshots():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def render(self) -> Iterable[str]:
+        yield from super().render()
+        for labels, value in sorted(self.values().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values (e.g. durations in seconds)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per-series layout: [count per bucket..., count above last bucket, sum]
+        self._width = len(self.buckets) + 2
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            series = shard[labels] = [0] * self._width
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def values(self) -> Dict[LabelValues, List[float]]:
+        totals: Dict[LabelValues, List[float]] = {}
+        for shard in self._snapshots():
+            for labels, series in shard.items():
+                series = list(series)
+                total = totals.setdefault(labels, [0] * self._width)
+                for i, value in enumerate(series):
+                    total[i] += value
+        return totals
+
+    def render(self) -> Iterable[str]:
+        yield from super().render()
+        for labels, series in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Gauge(_Metric):
+    """
+    Point-in-time value read from a callback at scrape time. With labelnames,
+    the callback returns a dict of label values -> value instead.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Any], labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def render(self) -> Iterable[str]:
+        value = self.callback()
+        if value is None:
+            return
+        yield from super().render()
+        if not self.labelnames:
+            yield f"{self.name} {_format_value(value)}"
+            return
+        for labels, series in sorted(value.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(series)}"
+
+
+class Registry:
+    """Holds metrics by name and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, callback: Callable[[], Any], labelnames: Sequence[str] = ()) -> Gauge:
+        with self._lock:
+            # Callbacks are replaced so a re-created engine/pool is picked up
+            gauge = self._metrics[name] = Gauge(name, documentation, callback, labelnames)
+        return gauge
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+HTTP_LATENCY = REGISTRY.histogram("http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+DB_STATEMENTS = REGISTRY.counter("db_statements_total", "SQL statements executed, by operation.", ("operation",))
+DB_LATENCY = REGISTRY.histogram(
+    "db_statement_duration_seconds", "SQL statement duration, by operation.", ("operation",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+CHAT_TURNS = REGISTRY.histogram(
+    "chat_turn_duration_seconds", "Duration of one chat turn through the agent, by outcome.", ("outcome",),
+    buckets=(0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0),
+)
+CHAT_TOOL_CALLS = REGISTRY.counter("chat_tool_calls_total", "Tool calls made by the chat agents, by tool.", ("tool",))
+DB_POOL_WAIT = REGISTRY.histogram(
+    "db_pool_wait_seconds", "Time to get a connection from the pool (including opening one), by workload.", ("workload",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+DB_POOL_TIMEOUTS = REGISTRY.counter(
+    "db_pool_timeouts_total", "Connection requests that gave up after the pool timeout, by workload.", ("workload",),
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts and latency per route template
+    (e.g. `/booking/user/{user_id}/room/{room_id}`), so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_LATENCY.observe(time.perf_counter() - started, (method, path))
+            HTTP_REQUESTS.inc((method, path, str(status)))
+
+
+# Instrumented engines whose connection pools the pool gauges report
+_engines: Dict[int, Any] = {}
+
+
+def instrument_engine(engine, registry: Registry = REGISTRY) -> None:
+    """
+    Records statement counts/durations via SQLAlchemy cursor events and exposes
+    connection pool gauges for `engine`.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_query_start"].pop()
+        operation = (statement.lstrip().split(None, 1) or ["OTHER"])[0].upper()
+        labels = (operation,)
+        DB_LATENCY.observe(time.perf_counter() - started, labels)
+        DB_STATEMENTS.inc(labels)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        starts = exception_context.connection.info.get("metrics_query_start") if exception_context.connection else None
+        if starts:
+            starts.pop()
+
+    pool = engine.pool
+    if hasattr(pool, "checkedout"):
+        # With several resort databases the pool gauges add up all of their pools
+        _engines[id(engine)] = engine
+        # Read through the engine, since dispose() replaces its pool
+        pools = lambda: [instrumented.pool for instrumented in list(_engines.values())]
+
+        def by_workload(read: Callable[[Any], float]) -> Callable[[], Dict[LabelValues, float]]:
+            def collect():
+                totals: Dict[LabelValues, float] = {}
+                for p in pools():
+                    labels = (getattr(p, "workload", "http"),)
+                    totals[labels] = totals.get(labels, 0) + read(p)
+                return totals
+            return collect
+
+        labels = ("workload",)
+        registry.gauge("db_pool_size", "Configured connection pool size, by workload.", by_workload(lambda p: p.size()), labels)
+        registry.gauge(
+            "db_pool_checked_out", "Connections currently checked out of the pool, by workload.",
+            by_workload(lambda p: p.checkedout()), labels,
+        )
+        # QueuePool reports negative overflow until the pool has filled up
+        registry.gauge(
+            "db_pool_overflow", "Connections opened beyond the pool size, by workload.",
+            by_workload(lambda p: max(0, p.overflow())), labels,
+        )
+
+
+def serve_metrics(port: int, host: str = "0.0.0.0", registry: Registry = REGISTRY):
+    """
+    Serves `registry` at /metrics on its own port from a daemon thread.
+
+    Behind the shared socket of app.serve, a scrape of the app's /metrics lands
+    on whichever worker accepts it, so counters would jump between workers'
+    values. Each worker therefore also serves its metrics on a port of its own,
+    which Prometheus scrapes as a separate target.
+
+    Returns:
+        ThreadingHTTPServer: The running server; call shutdown() to stop it.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,286 @@
+# app/observability/profiling.py
+#
+# Opt-in profiling of single HTTP requests.
+#
+# A request is profiled when it carries `X-Profile: <PROFILING_TOKEN>` or, with
+# PROFILING_SAMPLE_RATE > 0, at random. Two modes are available:
+#   - "wall" (the default): a background thread samples the Python stacks of
+#     the event loop thread and of every busy worker thread every
+#     PROFILING_INTERVAL_MS. The result is in collapsed-stack format, which
+#     speedscope and flamegraph.pl can read. Time spent waiting (for the
+#     database, the LLM or the network) shows up too.
+#   - "cpu": cProfile on the event loop thread; saved as a .prof file for
+#     pstats/snakeviz.
+# Both also record every SQL statement the request issued, with durations.
+#
+# Results are written to PROFILING_DIR and served by /debug/profiles. Only one
+# request per process is profiled at a time. Profiles include anything else
+# the process ran during that window (other requests on the event loop).
+#
+# When neither a token nor a sample rate is configured, the middleware and the
+# SQLAlchemy listeners are not installed at all, so the cost is zero.
+
+import asyncio
+import cProfile
+import hmac
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional
+
+from app.observability.log import request_id_var
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+MODE_HEADER = b"x-profile-mode"
+MODES = ("wall", "cpu")
+MAX_STATEMENTS = 500
+# Frames at which an idle worker thread waits for work; such threads are left out of wall samples
+_IDLE_LEAVES = {("threading.py", "wait"), ("queue.py", "get"), ("selectors.py", "select"), ("thread.py", "_worker"),
+                ("handlers.py", "dequeue")}
+
+# The profile of the request running in this context, if any
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+# One profile at a time per process
+_busy = threading.Lock()
+
+
+class RequestProfile:
+    def __init__(self, mode: str, method: str, path: str, interval: float):
+        self.id = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{uuid.uuid4().hex[:8]}"
+        self.mode = mode
+        self.method = method
+        self.path = path
+        self.interval = interval
+        self.request_id = request_id_var.get()
+        self.started_at = time.time()
+        self.statements: List[dict] = []
+        self.statement_count = 0
+        self.status = None
+        self.duration = 0.0
+        self._profiler: Optional[cProfile.Profile] = None
+        self._sampler: Optional["StackSampler"] = None
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        if self.mode == "cpu":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._sampler = StackSampler(self.interval, threading.get_ident())
+            self._sampler.start()
+
+    def stop(self) -> None:
+        self.duration = time.perf_counter() - self._started
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+
+    def record_statement(self, statement: str, seconds: float, error: bool = False) -> None:
+        self.statement_count += 1
+        if len(self.statements) < MAX_STATEMENTS:
+            entry = {"sql": " ".join(statement.split())[:1000], "ms": round(seconds * 1000, 3)}
+            if error:
+                entry["error"] = True
+            self.statements.append(entry)
+
+    def save(self, directory: str, keep: int) -> None:
+        os.makedirs(directory, exist_ok=True)
+        summary = {
+            "id": self.id,
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "mode": self.mode,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started_at)),
+            "duration_ms": round(self.duration * 1000, 2),
+            "db": {
+                "statements": self.statement_count,
+                "total_ms": round(sum(s["ms"] for s in self.statements), 3),
+                "log": self.statements,
+            },
+        }
+        if self._profiler is not None:
+            self._profiler.dump_stats(os.path.join(directory, f"{self.id}.prof"))
+            text = io.StringIO()
+            pstats.Stats(self._profiler, stream=text).sort_stats("cumulative").print_stats(30)
+            summary["top"] = text.getvalue().splitlines()
+        if self._sampler is not None:
+            stacks = self._sampler.stacks
+            with open(os.path.join(directory, f"{self.id}.folded"), "w") as out:
+                for stack, count in stacks.most_common():
+                    out.write(f"{stack} {count}\n")
+            leaves = Counter()
+            for stack, count in stacks.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count
+            summary["samples"] = sum(stacks.values())
+            summary["interval_ms"] = round(self.interval * 1000, 3)
+            summary["top"] = [{"frame": frame, "samples": count} for frame, count in leaves.most_common(25)]
+        with open(os.path.join(directory, f"{self.id}.json"), "w") as out:
+            json.dump(summary, out, indent=1)
+        _prune(directory, keep)
+
+
+class StackSampler(threading.Thread):
+    """Samples the stacks of `loop_thread` and of every non-idle thread at a fixed interval."""
+
+    def __init__(self, interval: float, loop_thread: int):
+        super().__init__(name="request-profiler", daemon=True)
+        self.interval = interval
+        self.loop_thread = loop_thread
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def run(self) -> None:
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident:
+                    continue
+                leaf = (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name)
+                if ident != self.loop_thread and leaf in _IDLE_LEAVES:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if ident not in names:
+                    names[ident] = next((t.name for t in threading.enumerate() if t.ident == ident), str(ident))
+                frames.append(names[ident])
+                self.stacks[";".join(reversed(frames))] += 1
+
+
+def _short_path(filename: str) -> str:
+    marker = f"{os.sep}site-packages{os.sep}"
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    marker = f"{os.sep}app{os.sep}"
+    if marker in filename:
+        return "app/" + filename.rsplit(marker, 1)[1]
+    return os.path.basename(filename)
+
+
+def summaries_by_age(directory: str) -> List[str]:
+    """Profile summary file names, oldest first. Ids only have second resolution, so order by write time."""
+    names = [name for name in os.listdir(directory) if name.endswith(".json")]
+    return sorted(names, key=lambda name: (os.stat(os.path.join(directory, name)).st_mtime_ns, name))
+
+
+def _prune(directory: str, keep: int) -> None:
+    summaries = summaries_by_age(directory)
+    for name in summaries[:-keep] if keep > 0 else []:
+        stem = name[:-5]
+        for suffix in (".json", ".prof", ".folded"):
+            try:
+                os.remove(os.path.join(directory, stem + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def token_matches(provided: Optional[str], token: str) -> bool:
+    return bool(token) and provided is not None and hmac.compare_digest(provided.encode(), token.encode())
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests that send `X-Profile: <token>` (optionally with
+    `X-Profile-Mode: cpu|wall`) or that are picked by `sample_rate`. A profiled
+    response carries `X-Profile-Id`; fetch the result from /debug/profiles/<id>.
+    """
+
+    def __init__(self, app, token: str = "", sample_rate: float = 0.0, mode: str = "wall",
+                 interval_ms: float = 5.0, directory: str = "/tmp/resort-profiles", keep: int = 50):
+        self.app = app
+        self.token = token
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.interval = interval_ms / 1000
+        self.directory = directory
+        self.keep = keep
+
+    def _requested_mode(self, scope) -> Optional[str]:
+        if scope["path"].startswith("/debug/") or scope["path"] == "/metrics":
+            return None
+        headers = dict(scope["headers"])
+        if self.token and PROFILE_HEADER in headers:
+            if not token_matches(headers[PROFILE_HEADER].decode("latin-1"), self.token):
+                return None
+            mode = headers.get(MODE_HEADER, b"").decode("latin-1").lower()
+            return mode if mode in MODES else self.mode
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return self.mode
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        mode = self._requested_mode(scope)
+        if mode is None or not _busy.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(mode, scope["method"], scope["path"], self.interval)
+        token = _current.set(profile)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.stop()
+            _current.reset(token)
+            _busy.release()
+            try:
+                await asyncio.to_thread(profile.save, self.directory, self.keep)
+                logger.info("Request profiled", extra={
+                    "profile_id": profile.id, "path": profile.path, "mode": mode,
+                    "duration_ms": round(profile.duration * 1000, 1), "db_statements": profile.statement_count,
+                })
+            except Exception:
+                logger.exception("Failed to save request profile", extra={"profile_id": profile.id})
+
+
+def instrument_profiling(engine) -> None:
+    """Records the SQL statements of profiled requests. Only installed when profiling is configured."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _current.get()
+        starts = conn.info.get("profile_query_start")
+        if profile is not None and starts:
+            profile.record_statement(statement, time.perf_counter() - starts.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        profile = _current.get()
+        conn = exception_context.connection
+        starts = conn.info.get("profile_query_start") if conn is not None else None
+        if profile is not None and starts:
+            profile.record_statement(exception_context.statement or "", time.perf_counter() - starts.pop(), error=True)
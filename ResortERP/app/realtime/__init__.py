@@ -0,0 +1,3 @@
+from .availability import availability_hub
+from .broker import create_broker
+from .holds import hold_sweeper
@@ -0,0 +1,229 @@
+# app/realtime/availability.py
+#
+# Live room availability for dashboards and kiosks.
+#
+# A subscriber follows one resort. It gets one snapshot of that resort's
+# available rooms, then one delta per room change. ResortManager publishes
+# every change through the broker from inside its transaction, so only
+# committed changes are announced. The hub encodes each delta once and shares
+# the same string with every subscriber.
+#
+# Per connection the hub keeps only a small Subscriber (a deque and an Event).
+# An idle connection costs no CPU. A subscriber that falls more than
+# MAX_PENDING messages behind is sent a fresh snapshot, so its queue stays small.
+#
+# Messages (JSON text):
+#   {"type": "snapshot", "seq": 41, "rooms": [{...room...}, ...]}
+#   {"type": "room", "seq": 42, "available": false, "room": {...room...}}
+# A room under a checkout hold is not available; it is announced again when the hold ends.
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.config.db import shard_router
+from app.observability.metrics import REGISTRY
+from app.realtime.broker import MAX_PAYLOAD, Broker, LocalBroker
+from app.realtime.holds import hold_sweeper
+from app.repo.data_version import data_versions, ROOMS
+from app.repo.room_index import IndexedRoom, room_index_for
+
+logger = logging.getLogger(__name__)
+
+MAX_PENDING = 64
+
+
+class Subscriber:
+    __slots__ = ("resort_id", "pending", "wakeup", "resync")
+
+    def __init__(self, resort_id: str):
+        self.resort_id = resort_id
+        self.pending: deque = deque()
+        self.wakeup = asyncio.Event()
+        self.resync = True  # first message is always a snapshot
+
+    def push(self, message: str) -> None:
+        if self.resync:
+            return  # the next snapshot already includes this change
+        if len(self.pending) >= MAX_PENDING:
+            self.pending.clear()
+            self.resync = True
+        else:
+            self.pending.append(message)
+        self.wakeup.set()
+
+
+class AvailabilityHub:
+    """Fans room changes out to connected subscribers."""
+
+    def __init__(self, snapshot_loader: Callable[[str], List[IndexedRoom]]):
+        self.snapshot_loader = snapshot_loader
+        self.broker: Broker = LocalBroker()
+        # Per resort: subscribers, message sequence and cached snapshot (seq, encoded message)
+        self.subscribers: Dict[str, Set[Subscriber]] = {}
+        self.seq: Dict[str, int] = {}
+        self._snapshot: Dict[str, tuple] = {}
+
+    # --- Lifecycle (called from the app lifespan) ---
+
+    async def start(self, broker: Broker) -> None:
+        self.broker = broker
+        await broker.start(self._deliver, self.resync_all)
+
+    async def stop(self) -> None:
+        await self.broker.stop()
+
+    # --- Publishing (any thread) ---
+
+    def publish(self, db: Session, resort_id: str, rooms: Iterable) -> None:
+        """
+        Announces the changes of `rooms` (flushed ORM Rooms) to every worker from
+        inside the transaction making them; they are delivered when it commits.
+        Rooms are packed into as few messages as fit the broker's payload limit,
+        so a group booking sends a handful of messages rather than one per room.
+        """
+        if not self.broker.running:
+            return
+        prefix = '{"resort_id":' + json.dumps(resort_id) + ',"rooms":['
+        budget = MAX_PAYLOAD - len(prefix) - 2
+        messages, batch, size = [], [], 0
+        for room in rooms:
+            data = IndexedRoom.from_model(room).to_dict()
+            # Lets every worker's hold sweeper release the hold when it expires
+            data["held_until"] = room.held_until.isoformat() if getattr(room, "held_until", None) else None
+            encoded = json.dumps(data, separators=(",", ":"))
+            if batch and size + len(encoded) + 1 > budget:
+                messages.append(prefix + ",".join(batch) + "]}")
+                batch, size = [], 0
+            batch.append(encoded)
+            size += len(encoded) + 1
+        if batch:
+            messages.append(prefix + ",".join(batch) + "]}")
+        self.broker.publish(db, messages)
+
+    def publish_version(self, db: Session, resort_id: str, version: int) -> None:
+        """Announces rooms data `version` to every worker when `db`'s transaction (the one bumping it) commits."""
+        if self.broker.running:
+            self.broker.publish(db, [json.dumps({"resort_id": resort_id, "version": version}, separators=(",", ":"))])
+
+    def _deliver(self, payload: str) -> None:
+        # Runs on the event loop for every change, including ones from other workers
+        data = json.loads(payload)
+        # Messages from workers predating multi-resort support belong to the default resort
+        resort_id = data.pop("resort_id", None) or shard_router.default
+        version = data.pop("version", None)
+        if version is not None:
+            data_versions.observe(resort_id, ROOMS, version)
+            # Announced after the change committed, so its rooms were delivered before it
+            room_index_for(resort_id).applied(version)
+        # Messages from workers predating batched publishing carry one room each
+        rooms = data["rooms"] if "rooms" in data else [data] if "id" in data else []
+        for room in rooms:
+            self._apply(resort_id, room)
+
+    def _apply(self, resort_id: str, data: dict) -> None:
+        held_until = data.pop("held_until", None)
+        hold_sweeper.track(resort_id, uuid.UUID(data["id"]), datetime.fromisoformat(held_until) if held_until else None)
+        index = room_index_for(resort_id)
+        if index.built_at is not None:
+            index.upsert(SimpleNamespace(**{**data, "id": uuid.UUID(data["id"])}))
+        seq = self.seq[resort_id] = self.seq.get(resort_id, 0) + 1
+        self._snapshot.pop(resort_id, None)
+        subscribers = self.subscribers.get(resort_id)
+        if not subscribers:
+            return
+        message = json.dumps(
+            {"type": "room", "seq": seq, "available": not data["is_booked"] and not data.get("is_held"), "room": data},
+            separators=(",", ":"),
+        )
+        for subscriber in subscribers:
+            subscriber.push(message)
+
+    def resync_all(self) -> None:
+        """Sends every subscriber a fresh snapshot, e.g. after missed messages."""
+        self._snapshot.clear()
+        data_versions.forget(ROOMS)
+        for subscribers in self.subscribers.values():
+            for subscriber in subscribers:
+                subscriber.pending.clear()
+                subscriber.resync = True
+                subscriber.wakeup.set()
+
+    # --- Subscribing ---
+
+    def subscribe(self, resort_id: str) -> Subscriber:
+        subscriber = Subscriber(resort_id)
+        self.subscribers.setdefault(resort_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscribers = self.subscribers.get(subscriber.resort_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.subscribers[subscriber.resort_id]
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self.subscribers.values())
+
+    async def snapshot(self, resort_id: str) -> str:
+        # Every subscriber of a resort connecting before its next change gets the same encoded snapshot
+        seq = self.seq.get(resort_id, 0)
+        cached = self._snapshot.get(resort_id)
+        if cached is not None and cached[0] == seq:
+            return cached[1]
+        rooms = await asyncio.to_thread(self.snapshot_loader, resort_id)
+        message = json.dumps(
+            {"type": "snapshot", "seq": seq, "rooms": [room.to_dict() for room in rooms]},
+            separators=(",", ":"),
+        )
+        if seq == self.seq.get(resort_id, 0):
+            self._snapshot[resort_id] = (seq, message)
+        return message
+
+    async def messages(self, subscriber: Subscriber, heartbeat: Optional[float] = None):
+        """
+        Yields the encoded messages for one subscriber until it is cancelled.
+        With `heartbeat`, yields None after that many idle seconds.
+        """
+        while True:
+            if subscriber.resync:
+                subscriber.resync = False
+                subscriber.pending.clear()
+                yield await self.snapshot(subscriber.resort_id)
+            while subscriber.pending and not subscriber.resync:
+                yield subscriber.pending.popleft()
+            if not subscriber.pending and not subscriber.resync:
+                subscriber.wakeup.clear()
+                try:
+                    await asyncio.wait_for(subscriber.wakeup.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+
+
+def _load_available_rooms(resort_id: str) -> List[IndexedRoom]:
+    # Served from the room index; the database is only read when it is stale
+    from app.repo.base import ResortManager
+
+    db = shard_router.session(resort_id)
+    try:
+        rooms, _ = ResortManager(db, resort_id).search_rooms(available_only=True, sort=None)
+        return rooms
+    finally:
+        db.close()
+
+
+# Process-wide hub shared by every connection of this worker
+availability_hub = AvailabilityHub(_load_available_rooms)
+
+REGISTRY.gauge(
+    "availability_subscribers", "Open availability push connections.", lambda: availability_hub.subscriber_count,
+)
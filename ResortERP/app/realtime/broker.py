@@ -0,0 +1,212 @@
+# app/realtime/broker.py
+#
+# Minimal pub/sub used to fan room changes out to every worker process.
+#
+# Messages are published inside the transaction that makes the change, and
+# are delivered only if and when it commits: a rolled back change is never
+# announced, and a committed one is never lost to a crash between the commit
+# and a separate publish. One transaction publishes all of its messages with
+# a single statement.
+#
+# LocalBroker delivers within the publishing process only, once the session
+# commits. PostgresBroker uses NOTIFY in the writing transaction and LISTEN on
+# every resort database, so a change committed by any worker (or by a script)
+# reaches the subscribers of every worker. Its listeners are one connection
+# per database and process, watched with loop.add_reader, without an extra
+# thread.
+
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "room_availability"
+# NOTIFY payloads must be shorter than 8000 bytes
+MAX_PAYLOAD = 7900
+
+# Session.info key of the messages a LocalBroker delivers when the session commits
+PENDING = "broker_pending"
+
+
+class Broker:
+    """
+    Publishes string messages on one channel and hands every message received
+    to `deliver` on the event loop. `on_reset` is called when messages may
+    have been lost (e.g. after a reconnect) so subscribers can resynchronise.
+    """
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.deliver: Optional[Callable[[str], None]] = None
+        self.on_reset: Optional[Callable[[], None]] = None
+
+    async def start(self, deliver: Callable[[str], None], on_reset: Callable[[], None]) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.deliver = deliver
+        self.on_reset = on_reset
+
+    async def stop(self) -> None:
+        self.loop = None
+
+    @property
+    def running(self) -> bool:
+        return self.loop is not None
+
+    def publish(self, db: Session, messages: Sequence[str]) -> None:
+        """
+        Publishes `messages` in `db`'s current transaction; they are delivered
+        once it commits and dropped if it rolls back. Thread-safe; a no-op
+        until start() ran.
+        """
+        raise NotImplementedError
+
+
+class LocalBroker(Broker):
+    """In-process delivery only; changes made by other workers are not seen."""
+
+    def publish(self, db: Session, messages: Sequence[str]) -> None:
+        if self.running:
+            db.info.setdefault(PENDING, []).append((self, list(messages)))
+
+    def _deliver_committed(self, messages: List[str]) -> None:
+        loop = self.loop
+        if loop is not None:
+            for message in messages:
+                loop.call_soon_threadsafe(self.deliver, message)
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_pending(session: Session) -> None:
+    for broker, messages in session.info.pop(PENDING, ()):
+        broker._deliver_committed(messages)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_pending(session: Session, transaction) -> None:
+    # Runs after after_commit; whatever is left belonged to a rolled back or closed transaction
+    if transaction.parent is None:
+        session.info.pop(PENDING, None)
+
+
+class PostgresBroker(Broker):
+    """Fan-out across processes through PostgreSQL LISTEN/NOTIFY (psycopg2), on every resort database."""
+
+    def __init__(self, engines: Sequence[Engine], channel: str = CHANNEL, reconnect_delay: float = 1.0):
+        super().__init__()
+        self.engines = list(engines)
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        # Listening connection and pending reconnect, by index into engines
+        self._conns: Dict[int, object] = {}
+        self._reconnects: Dict[int, asyncio.TimerHandle] = {}
+
+    async def start(self, deliver: Callable[[str], None], on_reset: Callable[[], None]) -> None:
+        await super().start(deliver, on_reset)
+        for index in range(len(self.engines)):
+            self._listen(index)
+
+    async def stop(self) -> None:
+        for reconnect in self._reconnects.values():
+            reconnect.cancel()
+        self._reconnects.clear()
+        for index in list(self._conns):
+            self._close(index)
+        await super().stop()
+
+    def publish(self, db: Session, messages: Sequence[str]) -> None:
+        if not self.running:
+            return
+        sendable = []
+        for message in messages:
+            if len(message.encode("utf-8")) > MAX_PAYLOAD:
+                logger.warning("Availability message too large for NOTIFY; dropped", extra={"bytes": len(message)})
+            else:
+                sendable.append(message)
+        if sendable:
+            # Queued by the writing transaction and sent by PostgreSQL when it commits, in commit order
+            db.execute(select(*[func.pg_notify(self.channel, message) for message in sendable]))
+
+    def _listen(self, index: int) -> None:
+        self._reconnects.pop(index, None)
+        engine = self.engines[index]
+        try:
+            # A dedicated DBAPI connection, detached so it never returns to the pool
+            raw = engine.raw_connection()
+            raw.detach()
+            conn = raw.dbapi_connection
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+        except Exception:
+            logger.exception("Could not LISTEN for availability changes; retrying", extra={"database": engine.url.database})
+            self._schedule_reconnect(index)
+            return
+        self._conns[index] = conn
+        self.loop.add_reader(conn.fileno(), self._on_readable, index)
+        logger.info("Listening for availability changes", extra={"channel": self.channel, "database": engine.url.database})
+
+    def _on_readable(self, index: int) -> None:
+        conn = self._conns[index]
+        try:
+            conn.poll()
+        except Exception:
+            logger.warning("Availability listener connection lost; reconnecting", exc_info=True)
+            self._close(index)
+            self._schedule_reconnect(index)
+            return
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            try:
+                self.deliver(notify.payload)
+            except Exception:
+                logger.exception("Error delivering availability change")
+
+    def _close(self, index: int) -> None:
+        conn = self._conns.pop(index, None)
+        if conn is None:
+            return
+        try:
+            self.loop.remove_reader(conn.fileno())
+        except Exception:
+            pass
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _schedule_reconnect(self, index: int) -> None:
+        if self.loop is None:
+            return
+
+        def reconnect():
+            self._listen(index)
+            if index in self._conns:
+                # Changes made while disconnected were missed
+                self.on_reset()
+
+        self._reconnects[index] = self.loop.call_later(self.reconnect_delay, reconnect)
+
+
+def create_broker(engines: Sequence[Engine], kind: str = "auto") -> Broker:
+    """
+    Returns the broker for REALTIME_BROKER over the resort databases' `engines`:
+    "local", "postgres", or "auto" (postgres when the databases are PostgreSQL
+    with psycopg2, local otherwise).
+    """
+    engines = list(engines)
+    if kind == "auto":
+        postgres = all(engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2" for engine in engines)
+        kind = "postgres" if postgres else "local"
+    if kind == "postgres":
+        for engine in engines:
+            if engine.dialect.driver != "psycopg2":
+                raise ValueError(f"REALTIME_BROKER=postgres needs the psycopg2 driver, not '{engine.dialect.driver}'.")
+        return PostgresBroker(engines)
+    if kind == "local":
+        return LocalBroker()
+    raise ValueError(f"Unknown REALTIME_BROKER '{kind}'. Use 'auto', 'local' or 'postgres'.")
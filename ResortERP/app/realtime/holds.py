@@ -0,0 +1,193 @@
+# app/realtime/holds.py
+#
+# Releases room holds when they expire.
+#
+# Every hold deadline this worker knows of sits in a min-heap. One task sleeps
+# until the earliest deadline, releases every hold that is due with one
+# UPDATE per resort, and sleeps again. There is no periodic scan of the rooms
+# table. The heap is filled from three sources:
+#   - at start, from the rooms that have a hold (one indexed query per resort);
+#   - holds taken, renewed, released or converted in this worker
+#     (ResortManager._room_changed);
+#   - the same changes made in other workers, through the availability broker.
+# So every worker tracks every hold. When a hold expires, the workers race to
+# release it. The UPDATE only matches rooms whose hold is still past its
+# deadline, so one worker releases it and the others' UPDATEs match nothing.
+# The release bumps the rooms data version and publishes the room, so ETags,
+# room indexes and availability subscribers see the room free again.
+#
+# A renewed hold pushes a second entry instead of moving the first. Stale
+# entries are skipped when they come up, and the heap is rebuilt when they
+# outnumber the live ones.
+
+import asyncio
+import heapq
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.config.db import shard_router
+from app.observability.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# A failed release (e.g. the resort database is down) is retried after this long
+RETRY_SECONDS = 5.0
+
+ROOM_HOLDS = REGISTRY.counter(
+    "room_holds_total", "Room hold events, by event (held, conflict, released, converted, expired).", ("event",),
+)
+HOLD_SWEEP_SECONDS = REGISTRY.histogram(
+    "room_hold_sweep_seconds", "Time to release one batch of expired holds, including the database round trips.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+HOLD_SWEEP_LAG = REGISTRY.histogram(
+    "room_hold_sweep_lag_seconds", "Time from a hold's deadline until it was released.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+Key = Tuple[str, uuid.UUID]
+
+
+class HoldSweeper:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[float, str, uuid.UUID]] = []
+        # The live deadline (epoch seconds) of each tracked hold
+        self._deadlines: Dict[Key, float] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    # --- Tracking (any thread) ---
+
+    def track(self, resort_id: str, room_id: uuid.UUID, held_until: Optional[datetime]) -> None:
+        """Records the hold deadline of a room, or forgets the room's hold when `held_until` is None."""
+        key = (resort_id, room_id)
+        with self._lock:
+            if held_until is None:
+                self._deadlines.pop(key, None)
+                return
+            deadline = (held_until if held_until.tzinfo else held_until.replace(tzinfo=timezone.utc)).timestamp()
+            if self._deadlines.get(key) == deadline:
+                return
+            self._deadlines[key] = deadline
+            earliest = not self._heap or deadline < self._heap[0][0]
+            heapq.heappush(self._heap, (deadline, resort_id, room_id))
+            if len(self._heap) > 2 * len(self._deadlines) + 64:
+                self._heap = [(deadline, *key) for key, deadline in self._deadlines.items()]
+                heapq.heapify(self._heap)
+        if earliest:
+            self._notify()
+
+    def _notify(self) -> None:
+        loop = self._loop
+        if loop is not None and not self._stopping:
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _pop_due(self, now: float) -> Dict[str, List[Tuple[uuid.UUID, float]]]:
+        """Removes the holds due by `now`; returns (room id, deadline) by resort."""
+        due: Dict[str, List[Tuple[uuid.UUID, float]]] = {}
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, resort_id, room_id = heapq.heappop(self._heap)
+                if self._deadlines.get((resort_id, room_id)) != deadline:
+                    continue  # renewed or released since
+                del self._deadlines[(resort_id, room_id)]
+                due.setdefault(resort_id, []).append((room_id, deadline))
+        return due
+
+    def next_deadline(self) -> Optional[float]:
+        with self._lock:
+            while self._heap and self._deadlines.get((self._heap[0][1], self._heap[0][2])) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    # --- Lifecycle ---
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        loaded = await asyncio.to_thread(self._load)
+        self._task = asyncio.create_task(self._run())
+        logger.info("Hold sweeper started", extra={"holds": loaded})
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._task is None:
+            return
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        self._loop = None
+
+    def _load(self) -> int:
+        from app.repo.holds import active_holds
+
+        loaded = 0
+        for resort_id in shard_router.resort_ids():
+            db = shard_router.session(resort_id)
+            try:
+                for room_id, held_until in active_holds(db):
+                    self.track(resort_id, room_id, held_until)
+                    loaded += 1
+            except Exception:
+                # Its holds are picked up as they change, or when this worker restarts
+                logger.exception("Error loading room holds", extra={"resort_id": resort_id})
+            finally:
+                db.close()
+        return loaded
+
+    # --- Sweeping ---
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            due = self._pop_due(time.time())
+            if due:
+                await asyncio.to_thread(self._release, due)
+            deadline = self.next_deadline()
+            timeout = None if deadline is None else max(0.0, deadline - time.time())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _release(self, due: Dict[str, List[Tuple[uuid.UUID, float]]]) -> None:
+        from app.repo.base import ResortManager
+
+        for resort_id, holds in due.items():
+            started = time.perf_counter()
+            db = shard_router.session(resort_id)
+            try:
+                released = ResortManager(db, resort_id).release_expired_holds([room_id for room_id, _ in holds])
+            except Exception:
+                logger.exception("Error releasing expired holds", extra={"resort_id": resort_id, "holds": len(holds)})
+                retry_at = datetime.fromtimestamp(time.time() + RETRY_SECONDS, timezone.utc)
+                for room_id, _ in holds:
+                    # Unless the hold was renewed in the meantime
+                    if (resort_id, room_id) not in self._deadlines:
+                        self.track(resort_id, room_id, retry_at)
+                continue
+            finally:
+                db.close()
+            HOLD_SWEEP_SECONDS.observe(time.perf_counter() - started)
+            now = time.time()
+            for room_id, deadline in holds:
+                HOLD_SWEEP_LAG.observe(max(0.0, now - deadline))
+            if released:
+                logger.info("Expired room holds released", extra={"resort_id": resort_id, "rooms": len(released)})
+
+
+# Process-wide sweeper, started by the app lifespan
+hold_sweeper = HoldSweeper()
+
+REGISTRY.gauge("room_holds_tracked", "Room holds this worker will release when they expire.", lambda: len(hold_sweeper))
@@ -1,21 +1,64 @@
 # app/repo/base.py (Add getResortManager here)
 
+import heapq
+import logging
 import uuid
-from sqlalchemy.orm import Session
-from datetime import datetime, timezone
+from sqlalchemy import Row, or_, update
+from sqlalchemy.orm import Session, selectinload
+from datetime import datetime, timedelta, timezone, date
 # Assuming models are defined in app.domain.model.base
-from app.domain.model.base import User, Room, Booking
+from app.domain.model.base import User, Room, Booking, BookingArchive, Job, as_utc
 # Assuming schemas are defined in app.domain.schema.base
 from app.domain.schema.base import UserSchema, RoomSchema
-from fastapi import HTTPException, Depends # <--- Add Depends
-from typing import List
-# Assuming get_db is in app.config.db
-from app.config.db import get_db
+from fastapi import HTTPException, Depends, Query # <--- Add Depends
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+# Sessions come from the resort's database via the shard router in app.config.db
+from app.config.db import shard_router
+from app.config.env import get_settings
+from app.repo.room_index import room_index_for, IndexedRoom
+from app.repo import partitions, read_models, rollups
+from app.repo.data_version import data_versions, ROOMS
+from app.realtime import availability_hub, hold_sweeper
+from app.realtime.holds import ROOM_HOLDS
+from app import jobs
+
+logger = logging.getLogger(__name__)
+
+# Largest block of rooms booked by one book_rooms call
+MAX_GROUP_ROOMS = 500
 
 class ResortManager:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, resort_id: Optional[str] = None):
         # The manager now holds the session for its lifetime (per request)
         self.db = db
+        # The resort whose database `db` is bound to
+        self.resort_id = resort_id or shard_router.resort_for(db.get_bind())
+        self.room_index = room_index_for(self.resort_id)
+
+    # Called inside every transaction that changes rooms, just before it
+    # commits: announces the rooms to every worker's availability subscribers,
+    # room index and hold sweeper. The broker delivers the announcement only if
+    # the transaction commits, and nothing is lost between commit and publish.
+    def _publish_rooms(self, rooms: List[Room]) -> None:
+        self.db.flush()
+        availability_hub.publish(self.db, self.resort_id, rooms)
+
+    # Called after every committed change to rooms so ETags and this worker's
+    # views are current at once. The rooms data version is bumped here, in a
+    # transaction of its own (which also announces it to the other workers),
+    # so its row is locked for one statement rather than for the whole write.
+    def _rooms_changed(self, rooms: List[Room]) -> None:
+        version = data_versions.bump(
+            self.db, ROOMS, announce=lambda version: availability_hub.publish_version(self.db, self.resort_id, version),
+        )
+        if version is not None:
+            data_versions.observe(self.resort_id, ROOMS, version)
+        for room in rooms:
+            hold_sweeper.track(self.resort_id, room.id, room.held_until)
+            if self.room_index.built_at is not None:
+                self.room_index.upsert(room)
+        if version is not None:
+            self.room_index.applied(version)
 
     # ... (keep all your methods as they are in your last snippet) ...
     # (Methods like create_user, create_room now use self.db directly)
@@ -33,7 +76,7 @@ class ResortManager:
             return user
         except Exception as e:
             self.db.rollback()
-            print(f"Database error creating user: {e}")
+            logger.exception("Database error creating user", extra={"email": user_data.email})
             raise RuntimeError(f"Failed to save user to database") from e
 
     # Create a room
@@ -42,89 +85,504 @@ class ResortManager:
         if existing_room:
             raise HTTPException(status_code=409, detail=f"Room with number '{room_data.number}' already exists.")
 
-        room = Room(number=room_data.number, is_booked=room_data.is_booked)
+        room = Room(
+            number=room_data.number,
+            is_booked=room_data.is_booked,
+            room_type=room_data.room_type,
+            capacity=room_data.capacity,
+            view=room_data.view,
+            price=room_data.price,
+            amenities=room_data.amenities,
+        )
         try:
             self.db.add(room)
+            rollups.record_room_change(
+                self.db, room.room_type, total_delta=1, occupied_delta=int(room.is_booked),
+            )
+            self._publish_rooms([room])
             self.db.commit()
             self.db.refresh(room)
+            self._rooms_changed([room])
             return room
         except Exception as e:
             self.db.rollback()
-            print(f"Database error creating room: {e}")
+            logger.exception("Database error creating room", extra={"room_number": room_data.number})
             raise RuntimeError(f"Failed to save room to database") from e
 
     # --- Rest of your manager methods using self.db ---
     # Book a room
+    # Books the room; a room held for another guest gets 409, and the guest's
+    # own hold is converted into the booking
     def book_room(self, user_id: uuid.UUID, room_id: uuid.UUID) -> Booking | None:
         # ... uses self.db ...
-        room = self.db.query(Room).filter(Room.id == room_id).first()
+        # Locked, so a hold taken concurrently either comes first and is seen here, or waits
+        room = self.db.query(Room).filter(Room.id == room_id).with_for_update().first()
         # ... rest of the logic ...
         if room and not room.is_booked:
+            if room.is_held and room.held_by != user_id:
+                self.db.rollback()  # releases the row lock
+                ROOM_HOLDS.inc(("conflict",))
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Room '{room.number}' (ID: {room_id}) is held for another guest until {as_utc(room.held_until).isoformat()}.",
+                )
             user = self.db.query(User).filter(User.id == user_id).first()
             if not user:
-                 raise HTTPException(status_code=404, detail=f"User with id '{user_id}' not found.")
+                self.db.rollback()  # releases the row lock
+                raise HTTPException(status_code=404, detail=f"User with id '{user_id}' not found.")
+            # Only the guest's own hold is converted; a lapsed hold of another guest is just taken over
+            converted = room.held_until is not None and room.held_by == user_id
+            # The room remembers its booking's date so unbook_room can prune to one partition
+            booked_at = datetime.now(timezone.utc)
             room.is_booked = True
-            booking = Booking(user_id=user_id, room_id=room_id)
+            room.booked_at = booked_at
+            room.held_by = None
+            room.held_until = None
+            booking = Booking(user_id=user_id, room_id=room_id, booking_date=booked_at)
             # ... try/except block using self.db ...
             try:
+                partitions.ensure_partition_for(self.db, booked_at)
                 self.db.add(booking)
                 # self.db.add(room) # Add room too if its state needs explicit add
+                rollups.record_room_change(
+                    self.db, room.room_type, occupied_delta=1, bookings=1, revenue=float(room.price or 0),
+                )
+                self.db.flush()
+                # Sent by the job worker once this transaction has committed
+                jobs.enqueue(
+                    self.db, "booking.confirmation",
+                    {"booking_id": str(booking.id), "booking_date": booked_at.isoformat()},
+                    idempotency_key=f"booking.confirmation:{booking.id}",
+                )
+                self._publish_rooms([room])
                 self.db.commit()
                 self.db.refresh(booking)
                 self.db.refresh(room) # Refresh room too
+                self._rooms_changed([room])
+                if converted:
+                    ROOM_HOLDS.inc(("converted",))
+                logger.info("Room booked", extra={"room_id": str(room_id), "user_id": str(user_id), "booking_id": str(booking.id)})
                 return booking
             except Exception as e:
                 self.db.rollback()
-                print(f"Database error booking room: {e}")
+                logger.exception("Database error booking room", extra={"room_id": str(room_id), "user_id": str(user_id)})
                 raise RuntimeError(f"Failed to book room") from e
         # ... other conditions ...
         elif room and room.is_booked:
+            self.db.rollback()  # releases the row lock
             raise HTTPException(status_code=409, detail=f"Room '{room.number}' (ID: {room_id}) is already booked.")
         else:
+            self.db.rollback()
             raise HTTPException(status_code=404, detail=f"Room with id '{room_id}' not found.")
 
-    # Unbook a room
-    def unbook_room(self, room_id: uuid.UUID) -> Room | None:
-        # ... uses self.db ...
-        room = self.db.query(Room).filter(Room.id == room_id).first()
-        # ... rest of the logic using self.db ...
+    # Book a block of rooms (weddings, conferences) for one user, all or nothing:
+    # one transaction, one booking per room, one rollup update per room type and
+    # one data version bump. The rooms are locked in id order, so two blocks that
+    # overlap wait for each other instead of deadlocking; the conditional UPDATE
+    # also guards databases without row locks (SQLite).
+    def book_rooms(self, user_id: uuid.UUID, room_ids: List[uuid.UUID]) -> List[Booking]:
+        room_ids = sorted(set(room_ids))
+        if not room_ids:
+            raise HTTPException(status_code=422, detail="No rooms given.")
+        if len(room_ids) > MAX_GROUP_ROOMS:
+            raise HTTPException(status_code=422, detail=f"At most {MAX_GROUP_ROOMS} rooms per group booking; got {len(room_ids)}.")
+        if self.db.query(User.id).filter(User.id == user_id).first() is None:
+            raise HTTPException(status_code=404, detail=f"User with id '{user_id}' not found.")
+
+        rooms = (
+            self.db.query(Room).filter(Room.id.in_(room_ids)).order_by(Room.id).with_for_update().all()
+        )
+        missing = [str(room_id) for room_id in room_ids if room_id not in {room.id for room in rooms}]
+        booked = [room.number for room in rooms if room.is_booked]
+        held = [room.number for room in rooms if not room.is_booked and room.is_held and room.held_by != user_id]
+        if missing or booked or held:
+            self.db.rollback()  # releases the row locks
+            if missing:
+                raise HTTPException(status_code=404, detail=f"Rooms not found: {', '.join(missing)}.")
+            if booked:
+                raise HTTPException(status_code=409, detail=f"Rooms already booked: {', '.join(sorted(booked))}.")
+            ROOM_HOLDS.inc(("conflict",))
+            raise HTTPException(status_code=409, detail=f"Rooms held for another guest: {', '.join(sorted(held))}.")
+
+        converted = sum(1 for room in rooms if room.held_until is not None and room.held_by == user_id)
+        booked_at = datetime.now(timezone.utc)
+        try:
+            claimed = self.db.execute(
+                update(Room)
+                .where(
+                    Room.id.in_(room_ids), Room.is_booked == False,
+                    or_(Room.held_until.is_(None), Room.held_until <= booked_at, Room.held_by == user_id),
+                )
+                .values(is_booked=True, booked_at=booked_at, held_by=None, held_until=None)
+                .execution_options(synchronize_session="fetch")
+            ).rowcount
+            if claimed != len(room_ids):
+                self.db.rollback()
+                raise HTTPException(status_code=409, detail="Some of the rooms were booked concurrently; nothing was booked.")
+            partitions.ensure_partition_for(self.db, booked_at)
+            bookings = [Booking(user_id=user_id, room_id=room.id, booking_date=booked_at) for room in rooms]
+            self.db.add_all(bookings)
+            by_type: Dict[str, List[Room]] = {}
+            for room in rooms:
+                by_type.setdefault(room.room_type, []).append(room)
+            for room_type in sorted(by_type):
+                typed = by_type[room_type]
+                rollups.record_room_change(
+                    self.db, room_type, occupied_delta=len(typed), bookings=len(typed),
+                    revenue=sum(float(room.price or 0) for room in typed),
+                )
+            self.db.flush()
+            jobs.enqueue_many(
+                self.db, "booking.confirmation",
+                [{"booking_id": str(booking.id), "booking_date": booked_at.isoformat()} for booking in bookings],
+                idempotency_keys=[f"booking.confirmation:{booking.id}" for booking in bookings],
+            )
+            self._publish_rooms(rooms)
+            # The rooms and bookings in the session are current, so skip reloading each of them after the commit
+            expire_on_commit, self.db.expire_on_commit = self.db.expire_on_commit, False
+            try:
+                self.db.commit()
+            finally:
+                self.db.expire_on_commit = expire_on_commit
+        except HTTPException:
+            raise
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Database error booking rooms", extra={"user_id": str(user_id), "rooms": len(room_ids)})
+            raise RuntimeError("Failed to book rooms") from e
+        self._rooms_changed(rooms)
+        if converted:
+            ROOM_HOLDS.inc(("converted",), converted)
+        logger.info("Rooms booked", extra={"user_id": str(user_id), "rooms": len(rooms), "booking_ids": [str(b.id) for b in bookings]})
+        return bookings
+
+    # Unbook a room: the guest cancelled, or checked out at the end of the stay
+    # (checkout=True); the rollups count the two separately
+    def unbook_room(self, room_id: uuid.UUID, checkout: bool = False) -> Room | None:
+        # Row lock, so concurrent unbooks of the same room queue up and only the first one cancels
+        room = self.db.query(Room).filter(Room.id == room_id).with_for_update().first()
         if room and room.is_booked:
+            booked_at = room.booked_at
             try:
-                booking = self.db.query(Booking).filter(Booking.room_id == room_id).first()
+                # Conditional as well, for databases without row locks (SQLite): only one unbook sees rowcount 1
+                released = self.db.execute(
+                    update(Room)
+                    .where(Room.id == room_id, Room.is_booked == True)
+                    .values(is_booked=False, booked_at=None)
+                    .execution_options(synchronize_session="fetch")
+                ).rowcount
+                if released != 1:
+                    self.db.rollback()
+                    logger.info("Room was unbooked concurrently", extra={"room_id": str(room_id)})
+                    return self.db.get(Room, room_id)
+                query = self.db.query(Booking).filter(Booking.room_id == room_id, Booking.cancelled_at.is_(None))
+                if booked_at is not None:
+                    query = query.filter(Booking.booking_date == booked_at)
+                booking = query.order_by(Booking.booking_date.desc()).first()
                 if booking:
-                    self.db.delete(booking)
+                    # Kept as history; archive_bookings moves its month out once every booking in it has ended
+                    booking.cancelled_at = datetime.now(timezone.utc)
+                    booking.checked_out = checkout
                 else:
-                    print(f"Warning: Room {room_id} is booked but no corresponding booking found.")
-                room.is_booked = False
-                # self.db.add(room) # Add room if state needs explicit add
+                    logger.warning("Room is booked but no corresponding booking found", extra={"room_id": str(room_id)})
+                rollups.record_room_change(
+                    self.db, room.room_type, occupied_delta=-1, checkouts=int(checkout), cancellations=int(not checkout),
+                )
+                self._publish_rooms([room])
                 self.db.commit()
                 self.db.refresh(room)
+                self._rooms_changed([room])
+                logger.info("Room unbooked", extra={"room_id": str(room_id)})
                 return room
             except Exception as e:
                  self.db.rollback()
-                 print(f"Database error unbooking room: {e}")
+                 logger.exception("Database error unbooking room", extra={"room_id": str(room_id)})
                  raise RuntimeError(f"Failed to unbook room") from e
-        # ... other conditions ...
         elif room and not room.is_booked:
-             print(f"Room {room_id} was not booked.")
+             self.db.rollback()  # releases the row lock
+             logger.info("Room was not booked", extra={"room_id": str(room_id)})
              return room
         else:
              raise HTTPException(status_code=404, detail=f"Room with id '{room_id}' not found.")
 
 
-    # Get all bookings from user
-    def get_user_bookings(self, user_id: uuid.UUID) -> List[Booking]:
-        # ... uses self.db ...
+    # Hold an available room for `user_id` while they check out: until the hold
+    # expires (ttl_seconds, ROOM_HOLD_TTL_SECONDS by default) nobody else can
+    # hold or book it, and it is not listed as available. Holding a room again
+    # renews the guest's own hold. book_room converts it into a booking.
+    def hold_room(self, user_id: uuid.UUID, room_id: uuid.UUID, ttl_seconds: Optional[float] = None) -> Room:
+        settings = get_settings()
+        ttl_seconds = settings.ROOM_HOLD_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        if not 0 < ttl_seconds <= settings.ROOM_HOLD_MAX_TTL_SECONDS:
+            raise HTTPException(
+                status_code=422, detail=f"Hold duration must be between 0 and {settings.ROOM_HOLD_MAX_TTL_SECONDS} seconds.",
+            )
+        if self.db.query(User.id).filter(User.id == user_id).first() is None:
+            raise HTTPException(status_code=404, detail=f"User with id '{user_id}' not found.")
+        now = datetime.now(timezone.utc)
+        held_until = now + timedelta(seconds=ttl_seconds)
+        try:
+            # One conditional UPDATE, so two guests racing for the room cannot both get it
+            claimed = self.db.execute(
+                update(Room)
+                .where(
+                    Room.id == room_id, Room.is_booked == False,
+                    or_(Room.held_until.is_(None), Room.held_until <= now, Room.held_by == user_id),
+                )
+                .values(held_by=user_id, held_until=held_until)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            room = self.db.query(Room).filter(Room.id == room_id).populate_existing().first()
+            if not claimed:
+                self.db.rollback()
+                if room is None:
+                    raise HTTPException(status_code=404, detail=f"Room with id '{room_id}' not found.")
+                ROOM_HOLDS.inc(("conflict",))
+                if room.is_booked:
+                    raise HTTPException(status_code=409, detail=f"Room '{room.number}' (ID: {room_id}) is already booked.")
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Room '{room.number}' (ID: {room_id}) is held for another guest until {as_utc(room.held_until).isoformat()}.",
+                )
+            self._publish_rooms([room])
+            self.db.commit()
+            self.db.refresh(room)
+        except HTTPException:
+            raise
+        except Exception as e:
+            self.db.rollback()
+            logger.exception("Database error holding room", extra={"room_id": str(room_id), "user_id": str(user_id)})
+            raise RuntimeError("Failed to hold room") from e
+        self._rooms_changed([room])
+        ROOM_HOLDS.inc(("held",))
+        logger.info("Room held", extra={"room_id": str(room_id), "user_id": str(user_id), "held_until": held_until.isoformat()})
+        return room
+
+    # Release the guest's hold on a room before it expires, e.g. when they
+    # leave checkout; 404 if they hold none
+    def release_hold(self, user_id: uuid.UUID, room_id: uuid.UUID) -> Room:
+        released = self.db.execute(
+            update(Room)
+            .where(Room.id == room_id, Room.held_by == user_id, Room.held_until.is_not(None))
+            .values(held_by=None, held_until=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not released:
+            self.db.rollback()
+            raise HTTPException(status_code=404, detail=f"User '{user_id}' holds no room with id '{room_id}'.")
+        room = self.db.query(Room).filter(Room.id == room_id).populate_existing().one()
+        self._publish_rooms([room])
+        self.db.commit()
+        self._rooms_changed([room])
+        ROOM_HOLDS.inc(("released",))
+        logger.info("Room hold released", extra={"room_id": str(room_id), "user_id": str(user_id)})
+        return room
+
+    # Clear the holds of `room_ids` that have expired, in one UPDATE; called by
+    # the hold sweeper (app/realtime/holds.py). Returns the released rooms.
+    def release_expired_holds(self, room_ids: List[uuid.UUID]) -> List[Room]:
+        now = datetime.now(timezone.utc)
+        expired = (
+            self.db.query(Room)
+            .filter(Room.id.in_(room_ids), Room.held_until <= now)
+            .order_by(Room.id)
+            .with_for_update()
+            .all()
+        )
+        if not expired:
+            self.db.rollback()
+            return []
+        self.db.execute(
+            update(Room)
+            .where(Room.id.in_([room.id for room in expired]), Room.held_until <= now)
+            .values(held_by=None, held_until=None)
+            .execution_options(synchronize_session="fetch")
+        )
+        self._publish_rooms(expired)
+        expire_on_commit, self.db.expire_on_commit = self.db.expire_on_commit, False
+        try:
+            self.db.commit()
+        finally:
+            self.db.expire_on_commit = expire_on_commit
+        self._rooms_changed(expired)
+        ROOM_HOLDS.inc(("expired",), len(expired))
+        return expired
+
+
+    # Get all active (not cancelled) bookings from user, newest first. Reads the
+    # live `bookings` table (bounded by archival) unless include_archived is set;
+    # `since` bounds booking_date so older partitions are pruned as well.
+    def get_user_bookings(
+        self,
+        user_id: uuid.UUID,
+        since: Optional[datetime] = None,
+        include_archived: bool = False,
+    ) -> List[Booking | BookingArchive]:
         user = self.db.query(User).filter(User.id == user_id).first()
         if not user:
             raise HTTPException(status_code=404, detail=f"User with id '{user_id}' not found.")
-        return self.db.query(Booking).filter(Booking.user_id == user_id).all()
+        bookings = []
+        for model in (Booking, BookingArchive) if include_archived else (Booking,):
+            query = self.db.query(model).filter(model.user_id == user_id, model.cancelled_at.is_(None))
+            if since is not None:
+                query = query.filter(model.booking_date >= since)
+            bookings += query.order_by(model.booking_date.desc()).all()
+        return bookings
+
+
+    # Active bookings of several users, newest first, with booking.room loaded:
+    # one IN query each for users, bookings and rooms. Unknown users are left
+    # out of the result instead of raising.
+    def get_bookings_for_users(
+        self,
+        user_ids: List[uuid.UUID],
+        since: Optional[datetime] = None,
+    ) -> Dict[uuid.UUID, List[Booking]]:
+        if not user_ids:
+            return {}
+        found = {user_id for (user_id,) in self.db.query(User.id).filter(User.id.in_(set(user_ids)))}
+        result: Dict[uuid.UUID, List[Booking]] = {user_id: [] for user_id in user_ids if user_id in found}
+        if not found:
+            return result
+        query = (
+            self.db.query(Booking).options(selectinload(Booking.room))
+            .filter(Booking.user_id.in_(found), Booking.cancelled_at.is_(None))
+        )
+        if since is not None:
+            query = query.filter(Booking.booking_date >= since)
+        for booking in query.order_by(Booking.booking_date.desc()):
+            result[booking.user_id].append(booking)
+        return result
+
+
+    # A guest's active bookings at this resort, newest first, with booking.room
+    # loaded; None if no user has this email here
+    def get_bookings_by_email(self, email: str, since: Optional[datetime] = None) -> Optional[tuple[User, List[Booking]]]:
+        user = self.db.query(User).filter(User.email == email).first()
+        if not user:
+            return None
+        query = (
+            self.db.query(Booking).options(selectinload(Booking.room))
+            .filter(Booking.user_id == user.id, Booking.cancelled_at.is_(None))
+        )
+        if since is not None:
+            query = query.filter(Booking.booking_date >= since)
+        return user, query.order_by(Booking.booking_date.desc()).all()
+
+
+    # Rooms looked up by number, in one IN query
+    def get_rooms_by_numbers(self, numbers: List[str]) -> Dict[str, Room]:
+        if not numbers:
+            return {}
+        rooms = self.db.query(Room).filter(Room.number.in_(set(numbers))).all()
+        return {room.number: room for room in rooms}
 
 
     # Get all available rooms
     def get_available_rooms(self) -> List[Room]:
         # ... uses self.db ...
-        return self.db.query(Room).filter(Room.is_booked == False).all()
+        return self.db.query(Room).filter(read_models.available_condition()).all()
+
+
+    # Available rooms as tuples of `fields`, without building ORM entities
+    # (see app/repo/read_models.py); for listings that only serialize them
+    def get_available_room_rows(self, fields: Sequence[str] = read_models.ROOM_FIELDS) -> List[Row]:
+        return read_models.available_rooms(self.db, fields)
+
+
+    # Faceted room search served from the in-memory index
+    def search_rooms(
+        self,
+        room_types: Optional[List[str]] = None,
+        views: Optional[List[str]] = None,
+        amenities_all: Optional[List[str]] = None,
+        amenities_any: Optional[List[str]] = None,
+        min_capacity: Optional[int] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        available_only: bool = True,
+        sort: Optional[str] = "price",
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> tuple[List[IndexedRoom], int]:
+        if sort not in (None, "price", "-price"):
+            raise HTTPException(status_code=422, detail=f"Unsupported sort '{sort}'. Use 'price' or '-price'.")
+        self._ensure_room_index()
+        return self.room_index.search(
+            room_types=room_types or (),
+            views=views or (),
+            amenities_all=amenities_all or (),
+            amenities_any=amenities_any or (),
+            min_capacity=min_capacity,
+            min_price=min_price,
+            max_price=max_price,
+            available_only=available_only,
+            sort=sort,
+            limit=limit,
+            offset=offset,
+        )
+
+    # Room counts per facet value (room type, view, amenity, capacity)
+    def room_facets(self, available_only: bool = True) -> dict:
+        self._ensure_room_index()
+        return self.room_index.facet_counts(available_only=available_only)
+
+    # Rebuilds the index when it is behind the resort's rooms data version, so a
+    # change this worker never saw is picked up within DATA_VERSION_TTL_SECONDS
+    def _ensure_room_index(self) -> None:
+        settings = get_settings()
+        version = data_versions.current(self.resort_id, ROOMS, settings.DATA_VERSION_TTL_SECONDS)
+        if self.room_index.is_stale(settings.ROOM_INDEX_TTL_SECONDS, version):
+            # Read before the rooms, so the index never claims a version newer than its contents
+            self.room_index.rebuild(self.db.query(Room).all(), version)
+            logger.debug("Room index rebuilt", extra={"resort_id": self.resort_id, "rooms": len(self.room_index)})
+
+
+    # Daily occupancy/booking trend from the rollup tables
+    def occupancy_report(self, start: date, end: date, room_type: Optional[str] = None) -> List[dict]:
+        if end < start:
+            raise HTTPException(status_code=422, detail="'end' must not be before 'start'.")
+        if (end - start).days > 366 * 3:
+            raise HTTPException(status_code=422, detail="Date range is limited to three years.")
+        return rollups.occupancy_report(self.db, start, end, room_type=room_type)
+
+    # Current occupancy per room type
+    def room_type_occupancy(self) -> List[dict]:
+        return rollups.room_type_occupancy(self.db)
+
+
+    # --- Background jobs ---
+
+    def get_job(self, job_id: uuid.UUID) -> Job:
+        job = self.db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Job with id '{job_id}' not found.")
+        return job
+
+    def list_jobs(self, status: Optional[str] = None, kind: Optional[str] = None, limit: int = 50) -> List[Job]:
+        query = self.db.query(Job)
+        if status:
+            query = query.filter(Job.status == status)
+        if kind:
+            query = query.filter(Job.kind == kind)
+        return query.order_by(Job.created_at.desc()).limit(limit).all()
+
+    def enqueue_job(self, kind: str, payload: dict, idempotency_key: Optional[str] = None, delay_seconds: float = 0.0) -> Job:
+        if kind not in jobs.HANDLERS:
+            raise HTTPException(status_code=422, detail=f"Unknown job kind '{kind}'. Use one of: {', '.join(sorted(jobs.HANDLERS))}.")
+        job = jobs.enqueue(self.db, kind, payload, delay_seconds=delay_seconds, idempotency_key=idempotency_key)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def retry_job(self, job_id: uuid.UUID) -> Job:
+        job = jobs.queue.retry_dead_job(self.db, job_id)
+        if job is None:
+            self.get_job(job_id)  # 404 if it does not exist
+            raise HTTPException(status_code=409, detail=f"Job '{job_id}' is not dead; only dead jobs can be retried.")
+        self.db.commit()
+        self.db.refresh(job)
+        return job
 
 
     # Is room booked
@@ -136,10 +594,94 @@ class ResortManager:
         return room.is_booked
 
 
-# --- Dependency function ---
-def getResortManager(db: Session = Depends(get_db)) -> ResortManager:
+# --- Cross-resort reads ---
+
+def fan_out_resorts(
+    func: Callable[[ResortManager], Any],
+    resort_ids: Optional[List[str]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, BaseException]]:
+    """
+    Runs `func(manager)` against every resort (or `resort_ids`) concurrently,
+    one thread and session per resort database.
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, BaseException]]: Results by resort, and
+        the error of each resort that failed or timed out (see
+        SHARD_FANOUT_TIMEOUT_SECONDS). Callers report those resorts as
+        unavailable instead of failing the whole listing.
+    """
+    results, errors = shard_router.fan_out(
+        lambda resort_id, db: func(ResortManager(db, resort_id)),
+        resort_ids,
+        timeout=get_settings().SHARD_FANOUT_TIMEOUT_SECONDS,
+    )
+    for resort_id, error in errors.items():
+        logger.warning("Resort unavailable for cross-resort read", extra={"resort_id": resort_id, "error": repr(error)})
+    return results, errors
+
+
+def search_all_resorts(
+    resort_ids: Optional[List[str]] = None,
+    sort: Optional[str] = "price",
+    limit: int = 50,
+    offset: int = 0,
+    **filters,
+) -> dict:
+    """
+    Room search across resorts: each resort returns its first offset + limit
+    matches from its own room index, and the sorted lists are merged.
+
+    Args:
+        resort_ids (List[str], optional): Resorts to search; all of them by default.
+        sort (str, optional): "price", "-price" or None (grouped by resort).
+        limit (int): Page size.
+        offset (int): Rooms to skip.
+        **filters: ResortManager.search_rooms filters (room_types, views, ...).
+
+    Returns:
+        dict: "total" matches, the page of "rooms" (each with its resort_id)
+        and the resorts that were "unavailable".
+    """
+    if sort not in (None, "price", "-price"):
+        raise HTTPException(status_code=422, detail=f"Unsupported sort '{sort}'. Use 'price' or '-price'.")
+    results, errors = fan_out_resorts(
+        lambda manager: manager.search_rooms(sort=sort, limit=offset + limit, offset=0, **filters), resort_ids,
+    )
+    pages = [
+        [{**room.to_dict(), "resort_id": resort_id} for room in rooms]
+        for resort_id, (rooms, _) in sorted(results.items())
+    ]
+    if sort is None:
+        merged = [room for page in pages for room in page]
+    else:
+        merged = list(heapq.merge(*pages, key=lambda room: room["price"], reverse=sort == "-price"))
+    return {
+        "total": sum(total for _, total in results.values()),
+        "rooms": merged[offset:offset + limit],
+        "unavailable": sorted(errors),
+    }
+
+
+# --- Dependency functions ---
+def get_resort_id(
+    resort_id: Optional[str] = Query(default=None, description="Resort (property); defaults to DEFAULT_RESORT_ID."),
+) -> str:
+    """
+    Dependency resolving the resort a request is for; 404 for unknown resorts.
+    """
+    resort_id = resort_id or shard_router.default
+    if resort_id not in shard_router:
+        raise HTTPException(status_code=404, detail=f"Resort '{resort_id}' not found.")
+    return resort_id
+
+
+def getResortManager(resort_id: str = Depends(get_resort_id)) -> Iterator[ResortManager]:
     """
     Dependency function that provides a ResortManager instance
-    initialized with a database session obtained from Depends(get_db).
+    initialized with a session on the requested resort's database.
     """
-    return ResortManager(db) # Create instance with the injected session
\ No newline at end of file
+    db = shard_router.session(resort_id)
+    try:
+        yield ResortManager(db, resort_id) # Create instance with the resort's session
+    finally:
+        db.close()
\ No newline at end of file
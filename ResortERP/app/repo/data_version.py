@@ -0,0 +1,109 @@
+# app/repo/data_version.py
+#
+# Version numbers for data sets that clients poll, such as "rooms".
+#
+# ResortManager bumps the version right after each change commits, with an
+# `x = x + 1` upsert in a transaction of its own. The version row is locked for
+# that one statement only, so writers to different rooms do not queue behind
+# each other's whole transactions for it. A bump taken after the commit also
+# never carries a number that another worker sees before the change itself.
+# Between the commit and the bump a poll can still get the previous ETag; the
+# bump follows within one round trip and the next poll sees the change.
+# Each worker caches the latest version it knows of:
+#   - its own commits update the cache directly;
+#   - other workers' room changes arrive through the availability broker;
+#   - anything else (scripts, a missed notification) is caught by re-reading
+#     the row once the cached value is older than DATA_VERSION_TTL_SECONDS.
+# So a conditional GET is answered from memory, and an unchanged poll never
+# touches the database. Each resort's versions live in that resort's database
+# and are cached separately.
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.domain.model.base import DataVersion
+from app.repo.upsert import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+ROOMS = "rooms"
+
+
+class DataVersions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._known: Dict[Tuple[str, str], Tuple[int, float]] = {}  # (resort, name) -> (version, monotonic time read)
+
+    def bump(self, db: Session, name: str, announce: Optional[Callable[[int], None]] = None) -> Optional[int]:
+        """
+        Increments `name` and commits. Call it after the change it versions has
+        committed, with nothing else pending in `db`. `announce` is called with
+        the new version before the commit, e.g. to publish it in the same transaction.
+
+        Returns:
+            Optional[int]: The new version, or None if the bump failed. The
+            change stays committed; the version moves on with the next bump.
+        """
+        statement = dialect_insert(db)(DataVersion).values(name=name, version=1)
+        statement = statement.on_conflict_do_update(
+            index_elements=[DataVersion.name], set_={"version": DataVersion.version + 1},
+        ).returning(DataVersion.version)
+        # Nothing else is in this transaction, so the caller's loaded objects stay valid
+        expire_on_commit, db.expire_on_commit = db.expire_on_commit, False
+        try:
+            version = db.execute(statement).scalar_one()
+            if announce is not None:
+                announce(version)
+            db.commit()
+            return version
+        except Exception:
+            db.rollback()
+            logger.exception("Failed to bump data version", extra={"name": name})
+            return None
+        finally:
+            db.expire_on_commit = expire_on_commit
+
+    def observe(self, resort_id: str, name: str, version: int) -> None:
+        """Records a committed version, e.g. from this worker's commit or another worker's notification."""
+        key = (resort_id, name)
+        with self._lock:
+            known = self._known.get(key)
+            if known is None or version >= known[0]:
+                self._known[key] = (version, time.monotonic())
+
+    def forget(self, name: Optional[str] = None) -> None:
+        """Drops the cached versions of `name` (of every resort), or everything."""
+        with self._lock:
+            if name is None:
+                self._known.clear()
+            else:
+                for key in [key for key in self._known if key[1] == name]:
+                    del self._known[key]
+
+    def current(self, resort_id: str, name: str, ttl_seconds: float) -> int:
+        """The latest version of `name`, read from the database only when the cached value is older than `ttl_seconds`."""
+        key = (resort_id, name)
+        known = self._known.get(key)
+        if known is not None and time.monotonic() - known[1] < ttl_seconds:
+            return known[0]
+        from app.config.db import shard_router
+
+        db = shard_router.session(resort_id)
+        try:
+            row = db.get(DataVersion, name)
+            version = row.version if row is not None else 0
+        finally:
+            db.close()
+        with self._lock:
+            # A notification that arrived during the read may be newer
+            known = self._known.get(key)
+            version = max(version, known[0]) if known is not None else version
+            self._known[key] = (version, time.monotonic())
+        return version
+
+
+data_versions = DataVersions()
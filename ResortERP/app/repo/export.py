@@ -0,0 +1,242 @@
+# app/repo/export.py
+#
+# Streaming export of bookings and rooms. Rows are read as plain tuples through
+# a server-side cursor (stream_results) in fixed-size batches and encoded one
+# batch at a time, so memory stays flat no matter how many rows are exported.
+# The bookings export covers bookings_archive as well unless asked not to, with
+# an `archived` column telling the two apart.
+#
+# Parquet output needs the optional `pyarrow` dependency (pip install "app[parquet]").
+
+import csv
+import io
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List
+
+from sqlalchemy import literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.domain.model.base import Booking, BookingArchive, Room
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@dataclass
+class ExportTable:
+    name: str
+    columns: List[str]
+    # pyarrow type names, used only for Parquet
+    arrow_types: List[str]
+    # Builds the query; called with include_archived
+    statement: Callable
+    # Converts one result row into plain Python values (UUIDs as strings, etc.)
+    convert: Callable[[tuple], tuple] = field(default=lambda row: tuple(row))
+
+
+def _bookings_statement(include_archived: bool = True):
+    live = select(
+        Booking.id, Booking.user_id, Booking.room_id, Room.number, Room.room_type, Room.price,
+        Booking.booking_date, Booking.cancelled_at, Booking.checked_out, literal(False).label("archived"),
+    ).join(Room, Booking.room_id == Room.id)
+    if not include_archived:
+        return live.order_by(Booking.booking_date)
+    # Archived rows have no foreign keys; they are kept even if their room is gone
+    archived = select(
+        BookingArchive.id, BookingArchive.user_id, BookingArchive.room_id, Room.number, Room.room_type, Room.price,
+        BookingArchive.booking_date, BookingArchive.cancelled_at, BookingArchive.checked_out, literal(True).label("archived"),
+    ).outerjoin(Room, BookingArchive.room_id == Room.id)
+    history = union_all(live, archived).subquery()
+    return select(*history.c).order_by(history.c.booking_date)
+
+
+def _rooms_statement(include_archived: bool = True):
+    # Rooms are never archived
+    return (
+        select(Room.id, Room.number, Room.room_type, Room.capacity, Room.view, Room.price, Room.amenities, Room.is_booked)
+        .order_by(Room.number)
+    )
+
+
+EXPORT_TABLES = {
+    "bookings": ExportTable(
+        name="bookings",
+        columns=[
+            "id", "user_id", "room_id", "room_number", "room_type", "price", "booking_date", "cancelled_at",
+            "checked_out", "archived",
+        ],
+        arrow_types=["string", "string", "string", "string", "string", "float64", "timestamp", "timestamp", "bool", "bool"],
+        statement=_bookings_statement,
+        convert=lambda row: (
+            str(row[0]), str(row[1]), str(row[2]), row[3], row[4], row[5], row[6], row[7], bool(row[8]), bool(row[9]),
+        ),
+    ),
+    "rooms": ExportTable(
+        name="rooms",
+        columns=["id", "number", "room_type", "capacity", "view", "price", "amenities", "is_booked"],
+        arrow_types=["string", "string", "string", "int32", "string", "float64", "string", "bool"],
+        statement=_rooms_statement,
+        convert=lambda row: (str(row[0]), row[1], row[2], row[3], row[4], row[5], "|".join(row[6] or []), row[7]),
+    ),
+}
+
+
+@dataclass
+class ExportStats:
+    rows: int = 0
+    bytes: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    finished: float = 0.0
+
+    @property
+    def seconds(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def iter_batches(
+    db: Session, table: ExportTable, batch_size: int = DEFAULT_BATCH_SIZE, include_archived: bool = True,
+) -> Iterator[List[tuple]]:
+    """
+    Yields lists of converted rows, `batch_size` at a time, from a server-side cursor.
+    """
+    statement = table.statement(include_archived=include_archived)
+    result = db.execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+    try:
+        for partition in result.partitions():
+            yield [table.convert(row) for row in partition]
+    finally:
+        result.close()
+
+
+def csv_chunks(table: ExportTable, batches: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """Encodes batches as CSV, yielding one chunk per batch (header first)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(table.columns)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """Minimal writable file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def parquet_chunks(table: ExportTable, batches: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """Encodes batches as Parquet, one row group per batch, yielding bytes as they are written."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export requires pyarrow (pip install \"app[parquet]\").") from e
+
+    types = {"string": pa.string(), "float64": pa.float64(), "int32": pa.int32(), "bool": pa.bool_(),
+             "timestamp": pa.timestamp("us", tz="UTC")}
+    schema = pa.schema([(name, types[kind]) for name, kind in zip(table.columns, table.arrow_types)])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            columns = list(zip(*batch)) if batch else [()] * len(table.columns)
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=schema.field(i).type) for i, column in enumerate(columns)], schema=schema,
+            ))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def stream_export(
+    db: Session,
+    table_name: str,
+    export_format: str = "csv",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    stats: ExportStats = None,
+    include_archived: bool = True,
+) -> Iterator[bytes]:
+    """
+    Streams `table_name` ("bookings" or "rooms") as CSV or Parquet bytes.
+
+    Args:
+        db (Session): Session to read with; kept open until the generator is exhausted.
+        table_name (str): Table to export.
+        export_format (str): "csv" or "parquet".
+        batch_size (int): Rows fetched and encoded per batch.
+        stats (ExportStats, optional): Filled in with row/byte counts and timing.
+        include_archived (bool): Also export bookings_archive (bookings only).
+
+    Yields:
+        bytes: Encoded chunks, one or more per batch.
+    """
+    if table_name not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export table '{table_name}'. Use one of: {', '.join(EXPORT_TABLES)}.")
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}.")
+
+    table = EXPORT_TABLES[table_name]
+    stats = stats or ExportStats()
+
+    def counted(batches: Iterable[List[tuple]]) -> Iterator[List[tuple]]:
+        for batch in batches:
+            stats.rows += len(batch)
+            yield batch
+
+    encode = csv_chunks if export_format == "csv" else parquet_chunks
+    for chunk in encode(table, counted(iter_batches(db, table, batch_size, include_archived=include_archived))):
+        stats.bytes += len(chunk)
+        yield chunk
+    stats.finished = time.perf_counter()
+    logger.info(
+        "Export finished",
+        extra={
+            "table": table_name, "format": export_format, "rows": stats.rows, "bytes": stats.bytes,
+            "seconds": round(stats.seconds, 3), "rows_per_second": round(stats.rows_per_second),
+        },
+    )
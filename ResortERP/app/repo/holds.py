@@ -0,0 +1,43 @@
+# app/repo/holds.py
+#
+# Database side of room holds. A hold reserves an available room for one
+# guest while they check out. It lives on the room row (rooms.held_by and
+# rooms.held_until), so taking a hold is a single conditional UPDATE and the
+# availability queries need no join. ResortManager takes, releases and
+# converts holds. app/realtime/holds.py releases expired holds.
+
+from datetime import datetime
+from typing import List, Tuple
+import uuid
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.domain.model.base import Room, as_utc
+
+
+def migrate_hold_columns(engine: Engine) -> bool:
+    """
+    Adds rooms.held_by and rooms.held_until (with its index) to a database
+    created before holds existed, in one transaction.
+
+    Returns:
+        bool: True if the columns were added.
+    """
+    with engine.begin() as conn:
+        if not inspect(conn).has_table(Room.__tablename__):
+            return False
+        if "held_until" in {c["name"] for c in inspect(conn).get_columns(Room.__tablename__)}:
+            return False
+        uuid_type = "UUID" if conn.dialect.name == "postgresql" else "CHAR(32)"
+        conn.execute(text(f"ALTER TABLE {Room.__tablename__} ADD COLUMN held_by {uuid_type} REFERENCES users (id)"))
+        conn.execute(text(f"ALTER TABLE {Room.__tablename__} ADD COLUMN held_until TIMESTAMP WITH TIME ZONE"))
+        conn.execute(text(f"CREATE INDEX ix_rooms_held_until ON {Room.__tablename__} (held_until)"))
+    return True
+
+
+def active_holds(db: Session) -> List[Tuple[uuid.UUID, datetime]]:
+    """(room id, held_until) of every room with a hold, expired or not; served by ix_rooms_held_until."""
+    rows = db.execute(select(Room.id, Room.held_until).where(Room.held_until.is_not(None))).all()
+    return [(room_id, as_utc(held_until)) for room_id, held_until in rows]
@@ -0,0 +1,103 @@
+# app/repo/idempotency.py
+#
+# Database side of the Idempotency-Key store (see app/routers/idempotency.py).
+# A request claims its key by inserting a row with no response yet. Only one
+# insert can succeed, so across workers only one request runs for each key.
+# While the request runs, its worker renews the claim's lease. The row then
+# holds the response until it expires. Each function commits.
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.orm import Session
+
+from app.domain.model.base import IdempotencyKey
+from app.repo.upsert import dialect_insert
+
+
+def claim(db: Session, key: str, fingerprint: str, ttl_seconds: float, lease_seconds: float) -> Optional[IdempotencyKey]:
+    """
+    Claims `key` for a new request, unless another request holds it.
+
+    A row past its expiry, or a claim whose lease ran out without a response
+    (its worker died), is deleted and claimed again.
+
+    Returns:
+        Optional[IdempotencyKey]: None if the caller now owns the key and must
+        run the request. Otherwise the existing row: with a response
+        (status_code set) to replay, or still running elsewhere (status_code None).
+    """
+    for _ in range(3):
+        now = datetime.now(timezone.utc)
+        inserted = db.execute(
+            dialect_insert(db)(IdempotencyKey)
+            .values(
+                key=key, fingerprint=fingerprint, created_at=now,
+                locked_until=now + timedelta(seconds=lease_seconds), expires_at=now + timedelta(seconds=ttl_seconds),
+            )
+            .on_conflict_do_nothing(index_elements=[IdempotencyKey.key])
+        )
+        if inserted.rowcount == 1:
+            db.commit()
+            return None
+        reclaimed = db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.key == key,
+                or_(
+                    IdempotencyKey.expires_at < now,
+                    (IdempotencyKey.status_code.is_(None)) & (IdempotencyKey.locked_until < now),
+                ),
+            )
+        )
+        if reclaimed.rowcount:
+            db.commit()
+            continue
+        row = db.get(IdempotencyKey, key, populate_existing=True)
+        db.commit()
+        if row is not None:
+            return row
+    raise RuntimeError(f"Could not claim idempotency key '{key}'.")
+
+
+def renew(db: Session, key: str, fingerprint: str, lease_seconds: float) -> bool:
+    """
+    Extends the lease of a claim whose request is still running.
+
+    Returns:
+        bool: False if the claim is gone, e.g. another worker took it over after the lease ran out.
+    """
+    renewed = db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key, IdempotencyKey.fingerprint == fingerprint, IdempotencyKey.status_code.is_(None))
+        .values(locked_until=datetime.now(timezone.utc) + timedelta(seconds=lease_seconds))
+    )
+    db.commit()
+    return renewed.rowcount == 1
+
+
+def complete(db: Session, key: str, status_code: int, content_type: Optional[str], body: Optional[bytes]) -> None:
+    """
+    Stores the response of the request that claimed `key`. A `body` of None
+    marks the request as done without keeping its response (it was too large
+    to store), so retries are refused instead of running it again.
+    """
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key)
+        .values(status_code=status_code, content_type=content_type, body=body, locked_until=None)
+    )
+    db.commit()
+
+
+def release(db: Session, key: str) -> None:
+    """Gives up a claim without a response, so a retry runs the request again."""
+    db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None)))
+    db.commit()
+
+
+def purge_expired(db: Session) -> int:
+    """Deletes expired keys; returns how many."""
+    deleted = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.now(timezone.utc)))
+    db.commit()
+    return deleted.rowcount
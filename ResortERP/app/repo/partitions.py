@@ -0,0 +1,357 @@
+# app/repo/partitions.py
+#
+# Monthly partitioning and archival of bookings.
+#
+# On PostgreSQL `bookings` is PARTITION BY RANGE (booking_date), one partition
+# per calendar month (UTC) named bookings_pYYYY_MM. unbook_room pins
+# booking_date to rooms.booked_at and get_user_bookings(since=...) bounds it,
+# so the planner only touches the matching partitions. unbook_room keeps the
+# booking and sets cancelled_at (and checked_out for a checkout); a month is
+# closed once every booking in it has ended. archive_bookings moves closed months out of `bookings` by
+# detaching the partition and attaching it to `bookings_archive` as is, without
+# copying rows.
+#
+# Other databases (SQLite in development) keep one plain table. There,
+# archive_bookings copies each closed month into bookings_archive and deletes
+# it from bookings, which keeps the live table bounded in the same way.
+#
+# Operate with: python -m app.scripts.booking_partitions status|ensure|archive|migrate
+
+import logging
+import re
+import threading
+from datetime import date, datetime, time, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.config.db import shard_router
+from app.config.env import get_settings
+from app.domain.model.base import Booking, BookingArchive, DailyOccupancy, Room
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_NAME = re.compile(r"_p(\d{4})_(\d{2})$")
+
+# (database URL, partition) pairs this process has already seen, so the booking path only checks the catalog once per month
+_known_partitions = set()
+_known_lock = threading.Lock()
+
+
+def month_start(value) -> date:
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        value = value.date()
+    return value.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(start: date) -> Tuple[datetime, datetime]:
+    """UTC [start, end) bounds of the month beginning at `start`."""
+    lower = datetime.combine(start, time.min, tzinfo=timezone.utc)
+    upper = datetime.combine(add_months(start, 1), time.min, tzinfo=timezone.utc)
+    return lower, upper
+
+
+def partition_name(table: str, start: date) -> str:
+    return f"{table}_p{start:%Y_%m}"
+
+
+def is_postgres(bind) -> bool:
+    return bind.dialect.name == "postgresql"
+
+
+def is_partitioned(conn: Connection, table: str = Booking.__tablename__) -> bool:
+    """True if `table` is a declaratively partitioned PostgreSQL table."""
+    if not is_postgres(conn):
+        return False
+    relkind = conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": table}).scalar()
+    return relkind == "p"
+
+
+def list_partitions(conn: Connection, table: str = Booking.__tablename__) -> List[Tuple[str, date]]:
+    """Monthly partitions of `table` as (name, month start), oldest first."""
+    if not is_postgres(conn):
+        return []
+    names = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:t)"
+    ), {"t": table}).scalars()
+    partitions = []
+    for name in names:
+        match = _PARTITION_NAME.search(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def _create_partition(conn: Connection, table: str, start: date) -> bool:
+    name = partition_name(table, start)
+    if conn.execute(text("SELECT to_regclass(:n)"), {"n": name}).scalar() is not None:
+        return False
+    lower, upper = month_range(start)
+    conn.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+        f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    ))
+    return True
+
+
+def ensure_booking_partitions(
+    engine: Engine,
+    first_month: Optional[date] = None,
+    months_ahead: Optional[int] = None,
+) -> List[str]:
+    """
+    Creates missing monthly partitions of `bookings` from `first_month` (default:
+    the current month) through `months_ahead` months after the current one.
+    Does nothing unless the database is PostgreSQL with a partitioned `bookings`.
+
+    Returns:
+        List[str]: Names of the partitions created.
+    """
+    if not is_postgres(engine):
+        return []
+    months_ahead = get_settings().BOOKING_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+    current = month_start(datetime.now(timezone.utc))
+    start = month_start(first_month) if first_month else current
+    created = []
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            logger.warning("bookings is not partitioned; run `python -m app.scripts.booking_partitions migrate`")
+            return []
+        month = start
+        while month <= add_months(current, months_ahead):
+            if _create_partition(conn, Booking.__tablename__, month):
+                created.append(partition_name(Booking.__tablename__, month))
+            month = add_months(month, 1)
+    with _known_lock:
+        _known_partitions.update(
+            (str(engine.url), partition_name(Booking.__tablename__, m)) for m in _months(start, add_months(current, months_ahead))
+        )
+    if created:
+        logger.info("Booking partitions created", extra={"partitions": created})
+    return created
+
+
+def ensure_partition_for(db: Session, when: datetime) -> None:
+    """
+    Makes sure the partition receiving a booking dated `when` exists. Normally
+    ensure_booking_partitions has created it ahead of time; the DDL fallback runs
+    in its own transaction so the caller's transaction never holds the lock.
+    """
+    engine = db.get_bind()
+    if not is_postgres(engine):
+        return
+    key = (str(engine.url), partition_name(Booking.__tablename__, month_start(when)))
+    if key in _known_partitions:
+        return
+    ensure_booking_partitions(engine, first_month=month_start(when), months_ahead=0)
+    with _known_lock:
+        _known_partitions.add(key)
+
+
+def _months(first: date, last: date) -> List[date]:
+    months = []
+    while first <= last:
+        months.append(first)
+        first = add_months(first, 1)
+    return months
+
+
+def archive_cutoff(retention_months: Optional[int] = None) -> date:
+    """First month that stays live; every month before it is eligible for archival."""
+    retention_months = get_settings().BOOKING_RETENTION_MONTHS if retention_months is None else retention_months
+    return add_months(month_start(datetime.now(timezone.utc)), -retention_months)
+
+
+def _row_count(conn: Connection, lower: datetime, upper: datetime) -> int:
+    return conn.execute(
+        Booking.__table__.select()
+        .with_only_columns(func.count())
+        .where(Booking.booking_date >= lower, Booking.booking_date < upper)
+    ).scalar()
+
+
+def _active_bookings(conn: Connection, lower: datetime, upper: datetime) -> int:
+    """Bookings in [lower, upper) not cancelled yet, i.e. still holding a room; their month cannot be archived yet."""
+    return conn.execute(
+        Booking.__table__.select()
+        .with_only_columns(func.count())
+        .where(Booking.booking_date >= lower, Booking.booking_date < upper, Booking.cancelled_at.is_(None))
+    ).scalar()
+
+
+def _archive_partition(conn: Connection, name: str, start: date) -> None:
+    lower, upper = month_range(start)
+    conn.execute(text(f'ALTER TABLE "{Booking.__tablename__}" DETACH PARTITION "{name}"'))
+    # Archived rows must not block deleting users or rooms
+    for constraint in conn.execute(text(
+        "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:n) AND contype = 'f'"
+    ), {"n": name}).scalars():
+        conn.execute(text(f'ALTER TABLE "{name}" DROP CONSTRAINT "{constraint}"'))
+    tablespace = get_settings().BOOKING_ARCHIVE_TABLESPACE
+    if tablespace:
+        conn.execute(text(f'ALTER TABLE "{name}" SET TABLESPACE "{tablespace}"'))
+    conn.execute(text(
+        f'ALTER TABLE "{BookingArchive.__tablename__}" ATTACH PARTITION "{name}" '
+        f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    ))
+
+
+def _archive_rows(conn: Connection, lower: datetime, upper: datetime) -> int:
+    columns = [
+        Booking.id, Booking.user_id, Booking.room_id, Booking.booking_date, Booking.cancelled_at, Booking.checked_out,
+        Booking.resort_id,
+    ]
+    in_month = (Booking.booking_date >= lower) & (Booking.booking_date < upper)
+    conn.execute(
+        BookingArchive.__table__.insert().from_select(
+            ["id", "user_id", "room_id", "booking_date", "cancelled_at", "checked_out", "resort_id"],
+            Booking.__table__.select().with_only_columns(*columns).where(in_month),
+        )
+    )
+    return conn.execute(Booking.__table__.delete().where(in_month)).rowcount
+
+
+def archive_bookings(engine: Engine, before: Optional[date] = None, dry_run: bool = False) -> dict:
+    """
+    Moves every closed month older than `before` (default: BOOKING_RETENTION_MONTHS
+    ago) from `bookings` to `bookings_archive`, one transaction per month. A month
+    is closed once all of its bookings are cancelled; open months are skipped.
+
+    Returns:
+        dict: Lists of archived and skipped months (YYYY-MM) and the rows moved
+        (rows are only counted outside PostgreSQL, where they are copied).
+    """
+    cutoff = month_start(before) if before else archive_cutoff()
+    result = {"archived": [], "skipped": [], "rows": 0}
+
+    with engine.connect() as conn:
+        partitioned = is_partitioned(conn)
+        if partitioned:
+            months = [(name, start) for name, start in list_partitions(conn) if start < cutoff]
+        else:
+            oldest = conn.execute(
+                Booking.__table__.select().with_only_columns(func.min(Booking.booking_date))
+            ).scalar()
+            if isinstance(oldest, str):
+                oldest = datetime.fromisoformat(oldest)
+            months = [(None, m) for m in _months(month_start(oldest), add_months(cutoff, -1))] if oldest else []
+
+    for name, start in months:
+        lower, upper = month_range(start)
+        label = f"{start:%Y-%m}"
+        with engine.begin() as conn:
+            if not partitioned and not _row_count(conn, lower, upper):
+                continue
+            active = _active_bookings(conn, lower, upper)
+            if active:
+                logger.warning("Month still has active bookings; not archived", extra={"month": label, "active": active})
+                result["skipped"].append(label)
+                continue
+            if dry_run:
+                result["archived"].append(label)
+                continue
+            if partitioned:
+                _archive_partition(conn, name, start)
+            else:
+                result["rows"] += _archive_rows(conn, lower, upper)
+            result["archived"].append(label)
+    logger.info("Bookings archived", extra={**result, "cutoff": cutoff.isoformat(), "dry_run": dry_run})
+    return result
+
+
+# Columns added since the first release: (table, column, definition)
+_BOOKING_END_COLUMNS = [
+    (Booking.__tablename__, "cancelled_at", "TIMESTAMP WITH TIME ZONE"),
+    (BookingArchive.__tablename__, "cancelled_at", "TIMESTAMP WITH TIME ZONE"),
+    (Booking.__tablename__, "checked_out", "BOOLEAN NOT NULL DEFAULT false"),
+    (BookingArchive.__tablename__, "checked_out", "BOOLEAN NOT NULL DEFAULT false"),
+    (DailyOccupancy.__tablename__, "checkouts", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+
+def _add_booking_end_columns(conn: Connection) -> bool:
+    added = False
+    for table, column, definition in _BOOKING_END_COLUMNS:
+        if not inspect(conn).has_table(table):
+            continue
+        if column not in {c["name"] for c in inspect(conn).get_columns(table)}:
+            # On a partitioned table this adds the column to every partition
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+            added = True
+    return added
+
+
+def migrate_cancellation_columns(engine: Engine) -> bool:
+    """
+    Adds the columns recording how bookings end (bookings.cancelled_at and
+    checked_out, the same in bookings_archive, daily_occupancy.checkouts) to an
+    older database, in one transaction. A booking left from before cancelled_at
+    existed is still active; earlier cancellations stay counted as cancellations.
+
+    Returns:
+        bool: True if a column was added.
+    """
+    with engine.begin() as conn:
+        return _add_booking_end_columns(conn)
+
+
+def migrate_bookings(engine: Engine) -> dict:
+    """
+    Upgrades an existing database in one transaction: adds rooms.booked_at and
+    the booking end columns (see migrate_cancellation_columns) and, on
+    PostgreSQL, converts a plain `bookings` table into the partitioned layout
+    (rows are copied into monthly partitions, then the old table is dropped).
+
+    Returns:
+        dict: What was changed.
+    """
+    changes = {"booked_at_added": False, "booking_end_columns_added": False, "partitioned": False, "rows": 0}
+    with engine.begin() as conn:
+        changes["booking_end_columns_added"] = _add_booking_end_columns(conn)
+        if "booked_at" not in {c["name"] for c in inspect(conn).get_columns(Room.__tablename__)}:
+            conn.execute(text(f"ALTER TABLE {Room.__tablename__} ADD COLUMN booked_at TIMESTAMP WITH TIME ZONE"))
+            changes["booked_at_added"] = True
+
+        if is_postgres(conn) and not is_partitioned(conn):
+            conn.execute(text("ALTER TABLE bookings RENAME TO bookings_unpartitioned"))
+            conn.execute(text("ALTER TABLE bookings_unpartitioned RENAME CONSTRAINT bookings_pkey TO bookings_unpartitioned_pkey"))
+            conn.execute(text("ALTER INDEX IF EXISTS ix_bookings_id RENAME TO ix_bookings_unpartitioned_id"))
+            Booking.__table__.create(conn)
+            months = conn.execute(text(
+                "SELECT DISTINCT date_trunc('month', booking_date AT TIME ZONE 'UTC')::date FROM bookings_unpartitioned"
+            )).scalars().all()
+            current = month_start(datetime.now(timezone.utc))
+            for month in sorted(set(months) | set(_months(current, add_months(current, get_settings().BOOKING_PARTITIONS_AHEAD)))):
+                _create_partition(conn, Booking.__tablename__, month)
+            changes["rows"] = conn.execute(text(
+                "INSERT INTO bookings (id, user_id, room_id, booking_date, cancelled_at, checked_out, resort_id) "
+                "SELECT id, user_id, room_id, booking_date, cancelled_at, checked_out, :resort_id FROM bookings_unpartitioned"
+            ), {"resort_id": shard_router.resort_for(conn)}).rowcount
+            conn.execute(text("DROP TABLE bookings_unpartitioned"))
+            changes["partitioned"] = True
+
+        # Point booked rooms at their latest booking so unbook_room can prune
+        latest = (
+            Booking.__table__.select()
+            .with_only_columns(func.max(Booking.booking_date))
+            .where(Booking.room_id == Room.id, Booking.cancelled_at.is_(None))
+            .scalar_subquery()
+        )
+        conn.execute(
+            Room.__table__.update()
+            .where(Room.is_booked.is_(True), Room.booked_at.is_(None))
+            .values(booked_at=latest)
+        )
+    logger.info("Bookings migrated", extra=changes)
+    return changes
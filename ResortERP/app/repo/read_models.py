@@ -0,0 +1,59 @@
+# app/repo/read_models.py
+#
+# Read models: listings selected as plain column tuples instead of ORM
+# entities. A Room entity costs an identity-map entry, instance state and
+# attribute instrumentation. Listings only read the rows once and serialize
+# them, so they do not need any of that. The rows here are SQLAlchemy `Row`
+# tuples of the requested columns, and the routers turn them into JSON with
+# app/routers/fast_json.py without validating each row.
+
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Float, Numeric, Row, cast, or_, select
+from sqlalchemy.orm import Session
+
+from app.domain.model.base import Room
+
+# RoomSchema's fields, in its order, so the JSON matches the schema
+ROOM_FIELDS = ("number", "is_booked", "room_type", "capacity", "view", "price", "amenities")
+
+
+def _as_schema_type(column):
+    # RoomSchema's numeric fields are floats. A Numeric column comes back as an
+    # int on SQLite when the stored value is whole (100, not 100.0), so cast it.
+    if isinstance(column.type, Numeric) and not isinstance(column.type, Float):
+        return cast(column, Float).label(column.name)
+    return column
+
+
+def room_columns(fields: Sequence[str]):
+    """
+    The rooms table columns named by `fields`, with numeric columns cast to float
+    so the values serialize as RoomSchema's do.
+
+    Raises:
+        KeyError: If a field is not a column of rooms.
+    """
+    return [_as_schema_type(Room.__table__.c[field]) for field in fields]
+
+
+def available_condition(now: Optional[datetime] = None):
+    """SQL condition for a room that can be booked: not booked and not held (or its hold has lapsed)."""
+    now = now or datetime.now(timezone.utc)
+    return (Room.is_booked == False) & or_(Room.held_until.is_(None), Room.held_until <= now)  # noqa: E712
+
+
+def available_rooms(db: Session, fields: Sequence[str] = ROOM_FIELDS) -> List[Row]:
+    """
+    The rooms that are neither booked nor held, as tuples of `fields`.
+
+    Args:
+        db (Session): A session on the resort's database.
+        fields (Sequence[str]): Room columns to select, in output order.
+
+    Returns:
+        List[Row]: One tuple per available room; `row._fields` equals `fields`.
+    """
+    query = select(*room_columns(fields)).where(available_condition())
+    return db.execute(query).all()
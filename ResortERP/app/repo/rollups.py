@@ -0,0 +1,310 @@
+# app/repo/rollups.py
+#
+# Occupancy and booking rollups. ResortManager calls record_room_change inside
+# the same transaction as every room/booking write, so the rollup tables are
+# always consistent with the rows they summarise. Reports read at most one row
+# per day and room type, independent of how many bookings exist.
+#
+# Every writer of a room type updates the same room_type_inventory row, and
+# holds that row's lock until it commits. record_room_change therefore only
+# queues the change in the session; the queued changes are merged per room
+# type and written in a before_commit hook, right before the COMMIT, so the
+# lock is held for the commit alone rather than the whole booking transaction.
+# The room types are written in sorted order, so writers of several types
+# cannot deadlock. A rollback discards the queue.
+#
+# Recompute the derivable parts with: python -m app.scripts.rebuild_rollups
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, event, false, func, select, text, union_all, update
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.domain.model.base import Booking, BookingArchive, DailyOccupancy, Room, RoomTypeInventory
+from app.repo.upsert import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# Session.info key of the changes queued in the current transaction
+PENDING_KEY = "rollup_changes"
+# Order of the queued counters: total, occupied, bookings, cancellations, checkouts, revenue
+_TOTAL, _OCCUPIED, _BOOKINGS, _CANCELLATIONS, _CHECKOUTS, _REVENUE = range(6)
+
+
+def record_room_change(
+    db: Session,
+    room_type: str,
+    total_delta: int = 0,
+    occupied_delta: int = 0,
+    bookings: int = 0,
+    cancellations: int = 0,
+    checkouts: int = 0,
+    revenue: float = 0.0,
+    at: Optional[datetime] = None,
+) -> None:
+    """
+    Queues one change to the rollups; it is written when `db` commits. Counters
+    are updated with `x = x + delta` upserts, so concurrent writers never lose
+    increments.
+
+    Args:
+        db (Session): The session of the transaction making the change.
+        room_type (str): Room type of the affected room.
+        total_delta (int): Change in the number of rooms of this type.
+        occupied_delta (int): Change in the number of booked rooms of this type.
+        bookings (int): Bookings created.
+        cancellations (int): Bookings cancelled before the stay ended.
+        checkouts (int): Bookings ended by the guest checking out.
+        revenue (float): Revenue of the bookings created.
+        at (datetime, optional): When the change happened; defaults to now (UTC).
+    """
+    day = (at or datetime.now(timezone.utc)).astimezone(timezone.utc).date()
+    pending = db.info.setdefault(PENDING_KEY, {})
+    change = pending.setdefault((room_type, day), [0, 0, 0, 0, 0, 0.0])
+    for index, delta in (
+        (_TOTAL, total_delta), (_OCCUPIED, occupied_delta), (_BOOKINGS, bookings),
+        (_CANCELLATIONS, cancellations), (_CHECKOUTS, checkouts), (_REVENUE, revenue),
+    ):
+        change[index] += delta
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending_changes(db: Session) -> None:
+    pending = db.info.pop(PENDING_KEY, None)
+    for (room_type, day), change in sorted((pending or {}).items()):
+        _apply_change(db, room_type, day, *change)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_changes(db: Session, transaction: SessionTransaction) -> None:
+    # Rolled back or closed without committing
+    if transaction.parent is None:
+        db.info.pop(PENDING_KEY, None)
+
+
+def _apply_change(
+    db: Session, room_type: str, day: date, total_delta: int, occupied_delta: int,
+    bookings: int, cancellations: int, checkouts: int, revenue: float,
+) -> None:
+    insert = dialect_insert(db)
+    inventory = insert(RoomTypeInventory).values(
+        room_type=room_type, total_rooms=total_delta, occupied_rooms=occupied_delta,
+    )
+    inventory = inventory.on_conflict_do_update(
+        index_elements=[RoomTypeInventory.room_type],
+        set_={
+            "total_rooms": RoomTypeInventory.total_rooms + total_delta,
+            "occupied_rooms": RoomTypeInventory.occupied_rooms + occupied_delta,
+        },
+    ).returning(RoomTypeInventory.total_rooms, RoomTypeInventory.occupied_rooms)
+    total_rooms, occupied_rooms = db.execute(inventory).one()
+
+    daily = insert(DailyOccupancy).values(
+        day=day, room_type=room_type, bookings=bookings, cancellations=cancellations, checkouts=checkouts,
+        revenue=revenue, occupied_rooms=occupied_rooms, total_rooms=total_rooms,
+    )
+    daily = daily.on_conflict_do_update(
+        index_elements=[DailyOccupancy.day, DailyOccupancy.room_type],
+        set_={
+            "bookings": DailyOccupancy.bookings + bookings,
+            "cancellations": DailyOccupancy.cancellations + cancellations,
+            "checkouts": DailyOccupancy.checkouts + checkouts,
+            "revenue": DailyOccupancy.revenue + revenue,
+            "occupied_rooms": occupied_rooms,
+            "total_rooms": total_rooms,
+        },
+    )
+    db.execute(daily)
+
+
+def occupancy_report(db: Session, start: date, end: date, room_type: Optional[str] = None) -> List[dict]:
+    """
+    Daily occupancy and booking activity between `start` and `end` (inclusive),
+    for one room type or summed over all of them. Days without activity carry
+    the previous end-of-day occupancy forward.
+
+    Returns:
+        List[dict]: One entry per day with bookings, cancellations, checkouts,
+        revenue, occupied_rooms, total_rooms and occupancy_rate.
+    """
+    type_filter = [DailyOccupancy.room_type == room_type] if room_type else []
+
+    # End-of-day state of each room type just before the range starts
+    latest = (
+        db.query(DailyOccupancy.room_type, func.max(DailyOccupancy.day).label("day"))
+        .filter(DailyOccupancy.day < start, *type_filter)
+        .group_by(DailyOccupancy.room_type)
+        .subquery()
+    )
+    seeds = (
+        db.query(DailyOccupancy)
+        .join(latest, (DailyOccupancy.room_type == latest.c.room_type) & (DailyOccupancy.day == latest.c.day))
+        .all()
+    )
+    rows = (
+        db.query(DailyOccupancy)
+        .filter(DailyOccupancy.day >= start, DailyOccupancy.day <= end, *type_filter)
+        .all()
+    )
+
+    state: Dict[str, tuple] = {seed.room_type: (seed.occupied_rooms, seed.total_rooms) for seed in seeds}
+    by_day: Dict[date, List[DailyOccupancy]] = defaultdict(list)
+    for row in rows:
+        by_day[row.day].append(row)
+
+    report = []
+    day = start
+    while day <= end:
+        bookings = cancellations = checkouts = 0
+        revenue = 0.0
+        for row in by_day.get(day, ()):
+            bookings += row.bookings
+            cancellations += row.cancellations
+            checkouts += row.checkouts
+            revenue += row.revenue
+            state[row.room_type] = (row.occupied_rooms, row.total_rooms)
+        occupied = sum(value[0] for value in state.values())
+        total = sum(value[1] for value in state.values())
+        report.append({
+            "day": day,
+            "bookings": bookings,
+            "cancellations": cancellations,
+            "checkouts": checkouts,
+            "revenue": round(revenue, 2),
+            "occupied_rooms": occupied,
+            "total_rooms": total,
+            "occupancy_rate": round(occupied / total, 4) if total else 0.0,
+        })
+        day += timedelta(days=1)
+    return report
+
+
+def room_type_occupancy(db: Session) -> List[dict]:
+    """Current occupancy per room type from the inventory rollup."""
+    return [
+        {
+            "room_type": row.room_type,
+            "occupied_rooms": row.occupied_rooms,
+            "total_rooms": row.total_rooms,
+            "occupancy_rate": round(row.occupied_rooms / row.total_rooms, 4) if row.total_rooms else 0.0,
+        }
+        for row in db.query(RoomTypeInventory).order_by(RoomTypeInventory.room_type).all()
+    ]
+
+
+def _lock_rollups(db: Session) -> None:
+    # Writers queue behind this transaction for their rollup upserts; changes
+    # they committed before are visible to the next statement
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE room_type_inventory, daily_occupancy IN SHARE ROW EXCLUSIVE MODE"))
+    else:
+        # SQLite has a single writer: starting a write transaction is the lock
+        db.execute(update(RoomTypeInventory).where(false()).values(total_rooms=RoomTypeInventory.total_rooms))
+
+
+def _utc_day(value: datetime) -> date:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).date()
+
+
+def _booking_activity(db: Session, before: date, batch_size: int) -> Dict[tuple, list]:
+    # [bookings, revenue, cancellations, checkouts] per (day, room type) of live
+    # and archived bookings, for days before `before`
+    activity: Dict[tuple, list] = defaultdict(lambda: [0, 0.0, 0, 0])
+    history = union_all(
+        select(Booking.room_id, Booking.booking_date, Booking.cancelled_at, Booking.checked_out),
+        select(BookingArchive.room_id, BookingArchive.booking_date, BookingArchive.cancelled_at, BookingArchive.checked_out),
+    ).subquery()
+    query = (
+        db.query(history.c.booking_date, history.c.cancelled_at, history.c.checked_out, Room.room_type, Room.price)
+        .join(Room, history.c.room_id == Room.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for booking_date, cancelled_at, checked_out, room_type, price in query:
+        day = _utc_day(booking_date)
+        if day < before:
+            entry = activity[(day, room_type)]
+            entry[0] += 1
+            entry[1] += float(price or 0)
+        if cancelled_at is not None and _utc_day(cancelled_at) < before:
+            activity[(_utc_day(cancelled_at), room_type)][3 if checked_out else 2] += 1
+    return activity
+
+
+def rebuild_rollups(db: Session, batch_size: int = 10000) -> dict:
+    """
+    Recomputes what can be derived from `rooms`, `bookings` and
+    `bookings_archive`, keeping the counters recorded as changes happened, and commits:
+      - room_type_inventory is recomputed from `rooms`, and today's daily rows
+        get the same end-of-day occupancy;
+      - past days with bookings, cancellations or checkouts but no daily row
+        (e.g. older than the rollups) are backfilled with those counts and
+        their revenue. Past occupancy is not stored, so theirs is carried forward from
+        the previous row of the room type.
+    Existing daily rows are not touched: bookings cancelled before
+    bookings.cancelled_at existed were deleted, so their counts cannot be recomputed.
+    Rollup writers wait while the recomputed values are written, so no
+    concurrent change is lost or counted twice.
+
+    Returns:
+        dict: Number of room types and daily rows backfilled.
+    """
+    today = datetime.now(timezone.utc).date()
+    # Past days only, so the history is read before writers are held up; they only ever write today's rows
+    activity = _booking_activity(db, today, batch_size)
+    _lock_rollups(db)
+    insert = dialect_insert(db)
+
+    counts = {
+        room_type: (total, occupied or 0)
+        for room_type, total, occupied in (
+            db.query(Room.room_type, func.count(Room.id), func.sum(case((Room.is_booked, 1), else_=0)))
+            .group_by(Room.room_type)
+            .all()
+        )
+    }
+    db.query(RoomTypeInventory).filter(RoomTypeInventory.room_type.not_in(counts)).update(
+        {"total_rooms": 0, "occupied_rooms": 0}, synchronize_session=False,
+    )
+    for room_type, (total, occupied) in counts.items():
+        db.execute(insert(RoomTypeInventory).values(
+            room_type=room_type, total_rooms=total, occupied_rooms=occupied,
+        ).on_conflict_do_update(
+            index_elements=[RoomTypeInventory.room_type], set_={"total_rooms": total, "occupied_rooms": occupied},
+        ))
+        db.execute(insert(DailyOccupancy).values(
+            day=today, room_type=room_type, bookings=0, cancellations=0, checkouts=0, revenue=0,
+            occupied_rooms=occupied, total_rooms=total,
+        ).on_conflict_do_update(
+            index_elements=[DailyOccupancy.day, DailyOccupancy.room_type],
+            set_={"occupied_rooms": occupied, "total_rooms": total},
+        ))
+
+    # Walk the recorded and missing days in order, carrying each room type's occupancy forward
+    recorded = {
+        (row.day, row.room_type): (row.occupied_rooms, row.total_rooms)
+        for row in db.query(
+            DailyOccupancy.day, DailyOccupancy.room_type, DailyOccupancy.occupied_rooms, DailyOccupancy.total_rooms,
+        ).filter(DailyOccupancy.day < today)
+    }
+    state: Dict[str, tuple] = {}
+    backfilled = 0
+    for key in sorted(set(recorded) | set(activity)):
+        day, room_type = key
+        if key in recorded:
+            state[room_type] = recorded[key]
+            continue
+        count, revenue, cancellations, checkouts = activity[key]
+        occupied, total = state.get(room_type, (0, 0))
+        db.add(DailyOccupancy(
+            day=day, room_type=room_type, bookings=count, cancellations=cancellations, checkouts=checkouts, revenue=revenue,
+            occupied_rooms=occupied, total_rooms=total,
+        ))
+        backfilled += 1
+    db.commit()
+    logger.info("Rollups rebuilt", extra={"room_types": len(counts), "daily_rows": backfilled})
+    return {"room_types": len(counts), "daily_rows": backfilled}
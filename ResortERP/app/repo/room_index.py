@@ -0,0 +1,334 @@
+# app/repo/room_index.py
+#
+# In-process inverted index over room attributes for faceted search.
+#
+# Every room gets a slot number; each facet value (room type, view, amenity,
+# capacity, price bucket, availability) maps to a bitmap of slots, stored as a
+# Python int. A query ANDs/ORs a handful of ints, so filtering thousands of
+# rooms costs microseconds and never touches the database. ResortManager keeps
+# the index current after each committed room change. The index remembers the
+# rooms data version it reflects: versions whose changes it has applied move it
+# forward, and a full rebuild runs on first use, as soon as the resort's
+# current data version is newer (a change it never saw, e.g. from another
+# worker without a shared broker), and at the latest once the index is older
+# than ROOM_INDEX_TTL_SECONDS. Each resort has its own index.
+
+import bisect
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Width of a price bucket; price range filters OR whole buckets and only check
+# exact prices in the boundary buckets.
+PRICE_BUCKET = 25.0
+
+
+@dataclass(frozen=True)
+class IndexedRoom:
+    id: uuid.UUID
+    number: str
+    room_type: str
+    capacity: int
+    view: Optional[str]
+    price: float
+    amenities: Tuple[str, ...]
+    is_booked: bool
+    # Under a live checkout hold; a held room is not available to anyone else
+    is_held: bool = False
+
+    @classmethod
+    def from_model(cls, room) -> "IndexedRoom":
+        return cls(
+            id=room.id,
+            number=room.number,
+            room_type=(room.room_type or "").lower(),
+            capacity=room.capacity or 0,
+            view=room.view.lower() if room.view else None,
+            price=float(room.price or 0),
+            amenities=tuple(sorted({a.lower() for a in (room.amenities or [])})),
+            is_booked=bool(room.is_booked),
+            is_held=bool(getattr(room, "is_held", False)),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": str(self.id),
+            "number": self.number,
+            "room_type": self.room_type,
+            "capacity": self.capacity,
+            "view": self.view,
+            "price": self.price,
+            "amenities": list(self.amenities),
+            "is_booked": self.is_booked,
+            "is_held": self.is_held,
+        }
+
+
+# Set bit positions for every byte value, used to decode bitmaps a byte at a time
+# (shifting or masking a multi-thousand-bit int is O(n) per operation).
+_BYTE_BITS = [tuple(i for i in range(8) if value >> i & 1) for value in range(256)]
+
+
+def _to_bytes(mask: int) -> bytes:
+    return mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+
+
+def _bits(mask: int) -> List[int]:
+    slots: List[int] = []
+    for offset, value in enumerate(_to_bytes(mask)):
+        if value:
+            base = offset << 3
+            for i in _BYTE_BITS[value]:
+                slots.append(base + i)
+    return slots
+
+
+class RoomIndex:
+    """Bitmap index over rooms supporting multi-facet AND/OR filters and price ordering."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots: List[Optional[IndexedRoom]] = []
+        self._slot_by_id: Dict[uuid.UUID, int] = {}
+        self._free: List[int] = []
+        self._all = 0
+        self._available = 0
+        self._by_type: Dict[str, int] = {}
+        self._by_view: Dict[str, int] = {}
+        self._by_amenity: Dict[str, int] = {}
+        self._by_capacity: Dict[int, int] = {}
+        self._by_price_bucket: Dict[int, int] = {}
+        # (price, slot) pairs kept sorted for ordered scans
+        self._price_order: List[Tuple[float, int]] = []
+        self.built_at: Optional[float] = None
+        # Rooms data version the index reflects, and applied versions above it that arrived out of order
+        self.version: Optional[int] = None
+        self._applied: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._slot_by_id)
+
+    # --- Maintenance ---
+
+    def rebuild(self, rooms: Iterable, version: Optional[int] = None) -> None:
+        """
+        Replaces the whole index with `rooms` (ORM Room objects).
+
+        Args:
+            version (int, optional): The rooms data version read before `rooms` were loaded.
+        """
+        fresh = RoomIndex()
+        for room in rooms:
+            fresh._insert(IndexedRoom.from_model(room))
+        fresh.version = version
+        with self._lock:
+            self.__dict__.update({k: v for k, v in fresh.__dict__.items() if k != "_lock"})
+            self.built_at = time.monotonic()
+
+    def applied(self, version: int) -> None:
+        """Records that the changes of rooms data `version` are in the index."""
+        with self._lock:
+            if self.version is None or version <= self.version:
+                return
+            self._applied.add(version)
+            while self.version + 1 in self._applied:
+                self._applied.discard(self.version + 1)
+                self.version += 1
+
+    def upsert(self, room) -> None:
+        """Adds or updates a single room (ORM Room object) in place."""
+        entry = IndexedRoom.from_model(room)
+        with self._lock:
+            slot = self._slot_by_id.get(entry.id)
+            if slot is not None:
+                if self._slots[slot] == entry:
+                    return
+                self._clear(slot)
+            self._insert(entry, slot)
+
+    def remove(self, room_id: uuid.UUID) -> None:
+        with self._lock:
+            slot = self._slot_by_id.pop(room_id, None)
+            if slot is not None:
+                self._clear(slot)
+                self._slots[slot] = None
+                self._free.append(slot)
+
+    def is_stale(self, ttl_seconds: float, version: Optional[int] = None) -> bool:
+        """True if the index was never built, is older than `ttl_seconds`, or is behind data `version`."""
+        if self.built_at is None or time.monotonic() - self.built_at > ttl_seconds:
+            return True
+        return version is not None and (self.version is None or version > self.version)
+
+    def _insert(self, entry: IndexedRoom, slot: Optional[int] = None) -> None:
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self._slots)
+                self._slots.append(None)
+        bit = 1 << slot
+        self._slots[slot] = entry
+        self._slot_by_id[entry.id] = slot
+        self._all |= bit
+        if not entry.is_booked and not entry.is_held:
+            self._available |= bit
+        self._by_type[entry.room_type] = self._by_type.get(entry.room_type, 0) | bit
+        if entry.view:
+            self._by_view[entry.view] = self._by_view.get(entry.view, 0) | bit
+        for amenity in entry.amenities:
+            self._by_amenity[amenity] = self._by_amenity.get(amenity, 0) | bit
+        self._by_capacity[entry.capacity] = self._by_capacity.get(entry.capacity, 0) | bit
+        bucket = int(entry.price // PRICE_BUCKET)
+        self._by_price_bucket[bucket] = self._by_price_bucket.get(bucket, 0) | bit
+        bisect.insort(self._price_order, (entry.price, slot))
+
+    def _clear(self, slot: int) -> None:
+        entry = self._slots[slot]
+        keep = ~(1 << slot)
+        self._all &= keep
+        self._available &= keep
+
+        def drop(mapping: dict, key) -> None:
+            remaining = mapping.get(key, 0) & keep
+            if remaining:
+                mapping[key] = remaining
+            else:
+                mapping.pop(key, None)
+
+        drop(self._by_type, entry.room_type)
+        if entry.view:
+            drop(self._by_view, entry.view)
+        for amenity in entry.amenities:
+            drop(self._by_amenity, amenity)
+        drop(self._by_capacity, entry.capacity)
+        drop(self._by_price_bucket, int(entry.price // PRICE_BUCKET))
+        position = bisect.bisect_left(self._price_order, (entry.price, slot))
+        if position < len(self._price_order) and self._price_order[position] == (entry.price, slot):
+            del self._price_order[position]
+
+    # --- Queries ---
+
+    def _price_mask(self, min_price: Optional[float], max_price: Optional[float]) -> int:
+        low_bucket = int(min_price // PRICE_BUCKET) if min_price is not None else None
+        high_bucket = int(max_price // PRICE_BUCKET) if max_price is not None else None
+        boundaries = {low_bucket, high_bucket} - {None}
+        mask = 0
+        for bucket, bits in self._by_price_bucket.items():
+            if (low_bucket is not None and bucket < low_bucket) or (high_bucket is not None and bucket > high_bucket):
+                continue
+            if bucket not in boundaries:
+                mask |= bits
+        # Rooms of a boundary bucket form a contiguous run of the price-sorted list,
+        # so check exact prices there and set their bits in a bytearray
+        boundary = bytearray((len(self._slots) + 7) // 8)
+        order = self._price_order
+        for bucket in boundaries:
+            bucket_start, bucket_end = bucket * PRICE_BUCKET, (bucket + 1) * PRICE_BUCKET
+            position = bisect.bisect_left(order, (max(bucket_start, min_price if min_price is not None else bucket_start), -1))
+            while position < len(order):
+                price, slot = order[position]
+                if price >= bucket_end or (max_price is not None and price > max_price):
+                    break
+                boundary[slot >> 3] |= 1 << (slot & 7)
+                position += 1
+        return mask | int.from_bytes(boundary, "little")
+
+    def search(
+        self,
+        room_types: Sequence[str] = (),
+        views: Sequence[str] = (),
+        amenities_all: Sequence[str] = (),
+        amenities_any: Sequence[str] = (),
+        min_capacity: Optional[int] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        available_only: bool = True,
+        sort: Optional[str] = "price",
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Tuple[List[IndexedRoom], int]:
+        """
+        Filters rooms. Values within one facet are ORed, different facets are ANDed;
+        `amenities_all` requires every listed amenity, `amenities_any` at least one.
+
+        Args:
+            sort (str, optional): "price", "-price" or None (index order).
+
+        Returns:
+            Tuple[List[IndexedRoom], int]: The requested page of rooms and the total number of matches.
+        """
+        with self._lock:
+            mask = self._available if available_only else self._all
+            if room_types:
+                mask &= self._union(self._by_type, (t.lower() for t in room_types))
+            if views:
+                mask &= self._union(self._by_view, (v.lower() for v in views))
+            for amenity in amenities_all:
+                mask &= self._by_amenity.get(amenity.lower(), 0)
+            if amenities_any:
+                mask &= self._union(self._by_amenity, (a.lower() for a in amenities_any))
+            if min_capacity:
+                mask &= self._union(self._by_capacity, (c for c in self._by_capacity if c >= min_capacity))
+            if mask and (min_price is not None or max_price is not None):
+                mask &= self._price_mask(min_price, max_price)
+
+            total = mask.bit_count()
+            end = None if limit is None else offset + limit
+            if sort in ("price", "-price"):
+                slots = self._ordered_slots(mask, total, descending=sort == "-price", end=end)
+            else:
+                slots = list(_bits(mask))
+            return [self._slots[slot] for slot in slots[offset:end]], total
+
+    @staticmethod
+    def _union(mapping: Dict, keys: Iterable) -> int:
+        mask = 0
+        for key in keys:
+            mask |= mapping.get(key, 0)
+        return mask
+
+    def _ordered_slots(self, mask: int, total: int, descending: bool, end: Optional[int]) -> List[int]:
+        # Either extract and sort every match, or walk the presorted price list and
+        # stop once the page is filled, whichever is expected to touch fewer entries.
+        size = len(self._price_order)
+        expected_walk = size if end is None or not total else min(size, end * size // total)
+        if expected_walk > size // 8 + total:
+            return sorted(_bits(mask), key=lambda s: (self._slots[s].price, s), reverse=descending)
+        order = reversed(self._price_order) if descending else self._price_order
+        members = _to_bytes(mask)
+        member_bytes = len(members)
+        slots = []
+        for _, slot in order:
+            byte = slot >> 3
+            if byte < member_bytes and members[byte] >> (slot & 7) & 1:
+                slots.append(slot)
+                if end is not None and len(slots) >= end:
+                    break
+        return slots
+
+    def facet_counts(self, available_only: bool = True) -> Dict[str, Dict[str, int]]:
+        """Returns the number of rooms per facet value, for building filter UIs."""
+        with self._lock:
+            base = self._available if available_only else self._all
+            return {
+                "room_type": {k: (v & base).bit_count() for k, v in self._by_type.items() if v & base},
+                "view": {k: (v & base).bit_count() for k, v in self._by_view.items() if v & base},
+                "amenities": {k: (v & base).bit_count() for k, v in self._by_amenity.items() if v & base},
+                "capacity": {str(k): (v & base).bit_count() for k, v in sorted(self._by_capacity.items()) if v & base},
+            }
+
+
+# One index per resort, shared by every ResortManager of that resort in this worker
+_indexes: Dict[str, RoomIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def room_index_for(resort_id: str) -> RoomIndex:
+    index = _indexes.get(resort_id)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.setdefault(resort_id, RoomIndex())
+    return index
@@ -0,0 +1,84 @@
+# app/repo/shards.py
+#
+# Upgrade and inspection helpers for resort databases (see ShardRouter in
+# app/config/db.py). Tables created by create_all already have `resort_id`;
+# databases from before multi-resort support get it from migrate_resort_columns.
+# drop_redundant_id_indexes removes the extra `id` indexes of older schemas.
+
+import logging
+from typing import Dict, List
+
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config.db import shard_router
+from app.domain.model.base import Booking, BookingArchive, Room, User
+
+logger = logging.getLogger(__name__)
+
+# Tables whose rows carry the resort they belong to
+TENANT_TABLES = (User, Room, Booking, BookingArchive)
+
+# Created by `index=True` on primary keys before time-ordered keys; each
+# duplicated its table's primary key index and doubled the index writes per insert
+REDUNDANT_ID_INDEXES = ("ix_users_id", "ix_rooms_id", "ix_bookings_id")
+
+
+def migrate_resort_columns(engine: Engine) -> List[str]:
+    """
+    Adds `resort_id` to every tenant table of `engine` that lacks it, filled
+    with the id of the resort that owns the database, in one transaction.
+
+    Returns:
+        List[str]: Tables that were changed.
+    """
+    resort_id = shard_router.resort_for(engine)
+    changed = []
+    with engine.begin() as conn:
+        for model in TENANT_TABLES:
+            table = model.__tablename__
+            if not inspect(conn).has_table(table):
+                continue
+            if "resort_id" in {c["name"] for c in inspect(conn).get_columns(table)}:
+                continue
+            # The literal default backfills existing rows; new rows get the value from the ORM
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN resort_id VARCHAR NOT NULL DEFAULT '{resort_id}'"))
+            if conn.dialect.name == "postgresql":
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN resort_id DROP DEFAULT"))
+            changed.append(table)
+    logger.info("Resort columns migrated", extra={"resort_id": resort_id, "tables": changed})
+    return changed
+
+
+def drop_redundant_id_indexes(engine: Engine) -> List[str]:
+    """
+    Drops the indexes in REDUNDANT_ID_INDEXES that exist in `engine`'s
+    database. Existing keys are left as they are: version 4 and version 7
+    keys share the same columns and indexes.
+
+    Returns:
+        List[str]: Indexes that were dropped.
+    """
+    dropped = []
+    with engine.begin() as conn:
+        for model in (User, Room, Booking):
+            table = model.__tablename__
+            if not inspect(conn).has_table(table):
+                continue
+            existing = {index["name"] for index in inspect(conn).get_indexes(table)}
+            for name in REDUNDANT_ID_INDEXES:
+                if name in existing:
+                    # On a partitioned table this drops the partitions' copies as well
+                    conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+                    dropped.append(name)
+    logger.info("Redundant id indexes dropped", extra={"resort_id": shard_router.resort_for(engine), "indexes": dropped})
+    return dropped
+
+
+def resort_row_counts(db: Session) -> Dict[str, int]:
+    """Rows per tenant table in the session's database."""
+    return {
+        model.__tablename__: db.execute(select(func.count()).select_from(model)).scalar()
+        for model in TENANT_TABLES
+    }
@@ -0,0 +1,25 @@
+# app/repo/upsert.py
+#
+# INSERT ... ON CONFLICT for the dialects the app runs on (PostgreSQL and
+# SQLite). The rollups, the data versions and the idempotency store build
+# their upserts on it.
+
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session):
+    """
+    Returns the dialect-specific `insert` construct of `db`'s database, which
+    supports on_conflict_do_update / on_conflict_do_nothing.
+
+    Raises:
+        NotImplementedError: For dialects other than PostgreSQL and SQLite.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not implemented for the '{dialect}' dialect.")
+    return insert
@@ -0,0 +1,106 @@
+# app/routers/compression.py
+#
+# Negotiated response compression (brotli when the optional `brotli` package
+# is installed, otherwise gzip) for complete JSON/text bodies of at least
+# `minimum_size` bytes. Streaming responses (exports, SSE) and responses that
+# already have a Content-Encoding pass through untouched. A compressed body
+# gets its own strong ETag: "rooms-42" becomes "rooms-42-br".
+
+import gzip
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.observability.metrics import REGISTRY
+
+try:
+    import brotli
+except ImportError:  # optional dependency: pip install 'app[compression]'
+    brotli = None
+
+CODING_SUFFIXES = ("-br", "-gzip")
+
+COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/csv", "application/xml")
+
+COMPRESSION_BYTES = REGISTRY.counter(
+    "http_compression_bytes_total", "Response bytes before (in) and after (out) compression.", ("encoding", "stage"),
+)
+
+
+def negotiate(accept_encoding: str, available) -> Optional[str]:
+    """Picks the coding from `available` (in server preference order) with the highest q-value > 0."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+    best, best_q = None, 0.0
+    for coding in available:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.available = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def compress(self, body: bytes, coding: str) -> bytes:
+        if coding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.available)
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message  # held until the first body chunk shows the response size
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            response_start, start = start, None
+            headers = MutableHeaders(raw=response_start["headers"])
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or content_type not in COMPRESSIBLE_TYPES
+                or len(body) < self.minimum_size
+            ):
+                await send(response_start)
+                await send(message)
+                return
+            headers.add_vary_header("Accept-Encoding")
+            if coding is not None:
+                compressed = self.compress(body, coding)
+                if len(compressed) < len(body):
+                    COMPRESSION_BYTES.inc((coding, "in"), len(body))
+                    COMPRESSION_BYTES.inc((coding, "out"), len(compressed))
+                    body = compressed
+                    headers["Content-Encoding"] = coding
+                    headers["Content-Length"] = str(len(body))
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/") and etag.endswith('"'):
+                        headers["ETag"] = f'{etag[:-1]}-{coding}"'
+            await send(response_start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
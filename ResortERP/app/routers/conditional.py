@@ -0,0 +1,54 @@
+# app/routers/conditional.py
+#
+# Conditional GET for listing endpoints. The ETag is derived from the data
+# version (see app/repo/data_version.py), so checking If-None-Match costs a
+# dictionary lookup and an unchanged poll gets a bodiless 304.
+
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.config.env import get_settings
+from app.repo.data_version import data_versions
+from app.routers.compression import CODING_SUFFIXES
+
+# Clients may cache but must revalidate before reuse
+CACHE_CONTROL = "no-cache"
+
+
+def data_etag(resort_id: str, name: str) -> str:
+    """Strong ETag for the current version of a resort's data set `name`, e.g. "rooms-main-42"."""
+    version = data_versions.current(resort_id, name, get_settings().DATA_VERSION_TTL_SECONDS)
+    return f'"{name}-{resort_id}-{version}"'
+
+
+def _matching(if_none_match: str, etag: str) -> Optional[str]:
+    """Returns the validator from If-None-Match that matches `etag`, as the client sent it."""
+    if if_none_match.strip() == "*":
+        return etag
+    for raw in if_none_match.split(","):
+        raw = raw.strip()
+        candidate = raw[2:] if raw.startswith("W/") else raw
+        # The compression middleware tags encoded bodies "<etag>-gzip"/"-br"
+        for suffix in CODING_SUFFIXES:
+            if candidate.endswith(f'{suffix}"'):
+                candidate = candidate[: -len(suffix) - 1] + '"'
+                break
+        if candidate == etag:
+            return raw
+    return None
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Returns a 304 response if the request's If-None-Match matches `etag`.
+    Otherwise sets the ETag and Cache-Control headers on `response` and
+    returns None, and the endpoint builds its body as usual.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    matched = _matching(if_none_match, etag) if if_none_match else None
+    if matched is not None:
+        # Echo the validator the client holds (it may carry a content-coding suffix)
+        return Response(status_code=304, headers={"ETag": matched, "Cache-Control": CACHE_CONTROL})
+    response.headers.update({"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
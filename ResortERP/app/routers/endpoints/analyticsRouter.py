@@ -0,0 +1,46 @@
+import logging
+from datetime import date, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends
+from app.repo.base import ResortManager, getResortManager
+from app.domain.schema.base import OccupancyDay, RoomTypeOccupancy
+
+logger = logging.getLogger(__name__)
+
+analytics_router = APIRouter(prefix="/analytics")
+
+
+@analytics_router.get("/occupancy", response_model=List[OccupancyDay])
+async def occupancy_endpoint(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    room_type: Optional[str] = None,
+    resort_manager: ResortManager = Depends(getResortManager)
+):
+    """
+    Endpoint returning daily occupancy, bookings, cancellations and revenue
+    (default: the last 30 days), optionally for a single room type.
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=29)
+    try:
+        return resort_manager.occupancy_report(start=start, end=end, room_type=room_type)
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.exception("Error building occupancy report")
+        raise HTTPException(status_code=500, detail="Internal server error while building occupancy report.")
+
+
+@analytics_router.get("/room-types", response_model=List[RoomTypeOccupancy])
+async def room_type_occupancy_endpoint(
+    resort_manager: ResortManager = Depends(getResortManager)
+):
+    """
+    Endpoint returning current occupancy per room type.
+    """
+    try:
+        return resort_manager.room_type_occupancy()
+    except Exception as e:
+        logger.exception("Error getting room type occupancy")
+        raise HTTPException(status_code=500, detail="Internal server error while getting room type occupancy.")
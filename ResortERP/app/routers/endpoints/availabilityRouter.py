@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from fastapi import APIRouter, Depends, WebSocket, status
+from fastapi.responses import StreamingResponse
+from app.config.db import shard_router
+from app.realtime import availability_hub
+from app.repo.base import get_resort_id
+
+logger = logging.getLogger(__name__)
+
+availability_router = APIRouter()
+
+# Idle SSE streams send a comment this often so proxies keep them open
+SSE_HEARTBEAT_SECONDS = 20.0
+
+
+@availability_router.websocket("/ws/rooms/availability")
+async def availability_websocket(websocket: WebSocket):
+    """
+    Pushes a snapshot of the available rooms on connect, then one message per room change,
+    for the resort given by ?resort_id= (default resort otherwise).
+    """
+    resort_id = websocket.query_params.get("resort_id") or shard_router.default
+    if resort_id not in shard_router:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=f"Unknown resort '{resort_id}'.")
+        return
+    await websocket.accept()
+    subscriber = availability_hub.subscribe(resort_id)
+
+    async def push():
+        async for message in availability_hub.messages(subscriber):
+            await websocket.send_text(message)
+
+    sender = asyncio.create_task(push())
+    try:
+        # Clients only listen; reading is how a disconnect of an idle client is noticed
+        while not sender.done():
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    finally:
+        sender.cancel()
+        availability_hub.unsubscribe(subscriber)
+
+
+@availability_router.get("/rooms/availability/stream")
+async def availability_stream(resort_id: str = Depends(get_resort_id)):
+    """
+    Server-Sent Events variant of the availability feed, for clients that cannot use WebSockets.
+    """
+    subscriber = availability_hub.subscribe(resort_id)
+
+    async def events():
+        try:
+            async for message in availability_hub.messages(subscriber, heartbeat=SSE_HEARTBEAT_SECONDS):
+                yield f"data: {message}\n\n" if message is not None else ": keep-alive\n\n"
+        finally:
+            availability_hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
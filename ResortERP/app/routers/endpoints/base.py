@@ -1,14 +1,22 @@
 # app/routers/your_router_file.py
 
-from fastapi import APIRouter, HTTPException, Depends
+import logging
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 # Removed Session import as it's no longer directly injected here
 from uuid import UUID
-from typing import List
+from typing import List, Optional
 
 # Import the manager and the dependency function
 from app.repo.base import ResortManager, getResortManager # <--- Import dependency
+from app.domain.model.base import as_utc
 # Import your schemas
-from app.domain.schema.base import UserSchema, RoomSchema # Adjust import path
+from app.domain.schema.base import UserSchema, RoomSchema, RoomSearchResponse, GroupBookingRequest, GroupBookingResponse, RoomHoldResponse # Adjust import path
+from app.routers.conditional import data_etag, not_modified
+from app.repo.data_version import ROOMS
+from app.repo.read_models import ROOM_FIELDS
+from app.routers.fast_json import FastJSONResponse, rows_to_json
+
+logger = logging.getLogger(__name__)
 
 base_router = APIRouter()
 
@@ -30,7 +38,7 @@ async def create_room_endpoint(
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error creating room: {e}")
+        logger.exception("Error creating room")
         raise HTTPException(status_code=500, detail="Internal server error while creating room.")
 
 
@@ -52,27 +60,85 @@ async def create_user_endpoint(
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error creating user: {e}")
+        logger.exception("Error creating user")
         raise HTTPException(status_code=500, detail="Internal server error while creating user.")
 
 
 # Example: Get available rooms
 @base_router.get("/rooms/available", response_model=List[RoomSchema])
 async def get_available_rooms_endpoint(
+    request: Request,
+    response: Response,
     # Only depend on getResortManager
     resort_manager: ResortManager = Depends(getResortManager) # <--- Correct dependency
 ):
     """
     Endpoint to get available rooms using injected ResortManager.
+    Answers 304 Not Modified, without a database query, if rooms are unchanged since the client's ETag.
+    The rooms are read as column tuples and serialized without per-row RoomSchema validation.
     """
     try:
-        # Call manager method directly
-        available_rooms = resort_manager.get_available_rooms() # <--- No db passed
-        return available_rooms
+        unchanged = not_modified(request, response, data_etag(resort_manager.resort_id, ROOMS))
+        if unchanged is not None:
+            return unchanged
+        rows = resort_manager.get_available_room_rows(ROOM_FIELDS)
+        # A returned Response bypasses `response`, so carry its ETag over
+        return FastJSONResponse(raw=rows_to_json(ROOM_FIELDS, rows), headers=response.headers)
     except Exception as e:
-        print(f"Error getting available rooms: {e}")
+        logger.exception("Error getting available rooms")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# Faceted room search, e.g. /rooms/search?view=ocean&min_capacity=4&max_price=200&sort=price
+@base_router.get("/rooms/search", response_model=RoomSearchResponse)
+async def search_rooms_endpoint(
+    request: Request,
+    response: Response,
+    room_type: List[str] = Query(default=[], description="Room types to include (any of)."),
+    view: List[str] = Query(default=[], description="Views to include (any of)."),
+    amenity: List[str] = Query(default=[], description="Amenities the room must all have."),
+    amenity_any: List[str] = Query(default=[], description="Amenities of which the room needs at least one."),
+    min_capacity: Optional[int] = Query(default=None, ge=1),
+    min_price: Optional[float] = Query(default=None, ge=0),
+    max_price: Optional[float] = Query(default=None, ge=0),
+    include_booked: bool = False,
+    sort: Optional[str] = Query(default="price", description="'price', '-price' or empty for no ordering."),
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    facets: bool = Query(default=False, description="Also return room counts per facet value."),
+    resort_manager: ResortManager = Depends(getResortManager)
+):
+    """
+    Endpoint to search rooms by type, view, amenities, capacity and price using the in-memory room index.
+    Supports conditional GET like /rooms/available.
+    """
+    try:
+        unchanged = not_modified(request, response, data_etag(resort_manager.resort_id, ROOMS))
+        if unchanged is not None:
+            return unchanged
+        rooms, total = resort_manager.search_rooms(
+            room_types=room_type,
+            views=view,
+            amenities_all=amenity,
+            amenities_any=amenity_any,
+            min_capacity=min_capacity,
+            min_price=min_price,
+            max_price=max_price,
+            available_only=not include_booked,
+            sort=sort or None,
+            limit=limit,
+            offset=offset,
+        )
+        return {
+            "total": total,
+            "rooms": [room.to_dict() for room in rooms],
+            "facets": resort_manager.room_facets(available_only=not include_booked) if facets else None,
+        }
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.exception("Error searching rooms")
+        raise HTTPException(status_code=500, detail="Internal server error while searching rooms.")
+
 # --- Update ALL other endpoints similarly ---
 # Example: Book a room (assuming you have endpoint parameters for user_id, room_id)
 @base_router.post("/booking/user/{user_id}/room/{room_id}") # Assuming BookingSchema exists
@@ -88,5 +154,80 @@ async def book_room_endpoint(
      except HTTPException as http_exc:
         raise http_exc
      except Exception as e:
-        print(f"Error booking room: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error while booking room.")
\ No newline at end of file
+        logger.exception("Error booking room")
+        raise HTTPException(status_code=500, detail="Internal server error while booking room.")
+
+
+# Book a block of rooms for one user, all or nothing (e.g. a wedding or conference block)
+@base_router.post("/booking/user/{user_id}/rooms", response_model=GroupBookingResponse)
+async def book_rooms_endpoint(
+    user_id: UUID,
+    request: GroupBookingRequest,
+    resort_manager: ResortManager = Depends(getResortManager)
+):
+    """
+    Endpoint to book several rooms in one transaction: either every room is booked or none is.
+    Answers 404 if the user or a room does not exist and 409 if a room is already booked.
+    """
+    try:
+        bookings = resort_manager.book_rooms(user_id=user_id, room_ids=request.room_ids)
+        rooms = {room.id: room for room in (booking.room for booking in bookings)}
+        return {
+            "user_id": user_id,
+            "resort_id": resort_manager.resort_id,
+            "booking_date": bookings[0].booking_date,
+            "total_price": sum(float(room.price or 0) for room in rooms.values()),
+            "bookings": [
+                {"id": b.id, "room_id": b.room_id, "room_number": rooms[b.room_id].number, "price": rooms[b.room_id].price}
+                for b in bookings
+            ],
+        }
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.exception("Error booking rooms")
+        raise HTTPException(status_code=500, detail="Internal server error while booking rooms.")
+
+
+# Hold a room for a user while they check out; booking it converts the hold
+@base_router.post("/hold/user/{user_id}/room/{room_id}", response_model=RoomHoldResponse)
+async def hold_room_endpoint(
+    user_id: UUID,
+    room_id: UUID,
+    ttl_seconds: Optional[float] = Query(default=None, gt=0, description="Hold duration; ROOM_HOLD_TTL_SECONDS by default."),
+    resort_manager: ResortManager = Depends(getResortManager)
+):
+    """
+    Endpoint to hold a room: until the hold expires nobody else can hold or book it and it is not listed as available.
+    Holding it again renews the user's hold. Answers 409 if the room is booked or held for another user.
+    """
+    try:
+        room = resort_manager.hold_room(user_id=user_id, room_id=room_id, ttl_seconds=ttl_seconds)
+        return {
+            "room_id": room.id,
+            "room_number": room.number,
+            "user_id": user_id,
+            "resort_id": resort_manager.resort_id,
+            "held_until": as_utc(room.held_until),
+        }
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.exception("Error holding room")
+        raise HTTPException(status_code=500, detail="Internal server error while holding room.")
+
+# Release a user's hold, e.g. when they leave checkout
+@base_router.delete("/hold/user/{user_id}/room/{room_id}", status_code=204)
+async def release_hold_endpoint(
+    user_id: UUID,
+    room_id: UUID,
+    resort_manager: ResortManager = Depends(getResortManager)
+):
+    try:
+        resort_manager.release_hold(user_id=user_id, room_id=room_id)
+        return Response(status_code=204)
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.exception("Error releasing room hold")
+        raise HTTPException(status_code=500, detail="Internal server error while releasing room hold.")
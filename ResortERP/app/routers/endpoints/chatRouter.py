@@ -1,9 +1,36 @@
+import asyncio
+import time
+from functools import lru_cache
 from fastapi import APIRouter, HTTPException
-from app.agents.root_agent import initialize_agent
 from pydantic import BaseModel
+from app.observability.metrics import CHAT_TURNS
 chat_router = APIRouter()
 CHATSESSION = None
 
+
+@lru_cache(maxsize=1)
+def load_agent_factory():
+    """
+    Imports the agent stack (google.adk, google.genai, calendar client) on first use.
+
+    Importing app.agents.root_agent is by far the most expensive part of starting
+    the app, so it is deferred until a chat session is initialized or warmup runs.
+
+    Returns:
+        Callable: The initialize_agent coroutine function.
+    """
+    from app.agents.root_agent import initialize_agent
+    return initialize_agent
+
+
+def warmup_agents():
+    """
+    Pre-imports the agent stack so the first /initialize-chat does not pay for it.
+    Safe to call from a worker thread.
+    """
+    load_agent_factory()
+
+
 @chat_router.post("/initialize-chat")
 async def initialize_chat(user_id: str):
     global CHATSESSION
@@ -11,7 +38,9 @@ async def initialize_chat(user_id: str):
     Endpoint to initialize a chat session for a user.
     """
     try:
-        # Initialize the chat session
+        # Initialize the chat session. The first call imports the agent stack;
+        # do that in a worker thread so other requests keep being served meanwhile.
+        initialize_agent = await asyncio.to_thread(load_agent_factory)
         CHATSESSION = await initialize_agent(user_id=user_id)
         if CHATSESSION is None:
             raise HTTPException(status_code=500, detail="Failed to initialize chat session")
@@ -35,12 +64,17 @@ async def chat(request: MessageRequest):
     if CHATSESSION is None:
         raise HTTPException(status_code=400, detail="Chat session not initialized")
     
+    started = time.perf_counter()
+    outcome = "error"
     try:
         # Send the message to the chat session
         response = await CHATSESSION.call_agent_async(request.message)
         if response is None:
             raise HTTPException(status_code=500, detail="Failed to get response from chat session")
+        outcome = "success"
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in chat session: {str(e)}")
+    finally:
+        CHAT_TURNS.observe(time.perf_counter() - started, (outcome,))
 
-    return {"response": response}
\ No newline at end of file
+    return {"response": response}
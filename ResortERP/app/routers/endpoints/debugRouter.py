@@ -0,0 +1,70 @@
+import json
+import os
+import re
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import FileResponse
+from app.config.env import get_settings
+from app.observability.profiling import summaries_by_age, token_matches
+
+debug_router = APIRouter(prefix="/debug", include_in_schema=False)
+
+PROFILE_ID = re.compile(r"^[0-9T]{15}-[0-9a-f]{8}$")
+
+
+def _profiles_dir(x_profile: Optional[str]) -> str:
+    settings = get_settings()
+    if not settings.PROFILING_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token_matches(x_profile, settings.PROFILING_TOKEN):
+        raise HTTPException(status_code=403, detail="A valid X-Profile token is required.")
+    return settings.PROFILING_DIR
+
+
+def _summary_path(directory: str, profile_id: str) -> str:
+    path = os.path.join(directory, f"{profile_id}.json")
+    if not PROFILE_ID.match(profile_id) or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"Profile '{profile_id}' not found.")
+    return path
+
+
+@debug_router.get("/profiles")
+async def list_profiles_endpoint(x_profile: Optional[str] = Header(default=None)):
+    """
+    Endpoint listing stored request profiles, newest first.
+    """
+    directory = _profiles_dir(x_profile)
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in reversed(summaries_by_age(directory)):
+        with open(os.path.join(directory, name)) as summary_file:
+            summary = json.load(summary_file)
+        summary.pop("top", None)
+        summary["db"].pop("log", None)
+        profiles.append(summary)
+    return profiles
+
+
+@debug_router.get("/profiles/{profile_id}")
+async def get_profile_endpoint(profile_id: str, x_profile: Optional[str] = Header(default=None)):
+    """
+    Endpoint returning one profile: timings, top frames/functions and the SQL statements issued.
+    """
+    with open(_summary_path(_profiles_dir(x_profile), profile_id)) as summary_file:
+        return json.load(summary_file)
+
+
+@debug_router.get("/profiles/{profile_id}/download")
+async def download_profile_endpoint(profile_id: str, x_profile: Optional[str] = Header(default=None)):
+    """
+    Endpoint downloading the raw profile: collapsed stacks (.folded, for speedscope or
+    flamegraph.pl) in wall mode, or a pstats file (.prof, for snakeviz) in cpu mode.
+    """
+    directory = _profiles_dir(x_profile)
+    _summary_path(directory, profile_id)
+    for suffix in (".folded", ".prof"):
+        path = os.path.join(directory, profile_id + suffix)
+        if os.path.exists(path):
+            return FileResponse(path, filename=profile_id + suffix, media_type="application/octet-stream")
+    raise HTTPException(status_code=404, detail=f"Profile '{profile_id}' has no raw data.")
@@ -0,0 +1,53 @@
+import logging
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.config.db import shard_router
+from app.repo.base import get_resort_id
+from app.repo.export import EXPORT_FORMATS, EXPORT_TABLES, DEFAULT_BATCH_SIZE, stream_export
+
+logger = logging.getLogger(__name__)
+
+export_router = APIRouter(prefix="/export")
+
+
+@export_router.get("/{table_name}")
+def export_endpoint(
+    table_name: str,
+    format: str = Query(default="csv", description="'csv' or 'parquet'."),
+    batch_size: int = Query(default=DEFAULT_BATCH_SIZE, ge=100, le=100_000),
+    include_archived: bool = Query(default=True, description="Also export archived bookings."),
+    resort_id: str = Depends(get_resort_id),
+):
+    """
+    Endpoint streaming one resort's full 'bookings' or 'rooms' table as CSV or Parquet.
+    """
+    if table_name not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown export table '{table_name}'.")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=422, detail=f"Unsupported export format '{format}'.")
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Parquet export is not available (pyarrow is not installed).")
+
+    def body():
+        # The session lives as long as the stream, independent of request-scoped dependencies
+        db = shard_router.session(resort_id)
+        try:
+            yield from stream_export(
+                db, table_name, export_format=format, batch_size=batch_size, include_archived=include_archived,
+            )
+        except Exception:
+            logger.exception("Export failed", extra={"resort_id": resort_id, "table": table_name, "format": format})
+            raise
+        finally:
+            db.close()
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{resort_id}-{table_name}-{stamp}.{format}"'},
+    )
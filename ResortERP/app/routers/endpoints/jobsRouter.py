@@ -0,0 +1,55 @@
+import logging
+from typing import List, Optional
+from uuid import UUID
+from fastapi import APIRouter, HTTPException, Depends, Query
+from app.repo.base import ResortManager, getResortManager
+from app.domain.schema.base import JobSchema, JobRequest
+
+logger = logging.getLogger(__name__)
+
+jobs_router = APIRouter(prefix="/jobs")
+
+
+@jobs_router.get("", response_model=List[JobSchema])
+async def list_jobs_endpoint(
+    status: Optional[str] = Query(default=None, description="queued, running, succeeded or dead"),
+    kind: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    resort_manager: ResortManager = Depends(getResortManager)
+):
+    """
+    Endpoint listing the most recent background jobs, optionally filtered by status and kind.
+    """
+    return resort_manager.list_jobs(status=status, kind=kind, limit=limit)
+
+
+@jobs_router.get("/{job_id}", response_model=JobSchema)
+async def get_job_endpoint(job_id: UUID, resort_manager: ResortManager = Depends(getResortManager)):
+    """
+    Endpoint returning the status of one background job.
+    """
+    return resort_manager.get_job(job_id)
+
+
+@jobs_router.post("", response_model=JobSchema, status_code=202)
+async def enqueue_job_endpoint(request: JobRequest, resort_manager: ResortManager = Depends(getResortManager)):
+    """
+    Endpoint enqueuing a background job of a registered kind (e.g. 'bookings.maintenance').
+    """
+    try:
+        return resort_manager.enqueue_job(
+            request.kind, request.payload, idempotency_key=request.idempotency_key, delay_seconds=request.delay_seconds,
+        )
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.exception("Error enqueuing job")
+        raise HTTPException(status_code=500, detail="Internal server error while enqueuing job.")
+
+
+@jobs_router.post("/{job_id}/retry", response_model=JobSchema)
+async def retry_job_endpoint(job_id: UUID, resort_manager: ResortManager = Depends(getResortManager)):
+    """
+    Endpoint requeuing a dead job with a fresh set of attempts.
+    """
+    return resort_manager.retry_job(job_id)
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from app.config.db import shard_router
+from app.repo.base import fan_out_resorts, search_all_resorts
+from app.domain.schema.base import ResortRoomSearchResponse, GuestBookingsResponse
+
+logger = logging.getLogger(__name__)
+
+resorts_router = APIRouter(prefix="/resorts")
+
+
+def _resort_ids(resort: List[str]) -> Optional[List[str]]:
+    for resort_id in resort:
+        if resort_id not in shard_router:
+            raise HTTPException(status_code=404, detail=f"Resort '{resort_id}' not found.")
+    return resort or None
+
+
+@resorts_router.get("")
+async def list_resorts_endpoint():
+    """
+    Endpoint listing the resorts (properties) this deployment serves.
+    """
+    return {"default": shard_router.default, "resorts": shard_router.resort_ids()}
+
+
+# Room search across resorts, e.g. /resorts/rooms/search?view=ocean&max_price=200
+@resorts_router.get("/rooms/search", response_model=ResortRoomSearchResponse)
+async def search_all_resorts_endpoint(
+    resort: List[str] = Query(default=[], description="Resorts to search (any of); all by default."),
+    room_type: List[str] = Query(default=[], description="Room types to include (any of)."),
+    view: List[str] = Query(default=[], description="Views to include (any of)."),
+    amenity: List[str] = Query(default=[], description="Amenities the room must all have."),
+    min_capacity: Optional[int] = Query(default=None, ge=1),
+    min_price: Optional[float] = Query(default=None, ge=0),
+    max_price: Optional[float] = Query(default=None, ge=0),
+    include_booked: bool = False,
+    sort: Optional[str] = Query(default="price", description="'price', '-price' or empty for no ordering."),
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+):
+    """
+    Endpoint searching rooms of several resorts concurrently and merging the results by price.
+    """
+    try:
+        return await asyncio.to_thread(
+            search_all_resorts,
+            resort_ids=_resort_ids(resort),
+            sort=sort or None,
+            limit=limit,
+            offset=offset,
+            room_types=room_type,
+            views=view,
+            amenities_all=amenity,
+            min_capacity=min_capacity,
+            min_price=min_price,
+            max_price=max_price,
+            available_only=not include_booked,
+        )
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.exception("Error searching rooms across resorts")
+        raise HTTPException(status_code=500, detail="Internal server error while searching rooms.")
+
+
+@resorts_router.get("/guests/{email}/bookings", response_model=GuestBookingsResponse)
+async def guest_bookings_endpoint(email: str, since: Optional[datetime] = None):
+    """
+    Endpoint listing a guest's live bookings at every resort, newest first.
+    Guests are matched by email, since each resort keeps its own user records.
+    """
+    try:
+        results, errors = await asyncio.to_thread(
+            fan_out_resorts, lambda manager: manager.get_bookings_by_email(email, since=since),
+        )
+        bookings = [
+            {
+                "resort_id": resort_id,
+                "id": booking.id,
+                "user_id": booking.user_id,
+                "room_id": booking.room_id,
+                "room_number": booking.room.number if booking.room else None,
+                "booking_date": booking.booking_date,
+            }
+            for resort_id, found in results.items() if found is not None
+            for booking in found[1]
+        ]
+        bookings.sort(key=lambda booking: booking["booking_date"], reverse=True)
+        return {"email": email, "bookings": bookings, "unavailable": sorted(errors)}
+    except Exception as e:
+        logger.exception("Error listing guest bookings across resorts")
+        raise HTTPException(status_code=500, detail="Internal server error while listing bookings.")
@@ -0,0 +1,83 @@
+# app/routers/fast_json.py
+#
+# JSON responses that skip FastAPI's per-row model validation, for listings
+# built from read models (app/repo/read_models.py). A route that returns a
+# `response_model` has every item validated by Pydantic before it is
+# serialized. For rows that come straight from typed columns, that check
+# costs more than the query. These routes keep `response_model` for the
+# OpenAPI schema, but they return a FastJSONResponse, which FastAPI sends
+# as it is.
+#
+# orjson is used when the optional `orjson` package is installed; otherwise
+# the standard json module produces the same document.
+
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional dependency: pip install 'app[json]'
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    # Types that orjson handles natively but the json module does not
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+def dumps(content: Any) -> bytes:
+    """Serializes `content` to compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def rows_to_json(fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+    """
+    Serializes column tuples to a JSON array of objects keyed by `fields`.
+
+    Args:
+        fields (Sequence[str]): The key of each column, in column order.
+        rows (Iterable[Sequence[Any]]): Tuples of column values, e.g. read model rows.
+
+    Returns:
+        bytes: The JSON array.
+    """
+    return dumps([dict(zip(fields, row)) for row in rows])
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any = None,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        raw: Optional[bytes] = None,
+    ):
+        """
+        Args:
+            content: A JSON-serializable value; ignored when `raw` is given.
+            status_code (int): The response status.
+            headers: Extra headers, e.g. the injected `response.headers` holding the ETag.
+            raw (bytes, optional): An already serialized body, e.g. from rows_to_json.
+        """
+        super().__init__(raw if raw is not None else dumps(content), status_code=status_code, headers=headers)
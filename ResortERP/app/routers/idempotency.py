@@ -0,0 +1,329 @@
+# app/routers/idempotency.py
+#
+# Idempotency-Key support for unsafe requests (POST, PUT, PATCH, DELETE), e.g.
+# the booking, room and user creation endpoints that clients retry after a
+# timeout.
+#
+# The first request with a key runs as usual. Its response is stored and
+# replayed for every retry until the key expires (IDEMPOTENCY_TTL_SECONDS).
+# The replay carries `Idempotent-Replayed: true` and does not run the endpoint,
+# so the booking tables are not touched again. Concurrent duplicates are
+# coalesced into one run:
+#   - in this worker, duplicates wait for the first request and then replay its response;
+#   - across workers, the key row in the resort's database (app/repo/idempotency.py)
+#     admits one request, and the others poll it until the response is stored.
+#     The worker running the request renews its claim every third of the lease,
+#     so a slow request is not taken over and run twice; a claim expires only
+#     when its worker dies.
+#
+# Responses are kept in two places. An in-process cache of the latest
+# IDEMPOTENCY_CACHE_ENTRIES responses answers most retries from memory. The
+# database copy answers retries that reach another worker or a restarted one.
+# Responses with status 500 or above are not stored, so a retry runs the
+# request again. A response larger than MAX_STORED_BODY is recorded as done
+# without its body: a retry gets 409 instead of running the request again.
+# Reusing a key for a different request (another path, query or body) gets 422,
+# also while the first request is still running.
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, QueryParams
+
+from app.config.db import shard_router
+from app.observability.metrics import REGISTRY
+from app.repo import idempotency
+
+logger = logging.getLogger(__name__)
+
+HEADER = "idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+UNSAFE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+# Clients typically send a UUID; anything printable up to 255 characters is accepted
+KEY_PATTERN = re.compile(r"^[\x21-\x7e]{1,255}$")
+MAX_STORED_BODY = 1024 * 1024
+# Expired keys are deleted from a resort database at most this often per worker
+PURGE_INTERVAL_SECONDS = 60.0
+
+IDEMPOTENCY_REQUESTS = REGISTRY.counter(
+    "idempotency_requests_total",
+    "Requests with an Idempotency-Key, by outcome "
+    "(executed, replayed, coalesced, in_progress, mismatch, not_stored, invalid).",
+    ("outcome",),
+)
+
+
+class StoredResponse:
+    __slots__ = ("fingerprint", "status_code", "content_type", "body", "expires_at")
+
+    def __init__(self, fingerprint: bytes, status_code: int, content_type: Optional[str], body: Optional[bytes], expires_at: float):
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.content_type = content_type
+        self.body = body  # None: the request completed, but its response was too large to keep
+        self.expires_at = expires_at  # time.monotonic()
+
+
+class ResponseCache:
+    """
+    The latest `max_entries` stored responses of this worker, each until
+    `ttl_seconds` after it was stored. Every entry has the same TTL, so
+    insertion order is expiry order and expired entries are dropped from the front.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], StoredResponse]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple[str, str]) -> Optional[StoredResponse]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            return None
+        return entry
+
+    def put(self, key: Tuple[str, str], entry: StoredResponse) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        now = time.monotonic()
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+
+
+def fingerprint(method: str, path: str, query_string: bytes, body: bytes) -> bytes:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query_string, body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.digest()
+
+
+def _remaining_seconds(row) -> float:
+    # SQLite returns naive UTC datetimes
+    expires_at = row.expires_at if row.expires_at.tzinfo else row.expires_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (expires_at - datetime.now(timezone.utc)).total_seconds())
+
+
+async def _send_json(send, status_code: int, detail: str, headers=()) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app, ttl_seconds: float = 86400.0, lease_seconds: float = 60.0, cache_entries: int = 10000):
+        self.app = app
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self.cache = ResponseCache(cache_entries, ttl_seconds)
+        # Requests running in this worker: their completion future and fingerprint
+        self._inflight: Dict[Tuple[str, str], Tuple[asyncio.Future, bytes]] = {}
+        self._purged_at: Dict[str, float] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in UNSAFE_METHODS:
+            return await self.app(scope, receive, send)
+        key = Headers(scope=scope).get(HEADER)
+        if key is None:
+            return await self.app(scope, receive, send)
+        if not KEY_PATTERN.match(key):
+            IDEMPOTENCY_REQUESTS.inc(("invalid",))
+            return await _send_json(send, 400, "Idempotency-Key must be 1-255 printable ASCII characters.")
+        resort_id = QueryParams(scope["query_string"]).get("resort_id") or shard_router.default
+        if resort_id not in shard_router:
+            return await self.app(scope, receive, send)  # the endpoint answers 404
+
+        # The body is part of the fingerprint; the endpoint gets it from the buffer
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        request_fingerprint = fingerprint(scope["method"], scope["path"], scope["query_string"], body)
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        cache_key = (resort_id, key)
+        coalesced = False
+        while True:
+            stored = self.cache.get(cache_key)
+            if stored is not None:
+                return await self._replay(stored, request_fingerprint, send, "coalesced" if coalesced else "replayed")
+            inflight = self._inflight.get(cache_key)
+            if inflight is None:
+                break
+            running, running_fingerprint = inflight
+            if running_fingerprint != request_fingerprint:
+                return await self._mismatch(send)
+            # The same request is running in this worker
+            coalesced = True
+            await asyncio.shield(running)
+
+        done = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = (done, request_fingerprint)
+        try:
+            await self._run_once(scope, replay_receive, send, resort_id, key, request_fingerprint)
+        finally:
+            del self._inflight[cache_key]
+            done.set_result(None)
+
+    async def _run_once(self, scope, receive, send, resort_id: str, key: str, request_fingerprint: bytes) -> None:
+        deadline = time.monotonic() + self.lease_seconds
+        delay = 0.02
+        while True:
+            row = await asyncio.to_thread(self._claim, resort_id, key, request_fingerprint.hex())
+            if row is None or row.status_code is not None:
+                break
+            if bytes.fromhex(row.fingerprint) != request_fingerprint:
+                return await self._mismatch(send)
+            # Another worker runs this key; its response is stored when it finishes
+            if time.monotonic() >= deadline:
+                IDEMPOTENCY_REQUESTS.inc(("in_progress",))
+                return await _send_json(
+                    send, 409, "A request with this Idempotency-Key is still being processed.", [(b"retry-after", b"1")],
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+        if row is not None:
+            stored = StoredResponse(
+                bytes.fromhex(row.fingerprint), row.status_code, row.content_type, row.body,
+                time.monotonic() + _remaining_seconds(row),
+            )
+            self.cache.put((resort_id, key), stored)
+            return await self._replay(stored, request_fingerprint, send, "replayed")
+
+        status_code, content_type, chunks, size = None, None, [], 0
+
+        async def capture(message):
+            nonlocal status_code, content_type, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = Headers(raw=message["headers"]).get("content-type")
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+                if size <= MAX_STORED_BODY:
+                    chunks.append(message.get("body", b""))
+            await send(message)
+
+        heartbeat = asyncio.create_task(self._heartbeat(resort_id, key, request_fingerprint.hex()))
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException:
+            heartbeat.cancel()
+            await asyncio.to_thread(self._release, resort_id, key)
+            raise
+        heartbeat.cancel()
+        IDEMPOTENCY_REQUESTS.inc(("executed",))
+        if status_code is None or status_code >= 500:
+            await asyncio.to_thread(self._release, resort_id, key)
+            return
+        # A response too large to keep is still recorded, so a retry does not run the request again
+        body = b"".join(chunks) if size <= MAX_STORED_BODY else None
+        try:
+            await asyncio.to_thread(self._complete, resort_id, key, status_code, content_type, body)
+        except Exception:
+            # The response was sent; other workers see the claim as running until its lease ends
+            logger.exception("Failed to store idempotent response", extra={"resort_id": resort_id})
+        self.cache.put(
+            (resort_id, key),
+            StoredResponse(request_fingerprint, status_code, content_type, body, time.monotonic() + self.ttl_seconds),
+        )
+
+    async def _heartbeat(self, resort_id: str, key: str, fingerprint_hex: str) -> None:
+        # Keeps the claim of a running request, so other workers keep waiting for its response
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                renewed = await asyncio.to_thread(self._renew, resort_id, key, fingerprint_hex)
+            except Exception:
+                logger.exception("Failed to renew idempotency key", extra={"resort_id": resort_id})
+                continue
+            if not renewed:
+                logger.warning("Idempotency key claim lost while the request runs", extra={"resort_id": resort_id})
+                return
+
+    async def _mismatch(self, send) -> None:
+        IDEMPOTENCY_REQUESTS.inc(("mismatch",))
+        await _send_json(send, 422, "This Idempotency-Key was already used for a different request.")
+
+    async def _replay(self, stored: StoredResponse, request_fingerprint: bytes, send, outcome: str) -> None:
+        if stored.fingerprint != request_fingerprint:
+            return await self._mismatch(send)
+        if stored.body is None:
+            IDEMPOTENCY_REQUESTS.inc(("not_stored",))
+            return await _send_json(
+                send, 409, "The request with this Idempotency-Key completed, but its response was too large to replay.",
+            )
+        IDEMPOTENCY_REQUESTS.inc((outcome,))
+        headers = [(b"content-length", str(len(stored.body)).encode()), (REPLAYED_HEADER, b"true")]
+        if stored.content_type:
+            headers.append((b"content-type", stored.content_type.encode("latin-1")))
+        await send({"type": "http.response.start", "status": stored.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": stored.body})
+
+    # --- Database (worker threads) ---
+
+    def _claim(self, resort_id: str, key: str, fingerprint_hex: str):
+        db = shard_router.session(resort_id)
+        db.expire_on_commit = False
+        try:
+            now = time.monotonic()
+            if now - self._purged_at.get(resort_id, 0.0) > PURGE_INTERVAL_SECONDS:
+                self._purged_at[resort_id] = now
+                purged = idempotency.purge_expired(db)
+                if purged:
+                    logger.info("Expired idempotency keys purged", extra={"resort_id": resort_id, "keys": purged})
+            return idempotency.claim(db, key, fingerprint_hex, self.ttl_seconds, self.lease_seconds)
+        finally:
+            db.close()
+
+    def _renew(self, resort_id: str, key: str, fingerprint_hex: str) -> bool:
+        db = shard_router.session(resort_id)
+        try:
+            return idempotency.renew(db, key, fingerprint_hex, self.lease_seconds)
+        finally:
+            db.close()
+
+    def _complete(self, resort_id: str, key: str, status_code: int, content_type: Optional[str], body: Optional[bytes]) -> None:
+        db = shard_router.session(resort_id)
+        try:
+            idempotency.complete(db, key, status_code, content_type, body)
+        finally:
+            db.close()
+
+    def _release(self, resort_id: str, key: str) -> None:
+        db = shard_router.session(resort_id)
+        try:
+            idempotency.release(db, key)
+        except Exception:
+            # The claim expires after its lease anyway
+            logger.exception("Failed to release idempotency key", extra={"resort_id": resort_id})
+        finally:
+            db.close()
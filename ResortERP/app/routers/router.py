@@ -1,10 +1,24 @@
 from app.routers.endpoints.chatRouter import chat_router
 from app.routers.endpoints.base import base_router
+from app.routers.endpoints.metricsRouter import metrics_router
+from app.routers.endpoints.analyticsRouter import analytics_router
+from app.routers.endpoints.exportRouter import export_router
+from app.routers.endpoints.availabilityRouter import availability_router
+from app.routers.endpoints.jobsRouter import jobs_router
+from app.routers.endpoints.debugRouter import debug_router
+from app.routers.endpoints.resortsRouter import resorts_router
 from fastapi import APIRouter, HTTPException
 
 routerList = [
     chat_router,
-    base_router
+    base_router,
+    resorts_router,
+    analytics_router,
+    export_router,
+    availability_router,
+    jobs_router,
+    debug_router,
+    metrics_router
 ]
 
 routers = APIRouter()
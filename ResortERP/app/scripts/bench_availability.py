@@ -0,0 +1,125 @@
+# app/scripts/bench_availability.py
+#
+# Opens many idle availability WebSocket subscribers against a running server,
+# reports the server's memory per connection, then creates rooms and measures
+# how long each change takes to reach every subscriber.
+#
+#   python -m app.serve --workers 2 &
+#   python -m app.scripts.bench_availability --subscribers 5000 --changes 20 --server-pid <supervisor pid>
+
+import argparse
+import asyncio
+import http.client
+import json
+import statistics
+import time
+import uuid
+from urllib.parse import urlsplit
+
+import websockets
+
+
+def rss_kib(pid: int) -> int:
+    """Resident memory of `pid` plus all of its children, in KiB."""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as status:
+                total += next(int(line.split()[1]) for line in status if line.startswith("VmRSS:"))
+            with open(f"/proc/{current}/task/{current}/children") as children:
+                pending.extend(int(child) for child in children.read().split())
+        except (FileNotFoundError, StopIteration):
+            continue
+    return total
+
+
+def create_room(base_url: str, number: str) -> float:
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    body = json.dumps({"number": number, "room_type": "standard", "capacity": 2, "price": 100})
+    started = time.time()
+    conn.request("POST", "/room", body=body, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    if response.status != 200:
+        raise RuntimeError(f"POST /room returned {response.status}")
+    return started
+
+
+async def subscriber(url: str, ready: asyncio.Event, connected: list, arrivals: dict, expected: set, done: asyncio.Event):
+    async with websockets.connect(url, max_size=None, ping_interval=None) as ws:
+        await ws.recv()  # snapshot
+        connected.append(1)
+        ready.set()
+        async for raw in ws:
+            received = time.time()
+            message = json.loads(raw)
+            number = message.get("room", {}).get("number")
+            if number in expected:
+                arrivals.setdefault(number, []).append(received)
+            if done.is_set():
+                return
+
+
+async def run(args) -> None:
+    ws_url = args.url.replace("http", "ws", 1).rstrip("/") + "/ws/rooms/availability"
+    baseline = rss_kib(args.server_pid) if args.server_pid else None
+
+    ready, done = asyncio.Event(), asyncio.Event()
+    connected: list = []
+    arrivals: dict = {}
+    prefix = f"bench-{uuid.uuid4().hex[:6]}"
+    expected = {f"{prefix}-{i}" for i in range(args.changes)}
+    started = time.perf_counter()
+    tasks = []
+    for i in range(args.subscribers):
+        tasks.append(asyncio.create_task(subscriber(ws_url, ready, connected, arrivals, expected, done)))
+        if i % 200 == 199:
+            await asyncio.sleep(0.05)  # stay below the listen backlog
+    while len(connected) < args.subscribers:
+        if all(task.done() for task in tasks):
+            break
+        await asyncio.sleep(0.1)
+    print(f"{len(connected):,} subscribers connected in {time.perf_counter() - started:.1f}s")
+
+    if baseline is not None:
+        await asyncio.sleep(1.0)
+        grown = rss_kib(args.server_pid) - baseline
+        print(f"server RSS grew {grown / 1024:.1f} MiB: {grown * 1024 / max(len(connected), 1) / 1024:.1f} KiB per connection")
+
+    delays = []
+    for number in sorted(expected):
+        sent = await asyncio.to_thread(create_room, args.url, number)
+        deadline = time.time() + 10
+        while len(arrivals.get(number, ())) < len(connected) and time.time() < deadline:
+            await asyncio.sleep(0.005)
+        got = arrivals.get(number, [])
+        if len(got) < len(connected):
+            print(f"{number}: only {len(got)}/{len(connected)} subscribers notified")
+        if got:
+            delays.append((statistics.median(got) - sent, max(got) - sent))
+    done.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    if delays:
+        print(f"change -> subscriber: median {statistics.median(d[0] for d in delays) * 1000:.1f} ms, "
+              f"last subscriber {statistics.median(d[1] for d in delays) * 1000:.1f} ms (median over {len(delays)} changes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Availability push fan-out benchmark")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--subscribers", type=int, default=2000)
+    parser.add_argument("--changes", type=int, default=20)
+    parser.add_argument("--server-pid", type=int, help="Server (or supervisor) PID for RSS per connection.")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
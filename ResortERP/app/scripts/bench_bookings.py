@@ -0,0 +1,143 @@
+# app/scripts/bench_bookings.py
+#
+# Measures booking lookups as history grows, before and after archival.
+# For each history length it recreates the schema, fills `bookings` with
+# --per-month synthetic bookings for every past month, times the lookups,
+# runs archive_bookings and times them again. Bookings end with a checkout at the
+# end of their stay, as unbook_room(checkout=True) leaves them, so only recent
+# months stay open.
+#
+# DESTRUCTIVE: drops and recreates every table of DB_CONNECTION_URI, so
+# point it at a scratch database and pass --reset.
+#
+#   DB_CONNECTION_URI=postgresql://.../scratch python -m app.scripts.bench_bookings --reset --months 12,24,48
+
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from app.config.db import Base, SessionLocal, engine
+from app.domain.model.base import Booking, Room, User
+from app.repo import partitions
+from app.repo.base import ResortManager
+
+USERS = 2000
+ROOMS = 1000
+# Longest time a booking stays active before it is cancelled (checkout)
+MAX_STAY = 14 * 24 * 3600
+
+
+def populate(months: int, per_month: int, rng: random.Random) -> tuple:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now(timezone.utc)
+    first_month = partitions.add_months(partitions.month_start(now), -months)
+    partitions.ensure_booking_partitions(engine, first_month=first_month)
+
+    users = [uuid.uuid4() for _ in range(USERS)]
+    rooms = [uuid.uuid4() for _ in range(ROOMS)]
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"id": u, "name": f"user {i}", "email": f"u{i}@bench"} for i, u in enumerate(users)])
+        conn.execute(Room.__table__.insert(), [
+            {"id": r, "number": str(i), "is_booked": False, "room_type": "standard", "capacity": 2, "price": 100, "amenities": []}
+            for i, r in enumerate(rooms)
+        ])
+
+    # History as the app leaves it: each room is booked again only after its
+    # previous booking was cancelled, and only the bookings still in their stay are active
+    span = (now - datetime.combine(first_month, datetime.min.time(), tzinfo=timezone.utc)).total_seconds()
+    total = months * per_month
+    dates = {room_id: [] for room_id in rooms}
+    for _ in range(total):
+        dates[rng.choice(rooms)].append(now - timedelta(seconds=rng.uniform(60, span)))
+    active = []
+    batch = []
+    with engine.begin() as conn:
+        for room_id, booked in dates.items():
+            booked.sort()
+            for i, booking_date in enumerate(booked):
+                cancelled_at = booking_date + timedelta(seconds=rng.uniform(3600, MAX_STAY))
+                if i + 1 < len(booked):
+                    cancelled_at = min(cancelled_at, booked[i + 1])
+                elif cancelled_at > now:
+                    cancelled_at = None
+                    active.append((room_id, booking_date))
+                batch.append({
+                    "id": uuid.uuid4(), "user_id": rng.choice(users), "room_id": room_id,
+                    "booking_date": booking_date, "cancelled_at": cancelled_at,
+                    # Ended at the end of the stay, or when the room was booked again
+                    "checked_out": cancelled_at is not None,
+                })
+                if len(batch) == 20000:
+                    conn.execute(Booking.__table__.insert(), batch)
+                    batch = []
+        if batch:
+            conn.execute(Booking.__table__.insert(), batch)
+        for room_id, booked_at in active:
+            conn.execute(Room.__table__.update().where(Room.id == room_id).values(is_booked=True, booked_at=booked_at))
+    return users, active, total
+
+
+def time_lookups(users, active, samples: int, rng: random.Random) -> dict:
+    db = SessionLocal()
+    manager = ResortManager(db)
+    since = datetime.now(timezone.utc) - timedelta(days=30)
+    timings = {"user_bookings": [], "user_bookings_30d": [], "room_booking": []}
+    try:
+        for _ in range(samples):
+            user_id = rng.choice(users)
+            room_id, booked_at = rng.choice(active)
+
+            started = time.perf_counter()
+            manager.get_user_bookings(user_id)
+            timings["user_bookings"].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            manager.get_user_bookings(user_id, since=since)
+            timings["user_bookings_30d"].append(time.perf_counter() - started)
+
+            # The lookup unbook_room performs
+            started = time.perf_counter()
+            db.query(Booking).filter(
+                Booking.room_id == room_id, Booking.cancelled_at.is_(None), Booking.booking_date == booked_at,
+            ).first()
+            timings["room_booking"].append(time.perf_counter() - started)
+            db.expunge_all()
+    finally:
+        db.close()
+    return {name: statistics.median(values) * 1000 for name, values in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark booking lookups as history grows")
+    parser.add_argument("--months", default="12,24,48", help="Comma-separated history lengths in months.")
+    parser.add_argument("--per-month", type=int, default=20000, help="Bookings per month of history.")
+    parser.add_argument("--samples", type=int, default=300)
+    parser.add_argument("--reset", action="store_true", help="Required: confirms that all tables are dropped.")
+    args = parser.parse_args()
+    if not args.reset:
+        parser.error("this benchmark drops every table of DB_CONNECTION_URI; pass --reset to confirm")
+
+    rng = random.Random(7)
+    print(f"{engine.dialect.name}, {args.per_month:,} bookings/month, retention "
+          f"{partitions.archive_cutoff():%Y-%m} onwards, p50 in ms")
+    print(f"{'months':>6} {'rows':>10} {'state':>9} {'live rows':>10} {'user':>8} {'user 30d':>9} {'room':>8}")
+    for months in (int(m) for m in args.months.split(",")):
+        users, active, total = populate(months, args.per_month, rng)
+        for state in ("live", "archived"):
+            if state == "archived":
+                partitions.archive_bookings(engine)
+            with engine.connect() as conn:
+                live = conn.execute(select(func.count()).select_from(Booking)).scalar()
+            result = time_lookups(users, active, args.samples, rng)
+            print(f"{months:>6} {total:>10,} {state:>9} {live:>10,} {result['user_bookings']:>8.2f} "
+                  f"{result['user_bookings_30d']:>9.2f} {result['room_booking']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# app/scripts/bench_chat_context.py
+#
+# Chat context prefetch benchmark: one scripted conversation, run through the
+# real agents, runner, session state and tools, once with the prefetched guest
+# context and once without it (the context loads nothing, so every question
+# needs a tool). Reports the model calls, tool calls and latency of each turn.
+#
+# The model is a stand-in (ScriptedModel). It answers from the guest context
+# in its instruction when the part a question needs is there and holds no
+# error; otherwise it calls the tool, transferring first when the tool belongs
+# to another agent. Each model call takes --model-ms plus --model-ms-per-1k
+# per thousand prompt tokens (about four characters each), so the numbers
+# depend on those two settings and not on a real model. The calendar API is a
+# stand-in taking --calendar-ms.
+#
+# DESTRUCTIVE: drops and recreates every table of DB_CONNECTION_URI, so
+# point it at a scratch database and pass --reset.
+#
+#   DB_CONNECTION_URI=postgresql://.../scratch python -m app.scripts.bench_chat_context --reset
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncGenerator, Dict, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from app.agents import context as guest_context, rag_agent
+from app.agents.context import AVAILABILITY, BOOKINGS, CALENDAR, GuestContext
+from app.agents.root_agent import _resolve, initialize_agent
+from app.config.db import Base, SessionLocal, engine
+from app.domain.model.base import Room, User
+from app.repo import partitions
+from app.repo.base import ResortManager
+
+CONTEXT_MARKER = "Guest context: "
+
+
+def conversation(user_id: str, room_number: str) -> list:
+    """(question, context part that answers it or None, tool and arguments otherwise)."""
+    return [
+        ("What have I booked?", BOOKINGS, ("tool_get_bookings_for_users", {"user_ids": user_id})),
+        ("Which rooms are free?", AVAILABILITY, ("tool_search_rooms", {})),
+        ("What is on my calendar?", CALENDAR, ("tool_get_next_10_calendar_events", {})),
+        (f"Is room {room_number} free?", None, ("tool_get_room_status", {"room_numbers": room_number})),
+        (f"Book room {room_number} for me.", None,
+         ("tool_book_room", {"room_number": room_number, "user_id_str": user_id})),
+        ("What have I booked now?", BOOKINGS, ("tool_get_bookings_for_users", {"user_ids": user_id})),
+        ("Which rooms are still free?", AVAILABILITY, ("tool_search_rooms", {})),
+    ]
+
+
+class Counters:
+    """Shared by the stand-in models of all agents (pydantic would copy a dict field)."""
+
+    def __init__(self):
+        self.model_calls = 0
+        self.prompt_tokens = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        return {"model_calls": self.model_calls, "prompt_tokens": self.prompt_tokens}
+
+
+class ScriptedModel(BaseLlm):
+    """Stand-in model of one agent, following the scripted conversation."""
+
+    script: Dict[str, Tuple[Optional[str], Tuple[str, Dict[str, Any]]]]
+    # Tool name -> name of the agent that has it
+    owners: Dict[str, str]
+    latency: float
+    latency_per_1k_tokens: float
+    stats: Counters
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        instruction = str(llm_request.config.system_instruction or "")
+        prompt_chars = len(instruction) + sum(
+            len(part.text or "") + len(json.dumps(part.function_response.response, default=str) if part.function_response else "")
+            for content in llm_request.contents for part in content.parts or []
+        )
+        self.stats.model_calls += 1
+        self.stats.prompt_tokens += prompt_chars // 4
+        await asyncio.sleep(self.latency + prompt_chars / 4000 * self.latency_per_1k_tokens)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[self._next_part(llm_request, instruction)]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(prompt_token_count=prompt_chars // 4),
+        )
+
+    def _next_part(self, llm_request: LlmRequest, instruction: str) -> types.Part:
+        # After a transfer, the previous agent's turn is quoted as user content too
+        question = next(
+            part.text for content in reversed(llm_request.contents) if content.role == "user"
+            for part in content.parts or [] if part.text in self.script
+        )
+        part, (tool, args) = self.script[question]
+        last = llm_request.contents[-1].parts[-1]
+        if last.function_response and last.function_response.name != "transfer_to_agent":
+            return types.Part(text=f"Here is what {tool} returned.")
+        context = {}
+        if CONTEXT_MARKER in instruction:
+            # ADK appends its own instructions (e.g. how to transfer) after the agent's
+            try:
+                context, _ = json.JSONDecoder().raw_decode(instruction.split(CONTEXT_MARKER, 1)[1])
+            except ValueError:
+                pass
+        loaded = context.get(part)
+        if part and loaded is not None and not (isinstance(loaded, dict) and "error" in loaded):
+            return types.Part(text=f"From your context: {part}.")
+        if tool in llm_request.tools_dict:
+            return types.Part(function_call=types.FunctionCall(name=tool, args=args))
+        return types.Part(function_call=types.FunctionCall(name="transfer_to_agent", args={"agent_name": self.owners[tool]}))
+
+
+def make_calendar_stand_in(delay: float):
+    def tool_get_next_10_calendar_events() -> Dict[str, Any]:
+        """Retrieves the next 10 upcoming events from the user's primary Google Calendar."""
+        time.sleep(delay)
+        start = datetime.now(timezone.utc)
+        return {"status": "success", "events": [
+            {"summary": f"Event {i}", "start": (start + timedelta(days=i)).isoformat(), "end": (start + timedelta(days=i, hours=1)).isoformat()}
+            for i in range(10)
+        ]}
+    return tool_get_next_10_calendar_events
+
+
+def reset(rooms: int, bookings: int) -> Tuple[str, str]:
+    """Creates `rooms` rooms and a guest holding `bookings` of them; returns the guest and a free room number."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    partitions.ensure_booking_partitions(engine)
+    guest = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"id": guest, "name": "guest", "email": "guest@bench"}])
+        conn.execute(Room.__table__.insert(), [
+            {"id": uuid.uuid4(), "number": str(100 + i), "is_booked": False, "room_type": "standard",
+             "capacity": 2, "price": 100 + i, "amenities": []}
+            for i in range(rooms)
+        ])
+    db = SessionLocal()
+    try:
+        manager = ResortManager(db)
+        free = manager.get_available_rooms()
+        for room in free[:bookings]:
+            manager.book_room(guest, room.id)
+        return str(guest), free[-1].number
+    finally:
+        db.close()
+
+
+def tool_calls_of(events) -> Tuple[int, int]:
+    calls = [call.name for event in events for call in event.get_function_calls()]
+    transfers = calls.count("transfer_to_agent")
+    return len(calls) - transfers, transfers
+
+
+async def run(with_context: bool, args) -> list:
+    user_id, room_number = reset(args.rooms, args.bookings)
+    script = conversation(user_id, room_number)
+    load = GuestContext.load
+    if not with_context:
+        async def load_nothing(self, parts=None):
+            return None
+        GuestContext.load = load_nothing
+    try:
+        agent = await initialize_agent(user_id=user_id)
+    finally:
+        GuestContext.load = load
+
+    stats = Counters()
+    agents = [agent.runner.agent, *agent.runner.agent.sub_agents]
+    owners = {tool.__name__: a.name for a in agents for tool in a.tools if callable(tool)}
+    for a in agents:
+        a.model = ScriptedModel(
+            model=f"scripted-{a.name}", script={question: (part, call) for question, part, call in script},
+            owners=owners, latency=args.model_ms / 1000, latency_per_1k_tokens=args.model_ms_per_1k / 1000, stats=stats,
+        )
+
+    turns = []
+    seen = 0
+    for question, _, _ in script:
+        before = stats.snapshot()
+        started = time.perf_counter()
+        await agent.call_agent_async(question)
+        elapsed = time.perf_counter() - started
+        session = await _resolve(agent.runner.session_service.get_session(
+            app_name=agent.app_name, user_id=agent.user_id, session_id=agent.session_id,
+        ))
+        tools, transfers = tool_calls_of(session.events[seen:])
+        seen = len(session.events)
+        turns.append({
+            "question": question, "model_calls": stats.model_calls - before["model_calls"], "tools": tools,
+            "transfers": transfers, "prompt_tokens": stats.prompt_tokens - before["prompt_tokens"], "ms": elapsed * 1000,
+        })
+    return turns
+
+
+async def main_async(args) -> None:
+    calendar = make_calendar_stand_in(args.calendar_ms / 1000)
+    guest_context.tool_get_next_10_calendar_events = calendar
+    rag_agent.tool_get_next_10_calendar_events = calendar
+
+    results = {}
+    for with_context in (False, True):
+        runs = [await run(with_context, args) for _ in range(args.repeat)]
+        results[with_context] = [
+            {**runs[0][i], "ms": statistics.median(r[i]["ms"] for r in runs)} for i in range(len(runs[0]))
+        ]
+
+    print(f"{engine.dialect.name}; model {args.model_ms} ms + {args.model_ms_per_1k} ms per 1k prompt tokens, "
+          f"median of {args.repeat} runs")
+    print(f"{'turn':32} {'tools':>11} {'transfers':>11} {'model calls':>13} {'prompt tokens':>15} {'latency ms':>15}")
+    for without, with_ in zip(results[False], results[True]):
+        print(f"{without['question']:32} {without['tools']:>5} / {with_['tools']:<3} {without['transfers']:>5} / {with_['transfers']:<3} "
+              f"{without['model_calls']:>6} / {with_['model_calls']:<4} {without['prompt_tokens']:>7} / {with_['prompt_tokens']:<5} "
+              f"{without['ms']:>7.0f} / {with_['ms']:<5.0f}")
+    for label, turns in (("without context", results[False]), ("with context", results[True])):
+        print(f"{label}: {sum(t['tools'] for t in turns)} tool calls, {sum(t['transfers'] for t in turns)} transfers, "
+              f"{sum(t['model_calls'] for t in turns)} model calls, {sum(t['ms'] for t in turns):.0f} ms in {len(turns)} turns")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat context prefetch benchmark")
+    parser.add_argument("--rooms", type=int, default=200)
+    parser.add_argument("--bookings", type=int, default=30, help="Bookings of the guest.")
+    parser.add_argument("--model-ms", type=float, default=500, help="Latency of each model call.")
+    parser.add_argument("--model-ms-per-1k", type=float, default=20, help="Added latency per 1,000 prompt tokens.")
+    parser.add_argument("--calendar-ms", type=float, default=250, help="Latency of the calendar API stand-in.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--reset", action="store_true", help="Required: confirms that all tables are dropped.")
+    args = parser.parse_args()
+    if not args.reset:
+        parser.error("this benchmark drops every table of DB_CONNECTION_URI; pass --reset to confirm")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# app/scripts/bench_conditional.py
+#
+# Polls a listing endpoint the way dashboards do and compares response bytes
+# and server CPU per request: plain, gzip, brotli, and conditional (If-None-Match).
+#
+#   python -m app.serve --workers 1 &
+#   python -m app.scripts.bench_conditional --url http://127.0.0.1:8000/rooms/available --server-pid <pid>
+
+import argparse
+import http.client
+import os
+import time
+from urllib.parse import urlsplit
+
+MODES = {
+    "plain": {},
+    "gzip": {"Accept-Encoding": "gzip"},
+    "br": {"Accept-Encoding": "br"},
+    "conditional": {"Accept-Encoding": "br, gzip"},
+}
+
+
+def cpu_seconds(pid: int) -> float:
+    """User + system CPU time of `pid` and all of its children."""
+    total = 0.0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/stat") as stat:
+                fields = stat.read().rsplit(")", 1)[1].split()
+            total += (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+            with open(f"/proc/{current}/task/{current}/children") as children:
+                pending.extend(int(child) for child in children.read().split())
+        except FileNotFoundError:
+            continue
+    return total
+
+
+def poll(url: str, headers: dict, requests: int, conditional: bool):
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    etag, wire_bytes, statuses = None, 0, {}
+    for _ in range(requests):
+        request_headers = dict(headers)
+        if conditional and etag:
+            request_headers["If-None-Match"] = etag
+        conn.request("GET", path, headers=request_headers)
+        response = conn.getresponse()
+        body = response.read()
+        # Body plus status line and headers, as sent by the server
+        wire_bytes += len(body) + sum(len(k) + len(v) + 4 for k, v in response.getheaders()) + 17
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+        etag = response.getheader("ETag") or etag
+    conn.close()
+    return wire_bytes, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conditional GET / compression benchmark")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/rooms/available")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--server-pid", type=int, help="Server (or supervisor) PID for CPU per request.")
+    args = parser.parse_args()
+
+    print("| mode        | bytes/request | server CPU ms/request | statuses |")
+    print("|-------------|---------------|-----------------------|----------|")
+    for mode, headers in MODES.items():
+        cpu_before = cpu_seconds(args.server_pid) if args.server_pid else None
+        started = time.perf_counter()
+        wire_bytes, statuses = poll(args.url, headers, args.requests, conditional=mode == "conditional")
+        elapsed = time.perf_counter() - started
+        cpu = f"{(cpu_seconds(args.server_pid) - cpu_before) * 1000 / args.requests:.2f}" if cpu_before is not None else "-"
+        print(f"| {mode:<11} | {wire_bytes / args.requests:13,.0f} | {cpu:>21} | {statuses} |  ({elapsed:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# app/scripts/bench_group_booking.py
+#
+# Compares booking a block of rooms with one book_rooms call (one transaction)
+# against one book_room call per room. Then several threads book overlapping
+# blocks at the same time, to check that blocks are all or nothing and that
+# no two blocks deadlock.
+#
+# DESTRUCTIVE: drops and recreates every table of DB_CONNECTION_URI, so
+# point it at a scratch database and pass --reset.
+#
+#   DB_CONNECTION_URI=postgresql://.../scratch python -m app.scripts.bench_group_booking --reset --sizes 10,30,100
+
+import argparse
+import random
+import statistics
+import threading
+import time
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.config.db import Base, SessionLocal, engine
+from app.domain.model.base import Booking, Room, User
+from app.repo import partitions
+from app.repo.base import ResortManager
+
+
+def reset(rooms: int, users: int) -> tuple:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    partitions.ensure_booking_partitions(engine)
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    room_ids = [uuid.uuid4() for _ in range(rooms)]
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"id": u, "name": f"user {i}", "email": f"u{i}@bench"} for i, u in enumerate(user_ids)])
+        conn.execute(Room.__table__.insert(), [
+            {"id": r, "number": str(i), "is_booked": False, "room_type": ("standard", "deluxe", "suite")[i % 3],
+             "capacity": 2, "price": 100 + i % 50, "amenities": []}
+            for i, r in enumerate(room_ids)
+        ])
+    return user_ids, room_ids
+
+
+def timed(func) -> float:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        func(ResortManager(db))
+        return time.perf_counter() - started
+    finally:
+        db.close()
+
+
+def compare(sizes, repeat: int) -> None:
+    print(f"{'rooms':>6} {'sequential ms':>14} {'group ms':>9} {'speedup':>8}")
+    for size in sizes:
+        user_ids, room_ids = reset(size * repeat * 2, 1)
+        user_id = user_ids[0]
+        blocks = iter(room_ids[i:i + size] for i in range(0, len(room_ids), size))
+        sequential, group = [], []
+        for _ in range(repeat):
+            block = next(blocks)
+            sequential.append(timed(lambda manager: [manager.book_room(user_id, room_id) for room_id in block]))
+            block = next(blocks)
+            group.append(timed(lambda manager: manager.book_rooms(user_id, block)))
+        seq, grp = statistics.median(sequential) * 1000, statistics.median(group) * 1000
+        print(f"{size:>6} {seq:>14.1f} {grp:>9.1f} {seq / grp:>7.1f}x")
+
+
+def contend(threads: int, size: int, pool: int, attempts: int) -> None:
+    user_ids, room_ids = reset(pool, threads)
+    outcomes = {"booked": 0, "conflict": 0, "error": 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(user_id, seed):
+        rng = random.Random(seed)
+        barrier.wait()
+        for _ in range(attempts):
+            block = rng.sample(room_ids, size)
+            db = SessionLocal()
+            try:
+                ResortManager(db).book_rooms(user_id, block)
+                outcome = "booked"
+            except HTTPException:
+                outcome = "conflict"
+            except Exception as e:
+                print("error:", repr(e))
+                outcome = "error"
+            finally:
+                db.close()
+            with lock:
+                outcomes[outcome] += 1
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(user_id, i)) for i, user_id in enumerate(user_ids)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    with engine.connect() as conn:
+        bookings = conn.execute(select(func.count()).select_from(Booking)).scalar()
+        booked_rooms = conn.execute(select(func.count()).select_from(Room).where(Room.is_booked)).scalar()
+        partial = conn.execute(
+            select(func.count()).select_from(
+                select(Booking.user_id, Booking.booking_date).group_by(Booking.user_id, Booking.booking_date)
+                .having(func.count() != size).subquery()
+            )
+        ).scalar()
+    print(f"{threads} threads, blocks of {size} from {pool} rooms: {outcomes} in {elapsed:.1f}s")
+    print(f"bookings {bookings}, booked rooms {booked_rooms}, blocks with a missing room {partial}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark group bookings against sequential single bookings")
+    parser.add_argument("--sizes", default="10,30,100")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--reset", action="store_true", help="Required: confirms that all tables are dropped.")
+    args = parser.parse_args()
+    if not args.reset:
+        parser.error("this benchmark drops every table of DB_CONNECTION_URI; pass --reset to confirm")
+
+    print(f"{engine.dialect.name}")
+    compare([int(size) for size in args.sizes.split(",")], args.repeat)
+    contend(args.threads, size=30, pool=3000, attempts=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# app/scripts/bench_holds.py
+#
+# Room hold benchmark.
+#   - Stampede: guests go for the same few popular rooms, each spending a
+#     simulated checkout before booking. Without holds, every guest who loses
+#     the race finds out after checkout. With holds, they find out when they
+#     pick the room.
+#   - Sweeper: cost of tracking and popping hold deadlines in the heap, and
+#     how late the sweeper releases holds that expire while more are taken,
+#     next to the periodic scan query the heap replaces.
+#
+# DESTRUCTIVE: drops and recreates every table of DB_CONNECTION_URI, so
+# point it at a scratch database and pass --reset.
+#
+#   DB_CONNECTION_URI=postgresql://.../scratch python -m app.scripts.bench_holds --reset
+
+import argparse
+import asyncio
+import random
+import statistics
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+
+from app.config.db import Base, SessionLocal, engine
+from app.domain.model.base import Room, User
+from app.realtime.holds import HOLD_SWEEP_LAG, HOLD_SWEEP_SECONDS, HoldSweeper, hold_sweeper
+from app.repo import partitions, read_models
+from app.repo.base import ResortManager
+
+
+def reset(rooms: int, users: int) -> tuple:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    partitions.ensure_booking_partitions(engine)
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    room_ids = [uuid.uuid4() for _ in range(rooms)]
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"id": u, "name": f"user {i}", "email": f"u{i}@bench"} for i, u in enumerate(user_ids)])
+        conn.execute(Room.__table__.insert(), [
+            {"id": r, "number": str(i), "is_booked": False, "room_type": "standard", "capacity": 2,
+             "price": 100 + i, "amenities": []}
+            for i, r in enumerate(room_ids)
+        ])
+    return user_ids, room_ids
+
+
+def stampede(guests: int, rooms: int, popular: int, checkout: float, holds: bool) -> None:
+    """
+    Every guest picks one of the `popular` cheapest available rooms, checks
+    out for `checkout` seconds and books it; on a conflict they pick again,
+    until they have a room or none is left.
+    """
+    user_ids, _ = reset(rooms, guests)
+    stats = {"booked": 0, "wasted": 0, "hold_conflicts": 0, "gave_up": 0, "times": []}
+    lock = threading.Lock()
+    barrier = threading.Barrier(guests)
+
+    def guest(user_id, seed):
+        rng = random.Random(seed)
+        barrier.wait()
+        started = time.perf_counter()
+        while True:
+            db = SessionLocal()
+            try:
+                manager = ResortManager(db)
+                available = read_models.available_rooms(db, ("id", "price"))
+                if not available:
+                    with lock:
+                        stats["gave_up"] += 1
+                    return
+                room_id = rng.choice(sorted(available, key=lambda row: row.price)[:popular]).id
+                if holds:
+                    try:
+                        manager.hold_room(user_id, room_id)
+                    except HTTPException:
+                        with lock:
+                            stats["hold_conflicts"] += 1
+                        continue
+                time.sleep(checkout)
+                try:
+                    manager.book_room(user_id, room_id)
+                except HTTPException:
+                    with lock:
+                        stats["wasted"] += 1
+                    continue
+                with lock:
+                    stats["booked"] += 1
+                    stats["times"].append(time.perf_counter() - started)
+                return
+            finally:
+                db.close()
+
+    workers = [threading.Thread(target=guest, args=(user_id, i)) for i, user_id in enumerate(user_ids)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    times = stats["times"]
+    print(
+        f"{'with holds' if holds else 'without holds':<14} {stats['booked']:>7} {stats['wasted']:>16}"
+        f" {stats['hold_conflicts']:>15} {stats['gave_up']:>8}"
+        f" {statistics.median(times):>12.2f} {max(times):>10.2f}"
+    )
+
+
+def heap_cost(holds: int) -> None:
+    sweeper = HoldSweeper()
+    now = datetime.now(timezone.utc)
+    keys = [("main", uuid.uuid4()) for _ in range(holds)]
+    deadlines = [now + timedelta(seconds=random.uniform(0, 600)) for _ in range(holds)]
+    started = time.perf_counter()
+    for (resort_id, room_id), held_until in zip(keys, deadlines):
+        sweeper.track(resort_id, room_id, held_until)
+    tracked = time.perf_counter() - started
+    # Renew every hold once: leaves one stale entry per hold behind
+    started = time.perf_counter()
+    for (resort_id, room_id), held_until in zip(keys, deadlines):
+        sweeper.track(resort_id, room_id, held_until + timedelta(seconds=60))
+    renewed = time.perf_counter() - started
+    started = time.perf_counter()
+    due = sweeper._pop_due(now.timestamp() + 3600)
+    popped = time.perf_counter() - started
+    assert sum(len(rooms) for rooms in due.values()) == holds
+    print(
+        f"{holds} holds: track {tracked / holds * 1e6:.2f} us, renew {renewed / holds * 1e6:.2f} us,"
+        f" pop when due {popped / holds * 1e6:.2f} us per hold"
+    )
+
+
+def expiry(rooms: int, expiring: int, ttl: float) -> None:
+    """Holds `expiring` of `rooms` rooms for `ttl` seconds and lets the process-wide sweeper release them."""
+    user_ids, room_ids = reset(rooms, 1)
+    held = random.sample(room_ids, expiring)
+
+    def take_holds():
+        db = SessionLocal()
+        try:
+            manager = ResortManager(db)
+            for room_id in held:
+                manager.hold_room(user_ids[0], room_id, ttl_seconds=ttl)
+        finally:
+            db.close()
+
+    async def run():
+        await hold_sweeper.start()
+        try:
+            before = HOLD_SWEEP_LAG.values().get((), [0] * HOLD_SWEEP_LAG._width)
+            batches = HOLD_SWEEP_SECONDS.values().get((), [0] * HOLD_SWEEP_SECONDS._width)
+            # Off the event loop, so the sweeper runs while holds are still being taken
+            await asyncio.to_thread(take_holds)
+            # Every hold expires within `ttl` of being taken
+            while len(hold_sweeper):
+                await asyncio.sleep(0.05)
+            lag = [a - b for a, b in zip(HOLD_SWEEP_LAG.values()[()], before)]
+            batches = [a - b for a, b in zip(HOLD_SWEEP_SECONDS.values()[()], batches)]
+            return lag, sum(batches[:-1]), batches[-1]
+        finally:
+            await hold_sweeper.stop()
+
+    lag, batches, batch_seconds = asyncio.run(run())
+    count = sum(lag[:-1])
+    cumulative, p99 = 0, float("inf")
+    for bound, n in zip(HOLD_SWEEP_LAG.buckets, lag):
+        cumulative += n
+        if cumulative >= 0.99 * count:
+            p99 = bound
+            break
+    with engine.connect() as conn:
+        still_held = conn.execute(select(func.count()).select_from(Room).where(Room.held_until.is_not(None))).scalar()
+    print(
+        f"{expiring} holds on {rooms} rooms released by the sweeper: mean lag {lag[-1] / count * 1000:.1f} ms,"
+        f" p99 <= {p99 * 1000:.0f} ms, in {batches} batches of {batch_seconds / batches * 1000:.1f} ms; {still_held} still held"
+    )
+
+    # What one tick of a periodic sweep would cost instead, whether or not anything is due
+    with engine.begin() as conn:
+        conn.execute(update(Room).where(Room.id.in_(held)).values(held_until=datetime.now(timezone.utc) + timedelta(hours=1)))
+    timings = []
+    db = SessionLocal()
+    try:
+        for _ in range(200):
+            started = time.perf_counter()
+            db.execute(select(Room.id).where(Room.held_until <= datetime.now(timezone.utc))).all()
+            db.rollback()
+            timings.append(time.perf_counter() - started)
+    finally:
+        db.close()
+    print(f"one periodic scan tick (nothing due, {expiring} active holds): p50 {statistics.median(timings) * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Room hold benchmark")
+    parser.add_argument("--guests", type=int, default=20)
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--popular", type=int, default=5, help="Guests pick among this many cheapest available rooms.")
+    parser.add_argument("--checkout", type=float, default=0.5, help="Seconds a guest spends checking out.")
+    parser.add_argument("--reset", action="store_true", help="Required: confirms that all tables are dropped.")
+    args = parser.parse_args()
+    if not args.reset:
+        parser.error("this benchmark drops every table of DB_CONNECTION_URI; pass --reset to confirm")
+
+    print(f"{engine.dialect.name}; {args.guests} guests, {args.popular} popular rooms, {args.checkout}s checkout")
+    print(f"{'':<14} {'booked':>7} {'wasted checkouts':>16} {'hold conflicts':>15} {'gave up':>8} {'p50 book s':>12} {'max s':>10}")
+    stampede(args.guests, args.rooms, args.popular, args.checkout, holds=False)
+    stampede(args.guests, args.rooms, args.popular, args.checkout, holds=True)
+    heap_cost(100_000)
+    expiry(10_000, 1000, ttl=1.0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# app/scripts/bench_keys.py
+#
+# Compares booking insert throughput with random (version 4) and time-ordered
+# (version 7) primary keys. For each key type it recreates the schema and
+# inserts --rows bookings in transactions of --batch rows. It reports the
+# throughput as the table grows and, on PostgreSQL, the size of the primary key
+# index, the index pages read from outside shared buffers, and the WAL written.
+#
+# DESTRUCTIVE: drops and recreates every table of DB_CONNECTION_URI, so
+# point it at a scratch database and pass --reset.
+#
+#   DB_CONNECTION_URI=postgresql://.../scratch python -m app.scripts.bench_keys --reset --rows 1200000
+
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.config.db import Base, engine, shard_router
+from app.domain.model.base import Booking, Room, User
+from app.domain.model.ids import uuid7
+from app.repo import partitions
+
+KEY_TYPES = {"v4": uuid.uuid4, "v7": uuid7}
+USERS = 2000
+ROOMS = 1000
+
+
+def _pg_stats(conn, index: str) -> dict:
+    return {
+        "wal": conn.execute(text("SELECT (pg_current_wal_lsn() - '0/0'::pg_lsn)::bigint")).scalar(),
+        "index_bytes": conn.execute(text("SELECT pg_relation_size(to_regclass(:i))"), {"i": index}).scalar(),
+        "blocks_read": conn.execute(text(
+            "SELECT coalesce(sum(idx_blks_read), 0) FROM pg_statio_all_indexes WHERE indexrelid = to_regclass(:i)"
+        ), {"i": index}).scalar(),
+    }
+
+
+def run(key_type: str, rows: int, batch_size: int, segments: int, id_index: bool = False) -> list:
+    new_key = KEY_TYPES[key_type]
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    partitions.ensure_booking_partitions(engine)
+    if id_index:
+        # The schema before time-ordered keys: a second index on bookings.id
+        with engine.begin() as conn:
+            conn.execute(text("CREATE INDEX ix_bookings_id ON bookings (id)"))
+    postgres = partitions.is_postgres(engine)
+    resort_id = shard_router.default
+    rng = random.Random(7)
+
+    users = [new_key() for _ in range(USERS)]
+    rooms = [new_key() for _ in range(ROOMS)]
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": u, "name": f"user {i}", "email": f"u{i}@bench", "resort_id": resort_id} for i, u in enumerate(users)
+        ])
+        conn.execute(Room.__table__.insert(), [
+            {"id": r, "number": str(i), "is_booked": False, "room_type": "standard", "capacity": 2, "price": 100,
+             "amenities": [], "resort_id": resort_id}
+            for i, r in enumerate(rooms)
+        ])
+    # All bookings fall into the current month's partition
+    now = datetime.now(timezone.utc)
+    index = partitions.partition_name(Booking.__tablename__, partitions.month_start(now)) + "_pkey" if postgres else None
+    if postgres:
+        with engine.begin() as conn:
+            conn.execute(text("CHECKPOINT"))
+
+    results = []
+    segment = rows // segments
+    inserted = 0
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        before = _pg_stats(conn, index) if postgres else None
+        for _ in range(segments):
+            segment_started = time.perf_counter()
+            for _ in range(segment // batch_size):
+                batch = [
+                    {"id": new_key(), "user_id": rng.choice(users), "room_id": rng.choice(rooms),
+                     "booking_date": now - timedelta(microseconds=inserted + i), "resort_id": resort_id}
+                    for i in range(batch_size)
+                ]
+                conn.execute(Booking.__table__.insert(), batch)
+                conn.commit()
+                inserted += batch_size
+            elapsed = time.perf_counter() - segment_started
+            result = {"rows": inserted, "rate": segment // batch_size * batch_size / elapsed}
+            if postgres:
+                after = _pg_stats(conn, index)
+                result.update({
+                    "index_mb": after["index_bytes"] / 1e6,
+                    "blocks_read": after["blocks_read"] - before["blocks_read"],
+                    "wal_mb": (after["wal"] - before["wal"]) / 1e6,
+                })
+                before = after
+            results.append(result)
+    results[-1]["total_seconds"] = time.perf_counter() - started
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark booking inserts with random vs time-ordered keys")
+    parser.add_argument("--rows", type=int, default=1_200_000)
+    parser.add_argument("--batch", type=int, default=1000, help="Rows per transaction.")
+    parser.add_argument("--segments", type=int, default=6, help="Report points while the table grows.")
+    parser.add_argument("--keys", default="v4,v7")
+    parser.add_argument("--id-index", action="store_true", help="Add the old redundant index on bookings.id.")
+    parser.add_argument("--reset", action="store_true", help="Required: confirms that all tables are dropped.")
+    args = parser.parse_args()
+    if not args.reset:
+        parser.error("this benchmark drops every table of DB_CONNECTION_URI; pass --reset to confirm")
+
+    for key_type in args.keys.split(","):
+        generate_started = time.perf_counter()
+        for _ in range(100_000):
+            KEY_TYPES[key_type]()
+        per_key = (time.perf_counter() - generate_started) / 100_000 * 1e6
+        schema = " with ix_bookings_id" if args.id_index else ""
+        print(f"{key_type}{schema}: {per_key:.2f} us per key; {engine.dialect.name}, {args.batch} rows per transaction")
+        print(f"{'rows':>10} {'rows/s':>9} {'pkey MB':>8} {'idx reads':>10} {'WAL MB':>8}")
+        results = run(key_type, args.rows, args.batch, args.segments, args.id_index)
+        for result in results:
+            print(f"{result['rows']:>10,} {result['rate']:>9,.0f} {result.get('index_mb', 0):>8.1f} "
+                  f"{result.get('blocks_read', 0):>10,} {result.get('wal_mb', 0):>8.1f}")
+        print(f"total: {results[-1]['total_seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# app/scripts/bench_logging.py
+#
+# Compares caller-side throughput of synchronous `print` against the
+# queue-backed JSON logger from app.observability.log, both writing to the
+# same sink, from many concurrent asyncio tasks (as request handlers would).
+#
+#   python -m app.scripts.bench_logging --lines 200000 --tasks 100
+#   python -m app.scripts.bench_logging --sink /tmp/bench.log
+
+import argparse
+import asyncio
+import io
+import logging
+import os
+import sys
+import time
+
+
+class SlowSink(io.TextIOBase):
+    """File-like sink that simulates a blocking write (e.g. a full pipe to a log shipper)."""
+
+    def __init__(self, target, delay_s: float):
+        self.target = target
+        self.delay_s = delay_s
+
+    def write(self, s):
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        return self.target.write(s)
+
+    def flush(self):
+        self.target.flush()
+
+
+async def _emit_all(emit, lines: int, tasks: int) -> float:
+    per_task = lines // tasks
+
+    async def worker(worker_id: int):
+        for i in range(per_task):
+            emit(worker_id, i)
+            if i % 100 == 0:
+                await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(tasks)))
+    return time.perf_counter() - started
+
+
+def bench_print(sink, lines: int, tasks: int) -> float:
+    def emit(worker_id, i):
+        print(f"Booking room for worker {worker_id} iteration {i}", file=sink, flush=True)
+    return asyncio.run(_emit_all(emit, lines, tasks))
+
+
+def bench_logging(sink, lines: int, tasks: int, level: str, debug_sample_rate: float):
+    from app.observability.log import setup_logging, shutdown_logging
+
+    setup_logging(level=level, debug_sample_rate=debug_sample_rate, stream=sink)
+    logger = logging.getLogger("app.bench")
+
+    def emit(worker_id, i):
+        logger.info("Booking room", extra={"worker": worker_id, "iteration": i})
+        logger.debug("Booking debug detail", extra={"worker": worker_id, "iteration": i})
+
+    caller_s = asyncio.run(_emit_all(emit, lines, tasks))
+    drain_started = time.perf_counter()
+    shutdown_logging()  # blocks until the queue is drained
+    return caller_s, time.perf_counter() - drain_started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="print vs. queue-backed logging throughput")
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--sink", default=os.devnull, help="File to write log lines to.")
+    parser.add_argument("--write-delay-us", type=float, default=0.0,
+                        help="Simulated blocking time per write, in microseconds.")
+    parser.add_argument("--debug-sample-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with open(args.sink, "w") as target:
+        sink = SlowSink(target, args.write_delay_us / 1e6)
+        print_s = bench_print(sink, args.lines, args.tasks)
+        log_s, drain_s = bench_logging(sink, args.lines, args.tasks, "DEBUG", args.debug_sample_rate)
+
+    print(f"lines={args.lines} tasks={args.tasks} sink={args.sink} write_delay_us={args.write_delay_us}", file=sys.stderr)
+    print(f"print:        {args.lines / print_s:12,.0f} lines/s on the event loop", file=sys.stderr)
+    print(f"queue logger: {args.lines / log_s:12,.0f} lines/s on the event loop "
+          f"(+{args.lines * args.debug_sample_rate:,.0f} sampled debug lines, "
+          f"listener drained in {drain_s:.2f}s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# app/scripts/bench_pool.py
+#
+# Connection pool saturation benchmark. HTTP threads run short reads while a
+# burst of chat "tool calls" holds connections for slow queries. It compares
+# the agent workload sharing the HTTP pool (as before) with its own pool
+# budget, and then loads the HTTP pool beyond its own limit. Also measures
+# what pre-ping adds to a checkout.
+#
+# Read-only; needs a PostgreSQL DB_CONNECTION_URI, since the tool calls use
+# pg_sleep.
+#
+#   DB_CONNECTION_URI=postgresql://.../resort python -m app.scripts.bench_pool
+
+import argparse
+import statistics
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.engine import Engine
+
+from app.config.db import AGENT, DB_CONNECTION_URI, HTTP, MeteredQueuePool
+
+
+def pooled(workload: str, size: int, overflow: int, timeout: float, pre_ping: bool = True) -> Engine:
+    engine = create_engine(
+        DB_CONNECTION_URI, poolclass=MeteredQueuePool, pool_size=size, max_overflow=overflow,
+        pool_timeout=timeout, pool_pre_ping=pre_ping,
+    )
+    engine.pool.workload = workload
+    return engine
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def load(engine: Engine, threads: int, seconds: float, statement: str, think: float, stats: Dict) -> List[threading.Thread]:
+    """
+    Starts `threads` threads running `statement` on `engine` in a loop for
+    `seconds`, pausing `think` seconds between statements (the gap between
+    requests, in which the connection is back in the pool).
+    """
+    lock = threading.Lock()
+    stats.update(latencies=[], waits=[], timeouts=0)
+    deadline = time.monotonic() + seconds
+
+    def worker():
+        while time.monotonic() < deadline:
+            time.sleep(think)
+            started = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    waited = time.perf_counter() - started
+                    conn.execute(text(statement))
+            except exc.TimeoutError:
+                with lock:
+                    stats["timeouts"] += 1
+                continue
+            with lock:
+                stats["waits"].append(waited)
+                stats["latencies"].append(time.perf_counter() - started)
+
+    workers = [threading.Thread(target=worker, daemon=True) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    return workers
+
+
+def scenario(
+    name: str, http: Engine, agent: Optional[Engine], http_threads: int, agent_threads: int,
+    seconds: float, think: float, tool_seconds: float,
+) -> None:
+    http_stats, agent_stats = {}, {}
+    workers = load(http, http_threads, seconds, "SELECT count(*) FROM rooms WHERE NOT is_booked", think, http_stats)
+    if agent is not None and agent_threads:
+        workers += load(agent, agent_threads, seconds, f"SELECT pg_sleep({tool_seconds})", 0.0, agent_stats)
+    for t in workers:
+        t.join()
+    latencies, waits = http_stats["latencies"], http_stats["waits"]
+    print(
+        f"{name:<34} {len(latencies):>6} {statistics.median(latencies) * 1000:>7.1f} {percentile(latencies, 0.99) * 1000:>8.1f}"
+        f" {percentile(waits, 0.99) * 1000:>9.1f} {http_stats['timeouts']:>6}"
+        f" {len(agent_stats.get('latencies', [])):>6} {agent_stats.get('timeouts', 0):>6}"
+    )
+
+
+def pre_ping_cost(repeat: int) -> None:
+    for pre_ping in (False, True):
+        engine = pooled(HTTP, 1, 0, 5.0, pre_ping=pre_ping)
+        with engine.connect():
+            pass  # open the connection outside the timing
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            timings.append(time.perf_counter() - started)
+        engine.dispose()
+        print(f"checkout + SELECT 1, pre_ping={pre_ping!s:<5}: p50 {statistics.median(timings) * 1000:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Connection pool saturation benchmark")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--http-threads", type=int, default=8)
+    parser.add_argument("--think", type=float, default=0.02, help="Pause between one HTTP thread's requests.")
+    parser.add_argument("--chats", type=int, default=40, help="Concurrent tool calls in the chat burst.")
+    parser.add_argument("--tool-seconds", type=float, default=0.2, help="How long each tool call holds its connection.")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Pool timeout of both pools.")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<34} {'http':>6} {'p50 ms':>7} {'p99 ms':>8} {'wait p99':>9} {'t/out':>6} {'tools':>6} {'t/out':>6}")
+    run = lambda name, http, agent, http_threads=args.http_threads, chats=args.chats: scenario(
+        name, http, agent, http_threads, chats, args.seconds, args.think, args.tool_seconds,
+    )
+
+    http = pooled(HTTP, 10, 10, args.timeout)
+    run("HTTP alone (pool 10+10)", http, None)
+    run("chat burst sharing the HTTP pool", http, http)
+    agent = pooled(AGENT, 3, 2, args.timeout)
+    run("chat burst on its own pool (3+2)", http, agent)
+    run(f"HTTP, {4 * args.http_threads} threads on pool 2+2", pooled(HTTP, 2, 2, args.timeout), None, 4 * args.http_threads, 0)
+    run("same, with a 20 ms pool timeout", pooled(HTTP, 2, 2, 0.02), None, 4 * args.http_threads, 0)
+    pre_ping_cost(2000)
+
+
+if __name__ == "__main__":
+    main()
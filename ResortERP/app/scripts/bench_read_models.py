@@ -0,0 +1,159 @@
+# app/scripts/bench_read_models.py
+#
+# Compares the ORM read path of /rooms/available (Room entities validated
+# through RoomSchema, then serialized) with the read model path (column
+# tuples serialized by app/routers/fast_json.py), for latency and peak
+# memory. Also compares the two versions of tool_get_available_rooms, and
+# both routes end to end through FastAPI.
+#
+# DESTRUCTIVE: drops and recreates every table of DB_CONNECTION_URI, so
+# point it at a scratch database and pass --reset.
+#
+#   DB_CONNECTION_URI=postgresql://.../scratch python -m app.scripts.bench_read_models --reset --rooms 10000
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+import uuid
+from typing import List
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from app.config.db import Base, SessionLocal, engine
+from app.domain.model.base import Room
+from app.domain.schema.base import RoomSchema
+from app.repo.base import ResortManager
+from app.repo.read_models import ROOM_FIELDS
+from app.routers import fast_json
+from app.routers.fast_json import FastJSONResponse, rows_to_json
+
+ROOMS_ADAPTER = TypeAdapter(List[RoomSchema])
+
+
+def reset(rooms: int) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(Room.__table__.insert(), [
+            {"id": uuid.uuid4(), "number": str(i), "is_booked": i % 10 == 0,
+             "room_type": ("standard", "deluxe", "suite")[i % 3], "capacity": 2 + i % 3,
+             "view": ("ocean", "garden", None)[i % 3], "price": 100 + i % 50 + 0.5,
+             "amenities": ["wifi", "balcony"][: i % 3]}
+            for i in range(rooms)
+        ])
+
+
+# --- The paths compared ---
+
+def orm_body(manager: ResortManager) -> bytes:
+    # What FastAPI does for response_model=List[RoomSchema]: validate, then dump
+    rooms = manager.get_available_rooms()
+    return ROOMS_ADAPTER.dump_json(ROOMS_ADAPTER.validate_python(rooms, from_attributes=True))
+
+
+def rows_body(manager: ResortManager) -> bytes:
+    return rows_to_json(ROOM_FIELDS, manager.get_available_room_rows(ROOM_FIELDS))
+
+
+def rows_body_stdlib(manager: ResortManager) -> bytes:
+    saved, fast_json.orjson = fast_json.orjson, None
+    try:
+        return rows_body(manager)
+    finally:
+        fast_json.orjson = saved
+
+
+def orm_tool(manager: ResortManager) -> list:
+    return [{"id": str(room.id), "number": room.number, "is_booked": room.is_booked} for room in manager.get_available_rooms()]
+
+
+def rows_tool(manager: ResortManager) -> list:
+    rows = manager.get_available_room_rows(("id", "number", "is_booked"))
+    return [{"id": str(room_id), "number": number, "is_booked": is_booked} for room_id, number, is_booked in rows]
+
+
+def run(path, tracing: bool = False):
+    db = SessionLocal()
+    try:
+        if tracing:
+            tracemalloc.start()
+        started = time.perf_counter()
+        result = path(ResortManager(db))
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if tracing else 0
+        return result, elapsed, peak
+    finally:
+        if tracing:
+            tracemalloc.stop()
+        db.close()
+
+
+def compare(repeat: int) -> None:
+    paths = [
+        ("ORM + RoomSchema", orm_body), ("read model + orjson", rows_body), ("read model + json", rows_body_stdlib),
+        ("tool, ORM", orm_tool), ("tool, read model", rows_tool),
+    ]
+    if fast_json.orjson is None:
+        paths.remove(("read model + orjson", rows_body))
+    reference = json.loads(run(orm_body)[0])
+    print(f"{'path':<22} {'p50 ms':>8} {'peak MB':>8}")
+    for name, path in paths:
+        result = run(path)[0]
+        if path in (rows_body, rows_body_stdlib):
+            assert json.loads(result) == reference, f"{name} differs from the ORM response"
+        timings = [run(path)[1] for _ in range(repeat)]
+        peak = run(path, tracing=True)[2]
+        print(f"{name:<22} {statistics.median(timings) * 1000:>8.1f} {peak / 1e6:>8.1f}")
+
+
+def compare_http(repeat: int) -> None:
+    # Both routes as FastAPI serves them, without the app's middleware
+    app = FastAPI()
+
+    def manager():
+        db = SessionLocal()
+        try:
+            yield ResortManager(db)
+        finally:
+            db.close()
+
+    @app.get("/orm", response_model=List[RoomSchema])
+    def orm_route(resort_manager: ResortManager = Depends(manager)):
+        return resort_manager.get_available_rooms()
+
+    @app.get("/rows", response_model=List[RoomSchema])
+    def rows_route(resort_manager: ResortManager = Depends(manager)):
+        return FastJSONResponse(raw=rows_body(resort_manager))
+
+    with TestClient(app) as client:
+        assert client.get("/orm").json() == client.get("/rows").json()
+        for path in ("/orm", "/rows"):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                client.get(path).raise_for_status()
+                timings.append(time.perf_counter() - started)
+            print(f"GET {path:<18} {statistics.median(timings) * 1000:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ORM and read model paths of /rooms/available")
+    parser.add_argument("--rooms", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--reset", action="store_true", help="Required: confirms that all tables are dropped.")
+    args = parser.parse_args()
+    if not args.reset:
+        parser.error("this benchmark drops every table of DB_CONNECTION_URI; pass --reset to confirm")
+
+    reset(args.rooms)
+    print(f"{engine.dialect.name}, {args.rooms} rooms ({args.rooms - args.rooms // 10} available)")
+    compare(args.repeat)
+    compare_http(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
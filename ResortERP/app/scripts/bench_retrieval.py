@@ -0,0 +1,99 @@
+# app/scripts/bench_retrieval.py
+#
+# Builds a synthetic knowledge index (default 100k chunks) and measures query
+# latency and recall of the IVF index against exact search.
+#
+#   python -m app.scripts.bench_retrieval --chunks 100000 --nprobe 8,16,32,64,128
+
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+
+from app.knowledge import Chunk, VectorIndex, build_index_from_chunks, get_embedder
+
+
+def synthetic_corpus(count: int, topics: int, seed: int = 0):
+    """
+    Chunks built like real documents on many subjects: each chunk is five
+    phrases from its topic's twelve phrases plus 18 Zipf-distributed background
+    words. Queries are one topic phrase, like a guest asking about one subject.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = 50_000
+    phrases = rng.integers(0, vocabulary, size=(topics, 12, 6))
+    zipf = np.cumsum(1.0 / np.arange(1, vocabulary + 1))
+    zipf /= zipf[-1]
+    topic = rng.integers(topics, size=count)
+    words = np.concatenate([
+        phrases[topic[:, None], rng.integers(12, size=(count, 5))].reshape(count, 30),
+        np.searchsorted(zipf, rng.random((count, 18))),
+    ], axis=1)
+    chunks = [Chunk(" ".join(f"w{w}" for w in row), f"topic-{t}.md") for row, t in zip(words, topic)]
+
+    def query():
+        return " ".join(f"w{w}" for w in phrases[rng.integers(topics), rng.integers(12)][:5])
+
+    return chunks, query
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return ordered[len(ordered) // 2] * 1000, ordered[int(len(ordered) * 0.95)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge index latency/recall benchmark")
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--topics", type=int, default=2_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", default="8,16,32,64,128", help="Comma-separated nprobe values to try.")
+    parser.add_argument("--nlist", type=int, help="IVF clusters (default 4 * sqrt(chunks)).")
+    parser.add_argument("--embedder", default="hashing")
+    args = parser.parse_args()
+
+    embedder = get_embedder(args.embedder)
+    started = time.perf_counter()
+    chunks, make_query = synthetic_corpus(args.chunks, args.topics)
+    print(f"generated {len(chunks):,} chunks in {time.perf_counter() - started:.1f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index")
+        started = time.perf_counter()
+        meta = build_index_from_chunks(chunks, path, embedder, ivf_min_chunks=1, nlist=args.nlist)
+        size_mb = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1e6
+        print(f"built index in {time.perf_counter() - started:.1f}s: nlist={meta['nlist']}, {size_mb:.0f} MB on disk")
+
+        index = VectorIndex(path)
+        queries = [embedder.embed_query(make_query()) for _ in range(args.queries)]
+        index.search_rows(queries[0], args.k, exact=True)  # fault the vectors into the page cache
+
+        timings, truth = [], []
+        for query in queries:
+            t = time.perf_counter()
+            rows, _ = index.search_rows(query, args.k, exact=True)
+            timings.append(time.perf_counter() - t)
+            truth.append(set(rows.tolist()))
+        p50, p95 = percentiles(timings)
+        print(f"\n| search            | p50 ms | p95 ms | recall@{args.k} |")
+        print("|-------------------|--------|--------|-----------|")
+        print(f"| exact             | {p50:6.2f} | {p95:6.2f} |     1.000 |")
+        for nprobe in (int(n) for n in args.nprobe.split(",")):
+            timings, found = [], 0
+            for query, expected in zip(queries, truth):
+                t = time.perf_counter()
+                rows, _ = index.search_rows(query, args.k, nprobe=nprobe)
+                timings.append(time.perf_counter() - t)
+                found += len(expected & set(rows.tolist()))
+            p50, p95 = percentiles(timings)
+            print(f"| IVF nprobe={nprobe:<6} | {p50:6.2f} | {p95:6.2f} | {found / (len(queries) * args.k):9.3f} |")
+
+    print(f"\npeak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
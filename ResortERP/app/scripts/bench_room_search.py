@@ -0,0 +1,110 @@
+# app/scripts/bench_room_search.py
+#
+# Times RoomIndex queries and incremental updates on synthetic rooms, and
+# cross-checks every query against a linear scan.
+#
+#   python -m app.scripts.bench_room_search --rooms 5000 --queries 2000
+
+import argparse
+import random
+import time
+import uuid
+from types import SimpleNamespace
+
+from app.repo.room_index import RoomIndex
+
+TYPES = ["standard", "deluxe", "suite", "villa"]
+VIEWS = ["ocean", "garden", "pool", "mountain", None]
+AMENITIES = ["wifi", "balcony", "jacuzzi", "kitchen", "minibar", "accessible"]
+
+
+def make_room(number: int, rng: random.Random) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        number=str(number),
+        room_type=rng.choice(TYPES),
+        capacity=rng.choice([1, 2, 2, 3, 4, 6]),
+        view=rng.choice(VIEWS),
+        price=round(rng.uniform(60, 600), 2),
+        amenities=rng.sample(AMENITIES, rng.randint(0, 4)),
+        is_booked=rng.random() < 0.4,
+    )
+
+
+def make_query(rng: random.Random) -> dict:
+    return {
+        "room_types": rng.sample(TYPES, rng.randint(0, 2)),
+        "views": rng.sample([v for v in VIEWS if v], rng.randint(0, 2)),
+        "amenities_all": rng.sample(AMENITIES, rng.randint(0, 2)),
+        "min_capacity": rng.choice([None, 2, 4]),
+        "max_price": rng.choice([None, 150.0, 200.0, 350.0]),
+        "sort": "price",
+        "limit": 20,
+    }
+
+
+def linear_scan(rooms, q: dict) -> list:
+    hits = [
+        r for r in rooms
+        if not r.is_booked
+        and (not q["room_types"] or r.room_type in q["room_types"])
+        and (not q["views"] or r.view in q["views"])
+        and all(a in r.amenities for a in q["amenities_all"])
+        and (q["min_capacity"] is None or r.capacity >= q["min_capacity"])
+        and (q["max_price"] is None or r.price <= q["max_price"])
+    ]
+    hits.sort(key=lambda r: r.price)
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Room index query latency")
+    parser.add_argument("--rooms", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rooms = {}
+    for n in range(args.rooms):
+        room = make_room(100 + n, rng)
+        rooms[room.id] = room
+    index = RoomIndex()
+
+    started = time.perf_counter()
+    index.rebuild(rooms.values())
+    print(f"rebuild: {args.rooms} rooms in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    # Incremental updates: flip availability as booking/unbooking would
+    ids = list(rooms)
+    started = time.perf_counter()
+    for room_id in rng.sample(ids, min(1000, len(ids))):
+        room = rooms[room_id]
+        room.is_booked = not room.is_booked
+        index.upsert(room)
+    print(f"upsert:  {(time.perf_counter() - started) / min(1000, len(ids)) * 1e6:.1f} µs per room change")
+
+    queries = [make_query(rng) for _ in range(args.queries)]
+    index_times, scan_times = [], []
+    for q in queries:
+        started = time.perf_counter()
+        hits, total = index.search(**q)
+        index_times.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        expected = linear_scan(rooms.values(), q)
+        scan_times.append(time.perf_counter() - started)
+
+        assert total == len(expected), (q, total, len(expected))
+        assert [h.price for h in hits] == [r.price for r in expected[:20]], q
+
+    index_times.sort()
+    scan_times.sort()
+    p = lambda xs, pct: xs[int(len(xs) * pct)] * 1e6
+    print(f"index search: p50 {p(index_times, 0.5):.1f} µs  p99 {p(index_times, 0.99):.1f} µs")
+    print(f"linear scan:  p50 {p(scan_times, 0.5):.1f} µs  p99 {p(scan_times, 0.99):.1f} µs")
+    print(f"{args.queries} queries matched the linear scan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# app/scripts/bench_server.py
+#
+# Closed-loop HTTP load generator for comparing server configurations (e.g.
+# `python -m app.serve --workers 1` vs `--workers 4`). Each client thread
+# keeps one keep-alive connection and issues requests back to back.
+#
+#   python -m app.scripts.bench_server --url http://127.0.0.1:8000/rooms/available --clients 32 --duration 15
+
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def client(url, deadline: float, latencies: list, errors: list) -> None:
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP throughput/latency benchmark")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/rooms/available")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0)
+    args = parser.parse_args()
+
+    latencies: list = []
+    errors: list = []
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=client, args=(args.url, deadline, latencies, errors)) for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if not latencies:
+        print(f"no successful requests ({len(errors)} errors)")
+        return
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{args.url} clients={args.clients} duration={args.duration:.0f}s")
+    print(f"requests={len(latencies)} errors={len(errors)} throughput={len(latencies) / args.duration:,.0f} req/s")
+    print(f"latency p50={quantiles[49] * 1000:.1f}ms p90={quantiles[89] * 1000:.1f}ms p99={quantiles[98] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
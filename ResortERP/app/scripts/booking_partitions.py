@@ -0,0 +1,79 @@
+# app/scripts/booking_partitions.py
+#
+# Maintenance of the monthly booking partitions. Schedule `ensure` and
+# `archive` daily (cron, k8s CronJob); run `migrate` once when upgrading an
+# existing database. Every resort database is processed unless --resort names one.
+#
+#   python -m app.scripts.booking_partitions status
+#   python -m app.scripts.booking_partitions ensure --months-ahead 3
+#   python -m app.scripts.booking_partitions archive [--before 2025-10] [--dry-run]
+#   python -m app.scripts.booking_partitions migrate
+#   python -m app.scripts.booking_partitions --resort aspen status
+
+import argparse
+from datetime import date, datetime
+
+from sqlalchemy import func, select
+
+from app.config.db import Base, shard_router
+from app.domain.model.base import Booking, BookingArchive
+from app.repo import partitions
+
+
+def _month(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def status(engine) -> None:
+    with engine.connect() as conn:
+        live = conn.execute(select(func.count()).select_from(Booking)).scalar()
+        archived = conn.execute(select(func.count()).select_from(BookingArchive)).scalar()
+        print(f"bookings: {live:,} rows, bookings_archive: {archived:,} rows, "
+              f"archive cutoff: {partitions.archive_cutoff():%Y-%m}")
+        if not partitions.is_postgres(conn):
+            print(f"{conn.dialect.name}: bookings is a single table (partitioning is PostgreSQL only)")
+            return
+        if not partitions.is_partitioned(conn):
+            print("bookings is not partitioned yet; run `migrate`")
+            return
+        for table in (Booking.__tablename__, BookingArchive.__tablename__):
+            for name, start in partitions.list_partitions(conn, table):
+                print(f"  {table:<17} {start:%Y-%m}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage monthly booking partitions and archival")
+    parser.add_argument("--resort", choices=shard_router.resort_ids(), help="Only this resort (default: all).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Show row counts and partitions.")
+    ensure = commands.add_parser("ensure", help="Create missing monthly partitions (PostgreSQL).")
+    ensure.add_argument("--from", dest="first_month", type=_month, help="First month (YYYY-MM), default: current.")
+    ensure.add_argument("--months-ahead", type=int, help="Default: BOOKING_PARTITIONS_AHEAD.")
+    archive = commands.add_parser("archive", help="Move closed months to bookings_archive.")
+    archive.add_argument("--before", type=_month, help="Archive months before YYYY-MM (default: BOOKING_RETENTION_MONTHS ago).")
+    archive.add_argument("--dry-run", action="store_true")
+    commands.add_parser("migrate", help="Upgrade an existing database to the partitioned layout.")
+    args = parser.parse_args()
+
+    for resort_id, engine in shard_router.engines():
+        if args.resort and resort_id != args.resort:
+            continue
+        print(f"[{resort_id}]")
+        # Creates only missing tables (e.g. bookings_archive); existing ones are left to `migrate`
+        Base.metadata.create_all(bind=engine)
+        if args.command == "migrate":
+            print(partitions.migrate_bookings(engine))
+        elif args.command == "status":
+            status(engine)
+        elif args.command == "ensure":
+            created = partitions.ensure_booking_partitions(engine, first_month=args.first_month, months_ahead=args.months_ahead)
+            print(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+        elif args.command == "archive":
+            partitions.ensure_booking_partitions(engine)
+            result = partitions.archive_bookings(engine, before=args.before, dry_run=args.dry_run)
+            print(f"{'Would archive' if args.dry_run else 'Archived'} {len(result['archived'])} months "
+                  f"({', '.join(result['archived']) or '-'}); skipped with active bookings: {', '.join(result['skipped']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# app/scripts/build_knowledge_index.py
+#
+# Rebuilds the knowledge index used by the RAG agent from the documents in
+# KNOWLEDGE_DOCS_DIR, then optionally runs a query against it.
+#
+#   python -m app.scripts.build_knowledge_index
+#   python -m app.scripts.build_knowledge_index --docs ./docs --query "spa opening hours"
+
+import argparse
+
+from app.config.env import get_settings
+from app.knowledge import build_index, knowledge_base
+from app.observability.log import setup_logging, shutdown_logging
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Build the resort knowledge index")
+    parser.add_argument("--docs", default=settings.KNOWLEDGE_DOCS_DIR, help="Documents directory (.md/.txt).")
+    parser.add_argument("--index", default=settings.KNOWLEDGE_INDEX_DIR, help="Index directory to write.")
+    parser.add_argument("--embedder", default=settings.KNOWLEDGE_EMBEDDER, help="'hashing' or 'gemini'.")
+    parser.add_argument("--query", help="Search the new index for this text.")
+    args = parser.parse_args()
+
+    setup_logging()
+    try:
+        meta = build_index(args.docs, args.index, args.embedder)
+        print(f"Indexed {meta['count']:,} chunks from {len({s.split(' > ')[0] for s in meta['sources']})} documents "
+              f"into {args.index} ({'IVF, nlist=' + str(meta['nlist']) if meta['nlist'] else 'exact search'})")
+        if args.query:
+            for hit in knowledge_base.search(args.query, path=args.index):
+                print(f"\n[{hit.score:.3f}] {hit.source}\n{hit.text}")
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
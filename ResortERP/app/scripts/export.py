@@ -0,0 +1,52 @@
+# app/scripts/export.py
+#
+# Streams the bookings or rooms table to a CSV or Parquet file in fixed-size
+# batches and reports throughput and peak memory.
+#
+#   python -m app.scripts.export bookings --format csv --out bookings.csv
+#   python -m app.scripts.export rooms --format parquet --out rooms.parquet --batch-size 10000
+#   python -m app.scripts.export bookings --resort aspen --out aspen-bookings.csv
+#   python -m app.scripts.export bookings --live-only --out live-bookings.csv
+
+import argparse
+import resource
+import sys
+
+from app.config.db import shard_router
+from app.repo.export import EXPORT_FORMATS, EXPORT_TABLES, DEFAULT_BATCH_SIZE, ExportStats, stream_export
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a table to CSV or Parquet")
+    parser.add_argument("table", choices=sorted(EXPORT_TABLES))
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv")
+    parser.add_argument("--out", help="Output file (default: stdout).")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--resort", choices=shard_router.resort_ids(), default=shard_router.default)
+    parser.add_argument("--live-only", action="store_true", help="Leave out archived bookings.")
+    args = parser.parse_args()
+
+    stats = ExportStats()
+    db = shard_router.session(args.resort)
+    out = open(args.out, "wb") if args.out else sys.stdout.buffer
+    try:
+        for chunk in stream_export(
+            db, args.table, export_format=args.format, batch_size=args.batch_size, stats=stats,
+            include_archived=not args.live_only,
+        ):
+            out.write(chunk)
+    finally:
+        if args.out:
+            out.close()
+        db.close()
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"Exported {stats.rows:,} {args.table} rows ({stats.bytes / 1e6:.1f} MB {args.format}) in {stats.seconds:.2f}s: "
+        f"{stats.rows_per_second:,.0f} rows/s, peak RSS {peak_mb:.0f} MB",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# app/scripts/profile_startup.py
+#
+# Reports per-module import cost of the app using `python -X importtime` and
+# fails when startup regresses. Run from the project root (the directory that
+# contains the `app` package):
+#
+#   python -m app.scripts.profile_startup
+#   python -m app.scripts.profile_startup --module app.main --top 30 --max-total-ms 800
+#   python -m app.scripts.profile_startup --save-baseline startup.json
+#   python -m app.scripts.profile_startup --baseline startup.json --tolerance 0.25
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Modules that must only load on the first chat request or on warmup.
+DEFAULT_FORBIDDEN = [
+    "google.adk",
+    "google.genai",
+    "googleapiclient",
+    "google_auth_oauthlib",
+    "app.agents.root_agent",
+]
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportRecord]:
+    """
+    Parses the stderr of `python -X importtime` into import records.
+
+    Args:
+        stderr (str): Raw stderr output.
+
+    Returns:
+        List[ImportRecord]: One record per imported module, in import order.
+    """
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            records.append(ImportRecord(
+                module=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name) - len(name.lstrip())) // 2,
+            ))
+        except ValueError:
+            continue
+    return records
+
+
+def measure(module: str) -> Dict[str, ImportRecord]:
+    """
+    Imports `module` in a fresh interpreter and returns its import records by name.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        tail = "\n".join(result.stderr.strip().splitlines()[-5:])
+        raise RuntimeError(f"Importing '{module}' failed:\n{tail}")
+    return {record.module: record for record in parse_importtime(result.stderr)}
+
+
+def best_of(module: str, repeat: int) -> Dict[str, ImportRecord]:
+    """
+    Runs `measure` `repeat` times and keeps the fastest run per module to reduce noise.
+    """
+    best: Dict[str, ImportRecord] = {}
+    for _ in range(repeat):
+        for name, record in measure(module).items():
+            if name not in best or record.cumulative_us < best[name].cumulative_us:
+                best[name] = record
+    return best
+
+
+def report(records: Dict[str, ImportRecord], module: str, top: int) -> None:
+    total = records[module].cumulative_us if module in records else 0
+    print(f"Import of '{module}': {total / 1000:.1f} ms total, {len(records)} modules")
+    print(f"{'self ms':>9} {'cum ms':>9}  module")
+    for record in sorted(records.values(), key=lambda r: r.self_us, reverse=True)[:top]:
+        print(f"{record.self_us / 1000:9.1f} {record.cumulative_us / 1000:9.1f}  {record.module}")
+
+
+def check(
+    records: Dict[str, ImportRecord],
+    module: str,
+    forbidden: List[str],
+    max_total_ms: Optional[float],
+    baseline: Optional[Dict[str, float]],
+    tolerance: float,
+) -> List[str]:
+    """
+    Returns a list of human readable regressions (empty when startup is healthy).
+    """
+    problems = []
+    for name in records:
+        for prefix in forbidden:
+            if name == prefix or name.startswith(prefix + "."):
+                problems.append(f"'{name}' is imported eagerly (forbidden prefix '{prefix}')")
+                break
+
+    total_ms = records[module].cumulative_us / 1000 if module in records else 0.0
+    if max_total_ms is not None and total_ms > max_total_ms:
+        problems.append(f"total import time {total_ms:.1f} ms exceeds budget of {max_total_ms:.1f} ms")
+
+    if baseline:
+        allowed = baseline.get("total_ms", 0.0) * (1 + tolerance)
+        if total_ms > allowed:
+            problems.append(
+                f"total import time {total_ms:.1f} ms regressed past baseline "
+                f"{baseline['total_ms']:.1f} ms (+{tolerance:.0%} allowed)"
+            )
+        new_modules = sorted(set(records) - set(baseline.get("modules", [])))
+        top_level_new = [name for name in new_modules if "." not in name]
+        if top_level_new:
+            problems.append(f"new top-level imports since baseline: {', '.join(top_level_new)}")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile and guard app import time.")
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main).")
+    parser.add_argument("--top", type=int, default=20, help="Number of slowest modules to list.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs to take the best timing from.")
+    parser.add_argument("--max-total-ms", type=float, default=None, help="Fail above this total import time.")
+    parser.add_argument("--forbid", action="append", default=None,
+                        help="Module prefix that must not be imported (repeatable).")
+    parser.add_argument("--baseline", help="JSON file written by --save-baseline to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs. baseline.")
+    parser.add_argument("--save-baseline", help="Write the measured profile to this JSON file.")
+    args = parser.parse_args(argv)
+
+    try:
+        records = best_of(args.module, max(1, args.repeat))
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    report(records, args.module, args.top)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "module": args.module,
+                "total_ms": records[args.module].cumulative_us / 1000 if args.module in records else 0.0,
+                "modules": sorted(records),
+            }, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    forbidden = args.forbid if args.forbid is not None else DEFAULT_FORBIDDEN
+    problems = check(records, args.module, forbidden, args.max_total_ms, baseline, args.tolerance)
+    for problem in problems:
+        print(f"REGRESSION: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+# app/scripts/rebuild_rollups.py
+#
+# Recomputes what the occupancy rollup tables (room_type_inventory,
+# daily_occupancy) can derive from rooms and bookings: current inventory and
+# days missing from the rollups. Safe to run at any time, one transaction per
+# resort database; bookings wait for the rollup writes, not the history scan.
+#
+#   python -m app.scripts.rebuild_rollups [--resort aspen]
+
+import argparse
+import time
+
+from app.config.db import Base, shard_router
+from app.repo.rollups import rebuild_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute occupancy rollups from rooms and bookings")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Bookings fetched per round trip.")
+    parser.add_argument("--resort", choices=shard_router.resort_ids(), help="Only this resort (default: all).")
+    args = parser.parse_args()
+
+    import app.domain.model.base  # noqa: F401  (register models)
+    for resort_id, engine in shard_router.engines():
+        if args.resort and resort_id != args.resort:
+            continue
+        Base.metadata.create_all(bind=engine)
+        db = shard_router.session(resort_id)
+        try:
+            started = time.perf_counter()
+            result = rebuild_rollups(db, batch_size=args.batch_size)
+            print(f"[{resort_id}] Recomputed {result['room_types']} room types and backfilled {result['daily_rows']} daily rows "
+                  f"in {time.perf_counter() - started:.2f}s")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
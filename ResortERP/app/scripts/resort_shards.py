@@ -0,0 +1,65 @@
+# app/scripts/resort_shards.py
+#
+# Resort (property) databases. `migrate` prepares every database listed in
+# DB_CONNECTION_URI / RESORT_SHARDS: it creates missing tables and booking
+# partitions, adds `resort_id` to tables from before multi-resort support, and
+# drops the extra `id` indexes of tables from before time-ordered keys.
+# `status` counts the rows of each resort, querying all databases concurrently.
+#
+#   RESORT_SHARDS='{"aspen": "postgresql+psycopg2://...", "maui": "..."}' python -m app.scripts.resort_shards migrate
+#   python -m app.scripts.resort_shards status
+
+import argparse
+import time
+
+from app.config.db import Base, shard_router
+from app.repo.base import fan_out_resorts
+from app.repo.holds import migrate_hold_columns
+from app.repo.partitions import ensure_booking_partitions, migrate_cancellation_columns
+from app.repo.shards import drop_redundant_id_indexes, migrate_resort_columns, resort_row_counts
+
+
+def migrate() -> None:
+    for resort_id, engine in shard_router.engines():
+        Base.metadata.create_all(bind=engine)
+        changed = migrate_resort_columns(engine)
+        dropped = drop_redundant_id_indexes(engine)
+        created = ensure_booking_partitions(engine)
+        holds = migrate_hold_columns(engine)
+        cancellations = migrate_cancellation_columns(engine)
+        print(f"[{resort_id}] {engine.url.render_as_string(hide_password=True)}: "
+              f"resort_id added to {', '.join(changed) or 'no tables'}; "
+              f"dropped {', '.join(dropped) or 'no redundant indexes'}; {len(created)} partitions created"
+              f"{'; room hold columns added' if holds else ''}"
+              f"{'; booking cancellation columns added' if cancellations else ''}")
+
+
+def status() -> None:
+    started = time.perf_counter()
+    results, errors = fan_out_resorts(lambda manager: resort_row_counts(manager.db))
+    elapsed = time.perf_counter() - started
+    for resort_id in shard_router.resort_ids():
+        marker = " (default)" if resort_id == shard_router.default else ""
+        if resort_id in results:
+            counts = ", ".join(f"{table}: {count:,}" for table, count in results[resort_id].items())
+            print(f"{resort_id}{marker}: {counts}")
+        else:
+            print(f"{resort_id}{marker}: unavailable ({errors[resort_id]!r})")
+    print(f"{len(results)}/{len(shard_router.resort_ids())} resorts answered in {elapsed * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepare and inspect resort databases")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("migrate", help="Create tables, add resort_id and room hold columns and drop redundant indexes in every resort database.")
+    commands.add_parser("status", help="Row counts per resort.")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrate()
+    elif args.command == "status":
+        status()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# app/scripts/run_jobs.py
+#
+# Runs the background job worker as its own process, e.g. with JOB_WORKERS=0
+# on the API servers so request handling and jobs scale separately. Stops on
+# SIGTERM/SIGINT after letting running jobs finish.
+#
+#   python -m app.scripts.run_jobs --concurrency 8
+
+import argparse
+import asyncio
+import signal
+
+from app.config.db import Base, shard_router
+from app.config.env import get_settings
+from app.jobs import job_worker
+from app.observability.log import setup_logging, shutdown_logging
+
+
+async def run(args) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    job_worker.concurrency = args.concurrency
+    job_worker.poll_interval = args.poll_interval
+    job_worker.lease_seconds = get_settings().JOB_LEASE_SECONDS
+    await job_worker.start()
+    await stop.wait()
+    await job_worker.stop(timeout=args.shutdown_timeout)
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run the background job worker")
+    parser.add_argument("--concurrency", type=int, default=max(settings.JOB_WORKERS, 1))
+    parser.add_argument("--poll-interval", type=float, default=settings.JOB_POLL_INTERVAL)
+    parser.add_argument("--shutdown-timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    setup_logging()
+    for _, engine in shard_router.engines():
+        Base.metadata.create_all(bind=engine)
+    try:
+        asyncio.run(run(args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# app/serve.py
+#
+# Production entry point: a pre-forking supervisor that imports the app once,
+# binds the listening socket, and forks N uvicorn worker processes that share
+# it. Run from the project root:
+#
+#   python -m app.serve --workers 4 --loop uvloop --http httptools
+#
+# SIGTERM/SIGINT are forwarded to every worker; uvicorn stops accepting new
+# connections and lets in-flight requests (including long chat turns) finish
+# for up to --graceful-timeout seconds before the supervisor kills stragglers.
+# Workers that die unexpectedly are replaced.
+#
+# With --metrics-port, worker i also serves its own /metrics on
+# metrics-port + i, so Prometheus scrapes every worker as its own target.
+# (The app's /metrics on the shared port answers from whichever worker
+# accepted the connection.) A replaced worker takes over the slot, and
+# so the port, of the one it replaces.
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("app.serve")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the Resort ERP API with multiple worker processes.")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)),
+                        help="Number of worker processes (default: WEB_CONCURRENCY or CPU count).")
+    parser.add_argument("--loop", default=os.environ.get("UVICORN_LOOP", "auto"), choices=["auto", "asyncio", "uvloop"],
+                        help="Event loop implementation.")
+    parser.add_argument("--http", default=os.environ.get("UVICORN_HTTP", "auto"), choices=["auto", "h11", "httptools"],
+                        help="HTTP/1.1 parser implementation.")
+    parser.add_argument("--ws", default=os.environ.get("UVICORN_WS", "auto"),
+                        help="WebSocket implementation (auto, websockets, websockets-sansio on uvicorn>=0.35, wsproto).")
+    parser.add_argument("--ws-per-message-deflate", action="store_true",
+                        default=os.environ.get("WS_PER_MESSAGE_DEFLATE", "false").lower() in ("1", "true", "yes"),
+                        help="Compress WebSocket messages; costs ~100 KiB of zlib state per connection.")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--graceful-timeout", type=float, default=float(os.environ.get("GRACEFUL_TIMEOUT", "60")),
+                        help="Seconds workers get to drain in-flight requests on shutdown.")
+    parser.add_argument("--keep-alive", type=int, default=5, help="HTTP keep-alive timeout in seconds.")
+    parser.add_argument("--metrics-port", type=int, default=int(os.environ.get("METRICS_PORT", "0")),
+                        help="Worker i serves its metrics on this port + i (default: METRICS_PORT; 0 disables).")
+    parser.add_argument("--preload-agents", action="store_true",
+                        help="Import the agent stack in the supervisor so workers share it copy-on-write.")
+    return parser.parse_args(argv)
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    # asyncio only enables TCP_NODELAY on accepted connections when proto is
+    # IPPROTO_TCP; without it keep-alive responses stall on delayed ACKs (~40ms)
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, args: argparse.Namespace, slot: int) -> None:
+    """Body of the forked worker process in `slot` (0 .. workers - 1). Never returns."""
+    import uvicorn
+    from app.config.db import dispose_engine_after_fork
+    from app.observability.log import shutdown_logging
+    from app.observability.metrics import serve_metrics
+
+    # Reset the supervisor's handlers; uvicorn installs its own graceful ones
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+        signal.signal(sig, signal.SIG_DFL)
+
+    # Connections pooled by the supervisor (e.g. from create_all) must not be shared
+    dispose_engine_after_fork()
+
+    if args.metrics_port:
+        serve_metrics(args.metrics_port + slot, args.host)
+
+    config = uvicorn.Config(
+        app,
+        loop=args.loop,
+        http=args.http,
+        ws=args.ws,
+        ws_per_message_deflate=args.ws_per_message_deflate,
+        lifespan="on",
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        log_config=None,
+        access_log=False,
+    )
+    server = uvicorn.Server(config)
+    exit_code = 0
+    try:
+        server.run(sockets=[sock])
+    except BaseException:
+        logger.exception("Worker crashed", extra={"pid": os.getpid()})
+        exit_code = 1
+    finally:
+        shutdown_logging()
+    os._exit(exit_code)
+
+
+class Supervisor:
+    """Forks and babysits worker processes sharing one listening socket."""
+
+    def __init__(self, app, sock: socket.socket, args: argparse.Namespace):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers: Dict[int, float] = {}  # pid -> start time
+        self.slots: Dict[int, int] = {}  # pid -> slot, which picks the worker's metrics port
+        self.stopping = False
+
+    def spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.app, self.sock, self.args, slot)
+        self.workers[pid] = time.monotonic()
+        self.slots[pid] = slot
+        logger.info("Worker started", extra={"pid": pid, "slot": slot})
+
+    def reap(self) -> None:
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            slot = self.slots.pop(pid)
+            logger.info("Worker exited", extra={"pid": pid, "status": os.waitstatus_to_exitcode(status)})
+            if not self.stopping:
+                # Back off if workers crash right after boot to avoid a fork loop
+                if time.monotonic() - started < 1.0:
+                    time.sleep(1.0)
+                self.spawn(slot)
+
+    def stop(self, signum, frame) -> None:
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info("Draining workers", extra={"signal": signal.Signals(signum).name, "workers": len(self.workers)})
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for slot in range(self.args.workers):
+            self.spawn(slot)
+
+        deadline = None
+        while self.workers:
+            self.reap()
+            if self.stopping:
+                if deadline is None:
+                    # Give uvicorn's own graceful timeout a little headroom
+                    deadline = time.monotonic() + self.args.graceful_timeout + 5
+                elif time.monotonic() > deadline:
+                    for pid in list(self.workers):
+                        logger.warning("Killing worker that did not drain in time", extra={"pid": pid})
+                        try:
+                            os.kill(pid, signal.SIGKILL)
+                        except ProcessLookupError:
+                            pass
+                    deadline = float("inf")
+            time.sleep(0.2)
+        self.sock.close()
+        logger.info("All workers stopped")
+        return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    # Preload: import the app (routers, models, create_all) once in the supervisor
+    from app.main import app
+    if args.preload_agents:
+        from app.routers.endpoints.chatRouter import warmup_agents
+        warmup_agents()
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+    logger.info("Listening", extra={
+        "host": args.host, "port": args.port, "workers": args.workers, "loop": args.loop, "http": args.http,
+        "metrics_port": args.metrics_port or None,
+    })
+    return Supervisor(app, sock, args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
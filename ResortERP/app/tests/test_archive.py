@@ -0,0 +1,70 @@
+# app/tests/test_archive.py
+#
+# Archiving closed months on SQLite, where archive_bookings copies the rows of
+# each month into bookings_archive: closed months move, months with an active
+# booking stay, dry runs change nothing and exports still see archived rows.
+
+import csv
+import io
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.config.db import shard_router
+from app.domain.model.base import Booking, BookingArchive, as_utc
+from app.repo import export, partitions
+
+
+def test_archive_moves_closed_months_only(manager_for, add_rooms, guests):
+    ana, ben = guests
+    room, other = add_rooms("main", ("101", 100.0), ("102", 120.0))
+    this_month = partitions.month_start(datetime.now(timezone.utc))
+    cutoff = partitions.add_months(this_month, -12)
+    closed, still_open = partitions.add_months(cutoff, -3), partitions.add_months(cutoff, -2)
+
+    def at(month, day):
+        return datetime(month.year, month.month, day, 12, tzinfo=timezone.utc)
+
+    def booking(user_id, room_id, booked, ended=None, checked_out=False):
+        return {"id": uuid.uuid4(), "user_id": user_id, "room_id": room_id, "booking_date": booked,
+                "cancelled_at": ended, "checked_out": checked_out, "resort_id": "main"}
+
+    rows = [
+        booking(ana, room.id, at(closed, 1), at(closed, 3), checked_out=True),
+        booking(ben, other.id, at(closed, 10), at(closed, 11)),
+        booking(ana, room.id, at(closed, 28), at(still_open, 2), checked_out=True),
+        booking(ben, other.id, at(still_open, 5), at(still_open, 6)),
+        # Still holding its room: the whole month stays live
+        booking(ana, room.id, at(still_open, 20)),
+        booking(ben, other.id, at(this_month, 1), at(this_month, 1) + timedelta(hours=1)),
+    ]
+    engine = shard_router.engine("main")
+    with engine.begin() as conn:
+        conn.execute(Booking.__table__.insert(), rows)
+
+    assert partitions.archive_bookings(engine, before=cutoff, dry_run=True) == {
+        "archived": [f"{closed:%Y-%m}"], "skipped": [f"{still_open:%Y-%m}"], "rows": 0,
+    }
+    db = manager_for().db
+    assert db.query(BookingArchive).count() == 0
+
+    assert partitions.archive_bookings(engine, before=cutoff) == {
+        "archived": [f"{closed:%Y-%m}"], "skipped": [f"{still_open:%Y-%m}"], "rows": 3,
+    }
+    db.expire_all()
+    archived = {row.id: row for row in db.query(BookingArchive)}
+    assert set(archived) == {row["id"] for row in rows[:3]}
+    first = archived[rows[0]["id"]]
+    assert (first.user_id, first.room_id, first.checked_out) == (ana, room.id, True)
+    assert as_utc(first.cancelled_at) == rows[0]["cancelled_at"]
+    assert {row.id for row in db.query(Booking)} == {row["id"] for row in rows[3:]}
+
+    # Nothing left to move in the closed month
+    assert partitions.archive_bookings(engine, before=cutoff)["rows"] == 0
+
+    # Exports still cover the archived rows, flagged as archived
+    content = b"".join(export.stream_export(db, "bookings"))
+    header, *exported = list(csv.reader(io.StringIO(content.decode("utf-8"))))
+    flags = {row[0]: row[header.index("archived")] for row in exported}
+    assert flags == {**{str(row["id"]): "True" for row in rows[:3]}, **{str(row["id"]): "False" for row in rows[3:]}}
+    live_only = b"".join(export.stream_export(db, "bookings", include_archived=False))
+    assert len(live_only.decode("utf-8").splitlines()) == 1 + 3
@@ -0,0 +1,118 @@
+# app/tests/test_availability.py
+#
+# Availability push: a snapshot on connect, then one delta per committed room
+# change, per resort, over WebSocket and SSE; rolled back changes are never
+# announced and a subscriber that falls behind gets a fresh snapshot.
+
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+
+from app.config.db import shard_router
+from app.domain.schema.base import UserSchema
+from app.realtime.availability import MAX_PENDING, AvailabilityHub, availability_hub
+from app.realtime.broker import LocalBroker
+from app.routers.endpoints.availabilityRouter import availability_stream
+
+
+def test_websocket_sends_a_snapshot_then_committed_changes(client, manager_for, add_rooms, guests):
+    ana, _ = guests
+    first, _ = add_rooms("main", ("101", 100.0), ("102", 120.0))
+    east_room, = add_rooms("east", ("E1", 90.0))
+    east_guest = manager_for("east").create_user(UserSchema(name="eve", email="eve@example.com")).id
+
+    with client.websocket_connect("/ws/rooms/availability") as main, \
+            client.websocket_connect("/ws/rooms/availability?resort_id=east") as east:
+        snapshot = main.receive_json()
+        assert snapshot["type"] == "snapshot"
+        assert sorted(room["number"] for room in snapshot["rooms"]) == ["101", "102"]
+        assert [room["number"] for room in east.receive_json()["rooms"]] == ["E1"]
+
+        assert client.post(f"/booking/user/{ana}/room/{first.id}").status_code == 200
+        booked = main.receive_json()
+        assert booked["type"] == "room" and booked["seq"] == snapshot["seq"] + 1
+        assert (booked["available"], booked["room"]["number"], booked["room"]["is_booked"]) == (False, "101", True)
+
+        manager_for().unbook_room(first.id)
+        freed = main.receive_json()
+        assert (freed["available"], freed["room"]["number"], freed["seq"]) == (True, "101", booked["seq"] + 1)
+
+        # The east subscriber saw none of the main resort's changes
+        assert client.post(f"/booking/user/{east_guest}/room/{east_room.id}", params={"resort_id": "east"}).status_code == 200
+        east_booked = east.receive_json()
+        assert (east_booked["type"], east_booked["room"]["number"], east_booked["available"]) == ("room", "E1", False)
+
+
+def test_sse_stream_starts_with_a_snapshot(client, add_rooms):
+    add_rooms("east", ("E1", 90.0))
+
+    # The test client buffers whole responses, so the endless stream is read from the endpoint itself
+    async def first_event():
+        response = await availability_stream(resort_id="east")
+        try:
+            return response.headers["content-type"], await response.body_iterator.__anext__()
+        finally:
+            await response.body_iterator.aclose()
+
+    content_type, event = asyncio.run(first_event())
+    assert content_type.startswith("text/event-stream")
+    assert event.startswith("data: ") and event.endswith("\n\n")
+    snapshot = json.loads(event[len("data: "):])
+    assert (snapshot["type"], [room["number"] for room in snapshot["rooms"]]) == ("snapshot", ["E1"])
+    assert availability_hub.subscriber_count == 0
+
+    assert client.get("/rooms/availability/stream", params={"resort_id": "nowhere"}).status_code == 404
+
+
+def test_only_committed_changes_are_delivered():
+    def room(number: str, is_booked: bool):
+        return SimpleNamespace(id=uuid.uuid4(), number=number, room_type="standard", capacity=2, view=None,
+                               price=100.0, amenities=[], is_booked=is_booked, is_held=False, held_until=None)
+
+    async def scenario():
+        hub = AvailabilityHub(lambda resort_id: [])
+        await hub.start(LocalBroker())
+        subscriber = hub.subscribe("main")
+        messages = hub.messages(subscriber)
+        snapshot = json.loads(await messages.__anext__())
+        db = shard_router.session("main")
+        try:
+            db.connection()
+            hub.publish(db, "main", [room("101", True)])
+            db.rollback()
+            db.connection()
+            hub.publish(db, "main", [room("102", True), room("103", False)])
+            db.commit()
+            delivered = [json.loads(await asyncio.wait_for(messages.__anext__(), 1)) for _ in range(2)]
+        finally:
+            db.close()
+            await hub.stop()
+        return snapshot, delivered
+
+    snapshot, delivered = asyncio.run(scenario())
+    assert snapshot == {"type": "snapshot", "seq": 0, "rooms": []}
+    assert [(m["seq"], m["room"]["number"], m["available"]) for m in delivered] == [(1, "102", False), (2, "103", True)]
+
+
+def test_a_subscriber_that_falls_behind_gets_a_snapshot():
+    async def scenario():
+        loads = []
+        hub = AvailabilityHub(lambda resort_id: loads.append(resort_id) or [])
+        await hub.start(LocalBroker())
+        subscriber = hub.subscribe("main")
+        messages = hub.messages(subscriber)
+        await messages.__anext__()
+        for i in range(MAX_PENDING + 1):
+            hub._deliver(json.dumps({"resort_id": "main", "rooms": [{
+                "id": str(uuid.uuid4()), "number": str(i), "room_type": "standard", "capacity": 2, "view": None,
+                "price": 100.0, "amenities": [], "is_booked": True, "is_held": False, "held_until": None,
+            }]}))
+        message = json.loads(await messages.__anext__())
+        await hub.stop()
+        return loads, message, len(subscriber.pending)
+
+    loads, message, pending = asyncio.run(scenario())
+    assert message["type"] == "snapshot" and message["seq"] == MAX_PENDING + 1
+    assert loads == ["main", "main"]
+    assert pending == 0
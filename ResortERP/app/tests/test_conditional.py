@@ -0,0 +1,92 @@
+# app/tests/test_conditional.py
+#
+# Conditional GET and negotiated compression of room listings: ETags that move
+# with the rooms data version, bodiless 304s for unchanged polls (also for
+# compressed validators), Vary: Accept-Encoding and per-coding ETags.
+
+import gzip
+
+import pytest
+
+from app.routers import compression
+from app.routers.compression import negotiate
+
+
+@pytest.fixture
+def rooms(add_rooms):
+    # Enough rooms for a listing above COMPRESSION_MIN_BYTES
+    return add_rooms("main", *((str(100 + i), 100.0 + i) for i in range(30)))
+
+
+def test_unchanged_rooms_get_a_304_until_they_change(client, rooms, guests):
+    ana, _ = guests
+    identity = {"Accept-Encoding": "identity"}
+    first = client.get("/rooms/available", headers=identity)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('"rooms-main-') and first.headers["cache-control"] == "no-cache"
+    assert "content-encoding" not in first.headers
+
+    again = client.get("/rooms/available", headers={**identity, "If-None-Match": etag})
+    assert (again.status_code, again.content, again.headers["etag"]) == (304, b"", etag)
+    # Lists of validators, weak validators and * match too
+    for validator in (f'"other", {etag}', f"W/{etag}", "*"):
+        assert client.get("/rooms/available", headers={**identity, "If-None-Match": validator}).status_code == 304
+    assert client.get("/rooms/search", headers={**identity, "If-None-Match": etag}).status_code == 304
+
+    # Each resort has its own version
+    east = client.get("/rooms/available", params={"resort_id": "east"}, headers={"If-None-Match": etag})
+    assert east.status_code == 200 and east.headers["etag"].startswith('"rooms-east-')
+
+    assert client.post(f"/booking/user/{ana}/room/{rooms[0].id}").status_code == 200
+    changed = client.get("/rooms/available", headers={**identity, "If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert len(changed.json()) == len(first.json()) - 1
+
+
+@pytest.mark.parametrize("coding", ["gzip", "br"])
+def test_listings_are_compressed_with_their_own_etag(client, rooms, coding):
+    if coding == "br" and compression.brotli is None:
+        pytest.skip("brotli is not installed")
+    plain = client.get("/rooms/available", headers={"Accept-Encoding": "identity"})
+    assert "accept-encoding" in plain.headers["vary"].lower()
+
+    encoded = client.get("/rooms/available", headers={"Accept-Encoding": f"{coding}, identity;q=0.5"})
+    assert encoded.headers["content-encoding"] == coding
+    assert "accept-encoding" in encoded.headers["vary"].lower()
+    assert encoded.headers["etag"] == f'{plain.headers["etag"][:-1]}-{coding}"'
+    assert int(encoded.headers["content-length"]) < len(plain.content)
+    # The test client decodes the body
+    assert encoded.json() == plain.json()
+
+    # The compressed validator revalidates, and the 304 echoes it
+    unchanged = client.get("/rooms/available", headers={
+        "Accept-Encoding": coding, "If-None-Match": encoded.headers["etag"],
+    })
+    assert (unchanged.status_code, unchanged.headers["etag"]) == (304, encoded.headers["etag"])
+
+
+def test_small_and_streamed_responses_are_not_compressed(client, add_rooms):
+    add_rooms("main", ("101", 100.0))
+    small = client.get("/rooms/available", headers={"Accept-Encoding": "gzip"})
+    assert small.status_code == 200 and "content-encoding" not in small.headers
+
+    add_rooms("main", *((str(200 + i), 100.0) for i in range(40)))
+    export = client.get("/export/rooms", headers={"Accept-Encoding": "gzip"})
+    assert export.status_code == 200 and "content-encoding" not in export.headers
+
+
+def test_gzip_body_is_reproducible():
+    middleware = compression.CompressionMiddleware(app=None)
+    body = b'{"rooms": []}' * 200
+    assert middleware.compress(body, "gzip") == middleware.compress(body, "gzip")
+    assert gzip.decompress(middleware.compress(body, "gzip")) == body
+
+
+def test_negotiate_honours_q_values():
+    assert negotiate("gzip, br", ("br", "gzip")) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", ("br", "gzip")) == "gzip"
+    assert negotiate("br;q=0, *", ("br", "gzip")) == "gzip"
+    assert negotiate("identity", ("br", "gzip")) is None
+    assert negotiate("", ("gzip",)) is None
+    assert negotiate("gzip;q=oops", ("gzip",)) is None
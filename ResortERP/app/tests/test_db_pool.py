@@ -0,0 +1,115 @@
+# app/tests/test_db_pool.py
+#
+# Connection pools: each resort database has an HTTP and an agent pool sized
+# by their own settings, sessions follow the db_workload context (also into
+# fan-out threads), checkouts that time out are counted, and /metrics reports
+# the pools by workload.
+
+import re
+
+import pytest
+from sqlalchemy import exc, text
+
+from app.config.db import AGENT, HTTP, MeteredQueuePool, create_pooled_engine, db_workload, shard_router
+from app.config.env import get_settings
+from app.observability.metrics import DB_POOL_TIMEOUTS, DB_POOL_WAIT
+
+
+@pytest.fixture
+def tiny_pools(tmp_path, monkeypatch):
+    """Engines on a scratch database with small pools (2 HTTP, 1 agent connection) that give up after 50 ms."""
+    settings = get_settings()
+    for name, value in (
+        ("DB_POOL_SIZE", 2), ("DB_MAX_OVERFLOW", 0), ("DB_POOL_TIMEOUT_SECONDS", 0.05),
+        ("AGENT_DB_POOL_SIZE", 1), ("AGENT_DB_MAX_OVERFLOW", 0), ("AGENT_DB_POOL_TIMEOUT_SECONDS", 0.05),
+    ):
+        monkeypatch.setattr(settings, name, value)
+    engines = []
+
+    def make(workload: str):
+        pooled = create_pooled_engine(f"sqlite:///{tmp_path / 'pool.db'}", workload)
+        engines.append(pooled)
+        return pooled
+
+    yield make
+    for pooled in engines:
+        pooled.dispose()
+
+
+def checkouts(workload: str) -> int:
+    """Observations in db_pool_wait_seconds: every bucket but the trailing sum."""
+    return sum(DB_POOL_WAIT.values().get((workload,), [0])[:-1])
+
+
+def test_each_workload_gets_its_own_budget(tiny_pools):
+    http, agent = tiny_pools(HTTP), tiny_pools(AGENT)
+    assert isinstance(agent.pool, MeteredQueuePool)
+    assert (http.pool.workload, http.pool.size(), http.pool.timeout()) == (HTTP, 2, 0.05)
+    assert (agent.pool.workload, agent.pool.size(), agent.pool.timeout()) == (AGENT, 1, 0.05)
+    # dispose() replaces the pool; the new one keeps its workload
+    agent.dispose()
+    assert agent.pool.workload == AGENT
+
+
+def test_an_exhausted_pool_times_out_and_is_counted(tiny_pools):
+    agent = tiny_pools(AGENT)
+    timeouts = DB_POOL_TIMEOUTS.values().get((AGENT,), 0)
+    waits = checkouts(AGENT)
+    with agent.connect() as held:
+        held.execute(text("SELECT 1"))
+        with pytest.raises(exc.TimeoutError):
+            agent.connect()
+        # The HTTP pool of the same database is not affected
+        with tiny_pools(HTTP).connect() as other:
+            assert other.execute(text("SELECT 1")).scalar() == 1
+    assert DB_POOL_TIMEOUTS.values()[(AGENT,)] == timeouts + 1
+    # Only the checkout that got a connection is in the wait histogram
+    assert checkouts(AGENT) == waits + 1
+
+    with agent.connect() as again:
+        assert again.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_sessions_follow_the_workload_context():
+    default = shard_router.session("east")
+    try:
+        assert default.get_bind() is shard_router.engine("east", HTTP)
+    finally:
+        default.close()
+    assert shard_router.engine("east", AGENT) is not shard_router.engine("east", HTTP)
+
+    with db_workload(AGENT):
+        agent = shard_router.session("east")
+        try:
+            assert agent.get_bind() is shard_router.engine("east", AGENT)
+        finally:
+            agent.close()
+        # Fan-out threads copy the context, so agent fan-outs use the agent pools
+        results, errors = shard_router.fan_out(lambda resort_id, session: session.get_bind())
+    assert errors == {}
+    assert results == {resort_id: shard_router.engine(resort_id, AGENT) for resort_id in ("main", "east")}
+
+
+def test_metrics_report_pools_by_workload(client):
+    assert client.get("/rooms/available").status_code == 200
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+
+    def samples(name: str) -> dict:
+        pattern = re.compile(rf'^{name}\{{workload="(\w+)"\}} (\S+)$')
+        return {m.group(1): float(m.group(2)) for m in map(pattern.match, lines) if m}
+
+    settings = get_settings()
+    # Both resort databases add up in each workload's gauge
+    assert samples("db_pool_size") == {HTTP: 2 * settings.DB_POOL_SIZE, AGENT: 2 * settings.AGENT_DB_POOL_SIZE}
+    assert samples("db_pool_checked_out") == {HTTP: 0, AGENT: 0}
+    assert set(samples("db_pool_overflow")) == {HTTP, AGENT}
+    assert samples("db_pool_wait_seconds_count")[HTTP] >= 1
+
+    # HELP and TYPE come before each metric's samples
+    for name, kind in (("db_pool_size", "gauge"), ("db_pool_wait_seconds", "histogram"), ("db_pool_timeouts_total", "counter")):
+        help_at = lines.index(next(line for line in lines if line.startswith(f"# HELP {name} ")))
+        assert lines[help_at + 1] == f"# TYPE {name} {kind}"
+    assert f'db_pool_wait_seconds_bucket{{workload="{HTTP}",le="+Inf"}}' in response.text
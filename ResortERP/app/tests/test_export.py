@@ -0,0 +1,89 @@
+# app/tests/test_export.py
+#
+# Streaming exports: CSV header and row counts across several batches, the
+# bookings columns, Parquet output and the resort an export reads from.
+
+import csv
+import io
+
+import pytest
+
+from app.domain.model.base import Room
+from app.repo import export
+from app.repo.export import EXPORT_TABLES, ExportStats
+
+
+def insert_rooms(manager, count: int) -> None:
+    manager.db.execute(Room.__table__.insert(), [
+        {"number": f"{i:04d}", "room_type": "standard", "capacity": 2, "price": 100 + i,
+         "amenities": ["wifi", "balcony"] if i % 2 else [], "resort_id": manager.resort_id}
+        for i in range(count)
+    ])
+    manager.db.commit()
+
+
+def read_csv(content: bytes):
+    header, *rows = list(csv.reader(io.StringIO(content.decode("utf-8"))))
+    return header, rows
+
+
+def test_rooms_csv_streams_every_row_in_batches(manager_for):
+    manager = manager_for()
+    insert_rooms(manager, 250)
+    stats = ExportStats()
+
+    chunks = list(export.stream_export(manager.db, "rooms", batch_size=100, stats=stats))
+    # One chunk per batch, the header travelling with the first
+    assert len(chunks) == 3
+    header, rows = read_csv(b"".join(chunks))
+    assert header == EXPORT_TABLES["rooms"].columns
+    assert len(rows) == 250 == stats.rows
+    assert stats.bytes == sum(len(chunk) for chunk in chunks)
+    assert [row[1] for row in rows] == [f"{i:04d}" for i in range(250)]
+    assert rows[1][6] == "wifi|balcony" and rows[0][6] == ""
+
+
+def test_bookings_csv_through_the_endpoint(client, manager_for, add_rooms, guests):
+    ana, ben = guests
+    rooms = add_rooms("main", ("101", 100.0), ("102", 120.0), ("103", 150.0))
+    manager = manager_for()
+    for guest, room in zip((ana, ben, ana), rooms):
+        manager.book_room(guest, room.id)
+    manager.unbook_room(rooms[0].id, checkout=True)
+    manager.unbook_room(rooms[1].id)
+
+    response = client.get("/export/bookings", params={"batch_size": 100})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"].startswith('attachment; filename="main-bookings-')
+    header, rows = read_csv(response.content)
+    assert header == [
+        "id", "user_id", "room_id", "room_number", "room_type", "price", "booking_date", "cancelled_at",
+        "checked_out", "archived",
+    ]
+    by_room = {row[3]: dict(zip(header, row)) for row in rows}
+    assert sorted(by_room) == ["101", "102", "103"]
+    assert [(by_room[n]["checked_out"], by_room[n]["cancelled_at"] != "") for n in ("101", "102", "103")] == [
+        ("True", True), ("False", True), ("False", False),
+    ]
+    assert {row["archived"] for row in by_room.values()} == {"False"}
+    assert by_room["103"]["user_id"] == str(ana)
+
+    # Each resort exports its own rows
+    header, rows = read_csv(client.get("/export/bookings", params={"resort_id": "east"}).content)
+    assert rows == []
+    assert client.get("/export/guests").status_code == 404
+    assert client.get("/export/rooms", params={"format": "xml"}).status_code == 422
+
+
+def test_rooms_parquet_has_one_row_group_per_batch(client, manager_for):
+    pq = pytest.importorskip("pyarrow.parquet")
+    insert_rooms(manager_for(), 250)
+
+    response = client.get("/export/rooms", params={"format": "parquet", "batch_size": 100})
+    assert response.status_code == 200
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet.metadata.num_rows == 250
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.schema_arrow.names == EXPORT_TABLES["rooms"].columns
+    assert parquet.read().column("price").to_pylist()[:3] == [100.0, 101.0, 102.0]
@@ -0,0 +1,41 @@
+# app/tests/test_group_booking.py
+#
+# All-or-nothing group bookings of several rooms for one guest.
+
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.domain.model.base import Booking
+from app.repo import rollups
+
+
+def available_numbers(manager):
+    return sorted(room.number for room in manager.get_available_rooms())
+
+
+def test_book_rooms_is_all_or_nothing(manager_for, add_rooms, guests):
+    ana, ben = guests
+    free_a, free_b, taken = add_rooms("main", ("101", 100.0), ("102", 120.0), ("103", 140.0))
+    manager = manager_for()
+    manager.book_room(ben, taken.id)
+    before = rollups.room_type_occupancy(manager.db)
+
+    with pytest.raises(HTTPException) as raised:
+        manager.book_rooms(ana, [free_a.id, free_b.id, taken.id])
+    assert raised.value.status_code == 409
+    assert available_numbers(manager) == ["101", "102"]
+    assert manager.db.query(Booking).filter(Booking.user_id == ana).count() == 0
+    assert rollups.room_type_occupancy(manager.db) == before
+
+    with pytest.raises(HTTPException) as raised:
+        manager.book_rooms(ana, [free_a.id, uuid.uuid4()])
+    assert raised.value.status_code == 404
+    assert available_numbers(manager) == ["101", "102"]
+
+    bookings = manager.book_rooms(ana, [free_a.id, free_b.id])
+    assert sorted(b.room_id for b in bookings) == sorted([free_a.id, free_b.id])
+    assert len({b.booking_date for b in bookings}) == 1
+    assert available_numbers(manager) == []
+    assert rollups.room_type_occupancy(manager.db)[0]["occupied_rooms"] == 3
@@ -0,0 +1,127 @@
+# app/tests/test_guest_context.py
+#
+# Chat guest context: the prefetched bookings and availability go stale when
+# any resort's rooms data version moves, the calendar after its TTL, and parts
+# that fail or time out hold an error so the agent falls back to the tool.
+
+import asyncio
+import json
+import time
+
+from app.agents.context import AVAILABILITY, BOOKINGS, CALENDAR, CONTEXT_KEY, VERSIONS_KEY, GuestContext
+from app.config.env import get_settings
+from app.domain.schema.base import UserSchema
+
+
+def make_context(user_id, calendar_ttl: float = 300.0, timeout: float = 3.0) -> GuestContext:
+    context = GuestContext(str(user_id), timeout=timeout, calendar_ttl=calendar_ttl)
+    calls = []
+    # Stand-in for the Google Calendar tool
+    context.loaders[CALENDAR] = lambda: calls.append(time.monotonic()) or {"status": "success", "events": [len(calls)]}
+    return context
+
+
+def booked_numbers(context: GuestContext, user_id) -> list:
+    return sorted(booking["room_number"] for booking in context.parts[BOOKINGS]["bookings"][str(user_id)])
+
+
+def available_numbers(context: GuestContext) -> list:
+    return sorted(room["number"] for room in context.parts[AVAILABILITY]["rooms"])
+
+
+def test_bookings_and_availability_reload_after_a_room_change(manager_for, add_rooms, guests):
+    ana, ben = guests
+    rooms = add_rooms("main", ("101", 100.0), ("102", 120.0), ("103", 150.0))
+    manager = manager_for()
+    manager.book_room(ana, rooms[0].id)
+    context = make_context(ana)
+
+    async def scenario():
+        await context.load()
+        loaded = (booked_numbers(context, ana), available_numbers(context), context.parts[CALENDAR]["events"])
+        unchanged = await context.refresh()
+        # Another guest books a room: availability changed, so both data parts reload
+        manager.book_room(ben, rooms[1].id)
+        stale = await context.stale_parts()
+        refreshed = await context.refresh()
+        return loaded, unchanged, stale, refreshed, await context.stale_parts()
+
+    loaded, unchanged, stale, refreshed, after = asyncio.run(scenario())
+    assert loaded == (["101"], ["102", "103"], [1])
+    assert unchanged == []
+    assert stale == refreshed == [BOOKINGS, AVAILABILITY]
+    assert after == []
+    assert available_numbers(context) == ["103"]
+    # The calendar was not reloaded
+    assert context.parts[CALENDAR]["events"] == [1]
+
+    state = context.state()
+    assert json.loads(state[CONTEXT_KEY])["guest_user_id"] == str(ana)
+    assert state[VERSIONS_KEY] == context.versions and set(context.versions) == {"main", "east"}
+
+
+def test_a_change_at_another_resort_makes_the_context_stale(manager_for, add_rooms, guests):
+    ana, _ = guests
+    add_rooms("main", ("101", 100.0))
+    east_room, = add_rooms("east", ("E1", 90.0))
+    east = manager_for("east")
+    eve = east.create_user(UserSchema(name="eve", email="eve@example.com")).id
+    context = make_context(ana)
+
+    async def scenario():
+        await context.load([BOOKINGS, AVAILABILITY])
+        before = available_numbers(context)
+        east.book_room(eve, east_room.id)
+        return before, await context.refresh()
+
+    before, refreshed = asyncio.run(scenario())
+    assert before == ["101", "E1"]
+    assert refreshed == [BOOKINGS, AVAILABILITY]
+    assert available_numbers(context) == ["101"]
+
+
+def test_calendar_reloads_after_its_ttl(guests):
+    ana, _ = guests
+    context = make_context(ana, calendar_ttl=0.05)
+
+    async def scenario():
+        await context.load([CALENDAR])
+        fresh = await context.stale_parts()
+        await asyncio.sleep(0.1)
+        return fresh, await context.refresh()
+
+    fresh, refreshed = asyncio.run(scenario())
+    assert fresh == []
+    assert refreshed == [CALENDAR]
+    assert context.parts[CALENDAR]["events"] == [2]
+    # Only the calendar was loaded, so data versions were never read
+    assert context.versions == {}
+
+
+def test_failed_and_slow_parts_hold_an_error(guests):
+    ana, _ = guests
+    context = make_context(ana, timeout=0.05)
+
+    def broken():
+        raise RuntimeError("calendar down")
+
+    context.loaders[CALENDAR] = broken
+    context.loaders[AVAILABILITY] = lambda: time.sleep(0.5)
+    asyncio.run(context.load([CALENDAR, AVAILABILITY]))
+    assert "calendar down" in context.parts[CALENDAR]["error"]
+    assert "use the tool instead" in context.parts[AVAILABILITY]["error"]
+
+
+def test_only_the_latest_bookings_are_kept(manager_for, add_rooms, guests, monkeypatch):
+    monkeypatch.setattr(get_settings(), "CHAT_CONTEXT_MAX_BOOKINGS", 2)
+    ana, _ = guests
+    rooms = add_rooms("main", ("101", 100.0), ("102", 120.0), ("103", 150.0))
+    manager = manager_for()
+    for room in rooms:
+        manager.book_room(ana, room.id)
+    context = make_context(ana)
+
+    asyncio.run(context.load([BOOKINGS]))
+    assert booked_numbers(context, ana) == ["102", "103"]
+    assert context.parts[BOOKINGS]["total_bookings"] == {str(ana): 3}
+
@@ -0,0 +1,123 @@
+# app/tests/test_holds.py
+#
+# Room holds: blocking other guests, conversion into a booking and expiry.
+
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.agents.tools.repo_tools.repo_tools import tool_get_room_status
+from app.domain.model.base import Booking, Room, as_utc
+from app.realtime.holds import ROOM_HOLDS
+
+
+def available_numbers(manager):
+    return sorted(room.number for room in manager.get_available_rooms())
+
+
+def test_a_hold_blocks_other_guests(manager_for, add_rooms, guests):
+    ana, ben = guests
+    room, = add_rooms("main", ("101", 100.0))
+    manager = manager_for()
+
+    held = manager.hold_room(ana, room.id)
+    assert held.held_by == ana and held.is_held
+    assert available_numbers(manager) == []
+
+    for attempt in (manager.hold_room, manager.book_room):
+        with pytest.raises(HTTPException) as raised:
+            attempt(ben, room.id)
+        assert raised.value.status_code == 409
+    with pytest.raises(HTTPException) as raised:
+        manager.book_rooms(ben, [room.id])
+    assert raised.value.status_code == 409
+    assert manager.db.query(Booking).count() == 0
+
+
+def test_the_guests_own_hold_converts_into_the_booking(manager_for, add_rooms, guests):
+    ana, _ = guests
+    room, = add_rooms("main", ("101", 100.0))
+    manager = manager_for()
+
+    first = manager.hold_room(ana, room.id, ttl_seconds=60)
+    first_until = first.held_until
+    # Holding again renews the guest's own hold
+    assert manager.hold_room(ana, room.id, ttl_seconds=120).held_until > first_until
+
+    booking = manager.book_room(ana, room.id)
+    assert booking.user_id == ana
+    booked = manager.db.get(Room, room.id)
+    assert booked.is_booked
+    assert booked.held_by is None and booked.held_until is None
+
+
+def converted_holds():
+    return ROOM_HOLDS.values().get(("converted",), 0)
+
+
+def test_only_the_guests_own_hold_counts_as_converted(manager_for, add_rooms, guests):
+    ana, ben = guests
+    own, lapsed = add_rooms("main", ("101", 100.0), ("102", 120.0))
+    manager = manager_for()
+    manager.hold_room(ana, own.id, ttl_seconds=60)
+    manager.hold_room(ana, lapsed.id, ttl_seconds=0.05)
+    time.sleep(0.1)
+
+    before = converted_holds()
+    # Ben takes over Ana's lapsed hold before the sweeper cleared it: not a conversion
+    manager.book_room(ben, lapsed.id)
+    assert converted_holds() == before
+    manager.book_room(ana, own.id)
+    assert converted_holds() == before + 1
+
+
+def test_booking_for_an_unknown_guest_releases_the_room_lock(manager_for, add_rooms):
+    room, = add_rooms("main", ("101", 100.0))
+    manager = manager_for()
+    with pytest.raises(HTTPException) as raised:
+        manager.book_room(uuid.uuid4(), room.id)
+    assert raised.value.status_code == 404
+    assert not manager.db.in_transaction()
+
+
+def test_release_expired_holds_frees_the_room(manager_for, add_rooms, guests):
+    ana, ben = guests
+    room, = add_rooms("main", ("101", 100.0))
+    manager = manager_for()
+
+    manager.hold_room(ana, room.id, ttl_seconds=0.05)
+    time.sleep(0.1)
+    # A lapsed hold no longer blocks anyone, even before the sweeper clears it
+    assert available_numbers(manager) == ["101"]
+
+    released = manager.release_expired_holds([room.id])
+    assert [r.id for r in released] == [room.id]
+    assert manager.db.get(Room, room.id).held_until is None
+    assert manager.release_expired_holds([room.id]) == []
+    manager.book_room(ben, room.id)
+
+
+def test_release_expired_holds_leaves_live_holds_alone(manager_for, add_rooms, guests):
+    ana, _ = guests
+    room, = add_rooms("main", ("101", 100.0))
+    manager = manager_for()
+
+    manager.hold_room(ana, room.id, ttl_seconds=60)
+    assert manager.release_expired_holds([room.id]) == []
+    assert manager.db.get(Room, room.id).held_by == ana
+
+
+def test_room_status_tool_reports_holds(manager_for, add_rooms, guests):
+    ana, _ = guests
+    add_rooms("main", ("101", 100.0), ("102", 120.0))
+    manager = manager_for()
+    held = manager.hold_room(ana, manager.get_rooms_by_numbers(["101"])["101"].id, ttl_seconds=60)
+
+    status = {room["number"]: room for room in tool_get_room_status("101,102")["rooms"]}
+    assert status["101"]["is_held"] is True
+    assert datetime.fromisoformat(status["101"]["held_until"]) == as_utc(held.held_until)
+    assert status["101"]["is_booked"] is False
+    assert status["102"]["is_held"] is False and status["102"]["held_until"] is None
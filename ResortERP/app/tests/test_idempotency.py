@@ -0,0 +1,195 @@
+# app/tests/test_idempotency.py
+#
+# Idempotency-Key replays through the app, and IdempotencyMiddleware around a
+# counting endpoint: concurrent duplicates, lease renewal and takeover,
+# mismatched requests, 5xx responses and responses too large to store.
+# Two middleware instances stand for two workers sharing the resort database.
+
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from app.config.db import shard_router
+from app.domain.model.base import Booking, IdempotencyKey
+from app.domain.schema.base import UserSchema
+from app.routers import idempotency
+from app.routers.idempotency import IdempotencyMiddleware
+
+
+class CountingEndpoint:
+    """ASGI app answering every request with the number of requests it has run."""
+
+    def __init__(self, delay: float = 0.0, statuses=()):
+        self.calls = 0
+        self.delay = delay
+        self.statuses = list(statuses)
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, scope, receive, send):
+        await receive()
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        await asyncio.sleep(self.delay)
+        status = self.statuses.pop(0) if self.statuses else 200
+        body = json.dumps({"call": self.calls}).encode()
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": body})
+
+
+def worker(endpoint, lease_seconds: float = 60.0) -> httpx.AsyncClient:
+    middleware = IdempotencyMiddleware(endpoint, ttl_seconds=3600, lease_seconds=lease_seconds)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=middleware), base_url="http://test")
+
+
+def post(client: httpx.AsyncClient, key: str, body: bytes = b"{}"):
+    return client.post("/booking", content=body, headers={"Idempotency-Key": key})
+
+
+def test_idempotency_key_replays_the_stored_response(client, manager_for, add_rooms):
+    ana = manager_for().create_user(UserSchema(name="ana", email="ana@example.com")).id
+    room, = add_rooms("main", ("101", 100.0))
+    url = f"/booking/user/{ana}/room/{room.id}"
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+    first = client.post(url, headers=headers)
+    assert first.status_code == 200
+    assert "idempotent-replayed" not in first.headers
+
+    replay = client.post(url, headers=headers)
+    assert replay.status_code == 200
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.content == first.content
+    # The endpoint did not run again: one booking, and no 409 for the already booked room
+    assert manager_for().db.query(Booking).count() == 1
+
+    # Without the key the same request runs and finds the room booked
+    assert client.post(url).status_code == 409
+    # Reusing the key for another request is rejected
+    assert client.post(f"/booking/user/{ana}/room/{uuid.uuid4()}", headers=headers).status_code == 422
+
+
+def test_concurrent_duplicates_run_once():
+    async def scenario():
+        endpoint = CountingEndpoint()
+        endpoint.release.clear()
+        async with worker(endpoint) as first_worker, worker(endpoint) as second_worker:
+            key = str(uuid.uuid4())
+            first = asyncio.create_task(post(first_worker, key))
+            await endpoint.started.wait()
+            duplicates = [asyncio.create_task(post(client, key)) for client in (first_worker, second_worker)]
+            await asyncio.sleep(0.1)
+            endpoint.release.set()
+            return endpoint, await first, await asyncio.gather(*duplicates)
+
+    endpoint, first, duplicates = asyncio.run(scenario())
+    assert endpoint.calls == 1
+    assert first.status_code == 200 and "idempotent-replayed" not in first.headers
+    for duplicate in duplicates:
+        assert duplicate.status_code == 200
+        assert duplicate.headers["idempotent-replayed"] == "true"
+        assert duplicate.content == first.content
+
+
+def test_a_running_request_keeps_its_claim_past_the_lease():
+    async def scenario():
+        endpoint = CountingEndpoint(delay=1.0)
+        async with worker(endpoint, lease_seconds=0.3) as first_worker, worker(endpoint, lease_seconds=0.3) as second_worker:
+            key = str(uuid.uuid4())
+            first = asyncio.create_task(post(first_worker, key))
+            await endpoint.started.wait()
+            # Waits past the lease: the claim is renewed, so the request is not run a second time
+            waiting = await post(second_worker, key)
+            first = await first
+            return endpoint, first, waiting, await post(second_worker, key)
+
+    endpoint, first, waiting, retry = asyncio.run(scenario())
+    assert endpoint.calls == 1
+    assert waiting.status_code == 409 and waiting.headers["retry-after"] == "1"
+    assert retry.status_code == 200 and retry.content == first.content
+
+
+def test_a_claim_whose_lease_expired_is_taken_over():
+    key = str(uuid.uuid4())
+    now = datetime.now(timezone.utc)
+    db = shard_router.session("main")
+    try:
+        # Left behind by a worker that died mid-request
+        db.add(IdempotencyKey(
+            key=key, fingerprint=idempotency.fingerprint("POST", "/booking", b"", b"{}").hex(),
+            created_at=now - timedelta(seconds=120), locked_until=now - timedelta(seconds=60),
+            expires_at=now + timedelta(hours=1),
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+    async def scenario():
+        endpoint = CountingEndpoint()
+        async with worker(endpoint) as client:
+            return endpoint, await post(client, key)
+
+    endpoint, response = asyncio.run(scenario())
+    assert endpoint.calls == 1
+    assert response.status_code == 200 and "idempotent-replayed" not in response.headers
+
+
+def test_a_key_reused_for_another_body_gets_422_while_the_first_runs():
+    async def scenario():
+        endpoint = CountingEndpoint()
+        endpoint.release.clear()
+        async with worker(endpoint) as first_worker, worker(endpoint) as second_worker:
+            key = str(uuid.uuid4())
+            first = asyncio.create_task(post(first_worker, key, b'{"room": 1}'))
+            await endpoint.started.wait()
+            # Answered at once, not after the lease
+            other_requests = await asyncio.wait_for(asyncio.gather(
+                post(first_worker, key, b'{"room": 2}'), post(second_worker, key, b'{"room": 2}'),
+            ), timeout=5)
+            endpoint.release.set()
+            return endpoint, await first, other_requests
+
+    endpoint, first, other_requests = asyncio.run(scenario())
+    assert endpoint.calls == 1
+    assert first.status_code == 200
+    assert [response.status_code for response in other_requests] == [422, 422]
+
+
+def test_a_5xx_response_releases_the_key():
+    async def scenario():
+        endpoint = CountingEndpoint(statuses=[500])
+        async with worker(endpoint) as client:
+            key = str(uuid.uuid4())
+            failed = await post(client, key)
+            db = shard_router.session("main")
+            try:
+                claimed = db.get(IdempotencyKey, key)
+            finally:
+                db.close()
+            return endpoint, failed, claimed, await post(client, key)
+
+    endpoint, failed, claimed, retry = asyncio.run(scenario())
+    assert failed.status_code == 500
+    assert claimed is None
+    assert retry.status_code == 200 and "idempotent-replayed" not in retry.headers
+    assert endpoint.calls == 2
+
+
+def test_a_response_too_large_to_store_is_not_run_again(monkeypatch):
+    monkeypatch.setattr(idempotency, "MAX_STORED_BODY", 4)
+
+    async def scenario():
+        endpoint = CountingEndpoint()
+        async with worker(endpoint) as first_worker, worker(endpoint) as second_worker:
+            key = str(uuid.uuid4())
+            return endpoint, await post(first_worker, key), await post(first_worker, key), await post(second_worker, key)
+
+    endpoint, first, *retries = asyncio.run(scenario())
+    assert first.status_code == 200
+    assert endpoint.calls == 1
+    assert [retry.status_code for retry in retries] == [409, 409]
@@ -0,0 +1,91 @@
+# app/tests/test_ids.py
+#
+# UUIDv7 keys: layout, strictly increasing within one millisecond, across a
+# counter overflow and when the clock goes back, and under concurrent callers.
+
+import threading
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.domain.model import ids
+from app.domain.model.ids import uuid7, uuid7_time
+
+FROZEN_NS = 1_760_000_000_123_456_789
+
+
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    """Pins time.time_ns in the ids module; returns a setter for the current time in ns."""
+    now = {"ns": FROZEN_NS}
+    monkeypatch.setattr(ids.time, "time_ns", lambda: now["ns"])
+    monkeypatch.setattr(ids, "_last_ms", 0)
+    monkeypatch.setattr(ids, "_counter", 0)
+    return lambda ns: now.update(ns=ns)
+
+
+def counter_of(value: uuid.UUID) -> int:
+    return value.int >> 64 & 0xFFF
+
+
+def test_layout_and_creation_time(frozen_clock):
+    value = uuid7()
+    assert (value.version, value.variant) == (7, uuid.RFC_4122)
+    assert value.int >> 80 == FROZEN_NS // 1_000_000
+    assert uuid7_time(value) == datetime.fromtimestamp(1_760_000_000.123, tz=timezone.utc)
+    with pytest.raises(ValueError):
+        uuid7_time(uuid.uuid4())
+
+
+def test_keys_increase_within_one_millisecond(frozen_clock):
+    keys = [uuid7() for _ in range(1000)]
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+    assert {key.int >> 80 for key in keys} == {FROZEN_NS // 1_000_000}
+    # The counter starts in the lower quarter of its range and counts up by one
+    assert counter_of(keys[0]) <= 0x3FF
+    assert [counter_of(b) - counter_of(a) for a, b in zip(keys, keys[1:])] == [1] * 999
+    # Strings sort the same way, as they do in a text or uuid column
+    assert [str(key) for key in keys] == sorted(str(key) for key in keys)
+
+
+def test_counter_overflow_borrows_the_next_millisecond(frozen_clock):
+    keys = [uuid7() for _ in range(0x1000 + 10)]
+    assert keys == sorted(keys)
+    ms = FROZEN_NS // 1_000_000
+    assert {key.int >> 80 for key in keys} == {ms, ms + 1}
+    # Once the clock reaches the borrowed millisecond, keys still increase
+    frozen_clock(FROZEN_NS + 1_000_000)
+    later = uuid7()
+    assert later > keys[-1] and later.int >> 80 == ms + 1
+
+
+def test_keys_increase_when_the_clock_goes_back(frozen_clock):
+    before = uuid7()
+    frozen_clock(FROZEN_NS - 5_000_000_000)
+    after = uuid7()
+    assert after > before
+    assert after.int >> 80 == before.int >> 80
+
+
+def test_concurrent_callers_get_distinct_increasing_keys(frozen_clock):
+    per_thread = {}
+
+    def make(name):
+        per_thread[name] = [uuid7() for _ in range(500)]
+
+    threads = [threading.Thread(target=make, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    keys = [key for generated in per_thread.values() for key in generated]
+    assert len(set(keys)) == 2000
+    for generated in per_thread.values():
+        assert generated == sorted(generated)
+
+
+def test_new_rows_get_time_ordered_keys(manager_for, add_rooms):
+    rooms = add_rooms("main", ("101", 100.0), ("102", 100.0), ("103", 100.0))
+    assert [room.id.version for room in rooms] == [7, 7, 7]
+    assert [room.id for room in rooms] == sorted(room.id for room in rooms)
@@ -0,0 +1,135 @@
+# app/tests/test_jobs.py
+#
+# Job queue: retries with exponential backoff, the dead transition once
+# max_attempts is used up, handler writes committing only with success, and
+# reclaiming jobs whose worker lost its lease. The worker's claim and run steps
+# are called directly instead of through its event loop.
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from app.domain.model.base import Job, User, as_utc
+from app.jobs import queue
+from app.jobs.queue import BACKOFF_BASE_SECONDS, BACKOFF_MAX_SECONDS, JobHandler
+from app.jobs.worker import JobWorker
+
+
+@pytest.fixture
+def flaky(monkeypatch):
+    """A "flaky" job kind that adds a user, then fails its first `failures` attempts."""
+    state = {"failures": 2, "calls": 0}
+
+    def run(db, payload):
+        state["calls"] += 1
+        db.add(User(name=payload["name"], email=f"{payload['name']}-{state['calls']}@example.com"))
+        db.flush()
+        if state["calls"] <= state["failures"]:
+            raise RuntimeError(f"attempt {state['calls']} failed")
+
+    monkeypatch.setitem(queue.HANDLERS, "flaky", JobHandler(kind="flaky", func=run, max_attempts=3))
+    return state
+
+
+def make_due(db, job_id) -> None:
+    db.execute(update(Job).where(Job.id == job_id).values(run_at=datetime.now(timezone.utc) - timedelta(seconds=1)))
+    db.commit()
+
+
+def test_retry_delay_doubles_with_jitter_up_to_the_cap():
+    for attempt in range(1, 15):
+        delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempt - 1), BACKOFF_MAX_SECONDS)
+        assert all(delay * 0.8 <= queue.retry_delay(attempt) <= delay * 1.2 for _ in range(20))
+    assert queue.retry_delay(30) <= BACKOFF_MAX_SECONDS * 1.2
+
+
+def test_failed_attempts_back_off_and_the_last_succeeds(manager_for, flaky):
+    db = manager_for().db
+    job = queue.enqueue(db, "flaky", {"name": "ana"})
+    db.commit()
+    worker = JobWorker()
+
+    for attempt in (1, 2):
+        (resort_id, claimed), = worker._claim(10)
+        assert (resort_id, claimed.id, claimed.attempts) == ("main", job.id, attempt)
+        failed_at = datetime.now(timezone.utc)
+        assert worker._run_handler(resort_id, claimed) == "retry"
+
+        db.expire_all()
+        job = db.get(Job, job.id)
+        assert (job.status, job.attempts, job.locked_by) == (queue.QUEUED, attempt, None)
+        assert f"attempt {attempt} failed" in job.last_error
+        delay = (as_utc(job.run_at) - failed_at).total_seconds()
+        expected = BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)
+        assert expected * 0.8 - 1 <= delay <= expected * 1.2
+        # Not due yet, so nothing to claim until the backoff has passed
+        assert worker._claim(10) == []
+        make_due(db, job.id)
+
+    (resort_id, claimed), = worker._claim(10)
+    assert worker._run_handler(resort_id, claimed) == "success"
+    db.expire_all()
+    job = db.get(Job, job.id)
+    assert (job.status, job.attempts, job.last_error) == (queue.SUCCEEDED, 3, None)
+    # Only the successful attempt's write was committed
+    assert [user.email for user in db.query(User).filter(User.name == "ana")] == ["ana-3@example.com"]
+
+
+def test_a_job_is_dead_once_its_attempts_are_used_up(manager_for, flaky):
+    flaky["failures"] = 10
+    db = manager_for().db
+    job = queue.enqueue(db, "flaky", {"name": "ben"})
+    db.commit()
+    worker = JobWorker()
+
+    outcomes = []
+    for _ in range(3):
+        (resort_id, claimed), = worker._claim(10)
+        outcomes.append(worker._run_handler(resort_id, claimed))
+        make_due(db, job.id)
+    assert outcomes == ["retry", "retry", "dead"]
+
+    db.expire_all()
+    job = db.get(Job, job.id)
+    assert (job.status, job.attempts) == (queue.DEAD, 3)
+    assert job.finished_at is not None and "attempt 3 failed" in job.last_error
+    assert worker._claim(10) == []
+    assert db.query(User).filter(User.name == "ben").count() == 0
+
+    # An operator can give it a fresh set of attempts
+    assert queue.retry_dead_job(db, job.id).status == queue.QUEUED
+    db.commit()
+    assert queue.retry_dead_job(db, job.id) is None
+    (_, claimed), = worker._claim(10)
+    assert claimed.attempts == 1
+
+
+def test_a_job_whose_lease_expired_is_reclaimed(manager_for, flaky):
+    flaky["failures"] = 0
+    db = manager_for().db
+    job = queue.enqueue(db, "flaky", {"name": "cy"}, idempotency_key="welcome-cy")
+    db.commit()
+    assert queue.enqueue(db, "flaky", {"name": "cy"}, idempotency_key="welcome-cy").id == job.id
+
+    lost = JobWorker(lease_seconds=0.01)
+    lost.worker_id = "lost-worker"
+    (_, stale), = lost._claim(10)
+    assert JobWorker()._claim(10) == []  # still leased
+
+    db.execute(update(Job).where(Job.id == job.id).values(locked_until=datetime.now(timezone.utc) - timedelta(seconds=1)))
+    db.commit()
+    worker = JobWorker()
+    (resort_id, claimed), = worker._claim(10)
+    assert (claimed.attempts, claimed.locked_by) == (2, worker.worker_id)
+    # The worker that lost the lease can no longer record a result
+    assert lost._run_handler(resort_id, stale) == "lost"
+    assert worker._run_handler(resort_id, claimed) == "success"
+    db.expire_all()
+    assert db.get(Job, job.id).status == queue.SUCCEEDED
+    assert db.query(User).filter(User.name == "cy").count() == 1
+
+
+def test_enqueue_rejects_unknown_kinds(manager_for):
+    with pytest.raises(ValueError):
+        queue.enqueue(manager_for().db, "no-such-kind")
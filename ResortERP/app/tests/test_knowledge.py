@@ -0,0 +1,117 @@
+# app/tests/test_knowledge.py
+#
+# Knowledge index: recall of the hashing embedder on a tiny resort corpus,
+# IVF search against exact search, and workers picking up a rebuilt index.
+
+import numpy as np
+
+from app.knowledge import VectorIndex, build_index, get_embedder, write_index
+from app.knowledge.embeddings import normalize
+from app.knowledge.index import KnowledgeBase
+
+DOCUMENTS = {
+    "spa.md": """# Spa
+## Opening hours
+The spa is open daily from 9am to 8pm. Massages must be booked a day ahead.
+
+## Treatments
+We offer hot stone massages, facials and a couples' package with champagne.
+""",
+    "dining.md": """# Dining
+## Breakfast
+Breakfast is served in the garden restaurant from 6:30am to 10:30am.
+
+## Room service
+Room service runs around the clock. Dial 7 from your room phone.
+""",
+    "policies.md": """# Policies
+## Check-out
+Check-out time is 11am. Late check-out until 2pm costs 40 dollars.
+
+## Pets
+Dogs under 10 kg are welcome in garden-view rooms for a fee of 25 dollars a night.
+
+## Parking
+Valet parking costs 30 dollars a day; self parking is free.
+""",
+}
+
+# Guest questions and the section that answers them; several use other word
+# forms than the documents (plurals, "checkout" for "check-out")
+QUESTIONS = [
+    ("When does the spa open?", "spa.md > Spa > Opening hours"),
+    ("Do you have hot stone massage treatments?", "spa.md > Spa > Treatments"),
+    ("What time is breakfast served?", "dining.md > Dining > Breakfast"),
+    ("Can I order room service at night?", "dining.md > Dining > Room service"),
+    ("What is the latest checkout?", "policies.md > Policies > Check-out"),
+    ("Can I bring my dog?", "policies.md > Policies > Pets"),
+    ("How much is valet parking?", "policies.md > Policies > Parking"),
+]
+
+
+def build(tmp_path, documents=DOCUMENTS, name="index"):
+    docs = tmp_path / "docs"
+    docs.mkdir(exist_ok=True)
+    for file_name, text in documents.items():
+        (docs / file_name).write_text(text)
+    return build_index(str(docs), str(tmp_path / name), "hashing")
+
+
+def test_hashing_index_finds_the_answering_section(tmp_path):
+    meta = build(tmp_path)
+    assert (meta["count"], meta["nlist"], meta["embedder"]) == (7, 0, "hashing-512")
+
+    knowledge_base = KnowledgeBase()
+    for question, source in QUESTIONS:
+        hits = knowledge_base.search(question, k=3, path=str(tmp_path / "index"))
+        assert hits[0].source == source, (question, [hit.source for hit in hits])
+        assert hits[0].score > 0.1
+        assert [hit.score for hit in hits] == sorted((hit.score for hit in hits), reverse=True)
+    # Nothing shared with any document
+    assert knowledge_base.search("zebra xylophone", path=str(tmp_path / "index")) == []
+
+
+def test_hashing_embedder_folds_plurals_and_hyphens():
+    embedder = get_embedder("hashing")
+    vectors = embedder.embed_documents(["late check-out", "late checkouts", "breakfast buffet"])
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+    assert vectors[0] @ vectors[1] > 0.99
+    assert vectors[0] @ vectors[2] < 0.2
+    assert np.allclose(embedder.embed_query("late check-out"), vectors[0])
+
+
+def test_ivf_search_recalls_the_exact_neighbours(tmp_path):
+    rng = np.random.default_rng(3)
+    centres = normalize(rng.normal(size=(40, 64)).astype(np.float32))
+    vectors = normalize(centres[rng.integers(40, size=4000)] + rng.normal(scale=0.08, size=(4000, 64)).astype(np.float32))
+    texts = [f"chunk {i}" for i in range(len(vectors))]
+    write_index(str(tmp_path / "ivf"), vectors, texts, ["synthetic"] * len(texts), "test", ivf_min_chunks=1000)
+    index = VectorIndex(str(tmp_path / "ivf"))
+    assert index.nlist > 1
+
+    queries = normalize(vectors[rng.choice(len(vectors), 50, replace=False)] + rng.normal(scale=0.05, size=(50, 64)).astype(np.float32))
+    found = total = 0
+    for query in queries:
+        exact, _ = index.search_rows(query, k=10, exact=True)
+        approximate, scores = index.search_rows(query, k=10, nprobe=8)
+        assert list(scores) == sorted(scores, reverse=True)
+        found += len(set(exact) & set(approximate))
+        total += len(exact)
+    assert found / total >= 0.9
+    # Rows are stored grouped by cluster, so texts follow their vectors
+    row, = index.search_rows(vectors[17], k=1, exact=True)[0]
+    assert index.text(row) == "chunk 17"
+
+
+def test_a_rebuilt_index_is_picked_up(tmp_path):
+    knowledge_base = KnowledgeBase()
+    build(tmp_path)
+    path = str(tmp_path / "index")
+    before = knowledge_base.search("Is there a kids club?", path=path)
+    assert len(knowledge_base._index) == 7
+
+    build(tmp_path, {**DOCUMENTS, "kids.md": "# Kids club\nThe kids club welcomes children aged 4 to 12 every morning.\n"})
+    hit, *_ = knowledge_base.search("Is there a kids club?", path=path)
+    assert hit.source == "kids.md > Kids club"
+    assert len(knowledge_base._index) == 8
+    assert hit.score > max((hit.score for hit in before), default=0.0)
@@ -0,0 +1,84 @@
+# app/tests/test_logging.py
+#
+# Structured logging: JSON lines written by the background listener, request
+# ids taken from X-Request-ID and echoed back, and sampling of DEBUG records.
+
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from app.observability import log
+
+
+@pytest.fixture
+def restore_logging():
+    """Removes the app's handler for the test and reinstalls the default one afterwards."""
+    log.shutdown_logging()
+    yield
+    log.shutdown_logging()
+    log.setup_logging()
+
+
+@pytest.fixture
+def captured_logs(restore_logging):
+    """Installs the queue handler with an in-memory stream; returns a function that drains it."""
+    stream = io.StringIO()
+    log.setup_logging(level="DEBUG", debug_sample_rate=0.0, stream=stream)
+
+    def lines():
+        log.shutdown_logging()  # blocks until the queue is drained
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    return lines
+
+
+def test_records_are_written_as_json_by_the_listener(restore_logging):
+    callers = set()
+
+    class RecordingStream(io.StringIO):
+        def write(self, text):
+            callers.add(threading.get_ident())
+            return super().write(text)
+
+    stream = RecordingStream()
+    log.setup_logging(level="INFO", stream=stream)
+    token = log.request_id_var.set("req-1")
+    try:
+        logging.getLogger("app.repo.base").info("Room booked", extra={"room_id": "r1"})
+        logging.getLogger("app.repo.base").debug("Below the level")
+    finally:
+        log.request_id_var.reset(token)
+    log.shutdown_logging()
+
+    record, = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert {key: record[key] for key in ("level", "logger", "msg", "request_id", "room_id")} == {
+        "level": "INFO", "logger": "app.repo.base", "msg": "Room booked", "request_id": "req-1", "room_id": "r1",
+    }
+    assert record["ts"].endswith("Z")
+    # Formatting and writing happen on the listener thread, not the caller's
+    assert callers and threading.get_ident() not in callers
+
+
+def test_debug_records_are_sampled(captured_logs):
+    logger = logging.getLogger("app.tests")
+    for i in range(20):
+        logger.debug("Dropped at a sample rate of 0", extra={"i": i})
+    logger.debug("Kept by its own rate", extra={"sample_rate": 1.0})
+    logger.info("Never sampled")
+    assert [record["msg"] for record in captured_logs()] == ["Kept by its own rate", "Never sampled"]
+
+
+def test_request_id_is_taken_from_the_header_and_echoed(captured_logs, client, manager_for, add_rooms, guests):
+    ana, _ = guests
+    room, = add_rooms("main", ("101", 100.0))
+    response = client.post(f"/booking/user/{ana}/room/{room.id}", headers={"X-Request-ID": "booking-42"})
+    assert response.status_code == 200
+    assert response.headers["x-request-id"] == "booking-42"
+    # Without the header a fresh id is generated
+    assert len(client.get("/rooms/available").headers["x-request-id"]) == 32
+
+    booked = [record for record in captured_logs() if record["msg"] == "Room booked"]
+    assert [(record["request_id"], record["room_id"]) for record in booked] == [("booking-42", str(room.id))]
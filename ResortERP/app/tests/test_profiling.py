@@ -0,0 +1,102 @@
+# app/tests/test_profiling.py
+#
+# Per-request profiling: only requests with the token are profiled, wall and
+# cpu profiles are saved with the request's SQL statements, the oldest
+# profiles are pruned, and /debug/profiles serves them.
+
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.config.env import get_settings
+from app.observability.profiling import ProfilingMiddleware, instrument_profiling
+from app.routers.endpoints.debugRouter import debug_router
+
+TOKEN = "s3cret"
+
+
+@pytest.fixture
+def profiled(tmp_path, monkeypatch):
+    """A small app reading a SQLite database, behind ProfilingMiddleware; returns (client, profiles dir)."""
+    directory = str(tmp_path / "profiles")
+    settings = get_settings()
+    monkeypatch.setattr(settings, "PROFILING_TOKEN", TOKEN)
+    monkeypatch.setattr(settings, "PROFILING_DIR", directory)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'profiled.db'}")
+    instrument_profiling(engine)
+    app = FastAPI()
+
+    @app.get("/work")
+    def work():
+        with engine.connect() as conn:
+            values = [conn.execute(text("SELECT :n * 2"), {"n": n}).scalar() for n in range(3)]
+        time.sleep(0.05)
+        return {"values": values}
+
+    @app.get("/metrics")
+    def metrics():
+        return {}
+
+    app.include_router(debug_router)
+    app.add_middleware(ProfilingMiddleware, token=TOKEN, interval_ms=1.0, directory=directory, keep=3)
+    with TestClient(app) as client:
+        yield client, directory
+    engine.dispose()
+
+
+def test_only_requests_with_the_token_are_profiled(profiled):
+    client, directory = profiled
+    assert "x-profile-id" not in client.get("/work").headers
+    assert "x-profile-id" not in client.get("/work", headers={"X-Profile": "wrong"}).headers
+    assert "x-profile-id" not in client.get("/metrics", headers={"X-Profile": TOKEN}).headers
+    assert not os.path.exists(directory)
+
+
+def test_wall_profile_records_stacks_and_sql(profiled):
+    client, directory = profiled
+    response = client.get("/work", headers={"X-Profile": TOKEN})
+    assert response.json() == {"values": [0, 2, 4]}
+    profile_id = response.headers["x-profile-id"]
+
+    summary = client.get(f"/debug/profiles/{profile_id}", headers={"X-Profile": TOKEN}).json()
+    assert (summary["method"], summary["path"], summary["status"], summary["mode"]) == ("GET", "/work", 200, "wall")
+    assert summary["duration_ms"] >= 50
+    assert summary["db"]["statements"] == 3
+    assert [entry["sql"] for entry in summary["db"]["log"]] == ["SELECT ? * 2"] * 3
+    assert summary["samples"] > 0 and summary["top"]
+
+    download = client.get(f"/debug/profiles/{profile_id}/download", headers={"X-Profile": TOKEN})
+    assert download.status_code == 200
+    # Collapsed stacks: "frame;frame;... count", with the request's own code among them
+    lines = download.text.splitlines()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("work (" in line for line in lines)
+
+
+def test_cpu_profile_and_pruning(profiled):
+    client, directory = profiled
+    cpu = client.get("/work", headers={"X-Profile": TOKEN, "X-Profile-Mode": "cpu"})
+    profile_id = cpu.headers["x-profile-id"]
+    assert os.path.exists(os.path.join(directory, f"{profile_id}.prof"))
+    summary = client.get(f"/debug/profiles/{profile_id}", headers={"X-Profile": TOKEN}).json()
+    assert summary["mode"] == "cpu" and summary["db"]["statements"] == 3
+
+    # Usually within the same second, where profile ids do not sort by time
+    newer = [client.get("/work", headers={"X-Profile": TOKEN}).headers["x-profile-id"] for _ in range(3)]
+    listed = client.get("/debug/profiles", headers={"X-Profile": TOKEN}).json()
+    assert [entry["id"] for entry in listed] == newer[::-1]
+    assert not any(name.startswith(profile_id) for name in os.listdir(directory))
+    assert "log" not in listed[0]["db"]
+
+
+def test_debug_endpoints_need_the_token(profiled):
+    client, _ = profiled
+    assert client.get("/debug/profiles").status_code == 403
+    assert client.get("/debug/profiles", headers={"X-Profile": "wrong"}).status_code == 403
+    assert client.get("/debug/profiles/../../etc/passwd", headers={"X-Profile": TOKEN}).status_code == 404
+    assert client.get("/debug/profiles/20260101T000000-deadbeef", headers={"X-Profile": TOKEN}).status_code == 404
@@ -0,0 +1,22 @@
+# app/tests/test_read_models.py
+#
+# Listings served from read models return the same JSON as RoomSchema.
+
+from app.domain.schema.base import RoomSchema
+from app.routers.fast_json import dumps
+
+
+def test_available_rooms_json_matches_room_schema(client, manager_for, add_rooms):
+    add_rooms("main", ("101", 100.0), ("102", 180.5))
+    expected = [
+        RoomSchema.model_validate(room, from_attributes=True).model_dump(mode="json")
+        for room in sorted(manager_for().get_available_rooms(), key=lambda room: room.number)
+    ]
+
+    response = client.get("/rooms/available")
+    assert response.status_code == 200
+    rooms = sorted(response.json(), key=lambda room: room["number"])
+    assert rooms == expected
+    # 100 == 100.0 in Python, so compare the encoded documents as well
+    assert dumps(rooms) == dumps(expected)
+    assert [type(room["price"]) for room in rooms] == [float, float]
@@ -0,0 +1,87 @@
+# app/tests/test_rollups.py
+#
+# Occupancy rollups: counters after book, hold and unbook, changes written only
+# at commit, and rebuild_rollups leaving consistent rollups unchanged.
+
+from datetime import datetime, timezone
+
+from app.config.db import shard_router
+from app.domain.model.base import DailyOccupancy, RoomTypeInventory
+from app.repo import rollups
+
+
+def today_activity(manager):
+    today = datetime.now(timezone.utc).date()
+    entry, = rollups.occupancy_report(manager.db, today, today)
+    return {key: entry[key] for key in ("bookings", "cancellations", "checkouts", "revenue", "occupied_rooms", "total_rooms")}
+
+
+def rollup_rows(db):
+    inventory = [tuple(row) for row in db.query(
+        RoomTypeInventory.room_type, RoomTypeInventory.total_rooms, RoomTypeInventory.occupied_rooms,
+    ).order_by(RoomTypeInventory.room_type)]
+    daily = [tuple(row) for row in db.query(
+        DailyOccupancy.day, DailyOccupancy.room_type, DailyOccupancy.bookings, DailyOccupancy.cancellations,
+        DailyOccupancy.checkouts, DailyOccupancy.revenue, DailyOccupancy.occupied_rooms, DailyOccupancy.total_rooms,
+    ).order_by(DailyOccupancy.day, DailyOccupancy.room_type)]
+    return inventory, daily
+
+
+def test_counters_follow_bookings_holds_and_unbookings(manager_for, add_rooms, guests):
+    ana, ben = guests
+    first, second, third = add_rooms("main", ("101", 100.0), ("102", 120.0), ("103", 150.0))
+    manager = manager_for()
+    assert today_activity(manager) == {
+        "bookings": 0, "cancellations": 0, "checkouts": 0, "revenue": 0.0, "occupied_rooms": 0, "total_rooms": 3,
+    }
+
+    manager.book_room(ana, first.id)
+    manager.book_room(ben, second.id)
+    # A hold does not book the room
+    manager.hold_room(ana, third.id, ttl_seconds=60)
+    assert today_activity(manager) == {
+        "bookings": 2, "cancellations": 0, "checkouts": 0, "revenue": 220.0, "occupied_rooms": 2, "total_rooms": 3,
+    }
+
+    manager.unbook_room(first.id)
+    manager.unbook_room(second.id, checkout=True)
+    assert today_activity(manager) == {
+        "bookings": 2, "cancellations": 1, "checkouts": 1, "revenue": 220.0, "occupied_rooms": 0, "total_rooms": 3,
+    }
+    assert rollups.room_type_occupancy(manager.db) == [
+        {"room_type": "standard", "occupied_rooms": 0, "total_rooms": 3, "occupancy_rate": 0.0},
+    ]
+
+
+def test_changes_are_written_at_commit_and_dropped_on_rollback(manager_for):
+    manager = manager_for()
+    rollups.record_room_change(manager.db, "suite", total_delta=1)
+    rollups.record_room_change(manager.db, "suite", total_delta=1, occupied_delta=1)
+    assert manager.db.query(RoomTypeInventory).count() == 0
+    manager.db.rollback()
+    manager.db.commit()
+    assert manager.db.query(RoomTypeInventory).count() == 0
+
+    rollups.record_room_change(manager.db, "suite", total_delta=2, occupied_delta=1)
+    manager.db.commit()
+    other = shard_router.session("main")
+    try:
+        assert rollup_rows(other)[0] == [("suite", 2, 1)]
+    finally:
+        other.close()
+
+
+def test_rebuild_keeps_consistent_rollups_unchanged(manager_for, add_rooms, guests):
+    ana, ben = guests
+    rooms = add_rooms("main", ("101", 100.0), ("102", 120.0))
+    rooms += add_rooms("main", ("201", 300.0), room_type="suite")
+    manager = manager_for()
+    manager.book_room(ana, rooms[0].id)
+    manager.book_room(ben, rooms[2].id)
+    manager.unbook_room(rooms[0].id, checkout=True)
+    manager.book_room(ana, rooms[1].id)
+    before = rollup_rows(manager.db)
+
+    result = rollups.rebuild_rollups(manager.db)
+    assert result == {"room_types": 2, "daily_rows": 0}
+    assert rollup_rows(manager.db) == before
@@ -0,0 +1,117 @@
+# app/tests/test_room_search.py
+#
+# Faceted room search: RoomIndex results, price ranges and facet counts checked
+# against the same filters run as plain SQL over the rooms table.
+
+import itertools
+import random
+from collections import Counter
+
+import pytest
+
+from app.domain.model.base import Room
+from app.domain.schema.base import RoomSchema
+
+ROOM_TYPES = ["standard", "deluxe", "suite"]
+VIEWS = ["ocean", "garden", None]
+AMENITIES = ["wifi", "balcony", "minibar", "jacuzzi"]
+# Bucket edges (25.0 wide) and prices on either side of them
+PRICES = [75.0, 99.99, 100.0, 100.01, 124.5, 125.0, 150.0, 199.99, 200.0, 250.0, 310.0]
+
+
+@pytest.fixture
+def resort(manager_for, guests):
+    """40 rooms with mixed attributes; some are booked and one is held."""
+    ana, ben = guests
+    rng = random.Random(7)
+    manager = manager_for()
+    rooms = [
+        manager.create_room(RoomSchema(
+            number=str(100 + i), room_type=rng.choice(ROOM_TYPES), view=rng.choice(VIEWS),
+            capacity=rng.randint(1, 6), price=rng.choice(PRICES),
+            amenities=rng.sample(AMENITIES, rng.randint(0, 3)),
+        ))
+        for i in range(40)
+    ]
+    for room in rooms[::5]:
+        manager.book_room(ana, room.id)
+    manager.hold_room(ben, rooms[1].id, ttl_seconds=60)
+    return manager
+
+
+def sql_search(db, room_types=(), views=(), amenities_all=(), amenities_any=(), min_capacity=None,
+               min_price=None, max_price=None, available_only=True):
+    query = db.query(Room)
+    if available_only:
+        query = query.filter(Room.is_booked.is_(False), Room.held_until.is_(None))
+    if room_types:
+        query = query.filter(Room.room_type.in_(room_types))
+    if views:
+        query = query.filter(Room.view.in_(views))
+    if min_capacity:
+        query = query.filter(Room.capacity >= min_capacity)
+    if min_price is not None:
+        query = query.filter(Room.price >= min_price)
+    if max_price is not None:
+        query = query.filter(Room.price <= max_price)
+    # The amenities JSON array is filtered here rather than with dialect-specific JSON operators
+    return [
+        room for room in query.all()
+        if set(amenities_all) <= set(room.amenities) and (not amenities_any or set(amenities_any) & set(room.amenities))
+    ]
+
+
+QUERIES = [
+    {},
+    {"available_only": False},
+    {"room_types": ["suite"]},
+    {"room_types": ["suite", "deluxe"], "views": ["ocean"]},
+    {"amenities_all": ["wifi", "balcony"]},
+    {"amenities_any": ["jacuzzi", "minibar"], "min_capacity": 3},
+    {"views": ["garden"], "amenities_all": ["wifi"], "amenities_any": ["balcony", "minibar"], "available_only": False},
+]
+PRICE_RANGES = [(None, None), (100.0, None), (None, 125.0), (100.0, 125.0), (100.01, 199.99), (125.0, 125.0), (320.0, None)]
+
+
+def test_search_matches_a_sql_filter(resort):
+    for filters, (min_price, max_price) in itertools.product(QUERIES, PRICE_RANGES):
+        expected = sql_search(resort.db, min_price=min_price, max_price=max_price, **filters)
+        prices = sorted(room.price for room in expected)
+
+        rooms, total = resort.search_rooms(min_price=min_price, max_price=max_price, **filters)
+        assert total == len(expected), (filters, min_price, max_price)
+        assert {room.id for room in rooms} == {room.id for room in expected}
+        assert [room.price for room in rooms] == prices
+
+        descending, _ = resort.search_rooms(min_price=min_price, max_price=max_price, sort="-price", **filters)
+        assert [room.price for room in descending] == prices[::-1]
+
+        # Pages of the price order add up to the whole result
+        pages = [resort.search_rooms(min_price=min_price, max_price=max_price, limit=4, offset=offset, **filters)
+                 for offset in range(0, total + 4, 4)]
+        assert [room.id for page, _ in pages for room in page] == [room.id for room in rooms]
+        assert {page_total for _, page_total in pages} == {total}
+
+
+def test_facet_counts_match_sql(resort):
+    for available_only in (True, False):
+        rooms = sql_search(resort.db, available_only=available_only)
+        assert resort.room_facets(available_only=available_only) == {
+            "room_type": dict(Counter(room.room_type for room in rooms)),
+            "view": dict(Counter(room.view for room in rooms if room.view)),
+            "amenities": dict(Counter(amenity for room in rooms for amenity in room.amenities)),
+            "capacity": {str(capacity): count for capacity, count in sorted(Counter(room.capacity for room in rooms).items())},
+        }
+
+
+def test_index_follows_room_changes(resort, guests):
+    ana, _ = guests
+    room = sql_search(resort.db, room_types=["suite"])[0]
+    resort.book_room(ana, room.id)
+    assert room.id not in {r.id for r in resort.search_rooms(room_types=["suite"])[0]}
+    assert room.id in {r.id for r in resort.search_rooms(room_types=["suite"], available_only=False)[0]}
+
+    resort.unbook_room(room.id)
+    rooms, total = resort.search_rooms(room_types=["suite"])
+    assert room.id in {r.id for r in rooms}
+    assert total == len(sql_search(resort.db, room_types=["suite"]))
@@ -0,0 +1,126 @@
+# app/tests/test_shards.py
+#
+# ShardRouter over two resort databases: resort_id stamping, resort lookup,
+# fan-out with a failing or slow resort, and the cross-resort price merge.
+
+import threading
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.config.db import UnknownResort, shard_router
+from app.domain.model.base import Room, User
+from app.repo.base import ResortManager, get_resort_id, search_all_resorts
+
+
+def test_rows_are_stamped_with_the_resort_of_their_database(manager_for):
+    for resort_id in ("main", "east"):
+        db = manager_for(resort_id).db
+        db.add(User(name="guest", email=f"guest@{resort_id}"))
+        db.commit()
+        # Core bulk inserts get the column default as well
+        with shard_router.engine(resort_id).begin() as conn:
+            conn.execute(Room.__table__.insert(), [{
+                "id": uuid.uuid4(), "number": "1", "is_booked": False, "room_type": "standard",
+                "capacity": 2, "price": 100, "amenities": [],
+            }])
+
+    for resort_id in ("main", "east"):
+        db = manager_for(resort_id).db
+        assert db.execute(select(User.resort_id)).scalars().all() == [resort_id]
+        assert db.execute(select(Room.resort_id)).scalars().all() == [resort_id]
+
+
+def test_resort_for_maps_engines_and_connections_back_to_their_resort():
+    for resort_id, engine in shard_router.engines():
+        assert shard_router.resort_for(engine) == resort_id
+        with engine.connect() as conn:
+            assert shard_router.resort_for(conn) == resort_id
+
+
+def test_get_resort_id_defaults_and_rejects_unknown_resorts():
+    assert get_resort_id(None) == "main"
+    assert get_resort_id("east") == "east"
+    with pytest.raises(HTTPException) as raised:
+        get_resort_id("nowhere")
+    assert raised.value.status_code == 404
+    with pytest.raises(UnknownResort):
+        shard_router.session("nowhere")
+
+
+def test_unknown_resort_is_404_over_http(client):
+    response = client.get("/rooms/available", params={"resort_id": "nowhere"})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Resort 'nowhere' not found."
+
+
+def test_fan_out_reports_a_failing_resort_and_keeps_the_others():
+    def count_rooms(resort_id, db):
+        if resort_id == "east":
+            raise RuntimeError("east is down")
+        return db.query(Room).count()
+
+    results, errors = shard_router.fan_out(count_rooms)
+    assert results == {"main": 0}
+    assert list(errors) == ["east"]
+    assert isinstance(errors["east"], RuntimeError)
+
+
+def test_fan_out_gives_up_on_a_resort_that_does_not_answer_in_time():
+    release = threading.Event()
+
+    def answer(resort_id, db):
+        if resort_id == "east":
+            release.wait(5)
+        return resort_id
+
+    try:
+        results, errors = shard_router.fan_out(answer, timeout=0.2)
+    finally:
+        release.set()
+    assert results == {"main": "main"}
+    assert isinstance(errors["east"], TimeoutError)
+
+
+def test_search_all_resorts_lists_failing_resorts_as_unavailable(add_rooms, monkeypatch):
+    add_rooms("main", ("101", 100.0))
+    add_rooms("east", ("201", 90.0))
+    search_rooms = ResortManager.search_rooms
+
+    def failing_in_east(self, **kwargs):
+        if self.resort_id == "east":
+            raise RuntimeError("east is down")
+        return search_rooms(self, **kwargs)
+
+    monkeypatch.setattr(ResortManager, "search_rooms", failing_in_east)
+    result = search_all_resorts()
+    assert result["unavailable"] == ["east"]
+    assert [(room["resort_id"], room["number"]) for room in result["rooms"]] == [("main", "101")]
+    assert result["total"] == 1
+
+
+def test_search_all_resorts_merges_pages_by_price(add_rooms):
+    add_rooms("main", ("101", 100.0), ("102", 250.0), ("103", 175.0))
+    add_rooms("east", ("201", 90.0), ("202", 180.0), ("203", 300.0))
+
+    result = search_all_resorts(sort="price", limit=4)
+    assert result["total"] == 6
+    assert result["unavailable"] == []
+    assert [(room["resort_id"], room["price"]) for room in result["rooms"]] == [
+        ("east", 90.0), ("main", 100.0), ("main", 175.0), ("east", 180.0),
+    ]
+
+    descending = search_all_resorts(sort="-price", limit=2, offset=1)
+    assert [(room["resort_id"], room["price"]) for room in descending["rooms"]] == [("main", 250.0), ("east", 180.0)]
+
+    east_only = search_all_resorts(resort_ids=["east"], sort="price")
+    assert {room["resort_id"] for room in east_only["rooms"]} == {"east"}
+    assert east_only["total"] == 3
+
+
+def test_search_all_resorts_rejects_unknown_sorts():
+    with pytest.raises(HTTPException) as raised:
+        search_all_resorts(sort="number")
+    assert raised.value.status_code == 422
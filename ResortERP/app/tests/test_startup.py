@@ -0,0 +1,36 @@
+# app/tests/test_startup.py
+#
+# Lazy imports: importing the app in a fresh interpreter leaves the Google
+# ADK/GenAI stack unloaded, and the startup check reports eager imports and
+# regressions against a baseline.
+
+from app.scripts import profile_startup
+from app.scripts.profile_startup import DEFAULT_FORBIDDEN, ImportRecord
+
+
+def test_importing_the_app_does_not_load_the_agent_stack():
+    records = profile_startup.measure("app.main")
+    assert "app.main" in records
+    assert "app.routers.endpoints.chatRouter" in records
+    assert profile_startup.check(records, "app.main", DEFAULT_FORBIDDEN, None, None, 0.0) == []
+
+
+def test_check_reports_eager_imports_and_regressions():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |   google.adk.agents",
+        "import time:       200 |        200 |   numpy",
+        "import time:      1000 |       1300 | app.main",
+    ])
+    records = {record.module: record for record in profile_startup.parse_importtime(stderr)}
+    assert records["google.adk.agents"] == ImportRecord("google.adk.agents", 100, 100, 1)
+
+    baseline = {"total_ms": 1.0, "modules": ["app.main", "google.adk.agents"]}
+    assert profile_startup.check(records, "app.main", DEFAULT_FORBIDDEN, 1.0, baseline, 0.25) == [
+        "'google.adk.agents' is imported eagerly (forbidden prefix 'google.adk')",
+        "total import time 1.3 ms exceeds budget of 1.0 ms",
+        "total import time 1.3 ms regressed past baseline 1.0 ms (+25% allowed)",
+        "new top-level imports since baseline: numpy",
+    ]
+    # "google.adkish" is not under the "google.adk" prefix
+    assert profile_startup.check({"google.adkish": records["numpy"]}, "app.main", DEFAULT_FORBIDDEN, None, None, 0.0) == []